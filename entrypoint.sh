@@ -21,7 +21,13 @@ fi
 
 echo "DB 다운로드 완료."
 
-# 2. FastAPI 애플리케이션 실행
+# 2. 다운로드한 .pkl DB를 메모리 매핑 저장소로 변환
+# 워커들이 같은 행렬 파일을 np.memmap으로 열어 OS 페이지 캐시를 공유하게 됩니다.
+DB_STORE_PATH="/app/db/embeddings"
+python scripts/convert_pkl_db.py "${DB_LOCAL_PATH}" "${DB_STORE_PATH}"
+export EMBEDDING_DB_PATH="${EMBEDDING_DB_PATH:-${DB_STORE_PATH}}"
+
+# 3. FastAPI 애플리케이션 실행
 # exec "$@"는 CMD로 전달된 명령어를 실행합니다.
 # 이렇게 하면 uvicorn이 PID 1이 되어 Docker의 시그널을 제대로 처리할 수 있습니다.
 echo "FastAPI 서버를 시작합니다..."
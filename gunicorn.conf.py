@@ -0,0 +1,20 @@
+# Gunicorn 설정: `gunicorn -c gunicorn.conf.py main:app`
+#
+# `preload_app`으로 마스터 프로세스에서 main.py를 import하고, 그 시점에 모델 가중치를 로드한 뒤
+# 워커를 fork합니다. 워커들은 가중치 메모리를 copy-on-write로 공유하므로 워커 수만큼 메모리가
+# 늘지 않고, 각 워커의 시작 시간에서 모델 로드가 빠집니다. (CPU 전용. GPU에서는 워커마다 로드합니다.)
+import gc
+import os
+
+os.environ.setdefault("PRELOAD_MODELS", "1")
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+
+def when_ready(server):
+    # 로드가 끝난 객체들을 GC 추적 대상에서 빼서, 워커의 GC가 공유 페이지를 건드려 복사되는 일을 줄입니다.
+    gc.freeze()
@@ -1,24 +1,149 @@
 import os
-import shutil
-import pickle
-import uuid
-import boto3
+import json
+import time
+import asyncio
+import logging
+from functools import partial
 from botocore.exceptions import ClientError
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request, Query
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request, Query, WebSocket, WebSocketDisconnect, status, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pathlib import Path
 import uvicorn
+import torch
 
 from src.pipeline import MusicRecommendationPipeline
+from src.db_manager import EmbeddingDBManager
+from src.inference_pool import InferencePool, QueueFullError
+from src.jobs import PRIORITIES, SUCCEEDED, FAILED, JobQueue
+from src.audio_decode import (
+    WHISPER_SAMPLE_RATE,
+    AudioDecodeError,
+    AudioTooLargeError,
+    DecoderUnavailableError,
+    decode_file,
+    decode_stream,
+)
+from src.cache import ResultCache, audio_fingerprint
+from src.object_store import LocalObjectStore, parse_manifest
+from src.presign import PresignedURLCache, object_key
+from src.live_session import PCM_FORMATS, LiveSession
+from src.tag_index import HybridScorer
+from src.cpu_inference import CPUInferenceProfile
+from src.decoding_profile import PROFILES, DecodingProfile, get_profile
+from src import model_registry
+from src.model_registry import startup_timings
 from src.speech_to_text import SpeechToText
+from src.logging_config import configure_logging
+from src.metrics import REGISTRY, MetricsMiddleware, span
 
 
 # --- 전역 설정 ---
-TEMP_UPLOAD_DIR = "temp_uploads"
 EMBEDDING_DB_PATH = os.getenv("EMBEDDING_DB_PATH", "db/embeddings.pkl")
 S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "bgm-selector-bucket")
-os.makedirs(TEMP_UPLOAD_DIR, exist_ok=True)
+# 로컬 S3 대역(moto 서버, MinIO 등)을 쓸 때의 엔드포인트. 비우면 AWS 기본 엔드포인트
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "") or None
+# 추천 결과의 파일 이름을 S3 키로 바꿀 때 붙이는 접두사
+S3_MUSIC_PREFIX = os.getenv("S3_MUSIC_PREFIX", "music_library/")
+# 다운로드 URL 유효 시간(초)과, 같은 키에 서명한 URL을 재사용하는 시간(초, 유효 시간보다 충분히 짧게)
+PRESIGN_EXPIRES_SECONDS = int(os.getenv("PRESIGN_EXPIRES_SECONDS", "3600"))
+PRESIGN_REUSE_SECONDS = float(os.getenv("PRESIGN_REUSE_SECONDS", "1800"))
+PRESIGN_MAX_KEYS = int(os.getenv("PRESIGN_MAX_KEYS", "100"))
+# 근사 검색 인덱스: "none"(전수 검색) 또는 "ivf" (`build_embedding_db.py --ann-index` 또는 `scripts/build_ann_index.py`로 생성).
+# 인덱스가 없는 버전은 경고를 남기고 전수 검색으로 서비스합니다.
+ANN_INDEX = os.getenv("ANN_INDEX", "none")
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "0")) or None
+# 0보다 크면 이 간격(초)마다 DB의 활성 버전을 확인하고, 바뀌었으면 재시작 없이 교체합니다.
+DB_WATCH_INTERVAL = float(os.getenv("DB_WATCH_INTERVAL", "0"))
+# 추론 스레드 수와, 그 뒤에서 기다릴 수 있는 요청 수. 둘 다 차면 503 + Retry-After로 즉시 거절합니다.
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "8"))
+# 비동기 작업(/jobs) 워커 스레드 수, 대기할 수 있는 작업 수, 끝난 작업의 결과를 보관할 시간(초)
+# 작업도 위의 추론 스레드에서 실행되므로 Whisper/CLAP 동시 실행은 합쳐서 INFERENCE_WORKERS개입니다.
+# 실행 중인 작업(최대 JOB_WORKERS개)은 /recommend/의 입장 한도(INFERENCE_WORKERS + INFERENCE_QUEUE_SIZE)도 차지하고,
+# 메모리에 올라가는 디코딩된 업로드는 최대 INFERENCE_WORKERS + INFERENCE_QUEUE_SIZE + JOB_QUEUE_SIZE + JOB_WORKERS개입니다.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "64"))
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "600"))
+# 1보다 크면 동시에 들어온 Whisper 변환을 최대 이 개수까지, WHISPER_BATCH_WAIT_MS 동안 모아 한 번에 디코딩합니다.
+# (INFERENCE_WORKERS가 2 이상이어야 요청이 동시에 도착합니다.)
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "1"))
+WHISPER_BATCH_WAIT_MS = float(os.getenv("WHISPER_BATCH_WAIT_MS", "20"))
+# 업로드 제한: 최대 크기(바이트)와 분석할 최대 길이(초). 길이를 넘는 부분은 읽지 않고 버립니다.
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+MAX_AUDIO_SECONDS = float(os.getenv("MAX_AUDIO_SECONDS", "600"))
+# 반복 업로드 결과 캐시: 메모리 상한(MB), TTL(초), 워커 간 공유용 SQLite 파일 경로(비우면 메모리만 사용)
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") == "1"
+CACHE_MAX_MB = int(os.getenv("CACHE_MAX_MB", "64"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "3600"))
+CACHE_DISK_PATH = os.getenv("CACHE_DISK_PATH", "")
+# 배치 추천: 한 요청의 최대 항목 수와, 함께 디코딩/변환/검색할 묶음 크기. 결과는 묶음마다 스트리밍됩니다.
+# 매니페스트의 경로/S3 키는 LOCAL_OBJECT_ROOT 디렉토리(버킷의 로컬 대역) 안의 파일로 해석합니다.
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "64"))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "8"))
+LOCAL_OBJECT_ROOT = os.getenv("LOCAL_OBJECT_ROOT", "objects")
+# 하이브리드 순위: 변환 텍스트의 키워드(`keywords.json`)가 가리키는 태그를 가진 곡에 가산점을 줍니다.
+# 점수 = HYBRID_EMBEDDING_WEIGHT * CLAP 코사인 유사도 + HYBRID_TAG_WEIGHT * (감지된 태그 중 곡이 가진 비율). 0이면 끕니다.
+HYBRID_EMBEDDING_WEIGHT = float(os.getenv("HYBRID_EMBEDDING_WEIGHT", "1.0"))
+HYBRID_TAG_WEIGHT = float(os.getenv("HYBRID_TAG_WEIGHT", "0.1"))
+# 다양성 재순위(MMR): 0이면 관련도 순서 그대로, 클수록 서로 비슷한 곡(같은 곡의 다른 편곡 등)을 함께 추천하지 않습니다.
+# 요청마다 `diversity`로 바꿀 수 있습니다.
+MMR_DIVERSITY = float(os.getenv("MMR_DIVERSITY", "0.3"))
+# 실시간 세션(`/recommend/live`): 최근 LIVE_WINDOW_SECONDS 창을 LIVE_STEP_SECONDS마다 다시 변환하고,
+# 변환 결과가 LIVE_MIN_CHANGE(단어 단위 차이 비율) 이상 바뀌었을 때만 다시 검색합니다.
+# 곡은 새 1위가 LIVE_SWITCH_MARGIN 이상 앞서고, 현재 곡을 LIVE_MIN_HOLD_SECONDS 이상 유지했을 때만 바꿉니다.
+LIVE_WINDOW_SECONDS = float(os.getenv("LIVE_WINDOW_SECONDS", "20"))
+LIVE_STEP_SECONDS = float(os.getenv("LIVE_STEP_SECONDS", "4"))
+LIVE_MIN_CHANGE = float(os.getenv("LIVE_MIN_CHANGE", "0.2"))
+LIVE_SWITCH_MARGIN = float(os.getenv("LIVE_SWITCH_MARGIN", "0.02"))
+LIVE_MIN_HOLD_SECONDS = float(os.getenv("LIVE_MIN_HOLD_SECONDS", "20"))
+# 음성 구간 검출(VAD): 무음을 잘라 내고 분석할 음성을 SPEECH_BUDGET_SECONDS로 제한합니다.
+# 전략은 "first"(앞에서부터) 또는 "sampled"(SPEECH_BUDGET_WINDOWS개 창을 전체에 고르게). 무음 업로드는 Whisper를 건너뜁니다.
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1") == "1"
+SPEECH_BUDGET_SECONDS = float(os.getenv("SPEECH_BUDGET_SECONDS", "30"))
+SPEECH_BUDGET_STRATEGY = os.getenv("SPEECH_BUDGET_STRATEGY", "first")
+SPEECH_BUDGET_WINDOWS = int(os.getenv("SPEECH_BUDGET_WINDOWS", "3"))
+# 점진적 변환: PROGRESSIVE_PREFIX_SECONDS보다 긴 오디오는 앞부분만 먼저 변환해, top-k 경계의 점수 차이가
+# DB 점수 표준편차의 PROGRESSIVE_MIN_MARGIN배 이상이면 나머지 변환 없이 추천합니다. 점수 보정이 있는 DB에서만 동작하며,
+# 다양성 재순위(MMR)나 태그 가중치가 적용되는 요청은 항상 전체를 변환합니다.
+PROGRESSIVE_ENABLED = os.getenv("PROGRESSIVE_ENABLED", "0") == "1"
+PROGRESSIVE_PREFIX_SECONDS = float(os.getenv("PROGRESSIVE_PREFIX_SECONDS", "10"))
+PROGRESSIVE_MIN_MARGIN = float(os.getenv("PROGRESSIVE_MIN_MARGIN", "0.1"))
+# 모델 로드 방식: "eager"(시작 시 로드) 또는 "lazy"(첫 요청 시 로드). MODEL_WARMUP=1이면 시작 시 한 번 추론해 둡니다.
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "eager")
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"
+# 1이면 모듈 import 시점(=Gunicorn `preload_app`의 fork 이전)에 모델을 로드해 워커들이 copy-on-write로 공유합니다.
+# `gunicorn -c gunicorn.conf.py main:app`으로 실행하면 자동으로 켜집니다.
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "0") == "1"
+# CPU 추론 프로필: Whisper 선형 계층 양자화("none" 또는 "int8"), 워커당 torch 스레드 수(0이면 torch 기본값),
+# 인코더 torch.compile 사용 여부. 한 노드에 워커가 N개면 스레드 수는 대략 (코어 수 / N)으로 맞춥니다.
+CPU_PROFILE = CPUInferenceProfile(
+    quantize=os.getenv("WHISPER_QUANTIZE", "none"),
+    intra_op_threads=int(os.getenv("TORCH_NUM_THREADS", "0")) or None,
+    inter_op_threads=int(os.getenv("TORCH_INTEROP_THREADS", "0")) or None,
+    compile=os.getenv("WHISPER_COMPILE", "0") == "1",
+)
+# Whisper 디코딩 프로필: 프리셋("default", "korean", "fast")에 언어 고정, 30초 창당 토큰 상한, 최대 창 수를 덧씌웁니다.
+# 요청마다 /recommend/의 폼 필드로 바꿀 수 있습니다.
+WHISPER_DECODING = get_profile(os.getenv("WHISPER_DECODING_PROFILE", "default")).replace(
+    language=os.getenv("WHISPER_LANGUAGE") or None,
+    max_tokens=int(os.getenv("WHISPER_MAX_TOKENS", "0")) or None,
+    max_segments=int(os.getenv("WHISPER_MAX_SEGMENTS", "0")) or None,
+)
+
+# 로그 수준("DEBUG"면 단계별 구간 로그 포함)과 형식("text" 또는 수집기용 "json")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+configure_logging(LOG_LEVEL, LOG_FORMAT)
+logger = logging.getLogger("main")
+
+if PRELOAD_MODELS:
+    CPU_PROFILE.apply_threads()
+    model_registry.preload(WHISPER_MODEL_SIZE, profile=CPU_PROFILE)
 
 
 # --- FastAPI 앱 초기화 ---
@@ -27,6 +152,7 @@ app = FastAPI(
     description="오디오 내용(음성)을 이해하고, 분위기와 의미에 맞는 음악을 추천합니다.",
     version="2.0.0",
 )
+app.add_middleware(MetricsMiddleware)
 
 
 # --- 서버 시작 이벤트 ---
@@ -34,40 +160,147 @@ app = FastAPI(
 def startup_event():
     """
     서버 시작 시, 미리 빌드된 음악 임베딩 DB를 로드하고 추천 파이프라인을 초기화합니다.
-    - `db/embeddings.pkl` 파일이 반드시 존재해야 합니다.
-    - 파일이 없으면 서버는 시작되지 않습니다.
+    - `EMBEDDING_DB_PATH`에 임베딩 저장소 디렉토리(권장, 메모리 매핑) 또는 기존 `.pkl` 파일이 반드시 존재해야 합니다.
+    - 경로가 없으면 서버는 시작되지 않습니다.
     """
-    print("--- 서버 시작 절차를 개시합니다 ---")
+    logger.info("서버 시작 절차를 개시합니다.")
+    startup_start = time.perf_counter()
+    # 스레드 수는 프로세스마다 설정해야 하므로 fork된 각 워커에서 다시 적용합니다.
+    CPU_PROFILE.apply_threads()
+    # S3 클라이언트는 워커마다 하나를 만들어 재사용합니다. (첫 서명 시점에 생성)
+    app.state.presigner = PresignedURLCache(
+        S3_BUCKET_NAME,
+        expires_in=PRESIGN_EXPIRES_SECONDS,
+        reuse_seconds=PRESIGN_REUSE_SECONDS,
+        region=os.getenv("AWS_REGION"),
+        endpoint_url=S3_ENDPOINT_URL,
+    )
     
     db_path = Path(EMBEDDING_DB_PATH)
     
-    if not db_path.is_file():
-        print(f"치명적 오류: 임베딩 데이터베이스 파일을 찾을 수 없습니다. (경로: {EMBEDDING_DB_PATH})")
-        print("-> 먼저 `scripts/build_embedding_db.py` 스크립트를 실행하여 DB를 생성해야 합니다.")
+    if not db_path.exists():
+        logger.critical("임베딩 데이터베이스 파일을 찾을 수 없습니다. (경로: %s)", EMBEDDING_DB_PATH)
+        logger.critical("먼저 `scripts/build_embedding_db.py` 스크립트를 실행하여 DB를 생성해야 합니다.")
         # DB가 없으면 서버를 중지시킴
         raise RuntimeError("Embedding database not found. Cannot start server.")
         
-    print(f"임베딩 데이터베이스를 로드합니다: {EMBEDDING_DB_PATH}")
+    logger.info("임베딩 데이터베이스를 로드합니다: %s", EMBEDDING_DB_PATH)
     try:
-        with open(db_path, "rb") as f:
-            embedding_db = pickle.load(f)
-        
-        app.state.embedding_db = embedding_db
-        app.state.pipeline = MusicRecommendationPipeline()
-        print("✓ 음악 추천 파이프라인이 성공적으로 초기화되었습니다.")
+        # 저장소 디렉토리는 np.memmap으로 열리므로 워커들이 OS 페이지 캐시를 공유합니다.
+        db_manager = EmbeddingDBManager(db_path, ann_index=ANN_INDEX, nprobe=ANN_NPROBE)
+        with startup_timings.phase("load_db"):
+            snapshot = db_manager.load()
+        app.state.db_manager = db_manager
+        logger.info("임베딩 %d개를 로드했습니다. (버전 %s, 인덱스 %s)", len(snapshot.db), snapshot.version, ANN_INDEX)
+
+        if DB_WATCH_INTERVAL > 0:
+            db_manager.start_watcher(DB_WATCH_INTERVAL)
+            logger.info("DB 버전 감시를 시작했습니다. (%ss 간격)", DB_WATCH_INTERVAL)
+
+        with startup_timings.phase("init_pipeline"):
+            app.state.pipeline = MusicRecommendationPipeline(
+                whisper_model_size=WHISPER_MODEL_SIZE, lazy=MODEL_LOAD_MODE == "lazy", cpu_profile=CPU_PROFILE
+            )
+        if WHISPER_BATCH_SIZE > 1:
+            app.state.pipeline.speech_to_text.enable_batching(WHISPER_BATCH_SIZE, WHISPER_BATCH_WAIT_MS)
+            logger.info(
+                "Whisper 마이크로 배칭을 사용합니다. (batch=%d, wait=%sms)", WHISPER_BATCH_SIZE, WHISPER_BATCH_WAIT_MS
+            )
+        if VAD_ENABLED:
+            app.state.pipeline.speech_to_text.enable_vad(
+                SPEECH_BUDGET_SECONDS, SPEECH_BUDGET_STRATEGY, SPEECH_BUDGET_WINDOWS
+            )
+            logger.info("음성 구간 검출을 사용합니다. (예산 %ss, %s)", SPEECH_BUDGET_SECONDS, SPEECH_BUDGET_STRATEGY)
+        app.state.pipeline.speech_to_text.decoding = WHISPER_DECODING
+        logger.info("Whisper 디코딩 프로필: %s", WHISPER_DECODING.as_dict())
+        if HYBRID_TAG_WEIGHT > 0:
+            app.state.pipeline.recommender.enable_hybrid(HybridScorer(HYBRID_EMBEDDING_WEIGHT, HYBRID_TAG_WEIGHT))
+            app.state.pipeline.recommender.tag_index(snapshot.db)
+            logger.info("하이브리드 순위를 사용합니다. (임베딩 %s, 태그 %s)", HYBRID_EMBEDDING_WEIGHT, HYBRID_TAG_WEIGHT)
+        if MMR_DIVERSITY > 0:
+            app.state.pipeline.recommender.enable_mmr(MMR_DIVERSITY)
+            logger.info("다양성 재순위(MMR)를 사용합니다. (diversity=%s)", MMR_DIVERSITY)
+        if PROGRESSIVE_ENABLED:
+            app.state.pipeline.enable_progressive(PROGRESSIVE_PREFIX_SECONDS, PROGRESSIVE_MIN_MARGIN)
+            if snapshot.db.calibration is None:
+                logger.warning("임베딩 DB에 점수 보정이 없어 점진적 변환이 동작하지 않습니다. DB를 다시 빌드하세요.")
+            logger.info(
+                "점진적 변환을 사용합니다. (앞 %ss, 최소 여유 %s)", PROGRESSIVE_PREFIX_SECONDS, PROGRESSIVE_MIN_MARGIN
+            )
+        if CACHE_ENABLED:
+            app.state.pipeline.enable_cache(ResultCache(
+                max_bytes=CACHE_MAX_MB * 1024 * 1024,
+                ttl_seconds=CACHE_TTL_SECONDS,
+                disk_path=CACHE_DISK_PATH or None,
+            ))
+            logger.info(
+                "결과 캐시를 사용합니다. (%dMB, TTL %ss, 디스크: %s)", CACHE_MAX_MB, CACHE_TTL_SECONDS, CACHE_DISK_PATH or "없음"
+            )
+        app.state.object_store = LocalObjectStore(LOCAL_OBJECT_ROOT, bucket=S3_BUCKET_NAME)
+        app.state.inference_pool = InferencePool(max_workers=INFERENCE_WORKERS, max_queue=INFERENCE_QUEUE_SIZE)
+        app.state.jobs = JobQueue(
+            workers=JOB_WORKERS,
+            max_queued=JOB_QUEUE_SIZE,
+            result_ttl_seconds=JOB_RESULT_TTL_SECONDS,
+            execute=app.state.inference_pool.run_blocking,
+        )
+        logger.info("음악 추천 파이프라인이 성공적으로 초기화되었습니다.")
+
+        # lazy 모드에서 워밍업하면 모델이 로드되므로 건너뜁니다.
+        if MODEL_WARMUP and MODEL_LOAD_MODE != "lazy":
+            with startup_timings.phase("warm_up"):
+                app.state.pipeline.warm_up()
+            logger.info("모델 워밍업을 마쳤습니다.")
 
     except Exception as e:
-        print(f"치명적 오류: 임베딩 DB 로딩 또는 파이프라인 초기화 중 예외가 발생했습니다: {e}")
+        logger.critical("임베딩 DB 로딩 또는 파이프라인 초기화 중 예외가 발생했습니다: %s", e, exc_info=True)
         raise RuntimeError("Failed to load DB or initialize pipeline.")
         
-    print("--- 서버가 성공적으로 시작되었습니다 ---")
+    startup_timings.record("startup_total", time.perf_counter() - startup_start)
+    logger.info("시작 단계별 소요 시간: %s", startup_timings.report())
+    logger.info("서버가 성공적으로 시작되었습니다.")
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """서버 종료 시 DB 버전 감시 스레드, 작업 워커, 추론 스레드를 정리합니다."""
+    if hasattr(app.state, "db_manager"):
+        app.state.db_manager.stop_watcher()
+    # 작업 워커가 추론 스레드에 넘기므로, 작업 대기열을 먼저 닫습니다.
+    if hasattr(app.state, "jobs"):
+        app.state.jobs.shutdown()
+    if hasattr(app.state, "inference_pool"):
+        app.state.inference_pool.shutdown()
 
 
 # --- Pydantic 모델 ---
 class RecommendationResponse(BaseModel):
     file_name: str
     file_path: str
+    # 점수 보정이 있는 DB면 0~1 보정 점수, 없으면 원시 유사도
     score: float
+    raw_score: Optional[float] = None
+    url: Optional[str] = None
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    deduplicated: bool
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    priority: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    queue_position: Optional[int] = None
+    attached: int = 0
+    cancel_requested: bool = False
+    result: Optional[List[RecommendationResponse]] = None
+    error: Optional[str] = None
 
 # --- API 엔드포인트 ---
 @app.get("/", summary="Health Check")
@@ -76,62 +309,650 @@ def health_check():
     return {"status": "ok", "message": "API is running."}
 
 
+def _presigner() -> PresignedURLCache:
+    presigner = getattr(app.state, "presigner", None)
+    if presigner is None:
+        raise HTTPException(status_code=503, detail="서버가 준비되지 않았습니다.")
+    return presigner
+
+
 @app.get("/generate-presigned-url/", summary="S3 파일용 임시 다운로드 URL 생성")
 def generate_presigned_url(key: str = Query(..., description="S3 버킷 내의 파일 경로 (예: music_library/song1.mp3)")):
     """
     S3에 저장된 음악 파일에 접근할 수 있는 임시 URL(Pre-signed URL)을 생성합니다.
-    이 URL은 1시간 동안 유효합니다.
+    이 URL은 1시간 동안 유효하며, 같은 키의 URL은 유효 시간이 충분히 남아 있는 동안 재사용됩니다.
     """
-    s3_client = boto3.client('s3', region_name=os.getenv("AWS_REGION", "ap-northeast-2"))
     try:
-        url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={'Bucket': S3_BUCKET_NAME, 'Key': key},
-            ExpiresIn=3600  # URL 유효 시간 (초)
-        )
-        return {"url": url}
+        return {"url": _presigner().url(key)}
     except ClientError as e:
-        print(f"S3 Pre-signed URL 생성 오류: {e}")
+        logger.error("S3 Pre-signed URL 생성 오류: %s", e)
         # 파일이 존재하지 않거나 접근 권한이 없을 때
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없거나 접근 권한이 없습니다.")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"내부 서버 오류: {e}")
 
 
-@app.post("/recommend/", response_model=List[RecommendationResponse], summary="음악 추천 받기")
-async def recommend_music(file: UploadFile = File(..., description="음성 또는 음악이 담긴 오디오 파일")):
+class PresignRequest(BaseModel):
+    keys: List[str]
+
+
+@app.post("/generate-presigned-urls/", summary="여러 S3 파일의 임시 다운로드 URL을 한 번에 생성")
+def generate_presigned_urls(request: PresignRequest):
     """
-    사용자가 업로드한 오디오 파일의 내용을 분석하여 가장 유사한 분위기의 음악을 추천합니다.
+    추천 결과 top-k 곡처럼 여러 키의 다운로드 URL을 한 번의 요청으로 생성합니다.
+
+    응답은 `{"urls": {키: URL}}` 형식이며, 중복 키는 한 번만 서명합니다.
     """
+    if len(request.keys) > PRESIGN_MAX_KEYS:
+        raise HTTPException(status_code=400, detail=f"키는 한 번에 최대 {PRESIGN_MAX_KEYS}개까지 요청할 수 있습니다.")
+    try:
+        return {"urls": _presigner().urls(request.keys)}
+    except ClientError as e:
+        logger.error("S3 Pre-signed URL 생성 오류: %s", e)
+        raise HTTPException(status_code=404, detail="파일을 찾을 수 없거나 접근 권한이 없습니다.")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"내부 서버 오류: {e}")
+
+
+@app.get("/admin/db", summary="활성 임베딩 DB 정보")
+def get_db_info():
+    """현재 사용 중인 임베딩 DB의 버전, 행 수, 로드 시각과 소요 시간을 반환합니다."""
+    if not hasattr(app.state, "db_manager"):
+        raise HTTPException(status_code=503, detail="임베딩 DB가 로드되지 않았습니다.")
+    return app.state.db_manager.info()
+
+
+@app.get("/admin/startup", summary="서버 시작 단계별 소요 시간")
+def get_startup_info():
+    """모델 로드 방식, 이 프로세스에 로드된 모델, 시작 단계별 소요 시간(초)을 반환합니다."""
+    return {
+        "pid": os.getpid(),
+        "model_load_mode": MODEL_LOAD_MODE,
+        "preloaded": PRELOAD_MODELS,
+        "loaded_models": model_registry.loaded_models(),
+        "cpu_profile": CPU_PROFILE.as_dict(),
+        "torch_threads": torch.get_num_threads(),
+        "timings": startup_timings.as_dict(),
+    }
+
+
+@app.get("/admin/cache", summary="결과 캐시 통계")
+def get_cache_stats():
+    """변환 텍스트/추천 결과/텍스트 임베딩/다운로드 URL 캐시의 항목 수, 메모리 사용량, 적중/실패 횟수를 반환합니다."""
+    if not hasattr(app.state, "pipeline"):
+        return {"enabled": False}
+    pipeline = app.state.pipeline
+    stats = {"text_embeddings": pipeline.recommender.text_embedding_cache.stats()}
+    if hasattr(app.state, "presigner"):
+        stats["presigned_urls"] = app.state.presigner.stats()
+    if pipeline.cache is None:
+        return {"enabled": False, **stats}
+    return {"enabled": True, **pipeline.cache.stats(), **stats}
+
+
+def _cache_samples(name: str, stats, key: str):
+    """캐시 통계(`{"memory": {...}, "disk": {...}}` 형식 포함)에서 `key` 값을 (레이블, 값) 목록으로 뽑습니다."""
+    if key in stats:
+        return [({"cache": name, "tier": "memory"}, stats[key])]
+    return [({"cache": name, "tier": tier}, tier_stats[key]) for tier, tier_stats in stats.items() if key in tier_stats]
+
+
+def _collect_app_metrics():
+    """내보낼 때마다 app.state에서 대기열, 캐시, DB, 모델 로드 상태를 읽어 지표로 만듭니다."""
+    families = []
+    pool = getattr(app.state, "inference_pool", None)
+    if pool is not None:
+        stats = pool.stats()
+        families += [
+            ("bgm_inference_in_flight", "gauge", "Inference jobs running or queued.", [({}, stats["in_flight"])]),
+            ("bgm_inference_queue_depth", "gauge", "Inference jobs waiting for a worker.", [({}, stats["queue_depth"])]),
+            ("bgm_inference_completed_total", "counter", "Finished inference jobs.", [({}, stats["completed"])]),
+            ("bgm_inference_rejected_total", "counter", "Requests rejected because the queue was full.", [({}, stats["rejected"])]),
+        ]
+
+    jobs = getattr(app.state, "jobs", None)
+    if jobs is not None:
+        stats = jobs.stats()
+        families += [
+            ("bgm_jobs_queued", "gauge", "Background jobs waiting for a worker.", [({}, stats["queued"])]),
+            ("bgm_jobs_running", "gauge", "Background jobs being processed.", [({}, stats["running"])]),
+            (
+                "bgm_jobs_total", "counter", "Background job submissions and outcomes.",
+                [({"outcome": outcome}, stats[outcome])
+                 for outcome in ("submitted", "deduplicated", "succeeded", "failed", "cancelled")],
+            ),
+        ]
+
+    pipeline = getattr(app.state, "pipeline", None)
+    if pipeline is not None:
+        caches = {"text_embeddings": pipeline.recommender.text_embedding_cache.stats()}
+        if pipeline.cache is not None:
+            caches.update(pipeline.cache.stats())
+        presigner = getattr(app.state, "presigner", None)
+        if presigner is not None:
+            caches["presigned_urls"] = presigner.cache.stats()
+        hits, misses, hit_rate = [], [], []
+        for name, stats in caches.items():
+            hits += _cache_samples(name, stats, "hits")
+            misses += _cache_samples(name, stats, "misses")
+            hit_rate += _cache_samples(name, stats, "hit_rate")
+        families += [
+            ("bgm_cache_hits_total", "counter", "Cache hits by cache and tier.", hits),
+            ("bgm_cache_misses_total", "counter", "Cache misses by cache and tier.", misses),
+            ("bgm_cache_hit_rate", "gauge", "Cache hit rate by cache and tier.", hit_rate),
+        ]
+
+    db_manager = getattr(app.state, "db_manager", None)
+    if db_manager is not None:
+        info = db_manager.info()
+        families.append(("bgm_db_rows", "gauge", "Rows in the active embedding DB.", [({}, info["rows"])]))
+
+    families += [
+        (
+            "bgm_startup_phase_seconds", "gauge", "Duration of each startup phase (model loads, DB load, warm-up).",
+            [({"phase": phase}, seconds) for phase, seconds in startup_timings.as_dict().items()],
+        ),
+        (
+            "bgm_model_loaded", "gauge", "Models loaded in this worker process.",
+            [({"model": name}, 1) for name in model_registry.loaded_models()],
+        ),
+    ]
+    return families
+
+
+REGISTRY.register_collector(_collect_app_metrics)
+
+
+@app.get("/metrics", summary="Prometheus 지표", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    단계별 지연 시간 히스토그램(`bgm_stage_seconds`), 엔드포인트별 요청 수/지연 시간,
+    추론 대기열, 캐시 적중률, 모델 로드 시간을 Prometheus 텍스트 형식으로 반환합니다.
+    지표는 워커 프로세스마다 따로 집계됩니다.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/admin/db/reload", status_code=202, summary="임베딩 DB 재로드")
+def reload_db():
+    """
+    디스크의 활성 임베딩 DB를 백그라운드에서 다시 로드하고, 완료되면 원자적으로 교체합니다.
+    로드가 끝날 때까지 요청은 기존 DB로 처리됩니다.
+    """
+    if not hasattr(app.state, "db_manager"):
+        raise HTTPException(status_code=503, detail="임베딩 DB가 로드되지 않았습니다.")
+    if not app.state.db_manager.reload_in_background():
+        raise HTTPException(status_code=409, detail="이미 재로드가 진행 중입니다.")
+    return {"status": "reloading", "current": app.state.db_manager.info()}
+
+
+def _decode_upload(file: UploadFile):
+    """업로드 본문을 ffmpeg 파이프로 바로 디코딩해 16kHz float32 파형을 만듭니다. (임시 파일 없음)"""
+    return decode_stream(file.file, max_bytes=MAX_UPLOAD_BYTES, max_seconds=MAX_AUDIO_SECONDS)
+
+
+def _queue_full_response(e: QueueFullError) -> HTTPException:
+    logger.warning("추론 대기열이 가득 차 요청을 거절합니다. (Retry-After: %ds)", e.retry_after)
+    return HTTPException(
+        status_code=503,
+        detail="서버가 처리할 수 있는 요청 수를 초과했습니다. 잠시 후 다시 시도해주세요.",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def _with_urls(recommendations):
+    """추천 결과마다 S3 다운로드 URL을 붙인 새 리스트를 만듭니다. (캐시된 결과 객체는 수정하지 않음)"""
+    keys = [object_key(r["file_path"], S3_MUSIC_PREFIX) for r in recommendations]
+    try:
+        urls = app.state.presigner.urls(keys)
+    except Exception as e:
+        logger.warning("추천 결과의 다운로드 URL을 만들지 못했습니다: %s", e)
+        return recommendations
+    return [{**r, "url": urls[key]} for r, key in zip(recommendations, keys)]
+
+
+def _parse_list_field(value: Optional[str], field: str) -> Optional[List[str]]:
+    """폼 필드의 목록 값(JSON 문자열 배열 또는 쉼표로 구분한 문자열)을 읽습니다."""
+    if not value or not value.strip():
+        return None
+    value = value.strip()
+    if value.startswith("["):
+        try:
+            items = json.loads(value)
+        except json.JSONDecodeError:
+            items = None
+        if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+            raise HTTPException(status_code=400, detail=f"`{field}`는 문자열 배열이어야 합니다.")
+    else:
+        items = value.split(",")
+    return [item.strip() for item in items if item.strip()] or None
+
+
+def _request_decoding(
+    profile: Optional[str],
+    language: Optional[str],
+    greedy: Optional[bool],
+    without_timestamps: Optional[bool],
+    max_tokens: Optional[int],
+    max_segments: Optional[int],
+) -> Optional[DecodingProfile]:
+    """요청의 디코딩 필드로 프로필을 만듭니다. 아무 필드도 없으면 None(서버 기본값)을 반환합니다."""
+    overrides = dict(
+        language=language, greedy=greedy, without_timestamps=without_timestamps,
+        max_tokens=max_tokens, max_segments=max_segments,
+    )
+    if profile is None and all(value is None for value in overrides.values()):
+        return None
+    try:
+        base = get_profile(profile) if profile is not None else WHISPER_DECODING
+        return base.replace(**overrides)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _recommend_options(
+    top_k: int = Form(5, ge=1, le=50, description="추천할 곡 수"),
+    tags: Optional[str] = Form(None, description="이 태그 중 하나라도 가진 곡만 추천 (JSON 배열 또는 쉼표 구분)"),
+    exclude: Optional[str] = Form(None, description="추천에서 뺄 곡의 파일 이름/경로 (JSON 배열 또는 쉼표 구분)"),
+    diversity: Optional[float] = Form(None, ge=0.0, le=1.0, description="다양성 재순위(MMR) 강도. 생략하면 서버 기본값"),
+    decoding_profile: Optional[str] = Form(
+        None, description=f"Whisper 디코딩 프리셋 ({', '.join(PROFILES)}). 생략하면 서버 설정"
+    ),
+    language: Optional[str] = Form(None, description="변환 언어 고정 (예: ko). 생략하면 프리셋/서버 설정"),
+    greedy: Optional[bool] = Form(None, description="온도 재시도 없이 탐욕 디코딩만 수행"),
+    without_timestamps: Optional[bool] = Form(None, description="타임스탬프 토큰 없이 텍스트만 디코딩"),
+    max_tokens: Optional[int] = Form(None, ge=1, le=224, description="30초 창마다 생성할 최대 토큰 수"),
+    max_segments: Optional[int] = Form(None, ge=1, description="변환할 최대 30초 창 수 (음성 구간 검출 이후 기준)"),
+) -> Dict[str, Any]:
+    """`/recommend/`와 `/jobs`가 같이 쓰는 추천 옵션 폼 필드를 `pipeline.run`의 인자로 바꿉니다."""
+    return {
+        "top_k": top_k,
+        "tags": _parse_list_field(tags, "tags"),
+        "exclude": _parse_list_field(exclude, "exclude"),
+        "diversity": diversity,
+        "decoding": _request_decoding(decoding_profile, language, greedy, without_timestamps, max_tokens, max_segments),
+    }
+
+
+def _require_pipeline() -> None:
     if not hasattr(app.state, 'pipeline') or app.state.pipeline is None:
         raise HTTPException(
-            status_code=503, 
+            status_code=503,
             detail="서버가 준비되지 않았습니다. 추천 파이프라인이 초기화되지 않았습니다."
         )
 
-    # 1. 임시 파일 저장
-    temp_file_path = Path(TEMP_UPLOAD_DIR) / f"{uuid.uuid4()}_{file.filename}"
+
+async def _read_upload(file: UploadFile):
+    """업로드를 읽으면서 바로 디코딩합니다. (디코딩이 이벤트 루프를 막지 않도록 스레드풀에서 실행)"""
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"업로드 파일이 너무 큽니다. (최대 {MAX_UPLOAD_BYTES} 바이트)")
+    try:
+        with span("upload_decode"):
+            return await run_in_threadpool(_decode_upload, file)
+    except AudioTooLargeError:
+        raise HTTPException(status_code=413, detail=f"업로드 파일이 너무 큽니다. (최대 {MAX_UPLOAD_BYTES} 바이트)")
+    except DecoderUnavailableError as e:
+        logger.error("오디오 디코더를 실행할 수 없습니다 - %s", e)
+        raise HTTPException(status_code=503, detail="오디오 디코더를 사용할 수 없습니다. 잠시 후 다시 시도해 주세요.")
+    except AudioDecodeError as e:
+        logger.error("업로드 파일 디코딩 실패 - %s", e)
+        raise HTTPException(status_code=400, detail="오디오 파일을 디코딩할 수 없습니다.")
+
+
+@app.post(
+    "/recommend/",
+    response_model=List[RecommendationResponse],
+    response_model_exclude_none=True,
+    summary="음악 추천 받기",
+)
+async def recommend_music(
+    file: UploadFile = File(..., description="음성 또는 음악이 담긴 오디오 파일"),
+    options: Dict[str, Any] = Depends(_recommend_options),
+    include_urls: bool = Form(False, description="각 추천 곡의 S3 다운로드 URL(`url`)을 함께 반환"),
+):
+    """
+    사용자가 업로드한 오디오 파일의 내용을 분석하여 가장 유사한 분위기의 음악을 추천합니다.
+
+    태그 필터는 벡터 검색 전에 후보를 좁히고, 제외 목록과 다양성 재순위는 후보 블록에 대한 배열 연산으로 적용됩니다.
+    `include_urls`를 켜면 클라이언트가 `/generate-presigned-url/`을 다시 호출하지 않고 바로 재생할 수 있습니다.
+    디코딩 필드(`decoding_profile`, `language`, `greedy`, ...)는 이 요청의 Whisper 디코딩 방식만 바꿉니다.
+    """
+    _require_pipeline()
+
+    # 대기열이 이미 가득 찼으면 업로드를 읽기 전에 바로 거절합니다.
+    inference_pool = app.state.inference_pool
     try:
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # 2. 추천 파이프라인 실행
-        print(f"오디오 파일 '{file.filename}'에 대한 추천을 시작합니다.")
-        recommendations = app.state.pipeline.run(
-            audio_path=str(temp_file_path),
-            embedding_db=app.state.embedding_db,
+        inference_pool.check_admission()
+    except QueueFullError as e:
+        raise _queue_full_response(e)
+
+    # 1. 업로드를 읽으면서 바로 디코딩
+    audio = await _read_upload(file)
+
+    try:
+        # 2. 추천 파이프라인 실행 (요청 도중 DB가 교체되어도 같은 스냅샷을 사용)
+        logger.info("오디오 파일 '%s'에 대한 추천을 시작합니다. (%.1fs)", file.filename, len(audio) / WHISPER_SAMPLE_RATE)
+        snapshot = app.state.db_manager.current
+        recommendations = await inference_pool.run(
+            app.state.pipeline.run,
+            audio=audio,
+            embedding_db=snapshot.db,
+            db_version=snapshot.version,
+            **options,
         )
-        print(f"추천 생성 완료: {len(recommendations)}개")
+        logger.info("추천 생성 완료: %d개", len(recommendations))
 
+        if include_urls:
+            recommendations = _with_urls(recommendations)
         return recommendations
 
+    except QueueFullError as e:
+        raise _queue_full_response(e)
     except Exception as e:
-        print(f"오류: 추천 처리 중 예외 발생 - {e}")
+        logger.exception("추천 처리 중 예외 발생 - %s", e)
         raise HTTPException(status_code=500, detail=f"내부 서버 오류: {e}")
+
+
+
+def _jobs() -> JobQueue:
+    jobs = getattr(app.state, "jobs", None)
+    if jobs is None:
+        raise HTTPException(status_code=503, detail="서버가 준비되지 않았습니다.")
+    return jobs
+
+
+def _job_key(audio, db_version: str, options: Dict[str, Any]) -> str:
+    """중복 제출을 알아보는 키: 오디오 해시 + DB 버전 + 결과에 영향을 주는 옵션."""
+    decoding = options["decoding"]
+    described = {
+        **options,
+        "tags": sorted(options["tags"] or []),
+        "exclude": sorted(options["exclude"] or []),
+        "decoding": decoding.as_dict() if decoding is not None else None,
+    }
+    return f"{audio_fingerprint(audio)}:{db_version}:{json.dumps(described, sort_keys=True)}"
+
+
+def _job_response(jobs: JobQueue, job, include_urls: bool = False) -> Dict[str, Any]:
+    body = {**job.as_dict(), "queue_position": jobs.position(job)}
+    if include_urls and body["result"]:
+        body["result"] = _with_urls(body["result"])
+    return body
+
+
+@app.post("/jobs", status_code=202, response_model=JobSubmitResponse, summary="비동기 추천 작업 제출")
+async def submit_job(
+    file: UploadFile = File(..., description="음성 또는 음악이 담긴 오디오 파일"),
+    options: Dict[str, Any] = Depends(_recommend_options),
+    priority: str = Form("normal", description=f"작업 우선순위 ({', '.join(PRIORITIES)})"),
+):
+    """
+    추천 작업을 백그라운드 대기열에 넣고 작업 ID를 바로 반환합니다. 결과는 `GET /jobs/{job_id}`로 조회합니다.
+
+    긴 업로드도 HTTP 연결이 추론 시간 동안 열려 있지 않으므로 로드 밸런서 타임아웃에 걸리지 않습니다.
+    같은 오디오와 옵션의 작업이 이미 대기 중이거나 실행 중이면 새로 계산하지 않고 그 작업 ID를 반환합니다
+    (`deduplicated: true`). 옵션 필드는 `/recommend/`와 같습니다.
+    """
+    _require_pipeline()
+    jobs = _jobs()
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"`priority`는 {', '.join(PRIORITIES)} 중 하나여야 합니다.")
+
+    audio = await _read_upload(file)
+    snapshot = app.state.db_manager.current
+    key = await run_in_threadpool(_job_key, audio, snapshot.version, options)
+    run = partial(
+        app.state.pipeline.run, audio=audio, embedding_db=snapshot.db, db_version=snapshot.version, **options
+    )
+    try:
+        job, deduplicated = jobs.submit(run, key=key, priority=priority)
+    except QueueFullError as e:
+        raise _queue_full_response(e)
+    logger.info(
+        "작업 %s를 %s했습니다. ('%s', %.1fs, 우선순위 %s)",
+        job.id, "재사용" if deduplicated else "등록", file.filename, len(audio) / WHISPER_SAMPLE_RATE, priority,
+    )
+    return {"job_id": job.id, "status": job.status, "deduplicated": deduplicated}
+
+
+@app.get(
+    "/jobs/{job_id}", response_model=JobStatusResponse, response_model_exclude_none=True, summary="작업 상태/결과 조회"
+)
+def get_job(job_id: str, include_urls: bool = Query(False, description="결과의 각 곡에 S3 다운로드 URL을 함께 반환")):
+    """
+    작업 상태(`queued`, `running`, `succeeded`, `failed`, `cancelled`)와, 끝났으면 결과 또는 오류를 반환합니다.
+    대기 중이면 `queue_position`에 앞선 작업 수가 담깁니다. 끝난 작업은 결과 보관 시간이 지나면 404입니다.
+    """
+    jobs = _jobs()
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return _job_response(jobs, job, include_urls)
+
+
+@app.delete(
+    "/jobs/{job_id}", response_model=JobStatusResponse, response_model_exclude_none=True, summary="작업 취소"
+)
+def cancel_job(job_id: str):
+    """
+    작업을 취소합니다. 대기 중인 작업은 바로 취소되고, 실행 중인 작업은 끝난 뒤 결과를 버립니다.
+    이미 성공하거나 실패한 작업은 409를 반환합니다.
+    """
+    jobs = _jobs()
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    if job.status in (SUCCEEDED, FAILED):
+        raise HTTPException(status_code=409, detail=f"이미 끝난 작업입니다. ({job.status})")
+    jobs.cancel(job_id)
+    return _job_response(jobs, job)
+
+
+def _decode_batch_item(source):
+    """배치 항목(업로드 파일 또는 매니페스트의 키)을 16kHz float32 파형으로 디코딩합니다."""
+    if isinstance(source, str):
+        # 로컬 파일은 ffmpeg 파이프 없이 프로세스 안에서 바로 디코딩합니다.
+        path = app.state.object_store.resolve(source)
+        if path.stat().st_size > MAX_UPLOAD_BYTES:
+            raise AudioTooLargeError(f"Object exceeds the limit of {MAX_UPLOAD_BYTES} bytes.")
+        return decode_file(path, max_seconds=MAX_AUDIO_SECONDS)[WHISPER_SAMPLE_RATE]
+    return _decode_upload(source)
+
+
+def _batch_error_message(e: Exception) -> str:
+    if isinstance(e, AudioTooLargeError):
+        return f"File is too large (max {MAX_UPLOAD_BYTES} bytes)."
+    if isinstance(e, DecoderUnavailableError):
+        return "Audio decoder is unavailable."
+    if isinstance(e, AudioDecodeError):
+        return "Audio could not be decoded."
+    if isinstance(e, FileNotFoundError):
+        return "Object not found."
+    if isinstance(e, ValueError):
+        return str(e)
+    return f"Internal error: {e}"
+
+
+def _ndjson_line(payload) -> bytes:
+    return (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+async def _stream_batch(items, snapshot, top_k: int):
+    """
+    항목을 `BATCH_CHUNK_SIZE`개씩 묶어 병렬 디코딩 → 배치 변환 → 행렬-행렬 검색을 하고,
+    묶음이 끝날 때마다 항목별 결과를 NDJSON 한 줄씩 내보냅니다.
+    실패한 항목은 `error` 필드를 가진 줄로 보고하고 나머지 항목은 계속 처리합니다.
+    """
+    inference_pool = app.state.inference_pool
+    for start in range(0, len(items), BATCH_CHUNK_SIZE):
+        chunk = items[start:start + BATCH_CHUNK_SIZE]
+        decoded = await asyncio.gather(
+            *(run_in_threadpool(_decode_batch_item, source) for _, source in chunk),
+            return_exceptions=True,
+        )
+
+        audios, entries = [], []
+        for offset, ((name, _), result) in enumerate(zip(chunk, decoded)):
+            entry = {"index": start + offset, "name": name}
+            if isinstance(result, Exception):
+                logger.error("배치 항목 '%s' 디코딩 실패 - %s", name, result)
+                yield _ndjson_line({**entry, "error": _batch_error_message(result)})
+            else:
+                audios.append(result)
+                entries.append(entry)
+        if not audios:
+            continue
+
+        try:
+            results = await inference_pool.run(
+                app.state.pipeline.run_batch,
+                audios,
+                embedding_db=snapshot.db,
+                top_k=top_k,
+                db_version=snapshot.version,
+            )
+        except QueueFullError as e:
+            for entry in entries:
+                yield _ndjson_line({**entry, "error": "Inference queue is full.", "retry_after": e.retry_after})
+            continue
+        except Exception as e:
+            logger.exception("배치 추천 처리 중 예외 발생 - %s", e)
+            for entry in entries:
+                yield _ndjson_line({**entry, "error": _batch_error_message(e)})
+            continue
+
+        for entry, recommendations in zip(entries, results):
+            yield _ndjson_line({**entry, "recommendations": recommendations})
+
+
+@app.post("/recommend/batch", summary="여러 오디오에 대한 음악 추천 (NDJSON 스트리밍)")
+async def recommend_music_batch(
+    files: Optional[List[UploadFile]] = File(None, description="추천받을 오디오 파일들"),
+    manifest: Optional[str] = Form(
+        None, description="오디오 경로/S3 키 목록 (JSON 문자열 배열 또는 한 줄에 하나씩)"
+    ),
+    top_k: int = Form(5, ge=1, le=50, description="항목마다 추천할 곡 수"),
+):
+    """
+    여러 클립을 한 요청으로 받아, 묶음 단위의 배치 변환과 행렬-행렬 검색으로 추천합니다.
+
+    응답은 `application/x-ndjson` 스트림이며, 항목마다 한 줄씩 다음 중 하나가 전송됩니다.
+    - `{"index", "name", "recommendations": [...]}`
+    - `{"index", "name", "error"}` (디코딩 실패, 파일 없음 등. 다른 항목은 계속 처리됩니다.)
+    """
+    _require_pipeline()
+
+    items = [(f.filename, f) for f in files or []]
+    if manifest:
+        try:
+            items += [(key, key) for key in parse_manifest(manifest)]
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"매니페스트 형식이 올바르지 않습니다: {e}")
+    if not items:
+        raise HTTPException(status_code=400, detail="파일 또는 매니페스트 항목이 하나 이상 필요합니다.")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {BATCH_MAX_ITEMS}개까지 요청할 수 있습니다.")
+
+    try:
+        app.state.inference_pool.check_admission()
+    except QueueFullError as e:
+        raise _queue_full_response(e)
+
+    # 배치 전체가 같은 DB 스냅샷을 사용합니다.
+    snapshot = app.state.db_manager.current
+    logger.info("배치 추천을 시작합니다. (%d개 항목)", len(items))
+    return StreamingResponse(_stream_batch(items, snapshot, top_k), media_type="application/x-ndjson")
+
+
+async def _run_live_step(session: LiveSession):
+    """세션의 최근 창을 추론 스레드에서 처리하고, 클라이언트에 보낼 메시지를 반환합니다."""
+    window = session.take_window()
+    snapshot = app.state.db_manager.current
+    try:
+        return await app.state.inference_pool.run(session.process, window, app.state.pipeline, snapshot.db)
+    except QueueFullError as e:
+        # 이번 창은 건너뛰고 다음 창에서 다시 시도합니다.
+        return [{"type": "busy", "retry_after": e.retry_after}]
+    except Exception as e:
+        logger.exception("실시간 세션 처리 중 예외 발생 - %s", e)
+        return [{"type": "error", "error": f"Internal error: {e}"}]
+
+
+async def _send_all(websocket: WebSocket, messages) -> None:
+    for message in messages:
+        await websocket.send_json(message)
+
+
+@app.websocket("/recommend/live")
+async def recommend_live(websocket: WebSocket, top_k: int = 5, sample_format: str = "s16le"):
+    """
+    실시간 강연 음성을 받아, 내용이 바뀔 때마다 어울리는 배경 음악을 다시 추천합니다.
+
+    클라이언트는 16kHz 모노 PCM(`sample_format`: "s16le" 또는 "f32le") 조각을 바이너리 메시지로 보내고,
+    끝낼 때는 텍스트 메시지 `stop`을 보냅니다. 서버는 다음 JSON 메시지를 보냅니다.
+    - `{"type": "transcript", "text", "audio_seconds"}`: 최근 창의 변환 결과가 크게 바뀌었을 때
+    - `{"type": "recommendations", "current", "recommendations", "audio_seconds"}`: 재생할 곡이 바뀌었을 때
+    - `{"type": "busy", "retry_after"}`: 추론 대기열이 가득 차 이번 창을 건너뛰었을 때
+    - `{"type": "end", ...}`: `stop` 이후 마지막 처리까지 끝났을 때 (세션 통계 포함)
+
+    처리 중에도 오디오 수신은 멈추지 않으며, 처리가 끝나면 그 사이 쌓인 최신 창을 처리합니다.
+    """
+    if not hasattr(app.state, 'pipeline') or app.state.pipeline is None:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    if sample_format not in PCM_FORMATS or not 1 <= top_k <= 50:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    session = LiveSession(
+        window_seconds=LIVE_WINDOW_SECONDS,
+        step_seconds=LIVE_STEP_SECONDS,
+        min_change=LIVE_MIN_CHANGE,
+        switch_margin=LIVE_SWITCH_MARGIN,
+        min_hold_seconds=LIVE_MIN_HOLD_SECONDS,
+        top_k=top_k,
+        sample_format=sample_format,
+    )
+    await websocket.accept()
+    logger.info("실시간 추천 세션을 시작합니다.")
+
+    pending: Optional[asyncio.Task] = None
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                session.feed(message["bytes"])
+            elif message.get("text") == "stop":
+                break
+
+            if pending is not None and pending.done():
+                await _send_all(websocket, pending.result())
+                pending = None
+            if pending is None and session.due():
+                pending = asyncio.create_task(_run_live_step(session))
+
+        # 남은 처리를 마치고, 마지막 창 이후 들어온 오디오도 처리한 뒤 종료합니다.
+        if pending is not None:
+            await _send_all(websocket, await pending)
+            pending = None
+        if session.unprocessed_samples > 0:
+            await _send_all(websocket, await _run_live_step(session))
+        await websocket.send_json({"type": "end", **session.stats()})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
     finally:
-        # 3. 임시 파일 정리
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+        if pending is not None:
+            pending.cancel()
+        logger.info(
+            "실시간 추천 세션을 종료합니다. (%.1fs, 곡 교체 %d회)", session.audio_seconds, session.hysteresis.switches
+        )
 
 
 if __name__ == "__main__":
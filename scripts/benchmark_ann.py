@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# `python scripts/benchmark_ann.py`로 실행해도 `src` 패키지를 찾을 수 있도록 합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.ann_index import IVFIndex, recall_at_k
+from src.embedding_db import EmbeddingDatabase, resolve_store_dir
+
+
+def _synthetic_db(num_rows: int, dim: int, seed: int) -> EmbeddingDatabase:
+    """군집 구조가 있는 가짜 임베딩 DB를 만듭니다. (실제 음악 임베딩과 비슷한 분포)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, num_rows // 500), dim)).astype(np.float32)
+    matrix = centers[rng.integers(len(centers), size=num_rows)]
+    matrix += 0.5 * rng.standard_normal((num_rows, dim)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return EmbeddingDatabase([f"synthetic/{i}.mp3" for i in range(num_rows)], matrix)
+
+
+def benchmark_ann(db: EmbeddingDatabase, index: IVFIndex, nprobes, top_k: int, num_queries: int, seed: int):
+    """
+    Measures recall@k and mean latency of the IVF index against exact search.
+
+    Queries are DB rows perturbed with noise, which mimics text queries landing
+    near (but not on) audio embeddings.
+
+    Returns:
+        A list of result dicts, one for exact search and one per nprobe value.
+    """
+    rng = np.random.default_rng(seed)
+    rows = np.asarray(db.matrix[rng.integers(len(db), size=num_queries)], dtype=np.float32)
+    queries = rows + 0.3 * rng.standard_normal(rows.shape).astype(np.float32)
+
+    start = time.perf_counter()
+    exact = [db.search(q, top_k, exact=True)[1] for q in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / num_queries
+    results = [{"method": "exact", "recall": 1.0, "latency_ms": exact_ms}]
+
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        approx = [index.search(db.matrix, q / np.linalg.norm(q), top_k, nprobe=nprobe)[1] for q in queries]
+        latency_ms = (time.perf_counter() - start) * 1000 / num_queries
+        recall = float(np.mean([recall_at_k(e, a) for e, a in zip(exact, approx)]))
+        results.append({"method": "ivf", "nprobe": nprobe, "recall": recall, "latency_ms": latency_ms})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="IVF 인덱스의 recall@k와 지연 시간을 전수 검색과 비교합니다."
+    )
+    parser.add_argument("--db-path", type=str, default=None, help="임베딩 저장소 경로. 생략하면 합성 DB를 사용합니다.")
+    parser.add_argument("--rows", type=int, default=200_000, help="합성 DB의 행 수입니다.")
+    parser.add_argument("--dim", type=int, default=512, help="합성 DB의 임베딩 차원입니다.")
+    parser.add_argument("--n-lists", type=int, default=None, help="인덱스를 새로 만들 때의 리스트 수입니다.")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64], help="비교할 nprobe 값들입니다.")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="결과를 저장할 JSON 파일 경로입니다.")
+
+    args = parser.parse_args()
+
+    if args.db_path:
+        store_dir = resolve_store_dir(args.db_path)
+        db = EmbeddingDatabase.open(store_dir)
+        try:
+            index = IVFIndex.load(store_dir)
+        except FileNotFoundError:
+            index = IVFIndex.build(db.matrix, n_lists=args.n_lists)
+    else:
+        db = _synthetic_db(args.rows, args.dim, args.seed)
+        index = IVFIndex.build(db.matrix, n_lists=args.n_lists)
+
+    print(f"DB: {len(db)} rows, dim={db.dim}, lists={index.n_lists}, top_k={args.top_k}")
+    results = benchmark_ann(db, index, args.nprobe, args.top_k, args.queries, args.seed)
+
+    for r in results:
+        label = "exact" if r["method"] == "exact" else f"ivf nprobe={r['nprobe']}"
+        print(f"{label:>18}  recall@{args.top_k}={r['recall']:.3f}  {r['latency_ms']:.2f} ms/query")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"rows": len(db), "dim": db.dim, "n_lists": index.n_lists, "top_k": args.top_k, "results": results}, f, indent=2)
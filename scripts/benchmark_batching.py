@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+import sys
+import json
+import time
+import threading
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import torch
+import whisper
+
+# `python scripts/benchmark_batching.py`로 실행해도 `src` 패키지를 찾을 수 있도록 합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.batching import TranscriptionBatcher
+
+
+def _run_load(transcribe, audio, concurrency: int, num_requests: int):
+    """Sends `num_requests` transcriptions from `concurrency` threads and records each latency."""
+    latencies = []
+
+    def one_request(_):
+        start = time.perf_counter()
+        transcribe(audio)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_request, range(num_requests)))
+    wall = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "throughput_rps": num_requests / wall,
+    }
+
+
+def benchmark_batching(audio_path: str, model_size: str, concurrency: int, num_requests: int, configs):
+    """
+    Compares unbatched `model.transcribe` against micro-batched decoding.
+
+    Args:
+        audio_path (str): Clip sent by every simulated request.
+        model_size (str): Whisper model size.
+        concurrency (int): Number of concurrent client threads.
+        num_requests (int): Total requests per configuration.
+        configs: List of `(max_batch_size, max_wait_ms)` pairs to try.
+
+    Returns:
+        A list of result dicts (latency percentiles and throughput per configuration).
+    """
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = whisper.load_model(model_size, device=device)
+    audio = whisper.load_audio(audio_path)
+
+    # 서버에서도 모델 호출은 서로 직렬화되므로, 같은 조건이 되도록 락을 겁니다.
+    lock = threading.Lock()
+
+    def unbatched(a):
+        with lock:
+            return model.transcribe(a, fp16=torch.cuda.is_available())["text"]
+
+    results = [{"mode": "unbatched", **_run_load(unbatched, audio, concurrency, num_requests)}]
+    for max_batch_size, max_wait_ms in configs:
+        batcher = TranscriptionBatcher(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        stats = _run_load(batcher, audio, concurrency, num_requests)
+        results.append({
+            "mode": "batched",
+            "max_batch_size": max_batch_size,
+            "max_wait_ms": max_wait_ms,
+            "avg_batch_size": batcher.stats()["avg_batch_size"],
+            **stats,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Whisper 마이크로 배칭의 지연 시간(p50/p99)과 처리량을 배칭 없는 경우와 비교합니다."
+    )
+    parser.add_argument("--audio", type=str, default="example/audio_2_ko.mp3", help="요청마다 보낼 오디오 파일입니다.")
+    parser.add_argument("--model-size", type=str, default="base")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시에 요청하는 클라이언트 수입니다.")
+    parser.add_argument("--requests", type=int, default=32, help="설정마다 보낼 전체 요청 수입니다.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--wait-ms", type=float, nargs="+", default=[10, 50])
+    parser.add_argument("--output", type=str, default=None, help="결과를 저장할 JSON 파일 경로입니다.")
+
+    args = parser.parse_args()
+
+    configs = [(b, w) for b in args.batch_sizes for w in args.wait_ms]
+    results = benchmark_batching(args.audio, args.model_size, args.concurrency, args.requests, configs)
+
+    for r in results:
+        label = "unbatched" if r["mode"] == "unbatched" else f"batch={r['max_batch_size']} wait={r['max_wait_ms']}ms"
+        print(f"{label:>24}  p50={r['p50_ms']:.0f}ms  p99={r['p99_ms']:.0f}ms  {r['throughput_rps']:.2f} req/s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+# `python scripts/benchmark_decode.py`로 실행해도 `src` 패키지를 찾을 수 있도록 합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.audio_decode import CLAP_SAMPLE_RATE, WHISPER_SAMPLE_RATE, DecoderPool, decode_file
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".flac", ".ogg", ".m4a")
+
+
+def _legacy_decode(path: str) -> Dict[int, np.ndarray]:
+    """The previous path: an ffmpeg process for Whisper (16kHz) plus a separate librosa load for CLAP (48kHz)."""
+    import librosa
+    import whisper
+
+    return {
+        WHISPER_SAMPLE_RATE: whisper.load_audio(path),
+        CLAP_SAMPLE_RATE: librosa.load(path, sr=CLAP_SAMPLE_RATE)[0],
+    }
+
+
+def _shared_decode(path: str) -> Dict[int, np.ndarray]:
+    return decode_file(path, (WHISPER_SAMPLE_RATE, CLAP_SAMPLE_RATE))
+
+
+def _time_per_file(decode, paths: List[str], repeats: int) -> Dict[str, Any]:
+    decode(paths[0])  # 첫 호출(임포트, 필터 설계)은 측정에서 제외합니다.
+    per_file = {}
+    for path in paths:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            decode(path)
+            timings.append(time.perf_counter() - start)
+        per_file[os.path.basename(path)] = float(np.median(timings))
+    values = list(per_file.values())
+    return {"mean_seconds": float(np.mean(values)), "per_file_seconds": per_file}
+
+
+def _pool_throughput(paths: List[str], workers: int, shared: bool) -> float:
+    """Files/sec when decoding all `paths` in a pool of `workers` processes."""
+    start = time.perf_counter()
+    if shared:
+        with DecoderPool(workers, sample_rates=(WHISPER_SAMPLE_RATE, CLAP_SAMPLE_RATE)) as pool:
+            for result in pool.imap_unordered(paths):
+                if result.error:
+                    raise RuntimeError(f"{result.path}: {result.error}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_legacy_decode, paths))
+    return len(paths) / (time.perf_counter() - start)
+
+
+def benchmark_decode(paths: List[str], repeats: int = 3, workers: int = 0, legacy: bool = True) -> Dict[str, Any]:
+    """
+    Compares per-file decode time (both sample rates) and pooled files/sec of the
+    previous per-consumer decoders against the shared decode layer.
+
+    Also reports how far the shared 16kHz waveform is from the ffmpeg one (max absolute
+    difference after aligning lengths), since the resampler changed.
+    """
+    results: Dict[str, Any] = {"files": len(paths)}
+    results["shared"] = _time_per_file(_shared_decode, paths, repeats)
+    if legacy:
+        results["legacy"] = _time_per_file(_legacy_decode, paths, repeats)
+        results["speedup"] = results["legacy"]["mean_seconds"] / results["shared"]["mean_seconds"]
+
+        old, new = _legacy_decode(paths[0])[WHISPER_SAMPLE_RATE], _shared_decode(paths[0])[WHISPER_SAMPLE_RATE]
+        n = min(len(old), len(new))
+        results["whisper_input_max_abs_diff"] = float(np.max(np.abs(old[:n] - new[:n]))) if n else 0.0
+        results["whisper_input_length_diff"] = len(new) - len(old)
+
+    if workers > 0:
+        results["pool_workers"] = workers
+        results["shared"]["pool_files_per_sec"] = _pool_throughput(paths, workers, shared=True)
+        if legacy:
+            results["legacy"]["pool_files_per_sec"] = _pool_throughput(paths, workers, shared=False)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="파일당 디코딩 시간(16kHz + 48kHz)을 기존 방식(Whisper ffmpeg + librosa)과 "
+                    "공유 디코딩 계층(`src/audio_decode.py`)으로 비교합니다."
+    )
+    parser.add_argument("paths", nargs="*", default=["music_library", "example", "test"],
+                        help="측정할 오디오 파일 또는 디렉토리입니다.")
+    parser.add_argument("--repeats", type=int, default=3, help="파일마다 측정할 반복 횟수입니다.")
+    parser.add_argument("--workers", type=int, default=0, help="0보다 크면 이 프로세스 수로 풀 처리량도 측정합니다.")
+    parser.add_argument("--no-legacy", action="store_true", help="기존 방식은 측정하지 않습니다.")
+    parser.add_argument("--output", type=str, default=None, help="결과를 저장할 JSON 파일 경로입니다.")
+
+    args = parser.parse_args()
+
+    files = []
+    for p in map(Path, args.paths):
+        if p.is_dir():
+            files.extend(sorted(str(f) for f in p.iterdir() if f.suffix.lower() in AUDIO_EXTENSIONS))
+        elif p.is_file():
+            files.append(str(p))
+    if not files:
+        parser.error("측정할 오디오 파일이 없습니다.")
+
+    results = benchmark_decode(files, args.repeats, args.workers, legacy=not args.no_legacy)
+    print(f"{len(files)} files, median of {args.repeats}")
+    for mode in ("legacy", "shared"):
+        if mode in results:
+            line = f"{mode:>7}: {results[mode]['mean_seconds'] * 1000:.0f} ms/file"
+            if "pool_files_per_sec" in results[mode]:
+                line += f", pool {results[mode]['pool_files_per_sec']:.1f} files/sec ({args.workers} workers)"
+            print(line)
+    if "speedup" in results:
+        print(f"speedup x{results['speedup']:.2f}, max |Δ| of Whisper input {results['whisper_input_max_abs_diff']:.4f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
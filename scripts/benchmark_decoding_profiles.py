@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# `python scripts/benchmark_decoding_profiles.py`로 실행해도 `src` 패키지를 찾을 수 있도록 합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.benchmark_whisper_cpu import error_rates
+from src.audio_decode import WHISPER_SAMPLE_RATE, load_audio
+from src.decoding_profile import PROFILES, DecodingProfile
+from src.speech_to_text import SpeechToText
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".flac", ".ogg", ".m4a")
+
+
+def _overlap(reference: List[str], other: List[str]) -> float:
+    """Fraction of the reference top-k that is also in the other top-k."""
+    return len(set(reference) & set(other)) / len(reference) if reference else 1.0
+
+
+def benchmark_profiles(
+    clips: List[str],
+    profiles: Dict[str, DecodingProfile],
+    model_size: str,
+    repeats: int,
+    db_path: Optional[str] = None,
+    top_k: int = 5,
+) -> Dict[str, Any]:
+    """
+    Transcribes every clip with every decoding profile and compares each profile
+    against the first one (the baseline).
+
+    Per profile: median latency and real-time factor, CER against the baseline
+    transcript and, with `db_path`, how much of the baseline top-k recommendation
+    list survives (overlap@k) and whether the top-1 track is the same.
+    """
+    stt = SpeechToText(model_size=model_size)
+    recommender, db = None, None
+    if db_path:
+        from src.embedding_db import load_embedding_db
+        from src.recommender import AudioRecommender
+
+        recommender = AudioRecommender(speech_to_text=stt)
+        db = load_embedding_db(db_path)
+
+    audios = {os.path.basename(path): load_audio(path) for path in clips}
+    # 첫 호출(커널 선택, mel 필터 초기화)은 측정에서 제외합니다.
+    stt.transcribe(next(iter(audios.values()))[:WHISPER_SAMPLE_RATE])
+
+    per_clip: Dict[str, Dict[str, Any]] = {}
+    for name, audio in audios.items():
+        per_clip[name] = {"audio_seconds": len(audio) / WHISPER_SAMPLE_RATE}
+        for label, profile in profiles.items():
+            timings, text = [], ""
+            for _ in range(repeats):
+                start = time.perf_counter()
+                text = stt.transcribe(audio, profile)
+                timings.append(time.perf_counter() - start)
+            result: Dict[str, Any] = {"seconds": float(np.median(timings)), "text": text.strip()}
+            if recommender is not None and text:
+                result["top_k"] = [r["file_path"] for r in recommender.recommend_from_db(text, db, top_k=top_k)]
+            per_clip[name][label] = result
+
+    baseline = next(iter(profiles))
+    summary: Dict[str, Dict[str, Any]] = {}
+    for label in profiles:
+        rows = [clip[label] for clip in per_clip.values()]
+        seconds = [row["seconds"] for row in rows]
+        audio_seconds = [clip["audio_seconds"] for clip in per_clip.values()]
+        entry = {
+            "mean_seconds": float(np.mean(seconds)),
+            "rtf": float(np.sum(seconds) / np.sum(audio_seconds)),
+            "cer_vs_baseline": float(np.mean([
+                error_rates(clip[baseline]["text"], clip[label]["text"])["cer"] for clip in per_clip.values()
+            ])),
+        }
+        if recommender is not None:
+            pairs = [(clip[baseline].get("top_k", []), clip[label].get("top_k", [])) for clip in per_clip.values()]
+            entry["overlap_at_k"] = float(np.mean([_overlap(ref, other) for ref, other in pairs]))
+            entry["top1_agreement"] = float(np.mean([ref[:1] == other[:1] for ref, other in pairs]))
+        summary[label] = entry
+    for label, entry in summary.items():
+        entry["speedup"] = summary[baseline]["mean_seconds"] / entry["mean_seconds"]
+
+    return {
+        "model_size": model_size,
+        "baseline": baseline,
+        "profiles": {label: profile.as_dict() for label, profile in profiles.items()},
+        "summary": summary,
+        "clips": per_clip,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Whisper 디코딩 프로필(언어 감지/고정, 온도 재시도, 타임스탬프, 토큰·창 상한)별 변환 지연 시간과 "
+                    "기준 프로필 대비 텍스트(CER)·추천 결과 안정성을 비교합니다."
+    )
+    parser.add_argument("clips", nargs="*", default=["test"], help="측정할 오디오 파일 또는 디렉토리입니다.")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES),
+                        help="비교할 프리셋 목록입니다. 첫 번째가 기준입니다.")
+    parser.add_argument("--model-size", type=str, default="base")
+    parser.add_argument("--repeats", type=int, default=3, help="클립·프로필마다 측정할 반복 횟수입니다.")
+    parser.add_argument("--db", type=str, default=None,
+                        help="임베딩 DB 경로입니다. 주면 추천 결과의 top-k 겹침과 1위 일치율도 측정합니다.")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--output", type=str, default=None, help="결과를 저장할 JSON 파일 경로입니다.")
+
+    args = parser.parse_args()
+
+    clips = []
+    for p in map(Path, args.clips):
+        if p.is_dir():
+            clips.extend(sorted(str(f) for f in p.iterdir() if f.suffix.lower() in AUDIO_EXTENSIONS))
+        elif p.is_file():
+            clips.append(str(p))
+    if not clips:
+        parser.error("측정할 오디오 파일이 없습니다.")
+
+    results = benchmark_profiles(
+        clips, {name: PROFILES[name] for name in args.profiles}, args.model_size, args.repeats, args.db, args.top_k
+    )
+    print(f"{len(clips)} clips, Whisper {args.model_size}, baseline '{results['baseline']}'")
+    for label, entry in results["summary"].items():
+        line = (
+            f"{label:>10}: {entry['mean_seconds'] * 1000:.0f} ms/clip  RTF={entry['rtf']:.3f}  "
+            f"x{entry['speedup']:.2f}  CER={entry['cer_vs_baseline']:.3f}"
+        )
+        if "overlap_at_k" in entry:
+            line += f"  overlap@{args.top_k}={entry['overlap_at_k']:.2f}  top1={entry['top1_agreement']:.2f}"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# `python scripts/benchmark_progressive.py`로 실행해도 `src` 패키지를 찾을 수 있도록 합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.benchmark_decoding_profiles import AUDIO_EXTENSIONS, _overlap
+from src.audio_decode import WHISPER_SAMPLE_RATE, load_audio
+from src.embedding_db import load_embedding_db
+from src.recommender import AudioRecommender
+from src.speech_to_text import SpeechToText
+
+DEFAULT_MARGINS = (0.0, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0)
+
+
+def benchmark_progressive(
+    clips: List[str],
+    db_path: str,
+    model_size: str,
+    prefix_seconds: float,
+    margins: Sequence[float],
+    top_k: int = 5,
+    vad: bool = True,
+) -> Dict[str, Any]:
+    """
+    Measures what answering from the first `prefix_seconds` of each clip would save
+    and what it would cost, for a sweep of `min_margin` thresholds.
+
+    Per clip: full and prefix transcription latency, the decision margin of the
+    prefix recommendation and its overlap@k with the full-transcript list. Per
+    threshold: the early-exit rate, the mean latency (prefix only on exit, prefix
+    plus full otherwise), and overlap@k / top-1 agreement with the full pipeline.
+    """
+    stt = SpeechToText(model_size=model_size)
+    if vad:
+        stt.enable_vad()
+    recommender = AudioRecommender(speech_to_text=stt)
+    db = load_embedding_db(db_path)
+    if db.calibration is None:
+        raise ValueError(f"{db_path} has no score calibration; rebuild it with scripts/build_embedding_db.py.")
+
+    audios = {os.path.basename(path): load_audio(path) for path in clips}
+    prefix_samples = int(prefix_seconds * WHISPER_SAMPLE_RATE)
+    # 첫 호출(커널 선택, mel 필터 초기화)은 측정에서 제외합니다.
+    stt.transcribe(next(iter(audios.values()))[:WHISPER_SAMPLE_RATE])
+
+    per_clip: Dict[str, Dict[str, Any]] = {}
+    for name, audio in audios.items():
+        start = time.perf_counter()
+        full_text = stt.transcribe(audio)
+        full_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        prefix_text = stt.transcribe(audio[:prefix_samples])
+        prefix_seconds_taken = time.perf_counter() - start
+
+        full_top = [r["file_path"] for r in recommender.recommend_from_db(full_text, db, top_k=top_k)] if full_text else []
+        prefix_top, margin = [], None
+        if prefix_text:
+            prefix_top = [r["file_path"] for r in recommender.recommend_from_db(prefix_text, db, top_k=top_k)]
+            margin = recommender.decision_margin(prefix_text, db, top_k)
+        per_clip[name] = {
+            "audio_seconds": len(audio) / WHISPER_SAMPLE_RATE,
+            # 앞부분보다 짧은 클립은 점진적 변환을 하지 않습니다.
+            "eligible": len(audio) > prefix_samples,
+            "full_seconds": full_seconds,
+            "prefix_seconds": prefix_seconds_taken,
+            "margin": margin,
+            "overlap_at_k": _overlap(full_top, prefix_top),
+            "top1_agreement": full_top[:1] == prefix_top[:1],
+        }
+
+    sweep: Dict[str, Dict[str, float]] = {}
+    for min_margin in margins:
+        latencies, overlaps, top1, exits = [], [], [], 0
+        for clip in per_clip.values():
+            exit_early = clip["eligible"] and clip["margin"] is not None and clip["margin"] >= min_margin
+            if exit_early:
+                exits += 1
+                latencies.append(clip["prefix_seconds"])
+                overlaps.append(clip["overlap_at_k"])
+                top1.append(float(clip["top1_agreement"]))
+            else:
+                latencies.append(clip["full_seconds"] + (clip["prefix_seconds"] if clip["eligible"] else 0.0))
+                overlaps.append(1.0)
+                top1.append(1.0)
+        sweep[f"{min_margin:g}"] = {
+            "exit_rate": exits / len(per_clip),
+            "mean_seconds": float(np.mean(latencies)),
+            "overlap_at_k": float(np.mean(overlaps)),
+            "top1_agreement": float(np.mean(top1)),
+        }
+
+    return {
+        "model_size": model_size,
+        "prefix_seconds": prefix_seconds,
+        "top_k": top_k,
+        "full_mean_seconds": float(np.mean([clip["full_seconds"] for clip in per_clip.values()])),
+        "sweep": sweep,
+        "clips": per_clip,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="오디오 앞부분만 변환해 추천이 확실하면 나머지 변환을 건너뛰는 점진적 변환의 지연 시간 절감과 "
+                    "전체 변환 대비 추천 결과 일치율을 최소 결정 여유별로 측정합니다."
+    )
+    parser.add_argument("clips", nargs="*", default=["test"], help="측정할 오디오 파일 또는 디렉토리입니다.")
+    parser.add_argument("--db", type=str, required=True, help="점수 보정이 포함된 임베딩 DB 경로입니다.")
+    parser.add_argument("--model-size", type=str, default="base")
+    parser.add_argument("--prefix-seconds", type=float, default=10.0, help="먼저 변환할 앞부분 길이(초)입니다.")
+    parser.add_argument("--margins", type=float, nargs="+", default=list(DEFAULT_MARGINS),
+                        help="비교할 최소 결정 여유(점수 표준편차 단위) 목록입니다.")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--no-vad", action="store_true", help="음성 구간 검출 없이 변환합니다.")
+    parser.add_argument("--output", type=str, default=None, help="결과를 저장할 JSON 파일 경로입니다.")
+
+    args = parser.parse_args()
+
+    clips = []
+    for p in map(Path, args.clips):
+        if p.is_dir():
+            clips.extend(sorted(str(f) for f in p.iterdir() if f.suffix.lower() in AUDIO_EXTENSIONS))
+        elif p.is_file():
+            clips.append(str(p))
+    if not clips:
+        parser.error("측정할 오디오 파일이 없습니다.")
+
+    results = benchmark_progressive(
+        clips, args.db, args.model_size, args.prefix_seconds, args.margins, args.top_k, vad=not args.no_vad
+    )
+    print(
+        f"{len(clips)} clips, Whisper {args.model_size}, prefix {args.prefix_seconds:g}s, "
+        f"full transcription {results['full_mean_seconds'] * 1000:.0f} ms/clip"
+    )
+    for min_margin, entry in results["sweep"].items():
+        print(
+            f"margin>={min_margin:>5}: exit {entry['exit_rate'] * 100:.0f}%  {entry['mean_seconds'] * 1000:.0f} ms/clip  "
+            f"overlap@{args.top_k}={entry['overlap_at_k']:.2f}  top1={entry['top1_agreement']:.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
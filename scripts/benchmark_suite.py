@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# `python scripts/benchmark_suite.py`로 실행해도 `src` 패키지를 찾을 수 있도록 합니다.
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from src.ann_index import IVFIndex, recall_at_k
+from src.embedding_db import EmbeddingDatabase
+
+SECTIONS = ("search", "decode", "transcription", "api", "build")
+AUDIO_EXTENSIONS = (".mp3", ".wav")
+
+# 비교 시 값이 작을수록/클수록 좋은 지표 (이름 끝부분으로 판별, 나머지는 비교하지 않음)
+LOWER_IS_BETTER = ("_ms", "_seconds", "rtf", "_bytes")
+HIGHER_IS_BETTER = ("_per_sec", "_rps", "recall")
+
+
+def _git_commit() -> Dict[str, Any]:
+    """Current commit and whether the working tree has uncommitted changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def _environment() -> Dict[str, Any]:
+    env = {
+        **_git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+    try:
+        import torch
+        env["torch"] = torch.__version__
+        env["torch_threads"] = torch.get_num_threads()
+    except ImportError:
+        pass
+    return env
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux only)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _latency_stats(seconds: List[float]) -> Dict[str, float]:
+    ms = np.asarray(seconds) * 1000
+    return {
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+
+def _find_clips(dirs: List[str]) -> List[Path]:
+    clips = []
+    for d in dirs:
+        path = ROOT / d if not Path(d).is_absolute() else Path(d)
+        if path.is_file():
+            clips.append(path)
+        elif path.is_dir():
+            clips.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in AUDIO_EXTENSIONS))
+    return clips
+
+
+def write_synthetic_store(store_dir: Path, num_rows: int, dim: int, seed: int) -> None:
+    """
+    Writes a clustered synthetic embedding store (float16, the build script's default).
+
+    Rows are generated in blocks so a 1M-row DB never needs a float32 copy in memory.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, num_rows // 500), dim)).astype(np.float32)
+    matrix = np.empty((num_rows, dim), dtype=np.float16)
+    for start in range(0, num_rows, 65536):
+        n = min(65536, num_rows - start)
+        block = centers[rng.integers(len(centers), size=n)]
+        block += 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        matrix[start:start + n] = block
+    EmbeddingDatabase([f"synthetic/{i}.mp3" for i in range(num_rows)], matrix).save(store_dir, dtype="float16")
+
+
+def benchmark_search(
+    row_counts: List[int],
+    dim: int,
+    num_queries: int,
+    top_k: int,
+    batch_size: int,
+    ann: bool,
+    seed: int,
+) -> Dict[str, Any]:
+    """
+    Measures open time, memory and search latency of memory-mapped synthetic DBs.
+
+    Each DB is written to a temporary store and reopened the way the server does
+    (`np.memmap`), so `rss_after_search_bytes` reflects the pages a search touches.
+    """
+    results = {}
+    rng = np.random.default_rng(seed)
+    for num_rows in row_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            store_dir = Path(tmp)
+            write_synthetic_store(store_dir, num_rows, dim, seed)
+
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            db = EmbeddingDatabase.open(store_dir)
+            open_seconds = time.perf_counter() - start
+
+            queries = rng.standard_normal((num_queries, dim)).astype(np.float32)
+            start = time.perf_counter()
+            db.search(queries[0], top_k)
+            cold_ms = (time.perf_counter() - start) * 1000
+
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                db.search(query, top_k)
+                timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for i in range(0, num_queries, batch_size):
+                db.search_batch(queries[i:i + batch_size], top_k)
+            batch_ms = (time.perf_counter() - start) * 1000 / num_queries
+
+            rss_after = _rss_bytes()
+            result = {
+                "rows": num_rows,
+                "dim": dim,
+                "store_bytes": (store_dir / "embeddings.npy").stat().st_size,
+                "open_seconds": open_seconds,
+                "cold_query_ms": cold_ms,
+                **_latency_stats(timings),
+                "batch_per_query_ms": batch_ms,
+                "rss_after_search_bytes": rss_after,
+                "rss_delta_bytes": rss_after - rss_before if rss_before is not None else None,
+            }
+
+            if ann:
+                start = time.perf_counter()
+                index = IVFIndex.build(db.matrix)
+                result["ivf_build_seconds"] = time.perf_counter() - start
+                exact = [db.search(q, top_k, exact=True)[1] for q in queries]
+                db.attach_index(index)
+                ann_timings, recalls = [], []
+                for query, expected in zip(queries, exact):
+                    start = time.perf_counter()
+                    found = db.search(query, top_k)[1]
+                    ann_timings.append(time.perf_counter() - start)
+                    recalls.append(recall_at_k(expected, found))
+                result["ivf_p50_ms"] = _latency_stats(ann_timings)["p50_ms"]
+                result["ivf_recall"] = float(np.mean(recalls))
+
+            del db
+        results[str(num_rows)] = result
+        print(
+            f"search rows={num_rows:>9,}  p50={result['p50_ms']:.2f}ms  p99={result['p99_ms']:.2f}ms  "
+            f"batch={batch_ms:.3f}ms/query  store={result['store_bytes'] / 2**20:.0f}MB"
+        )
+    return results
+
+
+def benchmark_transcription(clips: List[Path], model_size: str, vad: bool, repeats: int) -> Dict[str, Any]:
+    """Real-time factor (transcribe seconds / audio seconds) of the server's speech-to-text path per clip."""
+    from src.audio_decode import WHISPER_SAMPLE_RATE, load_audio
+    from src.speech_to_text import SpeechToText
+
+    stt = SpeechToText(model_size=model_size)
+    if vad:
+        stt.enable_vad()
+    stt.warm_up()
+
+    results = {}
+    for clip in clips:
+        audio = load_audio(clip)
+        audio_seconds = len(audio) / WHISPER_SAMPLE_RATE
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            stt.transcribe(audio)
+            timings.append(time.perf_counter() - start)
+        median = float(np.median(timings))
+        name = str(clip.relative_to(ROOT)) if clip.is_relative_to(ROOT) else str(clip)
+        results[name] = {"audio_seconds": audio_seconds, "median_seconds": median, "rtf": median / audio_seconds}
+        print(f"transcribe {name}: {audio_seconds:.1f}s audio, RTF={median / audio_seconds:.3f}")
+    return {"model_size": model_size, "vad": vad, "clips": results}
+
+
+def _start_local_server(port: int, db_path: str, cache: bool) -> subprocess.Popen:
+    env = {**os.environ, "EMBEDDING_DB_PATH": db_path, "CACHE_ENABLED": "1" if cache else "0", "LOG_LEVEL": "WARNING"}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT,
+        env=env,
+    )
+
+
+def _wait_for_server(url: str, process: Optional[subprocess.Popen], timeout: float) -> None:
+    import requests
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Local server exited with code {process.returncode}")
+        try:
+            if requests.get(f"{url}/", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Server at {url} did not become ready in {timeout}s")
+
+
+def benchmark_api(
+    url: Optional[str],
+    clip: Path,
+    concurrency_levels: List[int],
+    requests_per_level: int,
+    db_path: str,
+    port: int,
+    cache: bool,
+    startup_timeout: float,
+) -> Dict[str, Any]:
+    """
+    End-to-end `/recommend/` throughput and latency with concurrent clients.
+
+    Without `url`, starts `uvicorn main:app` locally (result cache off by default, so every
+    request runs the full pipeline) and stops it afterwards.
+    """
+    import requests
+
+    process = None
+    if url is None:
+        url = f"http://127.0.0.1:{port}"
+        process = _start_local_server(port, db_path, cache)
+    try:
+        _wait_for_server(url, process, startup_timeout)
+        payload = clip.read_bytes()
+        local = threading.local()
+
+        def one_request(_):
+            session = getattr(local, "session", None)
+            if session is None:
+                session = local.session = requests.Session()
+            start = time.perf_counter()
+            response = session.post(f"{url}/recommend/", files={"file": (clip.name, payload)})
+            return time.perf_counter() - start, response.status_code
+
+        # 첫 요청(지연 로드, 캐시 준비)은 측정에서 제외합니다.
+        one_request(None)
+
+        results = {}
+        for concurrency in concurrency_levels:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                responses = list(pool.map(one_request, range(requests_per_level)))
+            wall = time.perf_counter() - start
+
+            ok = [seconds for seconds, code in responses if code == 200]
+            statuses: Dict[str, int] = {}
+            for _, code in responses:
+                statuses[str(code)] = statuses.get(str(code), 0) + 1
+            result = {
+                "requests": requests_per_level,
+                "statuses": statuses,
+                "throughput_rps": len(ok) / wall,
+                **(_latency_stats(ok) if ok else {}),
+            }
+            results[f"concurrency={concurrency}"] = result
+            print(
+                f"api concurrency={concurrency:>3}  {result['throughput_rps']:.2f} req/s  "
+                f"p50={result.get('p50_ms', float('nan')):.0f}ms  p99={result.get('p99_ms', float('nan')):.0f}ms  "
+                f"statuses={statuses}"
+            )
+        return {"url": url, "clip": clip.name, "levels": results}
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def benchmark_build(music_dir: str, workers: Optional[int], batch_size: int) -> Dict[str, Any]:
+    """Full (non-incremental) build of `music_dir` into a temporary store; reports files/sec and stage times."""
+    from scripts.build_embedding_db import build_embedding_database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stats = build_embedding_database(
+            music_dir,
+            str(Path(tmp) / "store"),
+            num_workers=workers,
+            batch_size=batch_size,
+            resume=False,
+            tags_file=None,
+        )
+    if stats is None:
+        raise RuntimeError(f"Build produced no embeddings for {music_dir}")
+    print(f"build {music_dir}: {stats['files_per_sec']:.2f} files/sec ({stats['embedded']} files)")
+    return {"music_dir": music_dir, **stats}
+
+
+def _flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Compares every shared latency/throughput metric against a baseline result file.
+
+    Returns:
+        One dict per compared metric, with `change` (relative, positive = worse) and
+        `regression` (worse than `threshold`).
+    """
+    current_flat = _flatten({k: v for k, v in current.items() if k in SECTIONS})
+    baseline_flat = _flatten({k: v for k, v in baseline.items() if k in SECTIONS})
+    rows = []
+    for name, value in current_flat.items():
+        old = baseline_flat.get(name)
+        if old is None or old == 0:
+            continue
+        if name.endswith(LOWER_IS_BETTER):
+            change = (value - old) / old
+        elif name.endswith(HIGHER_IS_BETTER):
+            change = (old - value) / old
+        else:
+            continue
+        rows.append({"metric": name, "baseline": old, "current": value, "change": change, "regression": change > threshold})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="검색 지연 시간/메모리, 음성 변환 실시간 배율(RTF), /recommend/ 처리량, DB 빌드 속도를 측정해 "
+                    "커밋 정보와 함께 JSON으로 저장합니다. `--compare`로 이전 결과와 비교할 수 있습니다."
+    )
+    parser.add_argument("--only", choices=SECTIONS, nargs="+", default=list(SECTIONS), help="실행할 항목입니다. (기본값: 전부)")
+    parser.add_argument("--output", type=str, default=None,
+                        help="결과 JSON 경로입니다. (기본값: benchmark_results/<커밋>.json)")
+    parser.add_argument("--compare", type=str, default=None, help="비교할 이전 결과 JSON 경로입니다.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="회귀로 판단할 상대 변화량입니다. (기본값: 0.1)")
+    parser.add_argument("--seed", type=int, default=0)
+
+    group = parser.add_argument_group("search")
+    group.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000], help="합성 DB 행 수 목록입니다.")
+    group.add_argument("--dim", type=int, default=512, help="합성 DB의 임베딩 차원입니다. (CLAP: 512)")
+    group.add_argument("--queries", type=int, default=200)
+    group.add_argument("--top-k", type=int, default=5)
+    group.add_argument("--batch-size", type=int, default=16, help="배치 검색 한 번의 쿼리 수입니다.")
+    group.add_argument("--ann", action="store_true", help="IVF 인덱스의 지연 시간과 재현율도 측정합니다.")
+
+    group = parser.add_argument_group("transcription")
+    group.add_argument("--clips", type=str, nargs="+", default=["example", "test"], help="측정할 오디오 파일/디렉토리입니다.")
+    group.add_argument("--model-size", type=str, default=os.getenv("WHISPER_MODEL_SIZE", "base"))
+    group.add_argument("--no-vad", action="store_true", help="음성 구간 검출 없이 전체 오디오를 변환합니다.")
+    group.add_argument("--repeats", type=int, default=3)
+
+    group = parser.add_argument_group("api")
+    group.add_argument("--url", type=str, default=None, help="이미 실행 중인 서버 주소입니다. 생략하면 로컬 서버를 띄웁니다.")
+    group.add_argument("--db-path", type=str, default=os.getenv("EMBEDDING_DB_PATH", "db/embeddings.pkl"),
+                       help="로컬 서버가 로드할 임베딩 DB 경로입니다.")
+    group.add_argument("--port", type=int, default=8765)
+    group.add_argument("--api-clip", type=str, default="example/audio_2_ko.mp3", help="업로드할 오디오 파일입니다.")
+    group.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="동시 클라이언트 수 목록입니다.")
+    group.add_argument("--requests", type=int, default=32, help="동시성 단계마다 보낼 요청 수입니다.")
+    group.add_argument("--cache", action="store_true", help="로컬 서버의 결과 캐시를 켭니다. (기본값: 끔)")
+    group.add_argument("--startup-timeout", type=float, default=300.0)
+
+    group = parser.add_argument_group("build")
+    group.add_argument("--music-dir", type=str, default="music_library", help="빌드 속도를 측정할 음악 디렉토리입니다.")
+    group.add_argument("--build-workers", type=int, default=None)
+    group.add_argument("--build-batch-size", type=int, default=16)
+
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"environment": _environment(), "args": vars(args)}
+    if "search" in args.only:
+        report["search"] = benchmark_search(
+            args.rows, args.dim, args.queries, args.top_k, args.batch_size, args.ann, args.seed
+        )
+    if "decode" in args.only:
+        from scripts.benchmark_decode import benchmark_decode
+
+        decode_clips = _find_clips([args.music_dir, *args.clips])
+        report["decode"] = benchmark_decode([str(c) for c in decode_clips], args.repeats, legacy=False)
+        print(f"decode: {report['decode']['shared']['mean_seconds'] * 1000:.0f} ms/file ({len(decode_clips)} files)")
+    if "transcription" in args.only:
+        report["transcription"] = benchmark_transcription(
+            _find_clips(args.clips), args.model_size, not args.no_vad, args.repeats
+        )
+    if "api" in args.only:
+        report["api"] = benchmark_api(
+            args.url, ROOT / args.api_clip, args.concurrency, args.requests,
+            args.db_path, args.port, args.cache, args.startup_timeout,
+        )
+    if "build" in args.only:
+        report["build"] = benchmark_build(args.music_dir, args.build_workers, args.build_batch_size)
+
+    output = Path(args.output or ROOT / "benchmark_results" / f"{report['environment']['commit'] or 'unknown'}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"결과를 저장했습니다: {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare_results(report, baseline, args.threshold)
+        for row in rows:
+            marker = "REGRESSION" if row["regression"] else ""
+            print(f"{row['metric']:<50} {row['baseline']:>12.4g} -> {row['current']:>12.4g}  {row['change']:+.1%}  {marker}")
+        regressions = [row for row in rows if row["regression"]]
+        print(f"비교 기준: {baseline.get('environment', {}).get('commit')} / 회귀 {len(regressions)}개")
+        if regressions:
+            sys.exit(1)
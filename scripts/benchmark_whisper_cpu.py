@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import torch
+import whisper
+
+# `python scripts/benchmark_whisper_cpu.py`로 실행해도 `src` 패키지를 찾을 수 있도록 합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.cpu_inference import CPUInferenceProfile
+
+
+def _edit_distance(reference: List[str], hypothesis: List[str]) -> int:
+    """Levenshtein distance between two token sequences (one row of the DP table at a time)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_token in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_token in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_token != hyp_token)))
+        previous = current
+    return previous[-1]
+
+
+def error_rates(reference: str, hypothesis: str):
+    """
+    Word and character error rates of `hypothesis` against `reference`.
+
+    Korean is often segmented differently by the model, so CER is the more stable number.
+    """
+    ref_words, hyp_words = reference.split(), hypothesis.split()
+    ref_chars, hyp_chars = list("".join(ref_words)), list("".join(hyp_words))
+    return {
+        "wer": _edit_distance(ref_words, hyp_words) / max(len(ref_words), 1),
+        "cer": _edit_distance(ref_chars, hyp_chars) / max(len(ref_chars), 1),
+    }
+
+
+def benchmark_profile(
+    audio: np.ndarray,
+    model_size: str,
+    profile: Optional[CPUInferenceProfile],
+    repeats: int,
+    language: Optional[str],
+):
+    """Loads a fresh model with `profile`, then times `repeats` greedy transcriptions of `audio`."""
+    load_start = time.perf_counter()
+    model = whisper.load_model(model_size, device="cpu")
+    if profile is not None:
+        profile.apply_threads()
+        model = profile.optimize(model)
+    load_seconds = time.perf_counter() - load_start
+
+    # 첫 호출(워밍업)은 측정에서 제외합니다.
+    options = dict(fp16=False, temperature=0.0, language=language)
+    text = model.transcribe(audio, **options)["text"].strip()
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.transcribe(audio, **options)
+        timings.append(time.perf_counter() - start)
+
+    audio_seconds = len(audio) / whisper.audio.SAMPLE_RATE
+    median = float(np.median(timings))
+    return {
+        "load_seconds": load_seconds,
+        "median_seconds": median,
+        "rtf": median / audio_seconds,
+        "text": text,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="CPU에서 Whisper 추론 프로필(fp32 기본 / int8 동적 양자화 / torch.compile)의 "
+                    "실시간 배율(RTF)과 기준 대비 WER/CER을 비교합니다."
+    )
+    parser.add_argument("--audio", type=str, default="example/audio_2_ko.mp3", help="변환할 오디오 파일입니다.")
+    parser.add_argument("--model-size", type=str, default="base")
+    parser.add_argument("--language", type=str, default=None, help="언어 코드 (예: ko). 생략하면 자동 감지합니다.")
+    parser.add_argument("--repeats", type=int, default=3, help="프로필마다 측정할 반복 횟수입니다.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[torch.get_num_threads()],
+                        help="비교할 intra-op 스레드 수 목록입니다.")
+    parser.add_argument("--compile", action="store_true", help="torch.compile 프로필도 측정합니다.")
+    parser.add_argument("--reference", type=str, default=None,
+                        help="정답 텍스트 파일입니다. 생략하면 현재 경로(fp32) 결과를 기준으로 삼습니다.")
+    parser.add_argument("--output", type=str, default=None, help="결과를 저장할 JSON 파일 경로입니다.")
+
+    args = parser.parse_args()
+
+    audio = whisper.load_audio(args.audio)
+    print(f"{args.audio}: {len(audio) / whisper.audio.SAMPLE_RATE:.1f}s, Whisper {args.model_size}")
+
+    configs = [("fp32 (current)", None)]
+    for threads in args.threads:
+        configs.append((f"int8 threads={threads}", CPUInferenceProfile(quantize="int8", intra_op_threads=threads)))
+        if args.compile:
+            configs.append((
+                f"int8+compile threads={threads}",
+                CPUInferenceProfile(quantize="int8", intra_op_threads=threads, compile=True),
+            ))
+
+    results = []
+    for label, profile in configs:
+        result = benchmark_profile(audio, args.model_size, profile, args.repeats, args.language)
+        results.append({"profile": label, **(profile.as_dict() if profile else {}), **result})
+
+    if args.reference:
+        reference = Path(args.reference).read_text(encoding="utf-8")
+    else:
+        reference = results[0]["text"]
+
+    baseline_seconds = results[0]["median_seconds"]
+    for r in results:
+        r.update(error_rates(reference, r["text"]))
+        r["speedup"] = baseline_seconds / r["median_seconds"]
+        print(
+            f"{r['profile']:>28}  RTF={r['rtf']:.3f}  x{r['speedup']:.2f}  "
+            f"WER={r['wer']:.3f}  CER={r['cer']:.3f}  (load {r['load_seconds']:.1f}s)"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# `python scripts/build_ann_index.py`로 실행해도 `src` 패키지를 찾을 수 있도록 합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.ann_index import IVFIndex
+from src.embedding_db import (
+    CURRENT_FILE_NAME,
+    EmbeddingDatabase,
+    load_manifest,
+    publish_store_version,
+    resolve_store_dir,
+    validate_keep_versions,
+)
+
+
+def build_ann_index(
+    db_path: str, n_lists: int = None, iterations: int = 20, nprobe: int = 8, keep_versions: int = 3
+) -> str:
+    """
+    Trains an IVF index over an embedding store and saves it next to the matrix.
+
+    For a versioned store root, the active version is never modified: its matrix,
+    tag embeddings, calibration and manifest are published together with the index
+    as a new version, so servers only ever see a version that is complete. A plain
+    store directory gets the index written in place.
+
+    Args:
+        db_path (str): Embedding store written by `build_embedding_db.py`.
+        n_lists (int): Number of inverted lists. Defaults to about 4*sqrt(N).
+        iterations (int): Number of k-means iterations.
+        nprobe (int): Default number of lists probed per query, stored with the index.
+        keep_versions (int): Number of store versions to keep when publishing, including
+            the active one. Must be at least 1.
+
+    Returns:
+        The directory the index was written to.
+    """
+    validate_keep_versions(keep_versions)
+    store_dir = resolve_store_dir(db_path)
+    db = EmbeddingDatabase.open(store_dir)
+    print(f"총 {len(db)}개의 임베딩으로 IVF 인덱스를 학습합니다.")
+
+    start = time.perf_counter()
+    index = IVFIndex.build(db.matrix, n_lists=n_lists, iterations=iterations)
+    index.nprobe = nprobe
+    elapsed = time.perf_counter() - start
+    print(f"인덱스 학습 완료: lists={index.n_lists}, nprobe={index.nprobe}, 학습 시간 {elapsed:.1f}s")
+
+    if not (Path(db_path) / CURRENT_FILE_NAME).is_file():
+        index.save(store_dir)
+        print(f"인덱스 저장 완료: '{store_dir}'")
+        return str(store_dir)
+
+    db.attach_index(index)
+    version = publish_store_version(
+        db_path, db, load_manifest(store_dir), dtype=db.matrix.dtype.name, keep_versions=keep_versions
+    )
+    print(f"인덱스를 포함한 새 버전을 공개했습니다: {version}")
+    return str(resolve_store_dir(db_path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="임베딩 저장소에 대한 IVF 근사 최근접 이웃 인덱스를 생성합니다. "
+                    "버전 관리되는 저장소는 활성 버전을 건드리지 않고 인덱스를 포함한 새 버전으로 공개합니다."
+    )
+    parser.add_argument("db_path", type=str, help="임베딩 저장소 디렉토리 경로입니다.")
+    parser.add_argument("--n-lists", type=int, default=None, help="리스트(클러스터) 수입니다. (기본값: 약 4·√N)")
+    parser.add_argument("--iterations", type=int, default=20, help="k-means 반복 횟수입니다.")
+    parser.add_argument("--nprobe", type=int, default=8, help="검색 시 탐색할 기본 리스트 수입니다.")
+    parser.add_argument(
+        "--keep-versions", type=int, default=3, help="새 버전을 공개할 때 남겨 둘 버전 수입니다. (활성 버전 포함, 1 이상)"
+    )
+
+    args = parser.parse_args()
+    try:
+        validate_keep_versions(args.keep_versions)
+    except ValueError as e:
+        parser.error(str(e))
+
+    build_ann_index(
+        args.db_path, n_lists=args.n_lists, iterations=args.iterations, nprobe=args.nprobe,
+        keep_versions=args.keep_versions,
+    )
@@ -1,11 +1,39 @@
 #!/usr/bin/env python3
-import pickle
+import os
+import sys
+import json
+import time
+import hashlib
+import queue
+import threading
 from pathlib import Path
+from typing import List, Optional, Tuple
+import numpy as np
 import torch
 from transformers import ClapModel, ClapProcessor
-import librosa  # 오디오 파일 로드를 위해 librosa 추가
 import argparse
 
+# `python scripts/build_embedding_db.py`로 실행해도 `src` 패키지를 찾을 수 있도록 합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.ann_index import IVFIndex
+from src.audio_decode import CLAP_SAMPLE_RATE, DecoderPool
+from src.embedding_db import (
+    METADATA_FILE_NAME,
+    EmbeddingDatabase,
+    load_manifest,
+    publish_store_version,
+    resolve_store_dir,
+    validate_keep_versions,
+)
+from src.score_calibration import CALIBRATION_MAX_TRACKS, REFERENCE_QUERIES, ScoreCalibration
+from src.tag_embeddings import TagEmbeddings, tag_vocabulary
+
+CHECKPOINT_SUFFIX = ".partial"
+
+# 디코딩 큐의 종료 신호
+_DONE = object()
+
+
 # Helper function to load the model
 def _load_clap_model(device):
     """CLAP 모델과 프로세서를 로드합니다."""
@@ -14,39 +42,272 @@ def _load_clap_model(device):
     model = ClapModel.from_pretrained(
         "laion/larger_clap_music", use_safetensors=True
     ).to(device)
+    model.eval()
     processor = ClapProcessor.from_pretrained("laion/larger_clap_music")
     print("CLAP model loaded successfully.")
     return model, processor
 
-# Helper function to compute embedding
-def _get_audio_embedding(audio_path, model, processor, device):
-    """Computes a CLAP embedding for a single audio file."""
-    # librosa를 사용해 오디오 파일을 로드하고 resample
-    try:
-        y, sr = librosa.load(audio_path, sr=48000)  # CLAP 모델은 48kHz 샘플링 레이트를 기대합니다.
-    except Exception as e:
-        print(f"Error loading audio file {audio_path}: {e}")
-        return None
 
-    audio_inputs = processor(audios=y, return_tensors="pt", padding=True, sampling_rate=48000)
-    
+# Helper function to compute embeddings
+def _get_audio_embeddings(waveforms: List[np.ndarray], model, processor, device) -> torch.Tensor:
+    """Computes CLAP embeddings for a batch of 48kHz waveforms in one forward pass."""
+    audio_inputs = processor(audios=waveforms, return_tensors="pt", padding=True, sampling_rate=CLAP_SAMPLE_RATE)
+
     for key in audio_inputs:
         if isinstance(audio_inputs[key], torch.Tensor):
             audio_inputs[key] = audio_inputs[key].to(device)
 
     with torch.no_grad():
-        audio_embedding = model.get_audio_features(**audio_inputs)
-        
-    return audio_embedding.cpu()
+        audio_embeddings = model.get_audio_features(**audio_inputs)
+
+    return audio_embeddings.cpu()
+
+
+def _build_tag_embeddings(tags_file: str, model, processor, device) -> Optional[TagEmbeddings]:
+    """Embeds every tag term in `tags_file` with the CLAP text tower, so the server can skip it for tag queries."""
+    try:
+        with open(tags_file, "r", encoding="utf-8") as f:
+            vocab = tag_vocabulary(json.load(f))
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"태그 파일을 읽지 못해 태그 임베딩을 건너뜁니다: {e}")
+        return None
+    if not vocab:
+        return None
+
+    inputs = processor(text=vocab, return_tensors="pt", padding=True)
+    inputs = {key: value.to(device) for key, value in inputs.items()}
+    with torch.no_grad():
+        text_embeddings = model.get_text_features(**inputs)
+    print(f"태그 어휘 {len(vocab)}개의 텍스트 임베딩을 계산했습니다.")
+    return TagEmbeddings(vocab, text_embeddings.cpu().numpy())
+
+
+def _build_score_calibration(
+    db: EmbeddingDatabase, queries_file: Optional[str], model, processor, device
+) -> ScoreCalibration:
+    """
+    Scores reference queries against every track and keeps the distribution's quantiles,
+    so the server can report percentile scores and confidence margins for this version.
+
+    The queries are `REFERENCE_QUERIES`, the lines of `queries_file` (e.g. real
+    transcripts) and the already embedded tag vocabulary. Libraries larger than
+    `CALIBRATION_MAX_TRACKS` are scored against a fixed-seed sample of tracks, so the
+    float32 score matrix stays `[queries, CALIBRATION_MAX_TRACKS]` at most.
+    """
+    queries = list(REFERENCE_QUERIES)
+    if queries_file:
+        with open(queries_file, "r", encoding="utf-8") as f:
+            queries += [line.strip() for line in f if line.strip()]
+
+    inputs = processor(text=queries, return_tensors="pt", padding=True)
+    inputs = {key: value.to(device) for key, value in inputs.items()}
+    with torch.no_grad():
+        query_matrix = model.get_text_features(**inputs).cpu().numpy().astype(np.float32)
+    query_matrix /= np.maximum(np.linalg.norm(query_matrix, axis=1, keepdims=True), 1e-12)
+    if db.tag_embeddings is not None:
+        query_matrix = np.concatenate([query_matrix, db.tag_embeddings.matrix], axis=0)
+
+    rows = np.arange(len(db))
+    if len(rows) > CALIBRATION_MAX_TRACKS:
+        rows = np.sort(np.random.default_rng(0).choice(len(db), CALIBRATION_MAX_TRACKS, replace=False))
+    track_matrix = np.asarray(db.matrix[rows], dtype=np.float32)
+    calibration = ScoreCalibration.from_scores(query_matrix @ track_matrix.T)
+    print(
+        f"쿼리 {len(query_matrix)}개, 곡 {len(rows)}개로 점수 분포를 계산했습니다. "
+        f"(중앙값 {calibration.quantiles[len(calibration.quantiles) // 2]:.3f}, 표준편차 {calibration.std:.3f})"
+    )
+    return calibration
+
+
+def _file_sha256(path: str) -> str:
+    """Computes the SHA-256 of a file's contents, reading it in 1MB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _plan_incremental(audio_files: List[str], previous_db: Optional[EmbeddingDatabase], previous_manifest: dict):
+    """
+    Decides which files can reuse an embedding from the previous DB version.
+
+    A file whose size and mtime match the manifest is reused without being read.
+    Otherwise its content hash is computed, and a file whose content is already
+    in the previous DB (touched or moved) also reuses that row.
+
+    Returns:
+        `(manifest, reused, to_embed)`: the new manifest for every scanned file,
+        a `path -> previous row index` dict, and the list of files to embed.
+    """
+    previous_rows = {path: i for i, path in enumerate(previous_db.paths)} if previous_db is not None else {}
+    previous_by_hash = {
+        entry["sha256"]: previous_rows[path]
+        for path, entry in previous_manifest.items()
+        if path in previous_rows
+    }
+
+    manifest, reused, to_embed = {}, {}, []
+    for audio_path in audio_files:
+        st = os.stat(audio_path)
+        old = previous_manifest.get(audio_path)
+        if old and audio_path in previous_rows and old["size"] == st.st_size and old["mtime"] == st.st_mtime:
+            manifest[audio_path] = old
+            reused[audio_path] = previous_rows[audio_path]
+            continue
+
+        digest = _file_sha256(audio_path)
+        manifest[audio_path] = {"size": st.st_size, "mtime": st.st_mtime, "sha256": digest}
+        if digest in previous_by_hash:
+            reused[audio_path] = previous_by_hash[digest]
+        else:
+            to_embed.append(audio_path)
+    return manifest, reused, to_embed
+
+
+class _Checkpoint:
+    """
+    Stores finished batches as numbered `.npz` chunks in `<output>.partial/`.
+
+    Each chunk is written to a temporary file and renamed, so a crash never leaves
+    a half-written chunk behind. Every row carries the content hash the file had
+    when it was embedded; on restart, only rows whose hash still matches `manifest`
+    are reused, so a file replaced between the runs is embedded again.
+    """
+
+    def __init__(self, output_path: Path, manifest: dict):
+        self.dir = output_path.with_name(output_path.name + CHECKPOINT_SUFFIX)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.chunk_files = sorted(self.dir.glob("chunk_*.npz"))
+        self.manifest = manifest
+
+    def _valid_rows(self, chunk) -> Tuple[List[str], List[int]]:
+        """The chunk's paths and the rows whose stored hash matches the current file."""
+        paths = chunk["paths"].tolist()
+        # 해시가 없는 이전 형식의 체크포인트는 검증할 수 없으므로 재사용하지 않습니다.
+        hashes = chunk["sha256"].tolist() if "sha256" in chunk.files else [None] * len(paths)
+        rows = [
+            i for i, (path, digest) in enumerate(zip(paths, hashes))
+            if digest is not None and digest == self.manifest.get(path, {}).get("sha256")
+        ]
+        return paths, rows
+
+    def done_paths(self) -> set:
+        done = set()
+        for chunk_file in self.chunk_files:
+            with np.load(chunk_file) as chunk:
+                paths, rows = self._valid_rows(chunk)
+                done.update(paths[i] for i in rows)
+        return done
+
+    def write(self, paths: List[str], embeddings: np.ndarray) -> None:
+        chunk_file = self.dir / f"chunk_{len(self.chunk_files):06d}.npz"
+        tmp_file = self.dir / (chunk_file.name + ".tmp")
+        hashes = [self.manifest[path]["sha256"] for path in paths]
+        with open(tmp_file, "wb") as f:
+            np.savez(f, paths=np.array(paths), sha256=np.array(hashes), embeddings=embeddings)
+        os.replace(tmp_file, chunk_file)
+        self.chunk_files.append(chunk_file)
+
+    def load_all(self) -> Tuple[List[str], Optional[np.ndarray]]:
+        embeddings = {}
+        for chunk_file in self.chunk_files:
+            with np.load(chunk_file) as chunk:
+                paths, rows = self._valid_rows(chunk)
+                matrix = chunk["embeddings"]
+                # 같은 파일이 여러 청크에 있으면 나중에 쓴 행을 씁니다.
+                embeddings.update((paths[i], matrix[i]) for i in rows)
+        if not embeddings:
+            return [], None
+        return list(embeddings), np.stack(list(embeddings.values()))
+
+    def remove(self) -> None:
+        for chunk_file in self.chunk_files:
+            chunk_file.unlink()
+        self.dir.rmdir()
+
+
+def _decode_producer(audio_files: List[str], num_workers: int, decoded_queue: "queue.Queue", stats: dict):
+    """
+    Decodes files to 48kHz mono in a pool of persistent decoder processes and pushes results into a bounded queue.
 
-def build_embedding_database(music_dir_path: str, output_db_path: str):
+    At most `decoded_queue.maxsize` decodes are in flight, so a slow model
+    back-pressures the decoders instead of buffering the whole library in memory.
+    If the pool itself fails (e.g. a killed worker process), the exception is kept
+    in `stats["error"]`; the end marker is always queued so the consumer never hangs.
     """
-    Scans a directory of music files, computes their embeddings, and saves them to a database file.
+    try:
+        with DecoderPool(num_workers, sample_rates=(CLAP_SAMPLE_RATE,), max_in_flight=decoded_queue.maxsize) as pool:
+            for result in pool.imap_unordered(audio_files):
+                stats["decode_seconds"] += result.seconds
+                waveform = result.waveforms[CLAP_SAMPLE_RATE] if result.waveforms is not None else None
+                decoded_queue.put((result.path, waveform, result.error, result.seconds))
+    except BaseException as e:
+        stats["error"] = e
+    finally:
+        decoded_queue.put(_DONE)
+
+
+def build_embedding_database(
+    music_dir_path: str,
+    output_db_path: str,
+    dtype: str = "float16",
+    num_workers: Optional[int] = None,
+    batch_size: int = 16,
+    queue_size: int = 64,
+    resume: bool = True,
+    incremental: bool = False,
+    keep_versions: int = 3,
+    tags_file: Optional[str] = "tags.json",
+    calibrate: bool = True,
+    calibration_queries_file: Optional[str] = None,
+    ann_index: bool = False,
+    ann_lists: Optional[int] = None,
+    ann_nprobe: int = 8,
+):
+    """
+    Scans a directory of music files, computes their embeddings, and publishes them as a new store version.
+
+    Decoding/resampling runs in a process pool, and decoded waveforms flow through a
+    bounded queue into batched CLAP inference. Every finished batch is checkpointed,
+    so a rerun after a crash only processes the files that were not done yet.
+
+    Each build writes `versions/<version>/` (matrix, path table and a manifest of
+    path/size/mtime/sha256) under the output directory and then atomically points
+    `CURRENT` at it. In incremental mode only new or changed files are embedded,
+    deleted files are dropped, and every other row is copied from the active version.
 
     Args:
         music_dir_path (str): The path to the directory containing music files.
-        output_db_path (str): The path where the embedding database file (.pkl) will be saved.
+        output_db_path (str): The root directory of the versioned embedding store.
+        dtype (str): Storage dtype of the embedding matrix ('float16' or 'float32').
+        num_workers (int): Number of decode processes. Defaults to the CPU count.
+        batch_size (int): Number of files per CLAP forward pass.
+        queue_size (int): Maximum number of decoded (or in-flight) files waiting for the model.
+        resume (bool): Reuse checkpointed batches from a previous, interrupted run.
+        incremental (bool): Reuse embeddings of unchanged files from the active version.
+        keep_versions (int): Number of store versions to keep on disk, including the
+            active one. Must be at least 1.
+        tags_file (str): `tags.json` whose tag vocabulary is embedded and stored with the
+            version (`tag_embeddings.npz`). `None` skips it.
+        calibrate (bool): Store the text-to-track score distribution with the version
+            (`score_calibration.json`) for calibrated scores and early exit.
+        calibration_queries_file (str): Extra calibration queries, one per line.
+        ann_index (bool): Train an IVF index and publish it inside the new version, so
+            servers running with `ANN_INDEX=ivf` pick up matrix and index together.
+        ann_lists (int): Number of IVF lists. Defaults to about 4*sqrt(N).
+        ann_nprobe (int): Default number of lists probed per query, stored with the index.
+
+    Returns:
+        A dict of build statistics (file counts, files/sec and per-stage seconds),
+        or `None` if nothing was published.
+
+    Raises:
+        ValueError: If `keep_versions` is less than 1, before any work is done.
     """
+    validate_keep_versions(keep_versions)
+    total_start = time.perf_counter()
+
     # 1. Device setup and model loading
     device = "cuda" if torch.cuda.is_available() else "cpu"
     print(f"Using device: {device}")
@@ -59,37 +320,154 @@ def build_embedding_database(music_dir_path: str, output_db_path: str):
         return
 
     print(f"Scanning for audio files in '{music_dir}'...")
-    audio_files = list(music_dir.rglob("*.mp3")) + list(music_dir.rglob("*.wav"))
+    audio_files = sorted(
+        str(p.resolve()) for p in list(music_dir.rglob("*.mp3")) + list(music_dir.rglob("*.wav"))
+    )
     print(f"총 {len(audio_files)}개의 오디오 파일을 찾았습니다.")
 
-    # 3. Embedding computation
-    embedding_data = []
+    # 3. Compare against the active version's manifest
+    output_path = Path(output_db_path)
+    previous_db, previous_manifest = None, {}
+    if incremental:
+        previous_store = resolve_store_dir(output_path)
+        if (previous_store / METADATA_FILE_NAME).is_file():
+            previous_db = EmbeddingDatabase.open(previous_store)
+            previous_manifest = load_manifest(previous_store)
+            print(f"활성 버전 '{previous_db.version}'과 비교합니다. ({len(previous_db)}개 항목)")
+        else:
+            print("활성 버전이 없어 전체 빌드를 수행합니다.")
 
-    for audio_path in audio_files:
+    manifest, reused, to_embed = _plan_incremental(audio_files, previous_db, previous_manifest)
+    if previous_db is not None:
+        removed = len(set(previous_db.paths) - set(audio_files))
+        print(f"재사용 {len(reused)}개, 새로 임베딩 {len(to_embed)}개, 삭제 {removed}개")
+
+    # 4. Resume from checkpoint
+    checkpoint = _Checkpoint(output_path, manifest)
+    if not resume and checkpoint.chunk_files:
+        checkpoint.remove()
+        checkpoint = _Checkpoint(output_path, manifest)
+
+    done = checkpoint.done_paths()
+    todo = [p for p in to_embed if p not in done]
+    if done:
+        print(f"체크포인트에서 {len(done)}개의 임베딩을 재사용합니다. 남은 파일: {len(todo)}개")
+
+    # 5. Parallel decode -> bounded queue -> batched embedding computation
+    stats = {"decode_seconds": 0.0, "inference_seconds": 0.0, "failed": 0, "embedded": 0, "error": None}
+    decoded_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    producer = threading.Thread(
+        target=_decode_producer,
+        args=(todo, num_workers or os.cpu_count() or 1, decoded_queue, stats),
+        daemon=True,
+    )
+    producer.start()
+
+    batch_paths: List[str] = []
+    batch_waveforms: List[np.ndarray] = []
+
+    def flush_batch():
+        if not batch_paths:
+            return
+        start = time.perf_counter()
         try:
-            abs_path_str = str(audio_path.resolve())
-            print(f"Processing: {abs_path_str}")
-            
-            embedding_vector = _get_audio_embedding(abs_path_str, model, processor, device)
-            
-            if embedding_vector is not None:
-                embedding_data.append((abs_path_str, embedding_vector))
+            embeddings = _get_audio_embeddings(batch_waveforms, model, processor, device)
         except Exception as e:
-            print(f"Could not process file {audio_path}. Reason: {e}")
+            print(f"Could not embed batch of {len(batch_paths)} files. Reason: {e}")
+            stats["failed"] += len(batch_paths)
+        else:
+            checkpoint.write(list(batch_paths), embeddings.numpy().astype(np.float32))
+            stats["embedded"] += len(batch_paths)
+            print(f"Embedded {stats['embedded']}/{len(todo)} files")
+        stats["inference_seconds"] += time.perf_counter() - start
+        batch_paths.clear()
+        batch_waveforms.clear()
+
+    while True:
+        item = decoded_queue.get()
+        if item is _DONE:
+            break
+        audio_path, waveform, error, _ = item
+        if waveform is None:
+            print(f"Error loading audio file {audio_path}: {error}")
+            stats["failed"] += 1
             continue
+        batch_paths.append(audio_path)
+        batch_waveforms.append(waveform)
+        if len(batch_paths) >= batch_size:
+            flush_batch()
+    flush_batch()
+    producer.join()
+    if stats["error"] is not None:
+        # 이미 임베딩한 배치는 체크포인트에 남아 있으므로, 다시 실행하면 나머지부터 이어서 빌드합니다.
+        raise RuntimeError(f"Decoding failed: {stats['error']!r}") from stats["error"]
 
-    print(f"총 {len(embedding_data)}개의 임베딩을 생성했습니다.")
+    # 6. Merge reused and new rows, then publish a new version (contiguous matrix + path table)
+    save_start = time.perf_counter()
+    new_paths, new_matrix = checkpoint.load_all()
+    print(f"총 {len(new_paths)}개의 임베딩을 생성했습니다.")
+    new_rows = {path: i for i, path in enumerate(new_paths)}
 
-    # 4. Save database file
-    output_path = Path(output_db_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True) 
+    paths = [p for p in audio_files if p in reused or p in new_rows]
+    if not paths:
+        print("Error: No embeddings were produced. Nothing to save.")
+        return
+
+    dim = new_matrix.shape[1] if new_matrix is not None else previous_db.dim
+    matrix = np.empty((len(paths), dim), dtype=np.float32)
+    reused_positions = [i for i, p in enumerate(paths) if p in reused]
+    if reused_positions:
+        source_rows = np.array([reused[paths[i]] for i in reused_positions])
+        order = np.argsort(source_rows)  # memmap을 디스크 순서대로 읽습니다.
+        matrix[np.array(reused_positions)[order]] = previous_db.matrix[source_rows[order]]
+    new_positions = [i for i, p in enumerate(paths) if p in new_rows]
+    if new_positions:
+        matrix[new_positions] = new_matrix[[new_rows[paths[i]] for i in new_positions]]
+
+    db = EmbeddingDatabase.from_matrix(paths, matrix)
+    if tags_file:
+        db.tag_embeddings = _build_tag_embeddings(tags_file, model, processor, device)
+    if calibrate:
+        db.calibration = _build_score_calibration(db, calibration_queries_file, model, processor, device)
+    if ann_index:
+        index = IVFIndex.build(db.matrix, n_lists=ann_lists)
+        index.nprobe = ann_nprobe
+        db.attach_index(index)
+        print(f"IVF 인덱스를 생성했습니다. (lists={index.n_lists}, nprobe={index.nprobe})")
+
+    print(f"'{output_path}'에 {len(paths)}개의 항목을 저장합니다.")
+    version = publish_store_version(
+        output_path,
+        db,
+        {p: manifest[p] for p in paths},
+        dtype=dtype,
+        keep_versions=keep_versions,
+    )
+    checkpoint.remove()
+    save_seconds = time.perf_counter() - save_start
 
-    print(f"'{output_path}'에 {len(embedding_data)}개의 항목을 저장합니다.")
-    with open(output_path, 'wb') as f:
-        pickle.dump(embedding_data, f)
+    total_seconds = time.perf_counter() - total_start
+    print(f"\n총 {len(paths)}개의 임베딩이 데이터베이스에 저장되었습니다.")
+    print(f"데이터베이스 저장 완료: '{output_path}' (버전 {version})")
+    print("\n--- 빌드 통계 ---")
+    print(f"처리한 파일: {stats['embedded']}개 (실패 {stats['failed']}개, 체크포인트 재사용 {len(done)}개, 이전 버전 재사용 {len(reused)}개)")
+    print(f"처리량: {stats['embedded'] / total_seconds:.2f} files/sec (전체 {total_seconds:.1f}s)")
+    print(f"디코딩 (워커 합계): {stats['decode_seconds']:.1f}s")
+    print(f"CLAP 추론: {stats['inference_seconds']:.1f}s")
+    print(f"저장: {save_seconds:.1f}s")
+    return {
+        "version": version,
+        "files": len(audio_files),
+        "embedded": stats["embedded"],
+        "failed": stats["failed"],
+        "reused": len(reused) + len(done),
+        "files_per_sec": stats["embedded"] / total_seconds,
+        "total_seconds": total_seconds,
+        "decode_seconds": stats["decode_seconds"],
+        "inference_seconds": stats["inference_seconds"],
+        "save_seconds": save_seconds,
+    }
 
-    print(f"\n총 {len(embedding_data)}개의 임베딩이 데이터베이스에 저장되었습니다.")
-    print(f"데이터베이스 저장 완료: '{output_path}'")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -103,11 +481,93 @@ if __name__ == "__main__":
     parser.add_argument(
         "output_db_path",
         type=str,
-        help="임베딩 데이터베이스 파일(.pkl)을 저장할 경로입니다.",
+        help="버전 관리되는 임베딩 저장소의 루트 디렉토리 경로입니다.",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=["float16", "float32"],
+        default="float16",
+        help="임베딩 행렬의 저장 dtype입니다. (기본값: float16)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="디코딩 프로세스 수입니다. (기본값: CPU 코어 수)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=16,
+        help="CLAP 추론 한 번에 처리할 파일 수입니다. (기본값: 16)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=64,
+        help="모델 앞에서 대기할 수 있는 디코딩 결과의 최대 개수입니다. (기본값: 64)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="활성 버전과 비교해 새로 추가되거나 변경된 파일만 임베딩합니다.",
+    )
+    parser.add_argument(
+        "--keep-versions",
+        type=int,
+        default=3,
+        help="디스크에 남겨 둘 DB 버전 수입니다. 활성 버전을 포함하며 1 이상이어야 합니다. (기본값: 3)",
+    )
+    parser.add_argument(
+        "--tags-file",
+        type=str,
+        default="tags.json",
+        help="태그 어휘 임베딩을 함께 저장할 태그 파일입니다. 빈 문자열이면 건너뜁니다. (기본값: tags.json)",
+    )
+    parser.add_argument(
+        "--no-calibration",
+        action="store_true",
+        help="점수 보정 분포를 계산하지 않습니다. (점수는 원시 코사인 유사도, 조기 종료 비활성화)",
+    )
+    parser.add_argument(
+        "--calibration-queries",
+        type=str,
+        default=None,
+        help="점수 분포 계산에 추가할 기준 쿼리 파일입니다. (한 줄에 하나, 예: 실제 변환 텍스트)",
+    )
+    parser.add_argument(
+        "--ann-index",
+        action="store_true",
+        help="IVF 근사 인덱스를 학습해 새 버전에 함께 공개합니다. (ANN_INDEX=ivf로 실행하는 서버용)",
+    )
+    parser.add_argument("--ann-lists", type=int, default=None, help="IVF 리스트(클러스터) 수입니다. (기본값: 약 4·√N)")
+    parser.add_argument("--ann-nprobe", type=int, default=8, help="검색 시 탐색할 기본 리스트 수입니다.")
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="이전 실행의 체크포인트를 무시하고 처음부터 다시 빌드합니다.",
     )
 
     args = parser.parse_args()
+    try:
+        validate_keep_versions(args.keep_versions)
+    except ValueError as e:
+        parser.error(str(e))
 
     build_embedding_database(
-        music_dir_path=args.music_dir_path, output_db_path=args.output_db_path
+        music_dir_path=args.music_dir_path,
+        output_db_path=args.output_db_path,
+        dtype=args.dtype,
+        num_workers=args.workers,
+        batch_size=args.batch_size,
+        queue_size=args.queue_size,
+        resume=not args.no_resume,
+        incremental=args.incremental,
+        keep_versions=args.keep_versions,
+        tags_file=args.tags_file or None,
+        calibrate=not args.no_calibration,
+        calibration_queries_file=args.calibration_queries,
+        ann_index=args.ann_index,
+        ann_lists=args.ann_lists,
+        ann_nprobe=args.ann_nprobe,
     )
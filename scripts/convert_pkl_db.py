@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import sys
+import argparse
+from pathlib import Path
+
+# `python scripts/convert_pkl_db.py`로 실행해도 `src` 패키지를 찾을 수 있도록 합니다.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.embedding_db import EmbeddingDatabase, load_embedding_db
+
+
+def convert_pkl_database(input_pkl_path: str, output_db_path: str, dtype: str = "float16"):
+    """
+    Converts a legacy pickled `(path, tensor)` list into a memory-mappable embedding store.
+
+    Args:
+        input_pkl_path (str): Path to the existing `.pkl` database.
+        output_db_path (str): Directory where the embedding store will be written.
+        dtype (str): Storage dtype of the embedding matrix ('float16' or 'float32').
+    """
+    print(f"Loading legacy database: {input_pkl_path}")
+    db = load_embedding_db(input_pkl_path)
+    print(f"총 {len(db)}개의 임베딩을 읽었습니다. (dim={db.dim if len(db) else 0})")
+
+    db.save(output_db_path, dtype=dtype)
+
+    # 변환 결과를 다시 열어 행 수가 같은지 확인합니다.
+    reopened = EmbeddingDatabase.open(output_db_path)
+    if len(reopened) != len(db):
+        raise RuntimeError(f"Converted store has {len(reopened)} rows, expected {len(db)}.")
+    print(f"변환 완료: '{output_db_path}' ({dtype})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="기존 .pkl 임베딩 DB를 메모리 매핑 가능한 저장소 형식으로 변환합니다."
+    )
+    parser.add_argument("input_pkl_path", type=str, help="변환할 기존 .pkl 파일 경로입니다.")
+    parser.add_argument("output_db_path", type=str, help="저장소를 저장할 디렉토리 경로입니다.")
+    parser.add_argument(
+        "--dtype",
+        choices=["float16", "float32"],
+        default="float16",
+        help="임베딩 행렬의 저장 dtype입니다. (기본값: float16)",
+    )
+
+    args = parser.parse_args()
+
+    convert_pkl_database(args.input_pkl_path, args.output_db_path, dtype=args.dtype)
@@ -0,0 +1,199 @@
+import json
+import math
+import os
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+import numpy as np
+
+# 임베딩 저장소 디렉토리 안에 함께 저장되는 인덱스 파일 이름
+IVF_INDEX_FILE_NAME = "ivf_index.npz"
+IVF_INDEX_FORMAT_VERSION = 1
+
+# 할당/학습 시 한 번에 계산하는 행 수 (메모리 사용량 상한)
+_ASSIGN_BLOCK_ROWS = 65536
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """각 행을 내적이 가장 큰(=코사인 유사도가 가장 높은) 중심점에 할당합니다."""
+    assignments = np.empty(len(matrix), dtype=np.int32)
+    for start in range(0, len(matrix), _ASSIGN_BLOCK_ROWS):
+        block = np.asarray(matrix[start:start + _ASSIGN_BLOCK_ROWS], dtype=np.float32)
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def default_n_lists(num_rows: int) -> int:
+    """행 수에 맞는 기본 리스트 수 (약 4·√N, 리스트당 평균 40행 이상이 되도록 제한)."""
+    return max(1, min(int(4 * math.sqrt(num_rows)), num_rows // 40 or 1))
+
+
+class IVFIndex:
+    """
+    정규화된 임베딩 행렬 위에서 동작하는 IVF(Inverted File) 근사 최근접 이웃 인덱스.
+
+    학습 단계에서 구면 k-means로 `n_lists`개의 중심점을 구하고, 각 행을 가장 가까운
+    중심점의 리스트에 넣습니다. 검색 시에는 쿼리와 가까운 `nprobe`개의 리스트에 속한
+    행만 정확히 계산하므로, `nprobe`를 키우면 재현율이, 줄이면 속도가 올라갑니다.
+    인덱스는 행 ID만 보관하고 벡터는 원본 행렬(메모리 매핑)에서 읽습니다.
+    """
+
+    centroids: np.ndarray
+    list_offsets: np.ndarray
+    list_ids: np.ndarray
+    nprobe: int
+
+    def __init__(self, centroids: np.ndarray, list_offsets: np.ndarray, list_ids: np.ndarray, nprobe: int = 8):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        self.nprobe = nprobe
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(
+        cls,
+        matrix: np.ndarray,
+        n_lists: Optional[int] = None,
+        iterations: int = 20,
+        sample_size: Optional[int] = None,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """
+        정규화된 `[N, D]` 행렬로부터 인덱스를 학습하고 모든 행을 리스트에 할당합니다.
+
+        Args:
+            matrix: 행이 L2 정규화된 임베딩 행렬 (memmap 가능).
+            n_lists: 리스트(클러스터) 수. 생략하면 `default_n_lists(N)`.
+            iterations: k-means 반복 횟수.
+            sample_size: k-means 학습에 사용할 최대 행 수. 생략하면 `256 * n_lists`.
+            seed: 샘플링/초기화 난수 시드.
+
+        Returns:
+            학습된 IVFIndex.
+        """
+        num_rows = len(matrix)
+        if num_rows == 0:
+            raise ValueError("Cannot build an index over an empty embedding matrix.")
+
+        n_lists = min(n_lists or default_n_lists(num_rows), num_rows)
+        rng = np.random.default_rng(seed)
+
+        sample_size = min(sample_size or 256 * n_lists, num_rows)
+        sample_ids = np.sort(rng.choice(num_rows, size=sample_size, replace=False))
+        sample = np.asarray(matrix[sample_ids], dtype=np.float32)
+
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = _assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=n_lists)
+
+            # 빈 클러스터는 임의의 샘플 행으로 다시 시작합니다.
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                sums[empty] = sample[rng.choice(sample_size, size=len(empty), replace=False)]
+            centroids = _normalize_rows(sums)
+
+        assignments = _assign(matrix, centroids)
+        list_ids = np.argsort(assignments, kind="stable").astype(np.int64)
+        counts = np.bincount(assignments, minlength=n_lists)
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(centroids.astype(np.float32), list_offsets, list_ids)
+
+    def search(
+        self,
+        matrix: np.ndarray,
+        query: np.ndarray,
+        top_k: int,
+        nprobe: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        가까운 `nprobe`개의 리스트 안에서만 코사인 유사도 상위 `top_k`개를 찾습니다.
+
+        Args:
+            matrix: 인덱스를 만든 것과 같은 정규화된 임베딩 행렬.
+            query: 정규화된 `[D]` float32 쿼리 벡터.
+            top_k: 반환할 최대 개수.
+            nprobe: 탐색할 리스트 수. 생략하면 인덱스 기본값.
+
+        Returns:
+            `(scores, indices)` 튜플 (점수 내림차순, 전체 행 기준 인덱스).
+        """
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        centroid_scores = self.centroids @ query
+        if nprobe < self.n_lists:
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probe = np.arange(self.n_lists)
+
+        candidates = np.concatenate(
+            [self.list_ids[self.list_offsets[i]:self.list_offsets[i + 1]] for i in probe]
+        )
+        if len(candidates) == 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        # memmap에서 후보 행을 읽을 때 디스크 순서대로 접근하도록 정렬합니다.
+        candidates.sort()
+        scores = np.asarray(matrix[candidates], dtype=np.float32) @ query
+
+        k = min(top_k, len(candidates))
+        if k < len(candidates):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return scores[top], candidates[top]
+
+    def save(self, store_dir: Union[str, Path]) -> None:
+        """인덱스를 임베딩 저장소 디렉토리 안의 `ivf_index.npz`로 저장합니다."""
+        store_dir = Path(store_dir)
+        index_path = store_dir / IVF_INDEX_FILE_NAME
+        tmp_index_path = store_dir / (IVF_INDEX_FILE_NAME + ".tmp")
+        with open(tmp_index_path, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                list_offsets=self.list_offsets,
+                list_ids=self.list_ids,
+                info=np.array(json.dumps({"format_version": IVF_INDEX_FORMAT_VERSION, "nprobe": self.nprobe})),
+            )
+        os.replace(tmp_index_path, index_path)
+
+    @classmethod
+    def load(cls, store_dir: Union[str, Path], nprobe: Optional[int] = None) -> "IVFIndex":
+        """
+        저장소 디렉토리에서 인덱스를 읽어옵니다.
+
+        Args:
+            store_dir: `ivf_index.npz`가 들어 있는 임베딩 저장소 디렉토리.
+            nprobe: 기본 탐색 리스트 수를 덮어쓸 값.
+        """
+        with np.load(Path(store_dir) / IVF_INDEX_FILE_NAME) as data:
+            info = json.loads(str(data["info"]))
+            if info.get("format_version") != IVF_INDEX_FORMAT_VERSION:
+                raise ValueError(f"Unsupported IVF index format: {info.get('format_version')}")
+            return cls(
+                data["centroids"],
+                data["list_offsets"],
+                data["list_ids"],
+                nprobe=nprobe or info.get("nprobe", 8),
+            )
+
+
+def recall_at_k(exact_indices: Any, approx_indices: Any) -> float:
+    """정확한 상위 k개 중 근사 검색이 찾아낸 비율을 반환합니다."""
+    exact = set(np.asarray(exact_indices).tolist())
+    if not exact:
+        return 1.0
+    return len(exact & set(np.asarray(approx_indices).tolist())) / len(exact)
@@ -0,0 +1,368 @@
+import math
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, Iterator, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+from scipy.signal import firwin, resample_poly
+
+try:
+    import soundfile
+except ImportError:  # libsndfile이 없으면 모든 파일을 ffmpeg로 디코딩합니다.
+    soundfile = None
+
+try:
+    import av
+except ImportError:  # PyAV가 없으면 libsndfile이 못 읽는 형식(AAC/M4A 등)은 파일마다 ffmpeg 프로세스를 띄웁니다.
+    av = None
+
+# Whisper가 기대하는 입력 형식 (16kHz 모노 float32)
+WHISPER_SAMPLE_RATE = 16000
+# CLAP 오디오 인코더가 기대하는 샘플링 레이트
+CLAP_SAMPLE_RATE = 48000
+# 업로드 본문을 ffmpeg에 넘길 때의 청크 크기
+STREAM_CHUNK_BYTES = 64 * 1024
+# 디코딩에 쓰는 ffmpeg 실행 파일
+FFMPEG_BINARY = "ffmpeg"
+
+
+class AudioDecodeError(RuntimeError):
+    """ffmpeg가 입력을 오디오로 디코딩하지 못했을 때 발생합니다."""
+
+
+class DecoderUnavailableError(AudioDecodeError):
+    """ffmpeg 프로세스를 띄울 수 없을 때(설치되지 않았거나 자원 부족) 발생합니다. 입력이 아니라 서버 쪽 문제입니다."""
+
+
+class AudioTooLargeError(ValueError):
+    """업로드 크기가 허용 한도를 넘었을 때 발생합니다."""
+
+
+class StreamingDecoder:
+    """
+    바이트 청크를 ffmpeg 표준 입력으로 흘려 보내면서, 표준 출력의 PCM을 바로 모읍니다.
+
+    입력 전체를 디스크에 저장했다가 다시 읽는 과정이 없고, `max_bytes`를 넘는 입력은
+    읽는 도중에 거절합니다. `max_seconds`가 지정되면 ffmpeg가 그 길이까지만 디코딩하고
+    종료하므로, 나머지 입력은 더 읽지 않습니다.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = WHISPER_SAMPLE_RATE,
+        max_bytes: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+    ):
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.bytes_in = 0
+        self._output = bytearray()
+        self._stderr = b""
+
+        cmd = [FFMPEG_BINARY, "-nostdin", "-hide_banner", "-loglevel", "error", "-i", "pipe:0"]
+        if max_seconds is not None:
+            cmd += ["-t", str(max_seconds)]
+        cmd += ["-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "pipe:1"]
+        try:
+            self._process = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+        except OSError as e:
+            raise DecoderUnavailableError(f"Could not start ffmpeg: {e}") from e
+        # 파이프 버퍼가 가득 차 서로 기다리는 일이 없도록 출력은 별도 스레드에서 읽습니다.
+        self._stdout_reader = threading.Thread(target=self._read_stdout, daemon=True)
+        self._stderr_reader = threading.Thread(target=self._read_stderr, daemon=True)
+        self._stdout_reader.start()
+        self._stderr_reader.start()
+        self._input_closed = False
+
+    def _read_stdout(self) -> None:
+        for chunk in iter(lambda: self._process.stdout.read(STREAM_CHUNK_BYTES), b""):
+            self._output.extend(chunk)
+
+    def _read_stderr(self) -> None:
+        self._stderr = self._process.stderr.read()
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        입력 청크를 ffmpeg에 전달합니다.
+
+        Returns:
+            ffmpeg가 입력을 더 받을 수 있으면 True, 이미 필요한 만큼 디코딩하고 종료했으면 False.
+
+        Raises:
+            AudioTooLargeError: 누적 입력 크기가 `max_bytes`를 넘은 경우.
+        """
+        if self._input_closed:
+            return False
+        self.bytes_in += len(chunk)
+        if self.max_bytes is not None and self.bytes_in > self.max_bytes:
+            self.abort()
+            raise AudioTooLargeError(f"Upload exceeds the limit of {self.max_bytes} bytes.")
+        try:
+            self._process.stdin.write(chunk)
+            return True
+        except (OSError, ValueError):
+            # `-t` 길이에 도달했거나 실패해서 ffmpeg가 먼저 종료한 경우 (실패는 `finish()`에서 보고합니다)
+            self._input_closed = True
+            return False
+
+    def finish(self) -> np.ndarray:
+        """
+        입력을 닫고 디코딩이 끝날 때까지 기다립니다.
+
+        Returns:
+            `[-1, 1]` 범위의 모노 float32 파형.
+
+        Raises:
+            AudioDecodeError: ffmpeg가 실패했거나 디코딩된 샘플이 없는 경우.
+        """
+        if not self._input_closed:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+            self._input_closed = True
+        self._process.wait()
+        self._stdout_reader.join()
+        self._stderr_reader.join()
+
+        if not self._output and self._process.returncode != 0:
+            raise AudioDecodeError(f"Failed to decode audio: {self._stderr.decode(errors='replace').strip()}")
+        usable = len(self._output) - len(self._output) % 2
+        return np.frombuffer(bytes(self._output[:usable]), np.int16).astype(np.float32) / 32768.0
+
+    def abort(self) -> None:
+        """디코딩을 중단하고 ffmpeg 프로세스를 정리합니다."""
+        self._input_closed = True
+        self._process.kill()
+        self._process.wait()
+
+
+def decode_stream(
+    stream: BinaryIO,
+    sample_rate: int = WHISPER_SAMPLE_RATE,
+    max_bytes: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+) -> np.ndarray:
+    """
+    파일 객체를 청크 단위로 읽으며 ffmpeg로 디코딩해 float32 파형을 반환합니다.
+
+    Args:
+        stream: 읽기 가능한 바이너리 파일 객체 (예: `UploadFile.file`).
+        sample_rate: 출력 샘플링 레이트.
+        max_bytes: 허용하는 최대 입력 크기. 넘으면 `AudioTooLargeError`.
+        max_seconds: 디코딩할 최대 길이(초). 그 이후의 입력은 읽지 않습니다.
+
+    Returns:
+        모노 float32 파형.
+    """
+    decoder = StreamingDecoder(sample_rate=sample_rate, max_bytes=max_bytes, max_seconds=max_seconds)
+    try:
+        for chunk in iter(lambda: stream.read(STREAM_CHUNK_BYTES), b""):
+            if not decoder.feed(chunk):
+                break
+    except BaseException:
+        decoder.abort()
+        raise
+    return decoder.finish()
+
+
+@lru_cache(maxsize=32)
+def _lowpass_filter(up: int, down: int) -> np.ndarray:
+    """`resample_poly`의 기본 설계(카이저 창, beta=5)와 같은 저역 통과 필터. 레이트 쌍마다 한 번만 설계합니다."""
+    max_rate = max(up, down)
+    taps = firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0)).astype(np.float32)
+    taps.flags.writeable = False
+    return taps
+
+
+def resample(waveform: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """
+    다상(polyphase) 필터로 샘플링 레이트를 바꿉니다.
+
+    44.1kHz → 16kHz처럼 필터가 긴(수천 탭) 변환도 필터 설계는 처음 한 번만 하고,
+    이후에는 `upfirdn` 한 번으로 끝납니다.
+    """
+    if orig_sr == target_sr:
+        return waveform
+    g = math.gcd(orig_sr, target_sr)
+    up, down = target_sr // g, orig_sr // g
+    return resample_poly(waveform, up, down, window=_lowpass_filter(up, down)).astype(np.float32, copy=False)
+
+
+def _read_with_soundfile(path: str, max_seconds: Optional[float]):
+    with soundfile.SoundFile(path) as f:
+        frames = -1 if max_seconds is None else int(max_seconds * f.samplerate)
+        data = f.read(frames, dtype="float32", always_2d=True)
+        sample_rate = f.samplerate
+    waveform = data[:, 0] if data.shape[1] == 1 else data.mean(axis=1)
+    return np.ascontiguousarray(waveform, dtype=np.float32), sample_rate
+
+
+def _read_with_av(path: str, sample_rate: int, max_seconds: Optional[float]) -> np.ndarray:
+    """
+    PyAV(libav)로 프로세스 안에서 디코딩하고, libswresample로 `sample_rate` float32 모노 파형으로 변환합니다.
+
+    프레임마다 리샘플러를 부르면 호출 비용이 디코딩보다 커지므로, 원래 레이트로 끝까지 디코딩한 뒤
+    한 번에 변환합니다. 모노 변환은 libswresample의 다운믹스(채널 합 x 0.707) 대신 채널 평균으로 하고
+    [-1, 1]로 자르므로, ffmpeg 파이프 경로와 (s16 양자화 오차 안에서) 같은 파형을 만듭니다.
+    """
+    chunks, total, limit, orig_sr = [], 0, None, sample_rate
+    with av.open(path) as container:
+        # AAC/MP3/Vorbis 디코더는 평면(planar) float32를 내므로, 다른 형식일 때만 변환합니다.
+        to_planar = None
+        for frame in container.decode(audio=0):
+            if not chunks:
+                orig_sr = frame.sample_rate
+                limit = None if max_seconds is None else int(max_seconds * orig_sr)
+            if frame.format.name != "fltp":
+                to_planar = to_planar or av.AudioResampler(format="fltp")
+                frames = to_planar.resample(frame)
+            else:
+                frames = [frame]
+            for planar in frames:
+                planes = planar.to_ndarray()
+                chunks.append(planes[0] if len(planes) == 1 else planes.mean(axis=0))
+                total += len(chunks[-1])
+            if limit is not None and total >= limit:
+                break
+    if not chunks:
+        return np.empty(0, dtype=np.float32)
+    # `limit`를 넘겨 디코딩한 마지막 프레임은 리샘플링 필터의 끝부분에 쓰고, 변환한 뒤에 자릅니다.
+    waveform = np.concatenate(chunks)
+    if orig_sr != sample_rate:
+        mono = av.AudioFrame.from_ndarray(waveform[np.newaxis, :], format="fltp", layout="mono")
+        mono.sample_rate = orig_sr
+        resampler = av.AudioResampler(format="fltp", layout="mono", rate=sample_rate)
+        # 두 번째 호출(None)은 리샘플러에 남은 샘플을 비웁니다.
+        waveform = np.concatenate(
+            [f.to_ndarray()[0] for f in resampler.resample(mono) + resampler.resample(None)]
+        )
+    if max_seconds is not None:
+        waveform = waveform[: int(max_seconds * sample_rate)]
+    # ffmpeg 파이프(s16) 경로와 같은 [-1, 1] 범위로 맞춥니다.
+    return np.clip(waveform, -1.0, 1.0).astype(np.float32, copy=False)
+
+
+def decode_file(
+    path: Union[str, os.PathLike],
+    sample_rates: Sequence[int] = (WHISPER_SAMPLE_RATE,),
+    max_seconds: Optional[float] = None,
+) -> Dict[int, np.ndarray]:
+    """
+    오디오 파일을 한 번만 디코딩해, 요청한 샘플링 레이트마다의 모노 float32 파형을 만듭니다.
+
+    libsndfile(`soundfile`)이 읽을 수 있는 형식(WAV, FLAC, OGG, MP3 등)은 프로세스 안에서 바로 디코딩합니다.
+    그 밖의 형식(AAC/M4A 등)은 PyAV(`av`)가 설치되어 있으면 역시 프로세스 안에서 가장 높은 목표 레이트로
+    디코딩하고, 둘 다 읽지 못할 때만 ffmpeg 프로세스를 한 번 띄웁니다.
+    나머지 레이트는 그 한 번의 디코딩 결과를 `resample()`로 변환합니다.
+
+    Args:
+        path: 오디오 파일 경로.
+        sample_rates: 만들 샘플링 레이트 목록 (예: Whisper 16kHz, CLAP 48kHz).
+        max_seconds: 디코딩할 최대 길이(초).
+
+    Returns:
+        `{샘플링 레이트: 파형}` 딕셔너리.
+
+    Raises:
+        FileNotFoundError: 파일이 없는 경우.
+        AudioDecodeError: 두 방법 모두 디코딩하지 못한 경우.
+    """
+    path = os.fspath(path)
+    waveform = None
+    if soundfile is not None:
+        try:
+            waveform, orig_sr = _read_with_soundfile(path, max_seconds)
+        except RuntimeError:  # soundfile.LibsndfileError: 지원하지 않는 형식
+            waveform = None
+    if waveform is None and av is not None:
+        orig_sr = max(sample_rates)
+        try:
+            waveform = _read_with_av(path, orig_sr, max_seconds)
+        except (av.error.FFmpegError, IndexError):  # 읽을 수 없는 파일 또는 오디오 스트림 없음
+            waveform = None
+    if waveform is None:
+        orig_sr = max(sample_rates)
+        with open(path, "rb") as f:
+            waveform = decode_stream(f, sample_rate=orig_sr, max_seconds=max_seconds)
+    return {rate: resample(waveform, orig_sr, rate) for rate in sample_rates}
+
+
+def load_audio(path: Union[str, os.PathLike], sample_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """`whisper.load_audio` 대신 쓰는 단일 레이트 디코딩. (`decode_file()`과 같은 순서로 프로세스 안 디코딩을 먼저 시도)"""
+    return decode_file(path, (sample_rate,))[sample_rate]
+
+
+class DecodeResult(NamedTuple):
+    path: str
+    waveforms: Optional[Dict[int, np.ndarray]]
+    error: Optional[str]
+    seconds: float
+
+
+def _decode_task(path: str, sample_rates: Sequence[int], max_seconds: Optional[float]) -> DecodeResult:
+    start = time.perf_counter()
+    try:
+        waveforms = decode_file(path, sample_rates, max_seconds)
+        return DecodeResult(path, waveforms, None, time.perf_counter() - start)
+    except Exception as e:
+        return DecodeResult(path, None, str(e), time.perf_counter() - start)
+
+
+class DecoderPool:
+    """
+    여러 파일을 상주 워커 프로세스에서 디코딩하는 풀.
+
+    워커 프로세스는 처음에 한 번만 뜨고 모든 파일에 재사용되며, 각 워커는 `decode_file()`로
+    파일을 프로세스 안에서 디코딩합니다. `imap_unordered()`는 동시에 최대 `max_in_flight`개만
+    제출하므로, 소비자(모델)가 느리면 디코딩도 그만큼 기다려 라이브러리 전체가 메모리에 쌓이지 않습니다.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        sample_rates: Sequence[int] = (WHISPER_SAMPLE_RATE,),
+        max_in_flight: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.sample_rates = tuple(sample_rates)
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        self.max_seconds = max_seconds
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def submit(self, path: str) -> "Future[DecodeResult]":
+        return self._executor.submit(_decode_task, path, self.sample_rates, self.max_seconds)
+
+    def imap_unordered(self, paths: Iterable[str]) -> Iterator[DecodeResult]:
+        """끝난 순서대로 결과를 돌려줍니다. 실패한 파일은 `waveforms`가 None이고 `error`에 사유가 담깁니다."""
+        files = iter(paths)
+        pending = set()
+        for path in files:
+            pending.add(self.submit(path))
+            if len(pending) >= self.max_in_flight:
+                break
+
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield future.result()
+                next_path = next(files, None)
+                if next_path is not None:
+                    pending.add(self.submit(next_path))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "DecoderPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
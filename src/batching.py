@@ -0,0 +1,185 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+import torch
+import whisper
+
+from src.audio_decode import load_audio
+from src.decoding_profile import DecodingProfile
+
+
+class MicroBatcher:
+    """
+    여러 스레드에서 동시에 들어온 요청을 짧은 시간 창 동안 모아 한 번에 처리합니다.
+
+    첫 요청이 도착하면 최대 `max_wait_ms` 동안, 또는 `max_batch_size`개가 찰 때까지
+    다음 요청을 기다린 뒤 `process_batch(items)`를 한 번 호출합니다.
+    트래픽이 없을 때 혼자 온 요청은 `max_wait_ms`만큼만 늦어집니다.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+        name: str = "micro-batcher",
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._batches = 0
+        self._items = 0
+        self._worker = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any) -> Future:
+        """항목을 대기열에 넣고, 배치 처리 결과를 받을 Future를 반환합니다."""
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item: Any) -> Any:
+        """항목을 제출하고 결과가 나올 때까지 기다립니다."""
+        return self.submit(item).result()
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.process_batch(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"Batch returned {len(results)} results for {len(items)} items.")
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self._batches += 1
+            self._items += len(items)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+            "pending": self._queue.qsize(),
+        }
+
+
+def transcribe_batch(
+    model: whisper.Whisper,
+    audios: List[Union[str, np.ndarray]],
+    max_segments: int = 16,
+    decoding: Optional[DecodingProfile] = None,
+    **decode_options: Any,
+) -> List[str]:
+    """
+    여러 오디오를 Whisper 디코더 한 번(또는 몇 번)의 배치 호출로 텍스트로 변환합니다.
+
+    각 오디오는 30초 단위 구간으로 나뉘고(마지막 구간은 패딩), 모든 요청의 구간이
+    하나의 log-mel 배치로 쌓여 `whisper.decode`에 전달됩니다. 구간 결과는 요청별로 다시 이어 붙입니다.
+    `model.transcribe`와 달리 구간 경계를 타임스탬프로 조정하지 않으므로, 분위기 파악용 텍스트에 적합합니다.
+
+    Args:
+        model: 로드된 Whisper 모델.
+        audios: 오디오 파일 경로 또는 16kHz float32 파형의 리스트.
+        max_segments: 한 번의 디코더 호출에 넣을 최대 구간 수 (메모리 상한).
+        decoding: 언어 고정, 창당 토큰 상한, 오디오당 최대 구간 수를 정하는 디코딩 프로필.
+        **decode_options: `whisper.DecodingOptions`에 전달할 옵션 (예: language).
+
+    Returns:
+        입력 순서대로의 변환 텍스트 리스트.
+    """
+    mels, owners = [], []
+    for i, audio in enumerate(audios):
+        if isinstance(audio, str):
+            audio = load_audio(audio)
+        if decoding is not None:
+            audio = decoding.clip(audio)
+        starts = range(0, max(len(audio), 1), whisper.audio.N_SAMPLES)
+        for start in starts:
+            segment = whisper.pad_or_trim(audio[start:start + whisper.audio.N_SAMPLES])
+            mels.append(whisper.log_mel_spectrogram(segment, n_mels=model.dims.n_mels))
+            owners.append(i)
+
+    if decoding is not None:
+        decode_options = {**decoding.decoding_options(), **decode_options}
+    options = whisper.DecodingOptions(
+        fp16=torch.cuda.is_available(),
+        without_timestamps=True,
+        **decode_options,
+    )
+
+    texts: List[List[str]] = [[] for _ in audios]
+    for start in range(0, len(mels), max_segments):
+        mel_batch = torch.stack(mels[start:start + max_segments]).to(model.device)
+        with torch.no_grad():
+            results = whisper.decode(model, mel_batch, options)
+        for owner, result in zip(owners[start:start + max_segments], results):
+            if result.no_speech_prob < 0.6 or result.avg_logprob > -1.0:
+                texts[owner].append(result.text.strip())
+
+    return [" ".join(t for t in parts if t) for parts in texts]
+
+
+class TranscriptionBatcher(MicroBatcher):
+    """
+    `transcribe_batch`를 사용해 동시에 들어온 Whisper 변환 요청을 배치로 묶는 스케줄러.
+
+    요청마다 디코딩 프로필이 다를 수 있으므로, 한 번에 모인 요청을 프로필별로 나눠 디코딩합니다.
+    """
+
+    def __init__(
+        self,
+        model: whisper.Whisper,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+        decode_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.model = model
+        self.decode_options = decode_options or {}
+        super().__init__(
+            self._transcribe_groups,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            name="whisper-batcher",
+        )
+
+    def submit(self, audio: Union[str, np.ndarray], decoding: Optional[DecodingProfile] = None) -> Future:
+        return super().submit((audio, decoding))
+
+    def __call__(self, audio: Union[str, np.ndarray], decoding: Optional[DecodingProfile] = None) -> str:
+        return self.submit(audio, decoding).result()
+
+    def _transcribe_groups(self, items: List[tuple]) -> List[str]:
+        groups: Dict[Optional[DecodingProfile], List[int]] = {}
+        for i, (_, decoding) in enumerate(items):
+            groups.setdefault(decoding, []).append(i)
+        texts = [""] * len(items)
+        for decoding, indices in groups.items():
+            results = transcribe_batch(
+                self.model, [items[i][0] for i in indices], decoding=decoding, **self.decode_options
+            )
+            for i, text in zip(indices, results):
+                texts[i] = text
+        return texts
@@ -0,0 +1,252 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+# 값이 없음을 나타내는 표식 (None도 정상적인 캐시 값이 될 수 있으므로 따로 둡니다)
+MISSING = object()
+
+
+def _estimate_size(value: Any) -> int:
+    """캐시 값의 대략적인 메모리 크기(바이트). 메모리 상한 계산에만 쓰이므로 정확할 필요는 없습니다."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")) + 64
+
+
+class LRUCache:
+    """
+    항목 수와 메모리 크기 상한, TTL을 가진 스레드 안전 LRU 캐시.
+
+    상한을 넘으면 가장 오래 사용되지 않은 항목부터 제거하고,
+    만료된 항목은 조회 시점에 제거합니다.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, size = entry
+            if expires_at and expires_at < time.time():
+                del self._data[key]
+                self._bytes -= size
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        size = _estimate_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (value, time.time() + ttl if ttl else 0.0, size)
+            self._bytes += size
+            while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+class DiskCache:
+    """
+    SQLite 파일 하나에 JSON 값을 저장하는 캐시. 같은 파일을 여는 모든 uvicorn 워커가 결과를 공유합니다.
+
+    WAL 모드를 사용하므로 여러 프로세스가 동시에 읽고 쓸 수 있습니다. 만료 항목은 일정 횟수의
+    쓰기마다 한 번씩 정리합니다.
+    """
+
+    _PRUNE_EVERY = 256
+
+    def __init__(self, path: Union[str, Path], ttl_seconds: Optional[float] = None):
+        self.path = str(path)
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] and row[1] < time.time()):
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), time.time() + ttl if ttl else 0.0),
+        )
+        self._writes += 1
+        if self._writes % self._PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at > 0 AND expires_at < ?", (time.time(),))
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class TieredCache:
+    """프로세스 메모리 LRU 앞에 두고, 선택적으로 워커 간 공유 디스크 캐시를 뒤에 두는 2단 캐시."""
+
+    def __init__(self, memory: LRUCache, disk: Optional[DiskCache] = None, namespace: str = ""):
+        self.memory = memory
+        self.disk = disk
+        self.namespace = namespace
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        value = self.memory.get(key)
+        if value is not MISSING:
+            return value
+        if self.disk is not None:
+            value = self.disk.get(f"{self.namespace}:{key}")
+            if value is not MISSING:
+                self.memory.set(key, value)
+                return value
+        return default
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(f"{self.namespace}:{key}", value)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+
+def audio_fingerprint(audio: Union[str, np.ndarray]) -> str:
+    """디코딩된 파형(또는 파일 내용)의 SHA-256. 같은 클립을 다시 보내면 같은 값이 나옵니다."""
+    digest = hashlib.sha256()
+    if isinstance(audio, np.ndarray):
+        digest.update(str(audio.dtype).encode())
+        digest.update(np.ascontiguousarray(audio).tobytes())
+    else:
+        with open(audio, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def normalize_transcript(text: str) -> str:
+    """대소문자, 문장 부호, 공백 차이를 무시하도록 변환 텍스트를 정규화합니다."""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+class ResultCache:
+    """
+    추천 파이프라인의 2단계 결과 캐시.
+
+    - 변환 텍스트: 디코딩된 오디오의 해시 → Whisper 결과
+    - 추천 결과: (정규화된 텍스트, DB 버전, top_k) → 추천 목록
+
+    DB 버전이 키에 포함되므로, 새 DB로 교체되면 이전 추천 결과는 자연스럽게 사용되지 않습니다.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600,
+        disk_path: Optional[Union[str, Path]] = None,
+    ):
+        disk = DiskCache(disk_path, ttl_seconds=ttl_seconds) if disk_path else None
+        # 추천 결과는 작으므로 메모리의 대부분은 변환 텍스트 캐시에 배정합니다.
+        self.transcripts = TieredCache(
+            LRUCache(max_entries=100_000, max_bytes=max_bytes // 2, ttl_seconds=ttl_seconds), disk, "transcript"
+        )
+        self.recommendations = TieredCache(
+            LRUCache(max_entries=100_000, max_bytes=max_bytes // 2, ttl_seconds=ttl_seconds), disk, "recommendation"
+        )
+
+    @staticmethod
+    def recommendation_key(
+        text: str, db_version: str, top_k: int, options: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """`options`(필터, 제외 목록 등 요청별 검색 옵션)가 있으면 키에 포함합니다."""
+        key = f"{db_version}\n{top_k}\n{normalize_transcript(text)}"
+        if options:
+            key += "\n" + json.dumps(options, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "transcripts": self.transcripts.stats(),
+            "recommendations": self.recommendations.stats(),
+        }
@@ -0,0 +1,103 @@
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import torch
+import whisper
+from torch import nn
+
+logger = logging.getLogger(__name__)
+
+QUANTIZE_MODES = ("none", "int8")
+
+
+def _to_plain_linear(module: nn.Module) -> None:
+    """
+    Whisper의 `Linear` 서브클래스를 `nn.Linear`로 바꿉니다 (가중치는 그대로 공유).
+
+    동적 양자화는 `nn.Linear` 타입만 정확히 매칭하므로, 그대로는 Whisper의 선형 계층이 하나도
+    양자화되지 않습니다. Whisper의 `Linear`는 입력 dtype으로 가중치를 캐스팅할 뿐이라 fp32 CPU에서는 동작이 같습니다.
+    """
+    for name, child in module.named_children():
+        if isinstance(child, nn.Linear) and type(child) is not nn.Linear:
+            plain = nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+            plain.weight = child.weight
+            plain.bias = child.bias
+            setattr(module, name, plain)
+        else:
+            _to_plain_linear(child)
+
+
+class CPUInferenceProfile:
+    """
+    CPU 전용 노드에서 Whisper 추론 속도를 높이기 위한 설정 묶음.
+
+    - `quantize="int8"`: 모든 선형 계층(어텐션 q/k/v/out, MLP)을 동적 int8 양자화합니다.
+      가중치는 int8로 저장되고 활성값은 호출 시점에 양자화되므로, 보정 데이터가 필요 없습니다.
+    - `intra_op_threads` / `inter_op_threads`: 프로세스(워커)당 torch 스레드 수.
+      워커 여러 개가 한 노드를 나눠 쓸 때 코어 수를 넘겨 스레드가 경쟁하지 않도록 맞춥니다.
+    - `compile=True`: 인코더를 `torch.compile`로 컴파일합니다. 입력이 항상 30초 log-mel로 고정 크기라
+      재컴파일이 일어나지 않습니다. 컴파일러가 없는 환경에서는 경고 후 eager로 돌아갑니다.
+    """
+
+    def __init__(
+        self,
+        quantize: str = "none",
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None,
+        compile: bool = False,
+    ):
+        if quantize not in QUANTIZE_MODES:
+            raise ValueError(f"Unknown quantization mode: {quantize} (expected one of {QUANTIZE_MODES})")
+        self.quantize = quantize
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.compile = compile
+
+    @property
+    def key(self) -> Tuple[str, bool]:
+        """모델 가중치에 영향을 주는 설정. 모델 레지스트리의 캐시 키에 쓰입니다."""
+        return self.quantize, self.compile
+
+    def apply_threads(self) -> None:
+        """
+        현재 프로세스의 torch 스레드 수를 설정합니다. 워커 프로세스마다(fork 이후) 호출해야 합니다.
+
+        inter-op 스레드 수는 병렬 작업이 한 번이라도 실행된 뒤에는 바꿀 수 없으므로, 그 경우 경고만 출력합니다.
+        """
+        if self.intra_op_threads:
+            torch.set_num_threads(self.intra_op_threads)
+        if self.inter_op_threads:
+            try:
+                torch.set_num_interop_threads(self.inter_op_threads)
+            except RuntimeError as e:
+                logger.warning("inter-op 스레드 수를 바꾸지 못했습니다 - %s", e)
+
+    def optimize(self, model: whisper.Whisper) -> whisper.Whisper:
+        """로드된 CPU Whisper 모델에 양자화/컴파일을 적용해 반환합니다. (GPU 모델은 그대로 반환)"""
+        if model.device.type != "cpu":
+            return model
+
+        if self.quantize == "int8":
+            _to_plain_linear(model)
+            model = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+        if self.compile:
+            eager_encoder = model.encoder
+            try:
+                model.encoder = torch.compile(eager_encoder)
+                # 컴파일은 첫 호출 때 일어나므로, 여기서 한 번 실행해 실패를 미리 확인합니다.
+                mel = torch.zeros(1, model.dims.n_mels, whisper.audio.N_FRAMES)
+                with torch.no_grad():
+                    model.encoder(mel)
+            except Exception as e:
+                logger.warning("torch.compile을 사용할 수 없어 eager 인코더를 사용합니다 - %s", e)
+                model.encoder = eager_encoder
+        return model
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "quantize": self.quantize,
+            "intra_op_threads": self.intra_op_threads,
+            "inter_op_threads": self.inter_op_threads,
+            "compile": self.compile,
+        }
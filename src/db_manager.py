@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from src.ann_index import IVF_INDEX_FILE_NAME, IVFIndex
+from src.embedding_db import (
+    CURRENT_FILE_NAME,
+    METADATA_FILE_NAME,
+    VERSIONS_DIR_NAME,
+    EmbeddingDatabase,
+    load_embedding_db,
+)
+
+logger = logging.getLogger(__name__)
+
+# 버전 관리되지 않는 DB의 식별값 접두사 (뒤에 수정 시각이 붙습니다)
+MTIME_MARKER_PREFIX = "mtime:"
+
+
+class EmbeddingDBSnapshot:
+    """한 번 로드된 임베딩 DB와 그 로드 정보. 만들어진 뒤에는 변경되지 않습니다."""
+
+    def __init__(self, db: EmbeddingDatabase, version: str, marker: str, loaded_at: float, load_seconds: float):
+        self.db = db
+        self.version = version
+        # 로드 시점의 디스크 식별값 (감시 스레드가 변경 여부를 판단할 때 사용)
+        self.marker = marker
+        self.loaded_at = loaded_at
+        self.load_seconds = load_seconds
+
+
+class EmbeddingDBManager:
+    """
+    서버가 사용하는 임베딩 DB(와 ANN 인덱스)를 보관하고, 재시작 없이 새 버전으로 교체합니다.
+
+    새 DB는 백그라운드 스레드에서 완전히 로드된 뒤 `_snapshot` 참조 하나를 바꾸는 것으로
+    교체되므로, 요청은 항상 이전 스냅샷이나 새 스냅샷 중 하나만 보게 됩니다.
+    요청 처리 중에는 `current`를 한 번만 읽어 같은 스냅샷을 끝까지 사용해야 합니다.
+    """
+
+    def __init__(self, db_path: Union[str, Path], ann_index: str = "none", nprobe: Optional[int] = None):
+        if ann_index not in ("none", "ivf"):
+            raise ValueError(f"Unknown ANN_INDEX: {ann_index}")
+        self.db_path = Path(db_path)
+        self.ann_index = ann_index
+        self.nprobe = nprobe
+
+        self._snapshot: Optional[EmbeddingDBSnapshot] = None
+        self._reload_lock = threading.Lock()
+        self._last_error: Optional[str] = None
+        # 로드에 실패한 디스크 버전. 감시 스레드는 이 버전을 다시 시도하지 않습니다.
+        self._failed_marker: Optional[str] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watcher = threading.Event()
+
+    @property
+    def current(self) -> EmbeddingDBSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("Embedding database has not been loaded yet.")
+        return snapshot
+
+    def _version_marker(self) -> str:
+        """디스크 상의 활성 DB를 식별하는 값. 버전 저장소는 버전 이름, 그 외에는 수정 시각을 사용합니다."""
+        current_file = self.db_path / CURRENT_FILE_NAME
+        if current_file.is_file():
+            return current_file.read_text(encoding="utf-8").strip()
+        marker_file = self.db_path / METADATA_FILE_NAME if self.db_path.is_dir() else self.db_path
+        return f"{MTIME_MARKER_PREFIX}{marker_file.stat().st_mtime_ns}"
+
+    def _load_snapshot(self, marker: str) -> EmbeddingDBSnapshot:
+        start = time.perf_counter()
+        if marker.startswith(MTIME_MARKER_PREFIX):
+            db = load_embedding_db(self.db_path)
+        else:
+            # `CURRENT`를 다시 읽지 않고 marker의 버전 디렉토리를 직접 엽니다.
+            # (그 사이 새 버전이 공개되어도 스냅샷의 marker와 DB가 같은 버전을 가리킵니다.)
+            db = EmbeddingDatabase.open(self.db_path / VERSIONS_DIR_NAME / marker)
+        if self.ann_index == "ivf":
+            if db.store_dir is None:
+                raise ValueError("ANN_INDEX=ivf requires an embedding store directory, not a .pkl file.")
+            if (db.store_dir / IVF_INDEX_FILE_NAME).is_file():
+                db.attach_index(IVFIndex.load(db.store_dir, nprobe=self.nprobe))
+            else:
+                # 인덱스 없이 공개된 버전도 서비스는 계속합니다. (`build_embedding_db.py --ann-index`로 빌드하면 함께 생성됩니다.)
+                logger.warning("버전 %s에 IVF 인덱스가 없어 전수 검색을 사용합니다.", db.version or marker)
+        return EmbeddingDBSnapshot(db, db.version or marker, marker, time.time(), time.perf_counter() - start)
+
+    def load(self) -> EmbeddingDBSnapshot:
+        """DB를 동기적으로 로드하고 교체합니다. 서버 시작 시와 수동 재로드에 사용합니다."""
+        with self._reload_lock:
+            return self._load_locked()
+
+    def _load_locked(self) -> EmbeddingDBSnapshot:
+        """`_reload_lock`을 잡은 상태에서 활성 버전을 로드하고 교체합니다."""
+        marker = None
+        try:
+            marker = self._version_marker()
+            snapshot = self._load_snapshot(marker)
+        except Exception as e:
+            self._last_error = str(e)
+            self._failed_marker = marker
+            raise
+        self._snapshot = snapshot
+        self._last_error = None
+        self._failed_marker = None
+        return snapshot
+
+    def reload_in_background(self) -> bool:
+        """
+        백그라운드 스레드에서 DB를 다시 로드합니다.
+
+        Returns:
+            재로드를 시작했으면 True, 이미 다른 재로드가 진행 중이면 False.
+        """
+        # 확인과 잠금을 한 번에 해서, 동시에 부른 두 호출이 모두 재로드를 시작하지 않도록 합니다.
+        # 잠금은 재로드 스레드가 끝날 때 풉니다.
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+
+        def _reload():
+            try:
+                snapshot = self._load_locked()
+                logger.info(
+                    "임베딩 DB를 교체했습니다. (버전 %s, %d개, %.2fs)", snapshot.version, len(snapshot.db), snapshot.load_seconds
+                )
+            except Exception as e:
+                logger.error("임베딩 DB 재로드에 실패했습니다. 이전 버전을 계속 사용합니다 - %s", e)
+            finally:
+                self._reload_lock.release()
+
+        try:
+            threading.Thread(target=_reload, name="embedding-db-reload", daemon=True).start()
+        except BaseException:
+            self._reload_lock.release()
+            raise
+        return True
+
+    def start_watcher(self, interval_seconds: float) -> None:
+        """
+        `interval_seconds`마다 디스크의 활성 버전을 확인하고, 바뀌었으면 재로드합니다.
+
+        로드에 실패한 버전은 다시 시도하지 않고, 다음 버전이 공개되거나 수동으로 재로드할 때까지 기다립니다.
+        """
+        if self._watcher is not None:
+            return
+        self._stop_watcher.clear()
+
+        def _watch():
+            while not self._stop_watcher.wait(interval_seconds):
+                try:
+                    marker = self._version_marker()
+                except OSError:
+                    continue
+                snapshot = self._snapshot
+                if snapshot is not None and marker != snapshot.marker and marker != self._failed_marker:
+                    self.reload_in_background()
+
+        self._watcher = threading.Thread(target=_watch, name="embedding-db-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop_watcher.set()
+        self._watcher = None
+
+    def info(self) -> Dict[str, Any]:
+        """활성 DB의 버전, 행 수, 로드 시각/소요 시간과 재로드 상태를 반환합니다."""
+        snapshot = self._snapshot
+        return {
+            "db_path": str(self.db_path),
+            "version": snapshot.version if snapshot else None,
+            "rows": len(snapshot.db) if snapshot else 0,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "load_seconds": snapshot.load_seconds if snapshot else None,
+            "ann_index": self.ann_index,
+            "reloading": self._reload_lock.locked(),
+            "last_error": self._last_error,
+        }
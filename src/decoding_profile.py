@@ -0,0 +1,127 @@
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import whisper
+from whisper.tokenizer import LANGUAGES
+
+# Whisper 디코더가 한 30초 창에서 생성할 수 있는 최대 토큰 수 (n_text_ctx // 2)
+MAX_SAMPLE_LEN = 224
+
+
+class DecodingProfile:
+    """
+    Whisper 디코딩 방식 설정 묶음. 기본값은 `model.transcribe`의 기본 동작과 같습니다.
+
+    - `language`: 고정 언어 코드 (예: "ko"). 생략하면 클립마다 첫 30초 창으로 언어를 감지하는데,
+      감지에 인코더 출력과 디코더 한 스텝이 더 듭니다.
+    - `greedy=True`: 온도 0 탐욕 디코딩만 합니다. 압축률/평균 로그확률 기준에 걸린 창을
+      온도를 올려 다시 디코딩하는 재시도(최대 5회)를 하지 않습니다.
+    - `without_timestamps=True`: 타임스탬프 토큰을 예측하지 않아 창마다 생성하는 토큰 수가 줄어듭니다.
+      창 경계는 30초 단위로 고정됩니다.
+    - `max_tokens`: 30초 창마다 생성할 최대 토큰 수. 분위기 파악에는 앞부분 문장이면 충분합니다.
+    - `max_segments`: 변환할 최대 30초 창 수. 그 뒤의 오디오는 디코더에 넣지 않습니다.
+    """
+
+    def __init__(
+        self,
+        language: Optional[str] = None,
+        greedy: bool = False,
+        without_timestamps: bool = False,
+        max_tokens: Optional[int] = None,
+        max_segments: Optional[int] = None,
+    ):
+        if language is not None and language not in LANGUAGES:
+            raise ValueError(f"Unknown language code: {language}")
+        if max_tokens is not None and not 1 <= max_tokens <= MAX_SAMPLE_LEN:
+            raise ValueError(f"max_tokens must be between 1 and {MAX_SAMPLE_LEN}")
+        if max_segments is not None and max_segments < 1:
+            raise ValueError("max_segments must be at least 1")
+        self.language = language
+        self.greedy = greedy
+        self.without_timestamps = without_timestamps
+        self.max_tokens = max_tokens
+        self.max_segments = max_segments
+
+    @property
+    def key(self) -> Tuple[Any, ...]:
+        """변환 결과에 영향을 주는 설정. 변환 결과 캐시 키와 배치 묶음 기준에 쓰입니다."""
+        return self.language, self.greedy, self.without_timestamps, self.max_tokens, self.max_segments
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, DecodingProfile) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"DecodingProfile({', '.join(f'{k}={v!r}' for k, v in self.as_dict().items())})"
+
+    def replace(self, **overrides: Any) -> "DecodingProfile":
+        """`overrides` 중 None이 아닌 값만 바꾼 새 프로필을 반환합니다."""
+        values = self.as_dict()
+        values.update({name: value for name, value in overrides.items() if value is not None})
+        return DecodingProfile(**values)
+
+    def clip(self, audio: np.ndarray) -> np.ndarray:
+        """`max_segments`개의 30초 창을 넘는 뒷부분을 잘라냅니다. (복사 없이 앞부분 뷰를 반환)"""
+        if self.max_segments is None:
+            return audio
+        return audio[:self.max_segments * whisper.audio.N_SAMPLES]
+
+    def transcribe_options(self) -> Dict[str, Any]:
+        """`model.transcribe`에 넘길 키워드 인자."""
+        options: Dict[str, Any] = {}
+        if self.language is not None:
+            options["language"] = self.language
+        if self.greedy:
+            # 온도가 하나뿐이면 기준에 걸려도 다시 디코딩할 온도가 없습니다.
+            options["temperature"] = 0.0
+        if self.without_timestamps:
+            options["without_timestamps"] = True
+        if self.max_tokens is not None:
+            options["sample_len"] = self.max_tokens
+        return options
+
+    def decoding_options(self) -> Dict[str, Any]:
+        """
+        `whisper.DecodingOptions`에 넘길 키워드 인자 (`transcribe_batch`용).
+
+        배치 디코딩은 원래 온도 0, 타임스탬프 없이 한 번만 디코딩하므로 언어와 토큰 상한만 전달합니다.
+        """
+        options: Dict[str, Any] = {}
+        if self.language is not None:
+            options["language"] = self.language
+        if self.max_tokens is not None:
+            options["sample_len"] = self.max_tokens
+        return options
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "language": self.language,
+            "greedy": self.greedy,
+            "without_timestamps": self.without_timestamps,
+            "max_tokens": self.max_tokens,
+            "max_segments": self.max_segments,
+        }
+
+
+# 이름으로 고를 수 있는 프리셋
+PROFILES: Dict[str, DecodingProfile] = {
+    # `model.transcribe` 기본 동작 (언어 감지, 온도 재시도, 타임스탬프, 전체 길이)
+    "default": DecodingProfile(),
+    # 한국어 고정, 나머지는 기본 동작
+    "korean": DecodingProfile(language="ko"),
+    # 한국어 고정 + 탐욕 디코딩 + 타임스탬프 없음 + 첫 30초 창의 앞 128토큰만
+    "fast": DecodingProfile(language="ko", greedy=True, without_timestamps=True, max_tokens=128, max_segments=1),
+}
+
+
+def get_profile(name: str) -> DecodingProfile:
+    """
+    Raises:
+        ValueError: 알 수 없는 프리셋 이름인 경우.
+    """
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown decoding profile: {name} (expected one of {tuple(PROFILES)})") from None
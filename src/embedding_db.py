@@ -0,0 +1,435 @@
+import json
+import os
+import pickle
+import shutil
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.ann_index import IVFIndex
+from src.score_calibration import ScoreCalibration
+from src.tag_embeddings import TagEmbeddings
+
+# 임베딩 저장소(디렉토리) 안의 파일 이름
+MATRIX_FILE_NAME = "embeddings.npy"
+METADATA_FILE_NAME = "metadata.json"
+MANIFEST_FILE_NAME = "manifest.json"
+STORE_FORMAT_VERSION = 1
+
+# 버전 관리되는 저장소 루트의 구조: `<root>/CURRENT`(활성 버전 이름) + `<root>/versions/<버전>/`
+CURRENT_FILE_NAME = "CURRENT"
+VERSIONS_DIR_NAME = "versions"
+
+# float16 행렬은 BLAS를 타지 못하므로, 이 행 수만큼씩 float32로 올려 계산합니다.
+_SEARCH_BLOCK_ROWS = 65536
+
+
+def _to_numpy(vector: Any) -> np.ndarray:
+    """torch.Tensor 또는 배열형 객체를 float32 numpy 배열로 변환합니다."""
+    if hasattr(vector, "detach"):
+        vector = vector.detach().cpu().numpy()
+    return np.asarray(vector, dtype=np.float32)
+
+
+def _normalize_query(query: Any) -> np.ndarray:
+    query = _to_numpy(query).reshape(-1)
+    return query / max(float(np.linalg.norm(query)), 1e-12)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_order(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """`scores`에서 값이 큰 `top_k`개의 위치를 내림차순으로 반환합니다. (`argpartition` 후 후보만 정렬)"""
+    k = min(top_k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class EmbeddingDatabase:
+    """
+    음악 임베딩 DB를 검색에 바로 쓸 수 있는 형태로 보관합니다.
+
+    모든 임베딩은 하나의 `[N, D]` 행렬에 미리 L2 정규화된 상태로 저장되어 있으므로,
+    코사인 유사도 검색은 행렬-벡터 곱 한 번과 `argpartition` 한 번으로 끝납니다.
+    `open()`으로 연 DB의 행렬은 `np.memmap`이라서, 같은 파일을 연 여러 워커가
+    OS 페이지 캐시를 공유하고 시작 시점에 전체 데이터를 읽지 않습니다.
+    `attach_index()`로 근사 최근접 이웃 인덱스를 붙이면 `search()`가 그 인덱스를 사용합니다.
+    같은 모델로 계산한 태그 어휘 임베딩(`tag_embeddings`)과 점수 보정 분포(`calibration`)가 있으면
+    DB와 함께 저장/로드됩니다.
+    """
+
+    paths: List[str]
+    matrix: np.ndarray
+    index: Optional[IVFIndex]
+    tag_embeddings: Optional[TagEmbeddings]
+    calibration: Optional[ScoreCalibration]
+    store_dir: Optional[Path]
+    version: Optional[str]
+
+    def __init__(self, paths: List[str], matrix: np.ndarray):
+        if matrix.ndim != 2 or matrix.shape[0] != len(paths):
+            raise ValueError(
+                f"Embedding matrix shape {tuple(matrix.shape)} does not match {len(paths)} paths."
+            )
+        self.paths = paths
+        self.matrix = matrix
+        self.index = None
+        self.tag_embeddings = None
+        self.calibration = None
+        self._rows_by_name: Optional[Dict[str, int]] = None
+        # 디스크에서 연 DB일 때만 채워집니다.
+        self.store_dir = None
+        self.version = None
+
+    @classmethod
+    def from_pairs(cls, pairs: Sequence[Tuple[str, Any]]) -> "EmbeddingDatabase":
+        """
+        `(경로, 텐서)` 리스트(기존 `.pkl` 형식)로부터 메모리 상의 DB를 생성합니다.
+
+        Args:
+            pairs: `(절대경로, torch.Tensor[1, D])` 튜플의 시퀀스.
+
+        Returns:
+            정규화된 float32 행렬을 가진 EmbeddingDatabase.
+        """
+        if len(pairs) == 0:
+            return cls([], np.empty((0, 0), dtype=np.float32))
+
+        paths = [path for path, _ in pairs]
+        matrix = np.concatenate([_to_numpy(emb).reshape(1, -1) for _, emb in pairs], axis=0)
+        return cls.from_matrix(paths, matrix)
+
+    @classmethod
+    def from_matrix(cls, paths: List[str], matrix: Any) -> "EmbeddingDatabase":
+        """
+        경로 목록과 정규화되지 않은 `[N, D]` 임베딩 행렬로부터 메모리 상의 DB를 생성합니다.
+
+        Args:
+            paths: 행 순서대로의 파일 경로 목록.
+            matrix: `[N, D]` 임베딩 행렬 (numpy 배열 또는 torch.Tensor).
+
+        Returns:
+            정규화된 float32 행렬을 가진 EmbeddingDatabase.
+        """
+        return cls(list(paths), _normalize_rows(_to_numpy(matrix)))
+
+    @classmethod
+    def open(cls, store_dir: Union[str, Path]) -> "EmbeddingDatabase":
+        """
+        `save()`로 저장한 임베딩 저장소를 메모리 매핑으로 엽니다.
+
+        Args:
+            store_dir: `embeddings.npy`와 `metadata.json`이 들어 있는 디렉토리.
+
+        Returns:
+            행렬이 `np.memmap`(읽기 전용)인 EmbeddingDatabase.
+        """
+        store_dir = Path(store_dir)
+        with open(store_dir / METADATA_FILE_NAME, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+
+        if metadata.get("format_version") != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported embedding store format: {metadata.get('format_version')}")
+
+        matrix = np.load(store_dir / MATRIX_FILE_NAME, mmap_mode="r")
+        db = cls(metadata["paths"], matrix)
+        db.store_dir = store_dir
+        db.version = metadata.get("version")
+        db.tag_embeddings = TagEmbeddings.load(store_dir)
+        db.calibration = ScoreCalibration.load(store_dir)
+        return db
+
+    def save(self, store_dir: Union[str, Path], dtype: str = "float16", version: Optional[str] = None) -> None:
+        """
+        DB를 열 방향으로 분리된 저장소 형식으로 저장합니다.
+
+        - `embeddings.npy`: 정규화된 `[N, D]` 행렬 (float16 또는 float32)
+        - `metadata.json`: 형식 버전, 행 수, 차원, dtype, 행 순서대로의 파일 경로 목록
+        - `tag_embeddings.npz`: 태그 어휘 임베딩 (있을 때만)
+        - `score_calibration.json`: 텍스트-곡 유사도 분포 (있을 때만)
+        - `ivf_index.npz`: 붙어 있는 IVF 근사 인덱스 (있을 때만)
+
+        각 파일은 임시 파일에 먼저 쓴 뒤 `os.replace`로 교체하며, 메타데이터를 마지막에 씁니다.
+
+        Args:
+            store_dir: 저장할 디렉토리. 없으면 생성합니다.
+            dtype: 행렬 저장 dtype ('float16' 또는 'float32').
+            version: 메타데이터에 기록할 DB 버전 이름.
+        """
+        if dtype not in ("float16", "float32"):
+            raise ValueError(f"Unsupported dtype: {dtype}")
+
+        store_dir = Path(store_dir)
+        store_dir.mkdir(parents=True, exist_ok=True)
+
+        matrix_path = store_dir / MATRIX_FILE_NAME
+        tmp_matrix_path = store_dir / (MATRIX_FILE_NAME + ".tmp")
+        with open(tmp_matrix_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.matrix, dtype=dtype))
+        os.replace(tmp_matrix_path, matrix_path)
+
+        if self.tag_embeddings is not None:
+            self.tag_embeddings.save(store_dir)
+        if self.calibration is not None:
+            self.calibration.save(store_dir)
+        if self.index is not None:
+            self.index.save(store_dir)
+
+        metadata = {
+            "format_version": STORE_FORMAT_VERSION,
+            "count": len(self),
+            "dim": self.dim,
+            "dtype": dtype,
+            "created_at": time.time(),
+            "version": version,
+            "paths": self.paths,
+        }
+        metadata_path = store_dir / METADATA_FILE_NAME
+        tmp_metadata_path = store_dir / (METADATA_FILE_NAME + ".tmp")
+        with open(tmp_metadata_path, "w", encoding="utf-8") as f:
+            json.dump(metadata, f, ensure_ascii=False)
+        os.replace(tmp_metadata_path, metadata_path)
+
+    def attach_index(self, index: Optional[IVFIndex]) -> None:
+        """검색에 사용할 근사 인덱스를 붙입니다. `None`이면 정확한 전수 검색으로 돌아갑니다."""
+        self.index = index
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def find_rows(self, names: Sequence[str]) -> np.ndarray:
+        """경로 또는 파일 이름에 해당하는 행 번호들 (정렬, 중복 없음). 없는 이름은 무시합니다."""
+        if self._rows_by_name is None:
+            rows_by_name: Dict[str, int] = {}
+            for row, path in enumerate(self.paths):
+                rows_by_name.setdefault(os.path.basename(path), row)
+                rows_by_name[path] = row
+            self._rows_by_name = rows_by_name
+        rows = [self._rows_by_name[name] for name in names if name in self._rows_by_name]
+        return np.unique(np.asarray(rows, dtype=np.int64))
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    def scores(self, query: Any, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        쿼리 임베딩과 행들의 코사인 유사도를 float32 배열로 반환합니다.
+
+        `rows`(행 번호 배열)가 주어지면 그 행들만 읽어 `[len(rows)]` 점수를, 아니면 `[N]` 점수를 계산합니다.
+        """
+        query = _normalize_query(query)
+
+        if rows is not None:
+            return np.asarray(self.matrix[rows], dtype=np.float32) @ query
+
+        if self.matrix.dtype == np.float32:
+            return np.asarray(self.matrix @ query)
+
+        out = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), _SEARCH_BLOCK_ROWS):
+            block = np.asarray(self.matrix[start:start + _SEARCH_BLOCK_ROWS], dtype=np.float32)
+            out[start:start + len(block)] = block @ query
+        return out
+
+    def search(
+        self,
+        query: Any,
+        top_k: int,
+        exact: bool = False,
+        rows: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        쿼리 임베딩과 코사인 유사도가 가장 높은 `top_k`개의 행을 찾습니다.
+
+        Args:
+            query: `[D]` 또는 `[1, D]` 모양의 쿼리 임베딩 (정규화되지 않아도 됨).
+            top_k: 반환할 최대 개수. DB 크기보다 크면 DB 크기로 잘립니다.
+            exact: True이면 인덱스가 붙어 있어도 전수 검색을 합니다.
+            rows: 주어지면 이 행들(예: 태그 필터를 통과한 곡)만 검색합니다. 후보 집합이 작으므로 항상 정확히 계산합니다.
+
+        Returns:
+            `(scores, indices)` 튜플. 두 배열 모두 `[min(top_k, N)]` 모양이며 점수 내림차순입니다.
+        """
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+            scores = self.scores(query, rows)
+            order = top_k_order(scores, top_k)
+            return scores[order], rows[order]
+
+        k = min(top_k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        if self.index is not None and not exact:
+            return self.index.search(self.matrix, _normalize_query(query), k)
+
+        scores = self.scores(query)
+        order = top_k_order(scores, k)
+        return scores[order], order
+
+    def search_batch(self, queries: Any, top_k: int, exact: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        여러 쿼리를 한 번에 검색합니다. 전수 검색은 쿼리마다 행렬-벡터 곱을 하는 대신
+        `[N, D] @ [D, Q]` 행렬-행렬 곱 한 번으로 모든 점수를 계산합니다.
+
+        Args:
+            queries: `[Q, D]` 쿼리 임베딩 (정규화되지 않아도 됨).
+            top_k: 쿼리마다 반환할 최대 개수.
+            exact: True이면 인덱스가 붙어 있어도 전수 검색을 합니다.
+
+        Returns:
+            `(scores, indices)` 튜플. 두 배열 모두 `[Q, min(top_k, N)]` 모양이며 행마다 점수 내림차순입니다.
+            인덱스 검색에서 탐색한 리스트의 후보가 그보다 적으면 나머지 칸은 점수 `-inf`, 인덱스 `-1`로 채웁니다.
+        """
+        queries = _normalize_rows(_to_numpy(queries).reshape(-1, self.dim))
+        k = min(top_k, len(self))
+        if k <= 0 or len(queries) == 0:
+            return np.empty((len(queries), 0), dtype=np.float32), np.empty((len(queries), 0), dtype=np.int64)
+
+        if self.index is not None and not exact:
+            scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+            indices = np.full((len(queries), k), -1, dtype=np.int64)
+            for i, query in enumerate(queries):
+                row_scores, row_indices = self.index.search(self.matrix, query, k)
+                scores[i, :len(row_scores)] = row_scores
+                indices[i, :len(row_indices)] = row_indices
+            return scores, indices
+
+        if self.matrix.dtype == np.float32:
+            scores = np.asarray(queries @ self.matrix.T)
+        else:
+            scores = np.empty((len(queries), len(self)), dtype=np.float32)
+            for start in range(0, len(self), _SEARCH_BLOCK_ROWS):
+                block = np.asarray(self.matrix[start:start + _SEARCH_BLOCK_ROWS], dtype=np.float32)
+                scores[:, start:start + len(block)] = queries @ block.T
+
+        if k < len(self):
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.tile(np.arange(len(self)), (len(queries), 1))
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        return np.take_along_axis(candidate_scores, order, axis=1), np.take_along_axis(candidates, order, axis=1)
+
+
+def as_embedding_db(
+    embedding_db: Union[EmbeddingDatabase, Sequence[Tuple[str, Any]]]
+) -> EmbeddingDatabase:
+    """`(경로, 텐서)` 리스트가 들어오면 EmbeddingDatabase로 변환하고, 이미 변환된 DB는 그대로 반환합니다."""
+    if isinstance(embedding_db, EmbeddingDatabase):
+        return embedding_db
+    return EmbeddingDatabase.from_pairs(embedding_db)
+
+
+def resolve_store_dir(db_path: Union[str, Path]) -> Path:
+    """
+    버전 관리되는 저장소 루트이면 `CURRENT`가 가리키는 버전 디렉토리를, 아니면 경로를 그대로 반환합니다.
+    """
+    db_path = Path(db_path)
+    current_file = db_path / CURRENT_FILE_NAME
+    if current_file.is_file():
+        version = current_file.read_text(encoding="utf-8").strip()
+        return db_path / VERSIONS_DIR_NAME / version
+    return db_path
+
+
+def load_manifest(store_dir: Union[str, Path]) -> Dict[str, Dict[str, Any]]:
+    """
+    저장소의 파일 매니페스트(`경로 -> {size, mtime, sha256}`)를 읽습니다. 없으면 빈 딕셔너리를 반환합니다.
+    """
+    manifest_path = Path(store_dir) / MANIFEST_FILE_NAME
+    if not manifest_path.is_file():
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def validate_keep_versions(keep_versions: int) -> int:
+    """남겨 둘 버전 수를 검사합니다. 활성 버전이 포함되므로 1 이상이어야 합니다."""
+    if keep_versions < 1:
+        raise ValueError(f"keep_versions must be at least 1, got {keep_versions}.")
+    return keep_versions
+
+
+def publish_store_version(
+    root: Union[str, Path],
+    db: EmbeddingDatabase,
+    manifest: Dict[str, Dict[str, Any]],
+    dtype: str = "float16",
+    keep_versions: int = 3,
+) -> str:
+    """
+    DB를 새 버전으로 저장한 뒤 `CURRENT` 포인터를 원자적으로 교체해 공개합니다.
+
+    새 버전 디렉토리를 모두 쓴 다음에 `os.replace`로 `CURRENT`를 바꾸므로,
+    DB를 여는 쪽은 항상 이전 버전 또는 완성된 새 버전 중 하나만 보게 됩니다.
+    가장 최근 `keep_versions`개를 제외한 오래된 버전은 삭제하되, `CURRENT`가 가리키는 버전은
+    정렬 순서와 관계없이 항상 남깁니다.
+
+    Args:
+        root: 저장소 루트 디렉토리.
+        db: 저장할 DB.
+        manifest: 행 경로별 `{size, mtime, sha256}` 매니페스트.
+        dtype: 행렬 저장 dtype.
+        keep_versions: 남겨 둘 버전 수 (활성 버전 포함).
+
+    Returns:
+        공개된 버전 이름.
+
+    Raises:
+        ValueError: `keep_versions`가 1보다 작은 경우.
+    """
+    validate_keep_versions(keep_versions)
+    root = Path(root)
+    versions_dir = root / VERSIONS_DIR_NAME
+    version = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{uuid.uuid4().hex[:8]}"
+    version_dir = versions_dir / version
+
+    db.save(version_dir, dtype=dtype, version=version)
+    with open(version_dir / MANIFEST_FILE_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    tmp_current = root / (CURRENT_FILE_NAME + ".tmp")
+    tmp_current.write_text(version, encoding="utf-8")
+    os.replace(tmp_current, root / CURRENT_FILE_NAME)
+
+    # 버전 이름이 시간순으로 정렬되므로 앞쪽이 오래된 버전입니다. 활성 버전은 후보에서 빼고 나머지 중
+    # 최근 `keep_versions - 1`개를 남깁니다. (그 사이 다른 빌드가 공개했다면 그 버전이 활성 버전입니다.)
+    current = resolve_store_dir(root).name
+    candidates = sorted(p for p in versions_dir.iterdir() if p.is_dir() and p.name != current)
+    for old_version_dir in candidates[: max(0, len(candidates) - (keep_versions - 1))]:
+        shutil.rmtree(old_version_dir, ignore_errors=True)
+
+    return version
+
+
+def load_embedding_db(db_path: Union[str, Path]) -> EmbeddingDatabase:
+    """
+    경로 형식에 맞춰 임베딩 DB를 로드합니다.
+
+    - 버전 관리되는 저장소 루트: `CURRENT`가 가리키는 버전을 메모리 매핑으로 엽니다.
+    - 디렉토리: `save()`로 만든 저장소를 메모리 매핑으로 엽니다.
+    - `.pkl` 파일: 기존 `(경로, 텐서)` 리스트를 읽어 메모리 상의 행렬로 변환합니다.
+      (느리고 워커마다 사본이 생기므로 `scripts/convert_pkl_db.py`로 변환해 쓰는 것을 권장합니다.)
+    """
+    db_path = Path(db_path)
+    if db_path.is_dir():
+        return EmbeddingDatabase.open(resolve_store_dir(db_path))
+
+    with open(db_path, "rb") as f:
+        pairs = pickle.load(f)
+    return EmbeddingDatabase.from_pairs(pairs)
@@ -0,0 +1,138 @@
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict
+
+from src.metrics import STAGE_SECONDS
+
+
+class QueueFullError(Exception):
+    """추론 대기열이 가득 차서 요청을 받을 수 없을 때 발생합니다."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference queue is full. Retry after {retry_after}s.")
+        self.retry_after = retry_after
+
+
+class InferencePool:
+    """
+    무거운 동기 추론(Whisper, CLAP)을 이벤트 루프 밖의 전용 스레드에서 실행합니다.
+
+    동시에 실행되는 작업은 `max_workers`개, 실행을 기다리는 작업은 `max_queue`개로 제한합니다.
+    둘 다 찬 상태에서 들어온 요청은 대기열에 쌓이지 않고 즉시 `QueueFullError`로 거절되므로,
+    과부하 시에도 지연 시간이 무한정 늘어나지 않고 헬스 체크 등 다른 엔드포인트가 멈추지 않습니다.
+    `run_blocking()`을 뺀 모든 메서드는 이벤트 루프 스레드에서만 호출해야 합니다.
+
+    비동기 작업 워커(`JobQueue`)도 `run_blocking()`으로 같은 추론 스레드를 쓰므로, Whisper/CLAP는
+    동기 요청과 작업을 합쳐 최대 `max_workers`개만 동시에 실행되고, 실행 중이거나 기다리는 작업도
+    동기 요청의 입장 제어와 Retry-After 추정에 포함됩니다.
+    """
+
+    def __init__(self, max_workers: int = 1, max_queue: int = 8):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._admitted = 0
+        # 다른 스레드(작업 워커)에서 `run_blocking()`으로 들어온 작업 수. `_lock` 아래에서만 바꿉니다.
+        self._background = 0
+        self._lock = threading.Lock()
+        self._rejected = 0
+        self._completed = 0
+        # 최근 작업 소요 시간의 지수 이동 평균 (Retry-After 추정에 사용)
+        self._avg_seconds = 1.0
+
+    @property
+    def in_flight(self) -> int:
+        """실행 중이거나 대기 중인 작업 수. (작업 워커가 넘긴 작업 포함)"""
+        return self._admitted + self._background
+
+    @property
+    def queue_depth(self) -> int:
+        """실행을 기다리는 작업 수."""
+        return max(0, self.in_flight - self.max_workers)
+
+    def is_full(self) -> bool:
+        return self.in_flight >= self.max_workers + self.max_queue
+
+    def retry_after(self) -> int:
+        """대기열이 한 번 비워질 것으로 예상되는 시간(초)."""
+        waves = (self.queue_depth + self.max_workers) / self.max_workers
+        return max(1, math.ceil(waves * self._avg_seconds))
+
+    def check_admission(self) -> None:
+        """대기열이 가득 찼으면 `QueueFullError`를 발생시킵니다. 업로드를 읽기 전에 빠르게 거절할 때 사용합니다."""
+        if self.is_full():
+            self._rejected += 1
+            raise QueueFullError(self.retry_after())
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        `fn(*args, **kwargs)`를 추론 스레드에서 실행하고 결과를 기다립니다.
+
+        자리는 기다리는 코루틴이 아니라 실행기 작업이 끝날 때 반납합니다. 클라이언트가 연결을 끊어
+        요청이 취소되어도 이미 시작된 추론은 스레드에서 계속 돌기 때문에, 그동안은 한도에 계속 포함됩니다.
+        (아직 시작하지 않은 작업은 취소와 함께 바로 반납됩니다.)
+
+        Raises:
+            QueueFullError: 실행 중 + 대기 중인 작업이 한도에 도달한 경우.
+        """
+        self.check_admission()
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        future = self._executor.submit(partial(self._timed, submitted, fn, *args, **kwargs))
+        self._admitted += 1
+        future.add_done_callback(partial(self._release_from_thread, loop))
+        return await asyncio.wrap_future(future)
+
+    def run_blocking(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        이벤트 루프 밖의 스레드(비동기 작업 워커)에서 `fn(*args, **kwargs)`를 추론 스레드로 넘기고 결과를 기다립니다.
+
+        작업 대기열이 따로 길이를 제한하므로 입장 제어로 거절하지는 않지만, 끝날 때까지 `in_flight`에 포함됩니다.
+        """
+        with self._lock:
+            self._background += 1
+        try:
+            submitted = time.perf_counter()
+            return self._executor.submit(partial(self._timed, submitted, fn, *args, **kwargs)).result()
+        finally:
+            with self._lock:
+                self._background -= 1
+
+    def _release_from_thread(self, loop: asyncio.AbstractEventLoop, future) -> None:
+        """실행기 작업의 완료 콜백. 작업 스레드에서 불릴 수 있으므로 반납은 이벤트 루프 스레드로 넘깁니다."""
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:  # 이벤트 루프가 이미 닫힌 경우 (서버 종료 중)
+            pass
+
+    def _release(self) -> None:
+        self._admitted -= 1
+        self._completed += 1
+
+    def _timed(self, submitted: float, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """대기 시간은 `queue_wait` 구간으로 따로 기록하고, 실제 실행 시간만 평균에 반영합니다."""
+        start = time.perf_counter()
+        STAGE_SECONDS.observe(start - submitted, stage="queue_wait")
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "background": self._background,
+            "queue_depth": self.queue_depth,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_seconds": self._avg_seconds,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
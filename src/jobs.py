@@ -0,0 +1,265 @@
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.inference_pool import QueueFullError
+from src.metrics import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# 우선순위 이름 → 정렬 순위 (작을수록 먼저 실행)
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class Job:
+    """대기열의 작업 하나. 상태 필드는 `JobQueue`의 잠금 아래에서만 바뀝니다."""
+
+    def __init__(self, job_id: str, key: Optional[str], priority: str, fn: Callable[[], Any], created_at: float):
+        self.id = job_id
+        self.key = key
+        self.priority = priority
+        self.status = QUEUED
+        self.created_at = created_at
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.cancel_requested = False
+        # 같은 키로 들어와 이 작업에 붙은 중복 제출 수
+        self.attached = 0
+        self._fn: Optional[Callable[[], Any]] = fn
+
+    @property
+    def rank(self) -> int:
+        return PRIORITIES[self.priority]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "attached": self.attached,
+            "cancel_requested": self.cancel_requested,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    오래 걸리는 추천 작업을 HTTP 연결과 분리해 백그라운드 워커 스레드에서 실행하는 우선순위 대기열.
+
+    - 우선순위: "high" → "normal" → "low" 순으로, 같은 우선순위 안에서는 제출 순서대로 실행합니다.
+    - 중복 제거: 같은 `key`(오디오 해시 + 옵션)로 제출된 작업이 대기 중이거나 실행 중이면 새로 계산하지 않고
+      그 작업을 돌려줍니다. 더 높은 우선순위로 다시 제출되면 대기 중인 작업의 우선순위를 올립니다.
+    - 취소: 대기 중인 작업은 바로 취소되고, 실행 중인 작업은 끝난 뒤 결과를 버리고 취소 상태가 됩니다.
+    - 결과 보관: 끝난 작업은 `result_ttl_seconds` 동안만 조회할 수 있고, 이후 조회나 제출 때 정리됩니다.
+
+    워커는 모델을 이미 올린 이 프로세스의 스레드입니다. `execute`(서버에서는 `InferencePool.run_blocking`)를
+    주면 작업 함수를 직접 부르지 않고 그쪽으로 넘기므로, 추론은 동기 요청과 같은 추론 스레드 수 한도 안에서
+    실행됩니다. 이때 `workers`는 추론 스레드를 동시에 기다릴 수 있는 작업 수이고, "running" 상태에는
+    추론 스레드를 기다리는 시간도 포함됩니다.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_queued: int = 64,
+        result_ttl_seconds: float = 600.0,
+        execute: Optional[Callable[[Callable[[], Any]], Any]] = None,
+    ):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl_seconds = result_ttl_seconds
+        self._execute = execute or (lambda fn: fn())
+        self._cond = threading.Condition()
+        # (순위, 제출 순서, 작업). 우선순위를 올리면 새 항목을 넣고, 낡은 항목은 꺼낼 때 건너뜁니다.
+        self._heap: List[Tuple[int, int, Job]] = []
+        self._seq = itertools.count()
+        self._jobs: Dict[str, Job] = {}
+        self._in_flight: Dict[str, Job] = {}
+        # 끝난 순서 = 만료 순서 (TTL이 모두 같으므로)
+        self._finished: Deque[Job] = deque()
+        self._queued = 0
+        self._running = 0
+        self._counts = {"submitted": 0, "deduplicated": 0, SUCCEEDED: 0, FAILED: 0, CANCELLED: 0}
+        # 최근 작업 소요 시간의 지수 이동 평균 (Retry-After 추정에 사용)
+        self._avg_seconds = 1.0
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable[[], Any], key: Optional[str] = None, priority: str = "normal") -> Tuple[Job, bool]:
+        """
+        `fn()`을 실행할 작업을 대기열에 넣습니다.
+
+        Returns:
+            (작업, 중복 여부). 같은 `key`의 작업이 진행 중이면 그 작업과 True를 반환합니다.
+
+        Raises:
+            ValueError: 알 수 없는 우선순위인 경우.
+            QueueFullError: 대기 중인 작업이 `max_queued`개에 도달한 경우.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority} (expected one of {tuple(PRIORITIES)})")
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Job queue is shut down.")
+            now = time.time()
+            self._expire(now)
+
+            job = self._in_flight.get(key) if key is not None else None
+            # 취소를 기다리는 작업에는 붙이지 않고 새로 계산합니다.
+            if job is not None and not job.cancel_requested:
+                job.attached += 1
+                self._counts["deduplicated"] += 1
+                if job.status == QUEUED and PRIORITIES[priority] < job.rank:
+                    job.priority = priority
+                    heapq.heappush(self._heap, (job.rank, next(self._seq), job))
+                return job, True
+
+            if self._queued >= self.max_queued:
+                raise QueueFullError(self._retry_after())
+            job = Job(uuid.uuid4().hex, key, priority, fn, now)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._in_flight[key] = job
+            heapq.heappush(self._heap, (job.rank, next(self._seq), job))
+            self._queued += 1
+            self._counts["submitted"] += 1
+            self._cond.notify()
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """작업을 반환합니다. 없거나 결과 보관 시간이 지났으면 None."""
+        with self._cond:
+            self._expire(time.time())
+            return self._jobs.get(job_id)
+
+    def position(self, job: Job) -> Optional[int]:
+        """대기 중인 작업 앞에 있는 대기 작업 수. 대기 중이 아니면 None."""
+        with self._cond:
+            if job.status != QUEUED:
+                return None
+            # 대기 중인 작업마다 현재 순위와 같은 항목이 정확히 하나 있습니다.
+            mine = next((rank, seq) for rank, seq, entry in self._heap if entry is job and rank == job.rank)
+            return sum(
+                1 for rank, seq, entry in self._heap
+                if entry.status == QUEUED and rank == entry.rank and (rank, seq) < mine
+            )
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        작업을 취소합니다. 대기 중이면 바로 취소되고, 실행 중이면 끝난 뒤 결과를 버립니다.
+        이미 끝난 작업은 그대로 둡니다. 없는 작업이면 None을 반환합니다.
+        """
+        with self._cond:
+            self._expire(time.time())
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == QUEUED:
+                self._queued -= 1
+                self._finish(job, CANCELLED, time.time())
+            elif job.status == RUNNING:
+                job.cancel_requested = True
+            return job
+
+    def _retry_after(self) -> int:
+        waves = (self._queued + self._running) / max(self.workers, 1)
+        return max(1, math.ceil(waves * self._avg_seconds))
+
+    def _finish(self, job: Job, status: str, now: float) -> None:
+        job.status = status
+        job.finished_at = now
+        job._fn = None
+        if job.key is not None and self._in_flight.get(job.key) is job:
+            del self._in_flight[job.key]
+        self._finished.append(job)
+        self._counts[status] += 1
+
+    def _expire(self, now: float) -> None:
+        while self._finished and self._finished[0].finished_at + self.result_ttl_seconds <= now:
+            job = self._finished.popleft()
+            self._jobs.pop(job.id, None)
+
+    def _next_job(self) -> Optional[Job]:
+        with self._cond:
+            while True:
+                while self._heap:
+                    rank, _, job = heapq.heappop(self._heap)
+                    if job.status == QUEUED and rank == job.rank:
+                        job.status = RUNNING
+                        job.started_at = time.time()
+                        self._queued -= 1
+                        self._running += 1
+                        return job
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def _loop(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            STAGE_SECONDS.observe(job.started_at - job.created_at, stage="job_queue_wait")
+            start = time.perf_counter()
+            result, error = None, None
+            try:
+                result = self._execute(job._fn)
+            except Exception as e:
+                logger.exception("작업 %s 처리 중 예외 발생 - %s", job.id, e)
+                error = str(e) or type(e).__name__
+            seconds = time.perf_counter() - start
+            with self._cond:
+                self._running -= 1
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * seconds
+                if job.cancel_requested:
+                    self._finish(job, CANCELLED, time.time())
+                elif error is not None:
+                    job.error = error
+                    self._finish(job, FAILED, time.time())
+                else:
+                    job.result = result
+                    self._finish(job, SUCCEEDED, time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "max_queued": self.max_queued,
+                "result_ttl_seconds": self.result_ttl_seconds,
+                "queued": self._queued,
+                "running": self._running,
+                "stored": len(self._jobs),
+                **self._counts,
+                "avg_seconds": self._avg_seconds,
+            }
+
+    def shutdown(self) -> None:
+        """대기 중인 작업을 모두 취소하고 워커가 현재 작업을 마치면 끝나도록 합니다."""
+        with self._cond:
+            self._closed = True
+            now = time.time()
+            for _, _, job in self._heap:
+                if job.status == QUEUED:
+                    self._queued -= 1
+                    self._finish(job, CANCELLED, now)
+            self._heap.clear()
+            self._cond.notify_all()
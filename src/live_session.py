@@ -0,0 +1,203 @@
+import difflib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.audio_decode import WHISPER_SAMPLE_RATE
+
+PCM_FORMATS = ("s16le", "f32le")
+
+
+class PCMRingBuffer:
+    """
+    최근 `capacity`개 샘플만 보관하는 고정 크기 링 버퍼.
+
+    저장 공간과 시간순으로 펼친 창(window) 버퍼를 처음에 한 번만 할당하고 계속 재사용하므로,
+    세션이 한 시간 넘게 이어져도 메모리 사용량이 늘지 않습니다.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._window = np.zeros(capacity, dtype=np.float32)
+        self._write_pos = 0
+        self._filled = 0
+        self.total_samples = 0
+
+    def __len__(self) -> int:
+        return self._filled
+
+    def write(self, samples: np.ndarray, scale: float = 1.0) -> None:
+        """샘플을 추가합니다. 용량을 넘으면 가장 오래된 샘플부터 덮어씁니다. (`scale`을 곱해 저장)"""
+        n = len(samples)
+        self.total_samples += n
+        if n >= self.capacity:
+            np.multiply(samples[n - self.capacity:], scale, out=self._data, casting="unsafe")
+            self._write_pos, self._filled = 0, self.capacity
+            return
+        first = min(n, self.capacity - self._write_pos)
+        np.multiply(samples[:first], scale, out=self._data[self._write_pos:self._write_pos + first], casting="unsafe")
+        np.multiply(samples[first:], scale, out=self._data[:n - first], casting="unsafe")
+        self._write_pos = (self._write_pos + n) % self.capacity
+        self._filled = min(self.capacity, self._filled + n)
+
+    def write_pcm(self, data: bytes, sample_format: str = "s16le") -> None:
+        """리틀 엔디언 PCM 바이트(16비트 정수 또는 32비트 실수)를 복사 없이 해석해 추가합니다."""
+        if sample_format == "s16le":
+            self.write(np.frombuffer(data, dtype="<i2", count=len(data) // 2), scale=1.0 / 32768.0)
+        elif sample_format == "f32le":
+            self.write(np.frombuffer(data, dtype="<f4", count=len(data) // 4))
+        else:
+            raise ValueError(f"Unknown PCM format: {sample_format} (expected one of {PCM_FORMATS})")
+
+    def window(self) -> np.ndarray:
+        """
+        보관 중인 샘플을 시간순으로 펼친 배열.
+
+        반환값은 내부 창 버퍼의 뷰이므로 다음 `window()` 호출 전까지만 유효합니다.
+        """
+        n = self._filled
+        start = (self._write_pos - n) % self.capacity
+        first = min(n, self.capacity - start)
+        self._window[:first] = self._data[start:start + first]
+        self._window[first:n] = self._data[:n - first]
+        return self._window[:n]
+
+
+def transcript_change(previous: str, current: str) -> float:
+    """두 변환 결과가 단어 단위로 얼마나 다른지 (0: 같음, 1: 완전히 다름)."""
+    if not previous or not current:
+        return 0.0 if previous == current else 1.0
+    return 1.0 - difflib.SequenceMatcher(None, previous.split(), current.split(), autojunk=False).ratio()
+
+
+class TrackHysteresis:
+    """
+    재생 중인 곡이 순위가 조금 흔들릴 때마다 바뀌지 않도록 하는 히스테리시스.
+
+    새 1위 곡은 다음 두 조건을 모두 만족할 때만 현재 곡을 대체합니다.
+    - 새 순위에서 현재 곡보다 점수가 `switch_margin` 이상 높음 (현재 곡이 순위에서 빠졌으면 항상 만족)
+    - 현재 곡으로 바꾼 뒤 오디오 시간으로 `min_hold_seconds` 이상 지남
+    """
+
+    def __init__(self, switch_margin: float = 0.02, min_hold_seconds: float = 20.0):
+        self.switch_margin = switch_margin
+        self.min_hold_seconds = min_hold_seconds
+        self.current: Optional[Dict[str, Any]] = None
+        self._since = 0.0
+        self.switches = 0
+
+    def update(self, recommendations: List[Dict[str, Any]], now: float) -> bool:
+        """새 순위를 반영합니다. 현재 곡이 바뀌었으면 True."""
+        if not recommendations:
+            return False
+        best = recommendations[0]
+        if self.current is None:
+            self.current, self._since = best, now
+            return True
+        if best["file_path"] == self.current["file_path"]:
+            self.current = best
+            return False
+        if now - self._since < self.min_hold_seconds:
+            return False
+
+        current_score = next(
+            (r.get("raw_score", r["score"]) for r in recommendations if r["file_path"] == self.current["file_path"]), None
+        )
+        if current_score is not None and best.get("raw_score", best["score"]) - current_score < self.switch_margin:
+            return False
+        self.current, self._since = best, now
+        self.switches += 1
+        return True
+
+
+class LiveSession:
+    """
+    실시간 강연 음성에 맞춰 배경 음악을 추천하는 WebSocket 세션 한 개의 상태.
+
+    PCM 조각을 링 버퍼에 쌓고, `step_seconds`만큼 새 오디오가 들어올 때마다 최근 `window_seconds` 창을
+    다시 변환합니다. 변환 결과가 `min_change` 이상 달라졌을 때만 DB를 다시 검색하고,
+    곡 교체는 `TrackHysteresis`가 결정합니다.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 20.0,
+        step_seconds: float = 4.0,
+        min_change: float = 0.2,
+        switch_margin: float = 0.02,
+        min_hold_seconds: float = 20.0,
+        top_k: int = 5,
+        sample_format: str = "s16le",
+        sample_rate: int = WHISPER_SAMPLE_RATE,
+    ):
+        if sample_format not in PCM_FORMATS:
+            raise ValueError(f"Unknown PCM format: {sample_format} (expected one of {PCM_FORMATS})")
+        self.sample_rate = sample_rate
+        self.sample_format = sample_format
+        self.step_samples = int(step_seconds * sample_rate)
+        self.min_change = min_change
+        self.top_k = top_k
+        self.buffer = PCMRingBuffer(int(window_seconds * sample_rate))
+        self.hysteresis = TrackHysteresis(switch_margin, min_hold_seconds)
+        self.transcript = ""
+        self.recommendations: List[Dict[str, Any]] = []
+        self._processed_samples = 0
+
+    @property
+    def audio_seconds(self) -> float:
+        """세션 시작부터 받은 오디오 길이."""
+        return self.buffer.total_samples / self.sample_rate
+
+    def feed(self, data: bytes) -> None:
+        self.buffer.write_pcm(data, self.sample_format)
+
+    @property
+    def unprocessed_samples(self) -> int:
+        """마지막으로 처리한 창 이후 새로 받은 샘플 수."""
+        return self.buffer.total_samples - self._processed_samples
+
+    def due(self) -> bool:
+        """마지막 처리 이후 `step_seconds` 이상 새 오디오가 쌓였는지."""
+        return self.unprocessed_samples >= self.step_samples
+
+    def take_window(self) -> np.ndarray:
+        """처리할 창을 꺼냅니다. 반환값은 다음 `take_window()` 호출 전까지만 유효합니다."""
+        self._processed_samples = self.buffer.total_samples
+        return self.buffer.window()
+
+    def process(self, window: np.ndarray, pipeline, embedding_db) -> List[Dict[str, Any]]:
+        """
+        창 하나를 변환하고 필요하면 다시 추천합니다. (추론 스레드에서 실행)
+
+        Returns:
+            클라이언트에 보낼 메시지 리스트. 변환 결과가 크게 바뀌지 않았으면 빈 리스트입니다.
+        """
+        now = self._processed_samples / self.sample_rate
+        text = pipeline.speech_to_text.transcribe(window)
+        if transcript_change(self.transcript, text) < self.min_change:
+            return []
+        self.transcript = text
+        messages: List[Dict[str, Any]] = [{"type": "transcript", "text": text, "audio_seconds": now}]
+        if not text:
+            return messages
+
+        self.recommendations = pipeline.recommender.recommend_from_db(text, embedding_db, top_k=self.top_k)
+        if self.hysteresis.update(self.recommendations, now):
+            messages.append({
+                "type": "recommendations",
+                "current": self.hysteresis.current,
+                "recommendations": self.recommendations,
+                "audio_seconds": now,
+            })
+        return messages
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "audio_seconds": self.audio_seconds,
+            "window_seconds": self.buffer.capacity / self.sample_rate,
+            "switches": self.hysteresis.switches,
+            "current": self.hysteresis.current["file_path"] if self.hysteresis.current else None,
+        }
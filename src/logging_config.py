@@ -0,0 +1,50 @@
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict
+
+# LogRecord가 원래 가진 속성. 나머지(`extra=`로 넘긴 값)는 구조화된 필드로 내보냅니다.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+LOG_FORMATS = ("text", "json")
+
+
+class JSONFormatter(logging.Formatter):
+    """한 줄에 JSON 객체 하나. `extra=`로 넘긴 필드(예: `stage`, `seconds`)가 그대로 키가 됩니다."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: str = "INFO", fmt: str = "text") -> None:
+    """
+    서버의 로그 수준과 형식을 설정합니다. (`src.*`와 `main` 로거 공통)
+
+    Args:
+        level: "DEBUG", "INFO", "WARNING", "ERROR" 중 하나. DEBUG면 단계별 구간(span) 로그도 남깁니다.
+        fmt: "text"(사람이 읽기 쉬운 한 줄) 또는 "json"(수집기용 구조화 로그).
+    """
+    if fmt not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {fmt} (expected one of {LOG_FORMATS})")
+    handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    for name in ("src", "main"):
+        logger = logging.getLogger(name)
+        logger.handlers = [handler]
+        logger.setLevel(level.upper())
@@ -0,0 +1,266 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 요청 단계별 지연 시간 히스토그램의 버킷 경계(초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 수집기가 반환하는 한 지표: (이름, 종류, 설명, [(레이블, 값), ...])
+Sample = Tuple[Dict[str, str], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def collect(self) -> Family:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """단조 증가하는 값 (예: 요청 수)."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> Family:
+        with self._lock:
+            samples = [(self._labels(key), value) for key, value in self._values.items()]
+        return self.name, self.type_name, self.help, samples
+
+
+class Gauge(_Metric):
+    """오르내리는 현재 값 (예: 대기열 길이)."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def collect(self) -> Family:
+        with self._lock:
+            samples = [(self._labels(key), value) for key, value in self._values.items()]
+        return self.name, self.type_name, self.help, samples
+
+
+class Histogram(_Metric):
+    """
+    관측값의 분포. 버킷별 개수와 합계만 보관하므로 관측 한 번은 이진 탐색 한 번과 덧셈 몇 번입니다.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 레이블 → [버킷별 개수(마지막은 +Inf), 합계, 개수]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def collect(self) -> Family:
+        samples: List[Sample] = []
+        with self._lock:
+            series_items = [(key, list(s[0]), s[1], s[2]) for key, s in self._series.items()]
+        for key, counts, total, count in series_items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                samples.append(({**labels, "le": _format_value(float(bound))}, cumulative))
+            samples.append(({**labels, "__suffix__": "_sum"}, total))
+            samples.append(({**labels, "__suffix__": "_count"}, count))
+        return self.name, self.type_name, self.help, samples
+
+
+class MetricsRegistry:
+    """
+    프로세스의 지표 모음. `render()`는 Prometheus 텍스트 형식(0.0.4)으로 내보냅니다.
+
+    지표는 워커 프로세스마다 따로 집계되므로, 여러 워커를 띄우면 스크레이퍼가 워커별로 수집하거나
+    `pid` 레이블로 구분해야 합니다. 상태를 그대로 읽어 오면 되는 값(대기열 길이, 캐시 적중 수 등)은
+    `register_collector()`로 등록한 함수가 내보낼 때마다 계산합니다.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        self._collectors.append(collector)
+
+    def collect(self) -> List[Family]:
+        families = [metric.collect() for metric in list(self._metrics.values())]
+        for collector in self._collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning("Metrics collector failed: %s", e)
+        return families
+
+    def render(self) -> str:
+        lines = []
+        for name, type_name, help_text, samples in self.collect():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {type_name}")
+            for labels, value in samples:
+                labels = dict(labels)
+                suffix = labels.pop("__suffix__", "_bucket" if "le" in labels else "")
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "bgm_stage_seconds",
+    "Latency of each request/pipeline stage (upload_decode, queue_wait, transcribe, text_embedding, search, ...).",
+    labelnames=("stage",),
+)
+REQUESTS = REGISTRY.counter(
+    "bgm_requests_total", "Handled HTTP requests by endpoint and status code.", labelnames=("endpoint", "status")
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "bgm_request_seconds", "End-to-end HTTP request latency by endpoint.", labelnames=("endpoint",)
+)
+
+
+@contextmanager
+def span(stage: str, **fields: Any) -> Iterator[None]:
+    """
+    `stage` 구간의 소요 시간을 `bgm_stage_seconds` 히스토그램에 기록합니다.
+
+    DEBUG 로그가 켜져 있으면 구간마다 구조화된 로그(`stage`, `seconds`, `fields`)도 남깁니다.
+    꺼져 있으면 `perf_counter` 두 번과 히스토그램 관측 한 번만 듭니다.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        STAGE_SECONDS.observe(seconds, stage=stage)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("span %s %.1fms", stage, seconds * 1000, extra={"stage": stage, "seconds": seconds, **fields})
+
+
+class MetricsMiddleware:
+    """
+    HTTP 요청마다 엔드포인트별 지연 시간과 상태 코드를 기록하는 ASGI 미들웨어.
+
+    요청/응답 본문을 건드리지 않으므로 업로드 스트리밍과 `StreamingResponse`에 영향이 없습니다.
+    엔드포인트 레이블은 경로 템플릿(예: `/recommend/`)이라 경로 값 때문에 레이블 수가 늘지 않습니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+            REQUESTS.inc(endpoint=endpoint, status=status[0])
@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple, TypeVar
+
+import torch
+import whisper
+from transformers import ClapModel, ClapProcessor
+
+from src.cpu_inference import CPUInferenceProfile
+
+logger = logging.getLogger(__name__)
+
+CLAP_MODEL_NAME = "laion/larger_clap_music"
+
+T = TypeVar("T")
+
+
+class StartupTimings:
+    """서버 시작 단계별 소요 시간(초)을 기록합니다. `/admin/startup`과 시작 로그에 사용됩니다."""
+
+    def __init__(self):
+        self._phases: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._phases[phase] = self._phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._phases)
+
+    def report(self) -> str:
+        return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.as_dict().items())
+
+
+startup_timings = StartupTimings()
+
+# (종류, 이름, 장치) → 로드된 모델. 프로세스당 하나씩만 존재합니다.
+_models: Dict[Hashable, Any] = {}
+_locks: Dict[Hashable, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def resolve_device(device: Optional[str] = None) -> str:
+    """`None`이면 사용 가능한 장치('cuda' 또는 'cpu')를 고릅니다."""
+    if device is not None:
+        return device
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def load_once(key: Hashable, loader: Callable[[], T], phase: Optional[str] = None) -> T:
+    """
+    `key`에 해당하는 모델을 프로세스에서 한 번만 로드합니다.
+
+    여러 스레드가 동시에 요청해도 `loader`는 한 번만 실행되고, 나머지는 그 결과를 기다려 받습니다.
+    `phase`가 주어지면 로드 시간을 `startup_timings`에 기록합니다.
+    """
+    model = _models.get(key)
+    if model is not None:
+        return model
+    with _registry_lock:
+        lock = _locks.setdefault(key, threading.Lock())
+    with lock:
+        model = _models.get(key)
+        if model is None:
+            start = time.perf_counter()
+            model = loader()
+            if phase is not None:
+                startup_timings.record(phase, time.perf_counter() - start)
+            _models[key] = model
+    return model
+
+
+def get_whisper_model(
+    model_size: str = "base",
+    device: Optional[str] = None,
+    profile: Optional[CPUInferenceProfile] = None,
+) -> whisper.Whisper:
+    """
+    프로세스 공용 Whisper 모델을 반환합니다. 처음 호출될 때 로드합니다.
+
+    `profile`이 주어지면 로드 직후 CPU 최적화(양자화/컴파일)를 적용하며, 프로필마다 별도의 모델로 취급합니다.
+    """
+    device = resolve_device(device)
+    profile_key = profile.key if profile is not None else None
+
+    def _load():
+        logger.info("Loading Whisper model (%s, %s)...", model_size, device)
+        model = whisper.load_model(model_size, device=device)
+        if profile is not None:
+            model = profile.optimize(model)
+        return model
+
+    return load_once(("whisper", model_size, device, profile_key), _load, phase=f"load_whisper_{model_size}")
+
+
+def get_clap(model_name: str = CLAP_MODEL_NAME, device: Optional[str] = None) -> Tuple[ClapModel, ClapProcessor]:
+    """프로세스 공용 CLAP 모델과 프로세서를 반환합니다. 처음 호출될 때 로드합니다."""
+    device = resolve_device(device)
+
+    def _load():
+        logger.info("Loading CLAP model (%s, %s)...", model_name, device)
+        model = ClapModel.from_pretrained(model_name, use_safetensors=True).to(device)
+        model.eval()
+        return model, ClapProcessor.from_pretrained(model_name)
+
+    return load_once(("clap", model_name, device), _load, phase="load_clap")
+
+
+def preload(
+    whisper_model_size: str = "base",
+    device: Optional[str] = None,
+    profile: Optional[CPUInferenceProfile] = None,
+) -> bool:
+    """
+    워커를 fork하기 전에 마스터 프로세스에서 가중치를 미리 로드합니다.
+
+    fork된 워커는 이미 로드된 텐서 메모리를 copy-on-write로 공유하므로, 워커 수가 늘어도
+    가중치 메모리가 늘지 않고 각 워커의 시작 시간에서 모델 로드(와 양자화)가 빠집니다.
+    CUDA 컨텍스트는 fork 후 사용할 수 없으므로 GPU에서는 건너뜁니다.
+
+    Returns:
+        미리 로드했으면 True, 건너뛰었으면 False.
+    """
+    if resolve_device(device) != "cpu":
+        logger.warning("GPU에서는 fork 전 모델 로드를 지원하지 않습니다. 워커마다 모델을 로드합니다.")
+        return False
+    with startup_timings.phase("preload"):
+        get_whisper_model(whisper_model_size, device, profile)
+        get_clap(device=device)
+    return True
+
+
+def loaded_models() -> List[str]:
+    """현재 프로세스에 로드된 모델 목록."""
+    return [
+        ":".join(str(part) for part in key if part is not None) if isinstance(key, tuple) else str(key)
+        for key in _models
+    ]
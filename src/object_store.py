@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Union
+
+
+def parse_manifest(text: str) -> List[str]:
+    """
+    배치 요청의 매니페스트를 항목 리스트로 읽습니다.
+
+    JSON 문자열 배열(`["a.mp3", "s3://bucket/b.mp3"]`) 또는 한 줄에 하나씩 적은 텍스트를 받습니다.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        entries = json.loads(text)
+        if not isinstance(entries, list) or not all(isinstance(e, str) for e in entries):
+            raise ValueError("Manifest must be a JSON array of strings.")
+        return [e.strip() for e in entries if e.strip()]
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+class LocalObjectStore:
+    """
+    S3 키(또는 상대 경로)를 로컬 디렉토리 안의 파일로 해석하는 S3 대역(stand-in).
+
+    `s3://<bucket>/<key>`, `<key>`, `/<key>` 형식을 모두 `<root>/<key>`로 해석합니다.
+    루트 밖을 가리키는 경로(`..`, 심볼릭 링크 포함)는 거절합니다.
+    """
+
+    def __init__(self, root: Union[str, Path], bucket: Optional[str] = None):
+        self.root = Path(root).resolve()
+        self.bucket = bucket
+
+    def resolve(self, key: str) -> Path:
+        """
+        Raises:
+            ValueError: 다른 버킷이거나 루트 밖을 가리키는 경우.
+            FileNotFoundError: 해당 파일이 없는 경우.
+        """
+        if key.startswith("s3://"):
+            bucket, _, key = key[len("s3://"):].partition("/")
+            if self.bucket is not None and bucket != self.bucket:
+                raise ValueError(f"Unknown bucket: {bucket}")
+        path = (self.root / key.lstrip("/")).resolve()
+        if path != self.root and self.root not in path.parents:
+            raise ValueError(f"Key is outside the object root: {key}")
+        if not path.is_file():
+            raise FileNotFoundError(f"Object not found: {key}")
+        return path
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.resolve(key), "rb")
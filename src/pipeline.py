@@ -1,53 +1,286 @@
 import os
+import logging
 from src.recommender import AudioRecommender
-from typing import List, Dict, Tuple
+from src.speech_to_text import SpeechToText
+from src.embedding_db import EmbeddingDatabase
+from src.cpu_inference import CPUInferenceProfile
+from src.audio_decode import WHISPER_SAMPLE_RATE, load_audio
+from src.cache import MISSING, ResultCache, audio_fingerprint
+from src.decoding_profile import DecodingProfile
+from src.metrics import REGISTRY, span
+from typing import List, Dict, Optional, Sequence, Tuple, Union, Any
+import numpy as np
 import torch
 
+logger = logging.getLogger(__name__)
+
+PROGRESSIVE = REGISTRY.counter(
+    "bgm_progressive_total",
+    "Progressive transcription outcomes (early_exit: answered from the prefix, fallback: full transcription).",
+    labelnames=("outcome",),
+)
+
 
 class MusicRecommendationPipeline:
-    def __init__(self, whisper_model_size="base", device=None):
+    def __init__(
+        self,
+        whisper_model_size="base",
+        device=None,
+        lazy: bool = False,
+        cpu_profile: Optional[CPUInferenceProfile] = None,
+    ):
         """
         음악 추천 파이프라인의 모든 구성 요소를 초기화합니다.
+
+        모델은 프로세스 공용 레지스트리에서 가져오므로, 이미 로드(예: fork 전 preload)되어 있으면 다시 로드하지 않습니다.
+        `lazy=True`이면 모델 로드를 첫 요청 시점으로 미룹니다.
+        `cpu_profile`은 Whisper 모델에 적용할 CPU 추론 최적화(int8 양자화, torch.compile)입니다.
         """
         self.device = device
-        print("Initializing pipeline components...")
-        self.recommender = AudioRecommender(whisper_model_size=whisper_model_size, device=self.device)
-        print("Pipeline initialized.")
+        logger.info("Initializing pipeline components...")
+        self.speech_to_text = SpeechToText(
+            model_size=whisper_model_size, device=self.device, lazy=lazy, profile=cpu_profile
+        )
+        self.recommender = AudioRecommender(device=self.device, speech_to_text=self.speech_to_text, lazy=lazy)
+        self.cache: Optional[ResultCache] = None
+        # (앞부분 길이(초), 최소 결정 여유). None이면 항상 전체를 변환합니다.
+        self.progressive: Optional[Tuple[float, float]] = None
+        logger.info("Pipeline initialized.")
+
+    def warm_up(self):
+        """Whisper와 CLAP 텍스트 인코더를 한 번씩 실행해, 첫 요청이 초기화 비용을 치르지 않도록 합니다."""
+        self.speech_to_text.warm_up()
+        self.recommender.warm_up()
+
+    def enable_cache(self, cache: ResultCache):
+        """
+        반복 업로드에 대한 결과 캐시를 사용합니다.
+
+        같은 오디오는 Whisper를 건너뛰고, 같은 텍스트·DB 버전·top_k 조합은 검색도 건너뜁니다.
+        """
+        self.cache = cache
 
-    def run(self, audio_path: str) -> List[str]:
+    def enable_progressive(self, prefix_seconds: float = 10.0, min_margin: float = 0.1):
+        """
+        긴 오디오를 앞부분부터 변환해, 추천이 이미 확실하면 나머지 변환을 건너뜁니다.
+
+        `prefix_seconds`보다 긴 오디오는 먼저 앞 `prefix_seconds`초만 변환해 추천해 봅니다.
+        top-k 마지막 곡과 그다음 후보의 원시 점수 차이가 DB 점수 표준편차의 `min_margin`배 이상이면
+        (`AudioRecommender.decision_margin`) 그 결과를 반환하고, 아니면 전체를 변환합니다.
+        점수 분포가 없는 DB(보정 없이 빌드)나, 결과를 다양성 재순위(MMR) 또는 태그 가중치로 정하는 요청은
+        여유를 잴 수 없으므로 항상 전체를 변환합니다.
+        """
+        if prefix_seconds <= 0:
+            raise ValueError("prefix_seconds must be positive.")
+        self.progressive = (prefix_seconds, min_margin)
+
+    def _transcript_key(self, audio: Union[str, np.ndarray], decoding: Optional[DecodingProfile]) -> str:
+        """변환 결과 캐시 키. 기본 디코딩이 아니면 프로필을 키에 붙여, 설정이 다른 변환 결과를 섞지 않습니다."""
+        fingerprint = audio_fingerprint(audio)
+        decoding = decoding or self.speech_to_text.decoding
+        if decoding == DecodingProfile():
+            return fingerprint
+        return f"{fingerprint}:{decoding.key}"
+
+    def run(
+        self,
+        audio: Union[str, np.ndarray],
+        embedding_db: Union[EmbeddingDatabase, Sequence[Tuple[str, torch.Tensor]]],
+        top_k: int = 5,
+        db_version: Optional[str] = None,
+        tags: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        diversity: Optional[float] = None,
+        decoding: Optional[DecodingProfile] = None,
+    ) -> List[Dict[str, Any]]:
         """
         전체 음악 추천 파이프라인을 실행합니다.
 
         Args:
-            audio_path (str): 입력 오디오 파일의 경로.
+            audio: 입력 오디오 파일의 경로, 또는 이미 디코딩된 16kHz 모노 float32 파형.
+            embedding_db: 검색 대상 음악 임베딩 DB.
+            top_k (int): 추천할 최대 곡 수.
+            db_version (str): 추천 결과 캐시 키에 쓸 DB 버전. 생략하면 DB에 기록된 버전을 사용하며,
+                버전을 알 수 없으면 추천 결과는 캐시하지 않습니다.
+            tags: 이 태그 중 하나라도 가진 곡만 추천합니다.
+            exclude: 추천에서 뺄 곡의 파일 이름 또는 경로.
+            diversity: 다양성 재순위(MMR) 강도. 생략하면 추천기 기본값을 사용합니다.
+            decoding: 이 요청의 Whisper 디코딩 프로필. 생략하면 서버 기본값을 사용합니다.
 
         Returns:
-            추천된 음악 파일 이름의 리스트.
+            `file_name`, `file_path`, `score`를 담은 추천 결과 딕셔너리의 리스트 (점수 내림차순).
+            점수 보정이 있는 DB에서는 `score`가 보정 점수(0~1)이고 원시 유사도는 `raw_score`에 담깁니다.
         """
-        if not os.path.exists(audio_path):
-            print(f"오류: 입력 오디오 파일을 찾을 수 없습니다: {audio_path}")
+        if isinstance(audio, str) and not os.path.exists(audio):
+            logger.error("입력 오디오 파일을 찾을 수 없습니다: %s", audio)
             return []
 
         # 단계 1: 음성을 텍스트로 변환
-        print("\n--- 단계 1: 음성 텍스트 변환 ---")
-        print(f"음성 인식을 위해 다음 파일을 사용합니다: {audio_path}")
-        transcribed_text = self.recommender.transcribe_audio(audio_path)
+        if isinstance(audio, str):
+            logger.info("단계 1: 음성 텍스트 변환 (파일 %s)", audio)
+        else:
+            logger.info("단계 1: 음성 텍스트 변환 (디코딩된 파형 %.1fs)", len(audio) / WHISPER_SAMPLE_RATE)
+        with span("transcript_cache"):
+            fingerprint = self._transcript_key(audio, decoding) if self.cache is not None else None
+            transcribed_text = self.cache.transcripts.get(fingerprint) if self.cache is not None else MISSING
+        if transcribed_text is MISSING:
+            if self.progressive is not None and getattr(embedding_db, "calibration", None) is not None:
+                if isinstance(audio, str):
+                    # 앞부분과 (필요하면) 전체 변환이 같은 파형을 쓰도록 한 번만 디코딩합니다.
+                    with span("file_decode"):
+                        audio = load_audio(audio)
+                early = self._run_prefix(
+                    audio, fingerprint, embedding_db, top_k, db_version, tags, exclude, diversity, decoding
+                )
+                if early is not None:
+                    return early
+            with span("transcribe"):
+                transcribed_text = self.speech_to_text.transcribe(audio, decoding)
+            if self.cache is not None and transcribed_text:
+                self.cache.transcripts.set(fingerprint, transcribed_text)
+        else:
+            logger.info("캐시된 음성 변환 결과를 사용합니다.")
 
         if not transcribed_text:
-            print("경고: 음성 인식에 실패했거나 텍스트가 없습니다. 추천을 진행할 수 없습니다.")
+            logger.warning("음성 인식에 실패했거나 텍스트가 없습니다. 추천을 진행할 수 없습니다.")
             return []
 
-        print(f"\n인식된 텍스트: '{transcribed_text}'")
+        logger.info("인식된 텍스트: '%s'", transcribed_text)
+        return self._recommend(transcribed_text, embedding_db, top_k, db_version, tags, exclude, diversity)
 
-        # 단계 2: 텍스트 기반으로 음악 추천
-        print("\n--- 단계 2: 음악 추천 생성 ---")
-        recommendations = self.recommender.recommend_from_text(transcribed_text)
+    def _run_prefix(
+        self,
+        audio: np.ndarray,
+        fingerprint: Optional[str],
+        embedding_db: EmbeddingDatabase,
+        top_k: int,
+        db_version: Optional[str],
+        tags: Optional[Sequence[str]],
+        exclude: Optional[Sequence[str]],
+        diversity: Optional[float],
+        decoding: Optional[DecodingProfile],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """앞부분 변환만으로 추천이 확실하면 그 추천 결과를, 아니면 None을 반환합니다."""
+        prefix_seconds, min_margin = self.progressive
+        prefix_samples = int(prefix_seconds * WHISPER_SAMPLE_RATE)
+        if len(audio) <= prefix_samples:
+            return None
+
+        prefix_key = f"{fingerprint}:prefix{prefix_seconds:g}" if fingerprint is not None else None
+        prefix_text = self.cache.transcripts.get(prefix_key) if prefix_key is not None else MISSING
+        if prefix_text is MISSING:
+            with span("transcribe_prefix"):
+                prefix_text = self.speech_to_text.transcribe(audio[:prefix_samples], decoding)
+            if prefix_key is not None and prefix_text:
+                self.cache.transcripts.set(prefix_key, prefix_text)
+
+        margin = None
+        if prefix_text:
+            margin = self.recommender.decision_margin(
+                prefix_text, embedding_db, top_k, tags=tags, exclude=exclude, diversity=diversity
+            )
+        if margin is None or margin < min_margin:
+            logger.info("앞 %gs 변환으로는 추천이 불확실합니다 (여유 %s). 전체를 변환합니다.", prefix_seconds, margin)
+            PROGRESSIVE.inc(outcome="fallback")
+            return None
+
+        logger.info("앞 %gs 변환 결과로 추천합니다 (여유 %.2f): '%s'", prefix_seconds, margin, prefix_text)
+        PROGRESSIVE.inc(outcome="early_exit")
+        return self._recommend(prefix_text, embedding_db, top_k, db_version, tags, exclude, diversity)
+
+    def _recommend(
+        self,
+        text: str,
+        embedding_db: Union[EmbeddingDatabase, Sequence[Tuple[str, torch.Tensor]]],
+        top_k: int,
+        db_version: Optional[str],
+        tags: Optional[Sequence[str]],
+        exclude: Optional[Sequence[str]],
+        diversity: Optional[float],
+    ) -> List[Dict[str, Any]]:
+        # 단계 2: 텍스트 임베딩과 음악 임베딩의 유사도로 추천
+        logger.info("단계 2: 음악 추천 생성")
+        db_version = db_version or getattr(embedding_db, "version", None)
+        cache_key = None
+        if self.cache is not None and db_version:
+            options: Dict[str, Any] = {}
+            if tags:
+                options["tags"] = sorted(tags)
+            if exclude:
+                options["exclude"] = sorted(exclude)
+            if diversity is not None:
+                options["diversity"] = diversity
+            cache_key = ResultCache.recommendation_key(text, db_version, top_k, options)
+            cached = self.cache.recommendations.get(cache_key)
+            if cached is not MISSING:
+                logger.info("캐시된 추천 결과를 사용합니다.")
+                return cached
+
+        recommendations = self.recommender.recommend_from_db(
+            text, embedding_db, top_k=top_k, tags=tags, exclude=exclude, diversity=diversity
+        )
+        if cache_key is not None:
+            self.cache.recommendations.set(cache_key, recommendations)
 
         if recommendations:
-            print("\n--- 파이프라인 종료: 추천 목록 ---")
-            for i, r in enumerate(recommendations, 1):
-                print(f"{i}. {r}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "추천 목록: %s",
+                    ", ".join(f"{r['file_name']} ({r['score']:.4f})" for r in recommendations),
+                )
         else:
-            print("\n--- 파이프라인 종료: 추천된 음악이 없습니다. ---")
+            logger.info("추천된 음악이 없습니다.")
 
         return recommendations
+
+    def run_batch(
+        self,
+        audios: Sequence[Union[str, np.ndarray]],
+        embedding_db: Union[EmbeddingDatabase, Sequence[Tuple[str, torch.Tensor]]],
+        top_k: int = 5,
+        db_version: Optional[str] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        여러 오디오에 대한 추천을 한 번에 실행합니다.
+
+        캐시에 없는 오디오만 Whisper 배치 디코딩으로 변환하고, 모든 텍스트의 임베딩을 한 번에 계산한 뒤
+        행렬-행렬 곱 한 번으로 검색합니다. 결과 캐시는 `run()`과 같은 키를 공유합니다.
+
+        Returns:
+            입력 순서대로의 추천 결과 리스트. 음성이 없거나 변환에 실패한 오디오는 빈 리스트입니다.
+        """
+        db_version = db_version or getattr(embedding_db, "version", None)
+
+        # 단계 1: 캐시에 없는 오디오만 배치로 변환
+        texts: List[Any] = [MISSING] * len(audios)
+        if self.cache is not None:
+            fingerprints = [self._transcript_key(audio, None) for audio in audios]
+            texts = [self.cache.transcripts.get(fp) for fp in fingerprints]
+        pending = [i for i, text in enumerate(texts) if text is MISSING]
+        if pending:
+            with span("transcribe_batch"):
+                transcribed = self.speech_to_text.transcribe_many([audios[i] for i in pending])
+            for i, text in zip(pending, transcribed):
+                texts[i] = text
+                if self.cache is not None and text:
+                    self.cache.transcripts.set(fingerprints[i], text)
+        logger.info("배치 음성 변환 완료: %d개 중 %d개 변환, %d개 캐시", len(audios), len(pending), len(audios) - len(pending))
+
+        # 단계 2: 캐시에 없는 텍스트만 한 번에 검색
+        results: List[Any] = [[] if not text else MISSING for text in texts]
+        keys: Dict[int, str] = {}
+        if self.cache is not None and db_version:
+            for i, text in enumerate(texts):
+                if text:
+                    keys[i] = ResultCache.recommendation_key(text, db_version, top_k)
+                    results[i] = self.cache.recommendations.get(keys[i])
+
+        todo = [i for i, result in enumerate(results) if result is MISSING]
+        if todo:
+            with span("rank_batch"):
+                recommended = self.recommender.recommend_batch([texts[i] for i in todo], embedding_db, top_k=top_k)
+            for i, recommendations in zip(todo, recommended):
+                results[i] = recommendations
+                if i in keys:
+                    self.cache.recommendations.set(keys[i], recommendations)
+        return results
@@ -0,0 +1,116 @@
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+from src.cache import MISSING, LRUCache
+
+DEFAULT_REGION = "ap-northeast-2"
+
+# 프로세스당 하나씩 만들어 재사용하는 S3 클라이언트 (리전, 엔드포인트별)
+_clients: Dict[Tuple[Optional[str], Optional[str]], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_s3_client(region: Optional[str] = None, endpoint_url: Optional[str] = None, max_pool_connections: int = 32):
+    """
+    프로세스에서 공유하는 S3 클라이언트를 반환합니다. 처음 호출할 때만 만듭니다.
+
+    boto3 클라이언트는 스레드 안전하므로 요청마다 새로 만들 필요가 없습니다. 새로 만들면 매번
+    자격 증명 탐색과 서비스 모델 로드 비용이 들고, 커넥션 풀도 재사용되지 않습니다.
+    `endpoint_url`로 로컬 S3 대역(moto 서버, MinIO 등)을 가리킬 수 있습니다.
+    """
+    region = region or os.getenv("AWS_REGION", DEFAULT_REGION)
+    key = (region, endpoint_url)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # 세션은 스레드 안전하지 않으므로 전용 세션에서 클라이언트를 한 번만 만듭니다.
+            client = boto3.session.Session().client(
+                "s3",
+                region_name=region,
+                endpoint_url=endpoint_url,
+                config=Config(max_pool_connections=max_pool_connections),
+            )
+            _clients[key] = client
+    return client
+
+
+def object_key(file_path: str, prefix: str = "music_library/") -> str:
+    """
+    DB의 파일 경로를 S3 객체 키로 바꿉니다.
+
+    `s3://<bucket>/<key>` 형식이면 그 키를, 아니면 `prefix` 뒤에 파일 이름을 붙인 키를 사용합니다.
+    (서버 컨테이너의 음악 라이브러리와 버킷의 `music_library/`가 같은 파일을 담고 있다는 전제)
+    """
+    if file_path.startswith("s3://"):
+        return file_path[len("s3://"):].partition("/")[2]
+    return prefix + os.path.basename(file_path)
+
+
+class PresignedURLCache:
+    """
+    객체 키별로 서명한 다운로드 URL을 재사용하는 캐시.
+
+    URL은 `expires_in`초 동안 유효하지만 캐시에는 `reuse_seconds`초만 보관하므로, 캐시에서 꺼낸 URL도
+    항상 최소 `expires_in - reuse_seconds`초는 더 유효합니다. 서명은 네트워크 호출 없이 로컬에서 계산되지만
+    인기 곡은 같은 키가 반복해서 요청되므로, 캐시 적중 시에는 HMAC 계산도 생략됩니다.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        expires_in: int = 3600,
+        reuse_seconds: Optional[float] = None,
+        max_entries: int = 4096,
+        client: Any = None,
+        region: Optional[str] = None,
+        endpoint_url: Optional[str] = None,
+    ):
+        reuse_seconds = expires_in / 2 if reuse_seconds is None else reuse_seconds
+        if not 0 < reuse_seconds < expires_in:
+            raise ValueError("reuse_seconds must be between 0 and expires_in")
+        self.bucket = bucket
+        self.expires_in = expires_in
+        self.reuse_seconds = reuse_seconds
+        self._client = client
+        self._region = region
+        self._endpoint_url = endpoint_url
+        self.cache = LRUCache(max_entries=max_entries, ttl_seconds=reuse_seconds)
+
+    @property
+    def client(self):
+        """주입된 클라이언트가 없으면 첫 서명 시점에 프로세스 공유 클라이언트를 가져옵니다."""
+        if self._client is None:
+            self._client = get_s3_client(self._region, self._endpoint_url)
+        return self._client
+
+    def url(self, key: str) -> str:
+        """
+        `key`의 다운로드 URL을 반환합니다.
+
+        Raises:
+            botocore.exceptions.ClientError, NoCredentialsError: 서명에 실패한 경우.
+        """
+        url = self.cache.get(key)
+        if url is not MISSING:
+            return url
+        url = self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=self.expires_in,
+        )
+        self.cache.set(key, url)
+        return url
+
+    def urls(self, keys: Iterable[str]) -> Dict[str, str]:
+        """여러 키의 URL을 한 번에 반환합니다. (중복 키는 한 번만 서명)"""
+        return {key: self.url(key) for key in dict.fromkeys(keys)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "expires_in": self.expires_in, "reuse_seconds": self.reuse_seconds}
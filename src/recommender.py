@@ -1,50 +1,132 @@
 import os
 import json
-import random
-from typing import List, Dict, cast
-import whisper
+import logging
+import weakref
+from typing import Any, List, Dict, Optional, Sequence, Tuple, Union
+import numpy as np
 import torch
+from transformers import ClapModel, ClapProcessor
+
+from src import model_registry
+from src.cache import MISSING, LRUCache
+from src.embedding_db import EmbeddingDatabase, as_embedding_db, top_k_order
+from src.metrics import span
+from src.model_registry import CLAP_MODEL_NAME
+from src.rerank import mmr
+from src.speech_to_text import SpeechToText
+from src.tag_embeddings import tag_vocabulary
+from src.tag_index import KEYWORDS_FILE_NAME, HybridScorer, KeywordTable, TagIndex
+
+logger = logging.getLogger(__name__)
+
+# 메모이즈할 텍스트 임베딩 수 (768차원 float32 기준 1024개 ≈ 3MB)
+TEXT_EMBEDDING_CACHE_SIZE = 1024
+# 근사 인덱스가 붙은 DB에서 하이브리드 점수를 매길 때, 임베딩 후보를 top_k의 몇 배까지 가져올지
+HYBRID_OVERSAMPLE = 4
+# 다양성 재순위(MMR)에 넘길 후보 수 = top_k의 몇 배
+MMR_OVERSAMPLE = 4
+
 
 class AudioRecommender:
-    whisper_model: whisper.Whisper
+    speech_to_text: SpeechToText
     device: str
     music_tags: Dict[str, List[str]]
+    keyword_table: KeywordTable
+    scorer: Optional[HybridScorer] = None
+    diversity: float = 0.0
+    text_embedding_cache: LRUCache
 
-    def __init__(self, whisper_model_size="base", device=None):
+    def __init__(
+        self,
+        whisper_model_size="base",
+        device=None,
+        speech_to_text: Optional[SpeechToText] = None,
+        text_cache_size: int = TEXT_EMBEDDING_CACHE_SIZE,
+        lazy: bool = False,
+    ):
         """
-        Initialize the AudioRecommender with a Whisper model.
-        The recommendation logic is now based on keyword-tag matching.
+        Initialize the AudioRecommender with a Whisper model and a CLAP model.
+        Recommendations are ranked by CLAP text-to-audio similarity.
 
         Args:
             whisper_model_size (str): Size of the Whisper model to use.
             device (str): Device to run models on ('cuda' or 'cpu').
+            speech_to_text (SpeechToText): An already loaded transcriber to share.
+                If omitted, a new one is created with `whisper_model_size`.
+            text_cache_size (int): Number of text embeddings to memoize (LRU).
+            lazy (bool): Defer loading models until they are first used.
         """
-        if device is None:
-            self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        else:
-            self.device = device
+        self.device = model_registry.resolve_device(device)
+
+        logger.info("Using device: %s", self.device)
 
-        print(f"Using device: {self.device}")
+        if speech_to_text is None:
+            speech_to_text = SpeechToText(model_size=whisper_model_size, device=self.device, lazy=lazy)
+        self.speech_to_text = speech_to_text
 
-        print(f"Loading Whisper model ({whisper_model_size})...")
-        self.whisper_model = whisper.load_model(whisper_model_size)
-        self.whisper_model = self.whisper_model.to(self.device)
+        self._clap_model: Optional[ClapModel] = None
+        self._clap_processor: Optional[ClapProcessor] = None
+        if not lazy:
+            self._load_clap()
+        self.text_embedding_cache = LRUCache(max_entries=text_cache_size)
 
-        print("Loading music tags...")
+        logger.info("Loading music tags...")
         try:
             with open("tags.json", "r", encoding="utf-8") as f:
                 self.music_tags = json.load(f)
         except FileNotFoundError:
-            print("Error: tags.json not found. Please create it in the project root.")
+            logger.error("tags.json not found. Please create it in the project root.")
             self.music_tags = {}
         except json.JSONDecodeError:
-            print("Error: tags.json is not a valid JSON file.")
+            logger.error("tags.json is not a valid JSON file.")
             self.music_tags = {}
 
+        try:
+            self.keyword_table = KeywordTable.load(KEYWORDS_FILE_NAME)
+        except (FileNotFoundError, json.JSONDecodeError):
+            logger.warning("%s not found or invalid. Matching tag names only.", KEYWORDS_FILE_NAME)
+            self.keyword_table = KeywordTable.from_tags(tag_vocabulary(self.music_tags))
+        # DB마다 한 번만 만드는 태그 역색인. DB 스냅샷이 교체되어 버려지면 함께 정리됩니다.
+        self._tag_indexes: "weakref.WeakKeyDictionary[EmbeddingDatabase, TagIndex]" = weakref.WeakKeyDictionary()
+        self._catalog_index = TagIndex(self.music_tags)
+
+    def _load_clap(self) -> None:
+        if self._clap_model is None or self._clap_processor is None:
+            self._clap_model, self._clap_processor = model_registry.get_clap(CLAP_MODEL_NAME, self.device)
+
+    @property
+    def clap_model(self) -> ClapModel:
+        """The shared CLAP model, loaded on first access."""
+        self._load_clap()
+        return self._clap_model
+
+    @clap_model.setter
+    def clap_model(self, model: ClapModel) -> None:
+        self._clap_model = model
+
+    @property
+    def clap_processor(self) -> ClapProcessor:
+        self._load_clap()
+        return self._clap_processor
+
+    @clap_processor.setter
+    def clap_processor(self, processor: ClapProcessor) -> None:
+        self._clap_processor = processor
+
+    def warm_up(self) -> None:
+        """Runs the CLAP text tower once so the first request doesn't pay for lazy initialization."""
+        inputs = self.clap_processor(text=["warm up"], return_tensors="pt", padding=True)
+        inputs = {key: value.to(self.device) for key, value in inputs.items()}
+        with torch.no_grad():
+            self.clap_model.get_text_features(**inputs)
+
     def recommend_from_text(self, text: str) -> List[str]:
         """
-        Recommends music based on keywords found in the text.
-        (Temporarily modified to return random recommendations)
+        Recommends music from tags.json by the keywords found in the text.
+
+        Keywords (and their synonyms from keywords.json) are mapped to tags, and
+        tracks are looked up in the tag inverted index, ranked by how many of the
+        detected tags they carry. Text without any keyword falls back to neutral music.
 
         Args:
             text (str): The input text (e.g., from speech-to-text).
@@ -52,44 +134,405 @@ class AudioRecommender:
         Returns:
             A list of recommended music file names.
         """
-        # --- 기존 키워드 기반 추천 로직 (임시 주석 처리) ---
-        # sad_keywords = ['이별', '헤어지자', '슬퍼', '슬픔', '눈물']
-        # happy_keywords = ['파티', '신난다', '행복', '즐거움', '기쁨', '축하']
-        #
-        # recommended_music = []
-        # text_lower = text.lower()
-        #
-        # found_sad = any(keyword in text_lower for keyword in sad_keywords)
-        # found_happy = any(keyword in text_lower for keyword in happy_keywords)
-        #
-        # target_tags = set()
-        # if found_sad:
-        #     print("Detected sad keywords.")
-        #     target_tags.update(['슬픔', '차분함'])
-        #
-        # if found_happy:
-        #     print("Detected happy keywords.")
-        #     target_tags.update(['밝음', '즐거움', '신남'])
-        #
-        # if not target_tags:
-        #     print("No specific keywords found, recommending neutral music.")
-        #     target_tags.add('중립')
-        #
-        # for music_file, tags in self.music_tags.items():
-        #     if any(tag in tags for tag in target_tags):
-        #         recommended_music.append(music_file)
-        #
-        # return recommended_music
-
-        # --- 임시 랜덤 추천 로직 ---
-        print("Using temporary random recommendation logic.")
-        all_music = list(self.music_tags.keys())
-        if not all_music:
+        target_tags = self.keyword_table.tags_for_text(text)
+        if not target_tags:
+            logger.info("No specific keywords found, recommending neutral music.")
+            target_tags = ['중립']
+        else:
+            logger.info("Detected tags: %s", target_tags)
+
+        rows = self._catalog_index.rows_for(target_tags)
+        if len(rows) == 0:
+            return []
+        match = self._catalog_index.match_fraction(target_tags)[rows]
+        names = list(self.music_tags)
+        return [names[row] for row in rows[np.argsort(-match, kind="stable")]]
+
+    def enable_hybrid(self, scorer: HybridScorer) -> None:
+        """
+        Mixes tag-match boosts into the CLAP similarity ranking.
+
+        Tags detected in the query text (through the keyword table) boost the
+        tracks that carry them, weighted by `scorer`.
+        """
+        self.scorer = scorer
+
+    def enable_mmr(self, diversity: float = 0.3) -> None:
+        """
+        Reranks results with maximal marginal relevance by default, so that
+        near-duplicate tracks (e.g. two arrangements of one song) are not
+        recommended side by side. Requests can still override `diversity`.
+
+        Args:
+            diversity (float): 0 keeps the relevance order; higher values trade
+                relevance for variety.
+        """
+        self.diversity = diversity
+
+    def tag_index(self, db: EmbeddingDatabase) -> TagIndex:
+        """The tag inverted index over `db`'s rows, built once per database."""
+        index = self._tag_indexes.get(db)
+        if index is None:
+            index = TagIndex(self.music_tags, db.paths)
+            self._tag_indexes[db] = index
+        return index
+
+    def get_text_embedding(self, text: str) -> torch.Tensor:
+        """
+        Computes a CLAP text embedding for the given text.
+
+        Results are memoized in a bounded LRU cache, since transcripts tend to
+        repeat the same short phrases.
+
+        Args:
+            text (str): The input text (e.g., from speech-to-text).
+
+        Returns:
+            A tensor of shape [1, D] on the CPU. Treat it as read-only; it may be shared.
+        """
+        cached = self.text_embedding_cache.get(text)
+        if cached is not MISSING:
+            return cached
+
+        inputs = self.clap_processor(text=[text], return_tensors="pt", padding=True)
+        inputs = {key: value.to(self.device) for key, value in inputs.items()}
+        with torch.no_grad():
+            text_embedding = self.clap_model.get_text_features(**inputs).cpu()
+        self.text_embedding_cache.set(text, text_embedding)
+        return text_embedding
+
+    def get_text_embeddings(self, texts: Sequence[str]) -> torch.Tensor:
+        """
+        Computes CLAP text embeddings for several texts, running the text tower
+        once for all texts that are not memoized yet.
+
+        Args:
+            texts: The input texts.
+
+        Returns:
+            A tensor of shape [len(texts), D] on the CPU.
+        """
+        embeddings: List[Any] = [self.text_embedding_cache.get(text) for text in texts]
+        missing = sorted({text for text, embedding in zip(texts, embeddings) if embedding is MISSING})
+        if missing:
+            inputs = self.clap_processor(text=missing, return_tensors="pt", padding=True)
+            inputs = {key: value.to(self.device) for key, value in inputs.items()}
+            with torch.no_grad():
+                computed = self.clap_model.get_text_features(**inputs).cpu()
+            by_text = {}
+            for text, embedding in zip(missing, computed):
+                by_text[text] = embedding.unsqueeze(0)
+                self.text_embedding_cache.set(text, by_text[text])
+            embeddings = [
+                by_text[text] if embedding is MISSING else embedding
+                for text, embedding in zip(texts, embeddings)
+            ]
+        return torch.cat(embeddings, dim=0)
+
+    def _query_embedding(self, text: str, db: EmbeddingDatabase) -> Any:
+        """Uses the precomputed tag embedding when the text is exactly a tag term, else the text encoder."""
+        tag_embeddings = db.tag_embeddings
+        if tag_embeddings is not None and text in tag_embeddings:
+            return tag_embeddings.get(text)
+        return self.get_text_embedding(text)
+
+    def recommend_from_db(
+        self,
+        text: str,
+        embedding_db: Union[EmbeddingDatabase, Sequence[Tuple[str, torch.Tensor]]],
+        top_k: int = 5,
+        tags: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        diversity: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Recommends music whose CLAP audio embedding is closest to the text embedding.
+
+        With hybrid ranking enabled, tracks carrying the tags detected in the text
+        are boosted.
+
+        Args:
+            text (str): The input text (e.g., from speech-to-text).
+            embedding_db: An EmbeddingDatabase, or the raw list of `(path, tensor)`
+                tuples (stacked on the fly, which is slower).
+            top_k (int): Maximum number of recommendations to return.
+            tags: If given, only tracks carrying at least one of these tags are
+                searched. The candidate set is narrowed before the vector search.
+            exclude: File names or paths of tracks never to recommend.
+            diversity: MMR diversity for this call (see `enable_mmr`). Defaults
+                to the recommender-wide setting.
+
+        Returns:
+            A list of dicts with `file_name`, `file_path` and `score`, best first
+            (or in MMR selection order when diversifying). If the DB was built with
+            a score calibration, `score` is the calibrated 0-1 percentile of the
+            track's cosine similarity and the ranking score (the similarity, or the
+            hybrid score when tags were boosted) is returned as `raw_score`.
+        """
+        db = as_embedding_db(embedding_db)
+        if len(db) == 0:
+            raise ValueError("The provided embedding database is empty.")
+
+        with span("text_embedding"):
+            query = self._query_embedding(text, db)
+        with span("search"):
+            return self._search(
+                db,
+                query,
+                top_k,
+                boost_tags=self._boost_tags(text),
+                filter_tags=tags,
+                exclude=exclude,
+                diversity=diversity,
+            )
+
+    def decision_margin(
+        self,
+        text: str,
+        embedding_db: Union[EmbeddingDatabase, Sequence[Tuple[str, torch.Tensor]]],
+        top_k: int = 5,
+        tags: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        diversity: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        How clearly the top `top_k` tracks for `text` stand out from the rest.
+
+        The margin is the gap between the k-th and the (k+1)-th best cosine
+        similarity, in units of the DB's score standard deviation. A large margin
+        means a slightly different transcript is unlikely to change the top-k set.
+        The text embedding is memoized, so calling this next to `recommend_from_db`
+        costs one more search.
+
+        The margin only describes a list ranked by cosine similarity. When
+        `recommend_from_db` would rerank with MMR (`diversity` > 0) or boost tags
+        found in `text`, the served list is not ranked on the distribution's scale,
+        so no margin is reported.
+
+        Args:
+            text (str): The input text.
+            embedding_db: The database to search.
+            top_k (int): Size of the recommendation list.
+            tags: Tag filter, as in `recommend_from_db`.
+            exclude: Excluded tracks, as in `recommend_from_db`.
+            diversity: MMR diversity the list will be served with, as in
+                `recommend_from_db`. Defaults to the recommender-wide setting.
+
+        Returns:
+            The margin (`inf` if no other candidate could enter the top-k), or
+            `None` if the DB has no score distribution or the list would be
+            reranked with MMR or tag boosts.
+        """
+        db = as_embedding_db(embedding_db)
+        calibration = getattr(db, "calibration", None)
+        diversity = self.diversity if diversity is None else diversity
+        if calibration is None or len(db) == 0 or diversity > 0 or self._boost_tags(text):
+            return None
+        query = self._query_embedding(text, db)
+        results = self._search(db, query, top_k + 1, filter_tags=tags, exclude=exclude, diversity=0.0)
+        if len(results) <= top_k:
+            return float("inf")
+        raw = sorted((r.get("raw_score", r["score"]) for r in results), reverse=True)
+        return (raw[top_k - 1] - raw[top_k]) / calibration.std
+
+    def recommend_from_tags(
+        self,
+        tags: Sequence[str],
+        embedding_db: Union[EmbeddingDatabase, Sequence[Tuple[str, torch.Tensor]]],
+        top_k: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """
+        Recommends music for a set of mood/tag terms (e.g. `["평온", "휴식"]`).
+
+        Tags from the vocabulary built with the DB are looked up in its precomputed
+        tag embedding matrix, so the text encoder is not run. Any other term is
+        embedded with `get_text_embedding`. The query is the mean of the normalized
+        term embeddings. With hybrid ranking enabled, tracks carrying the tags are boosted.
+
+        Args:
+            tags: Tag terms to combine into one query.
+            embedding_db: The database to search.
+            top_k (int): Maximum number of recommendations to return.
+
+        Returns:
+            A list of dicts with `file_name`, `file_path` and `score`, best first.
+        """
+        db = as_embedding_db(embedding_db)
+        if len(db) == 0:
+            raise ValueError("The provided embedding database is empty.")
+        tags = [tag for tag in tags if tag.strip()]
+        if not tags:
+            raise ValueError("At least one tag is required.")
+
+        vectors = []
+        for tag in tags:
+            vector = np.asarray(self._query_embedding(tag, db), dtype=np.float32).reshape(-1)
+            vectors.append(vector / (np.linalg.norm(vector) or 1.0))
+        boost_tags = tags if self.scorer is not None else ()
+        return self._search(db, np.mean(vectors, axis=0, keepdims=True), top_k, boost_tags=boost_tags)
+
+    def recommend_batch(
+        self,
+        texts: Sequence[str],
+        embedding_db: Union[EmbeddingDatabase, Sequence[Tuple[str, torch.Tensor]]],
+        top_k: int = 5,
+        tags: Optional[Sequence[str]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Recommends music for several texts with one batched text-encoder pass
+        and one matrix-matrix similarity search.
+
+        Texts that need tag boosts or a tag filter are ranked one by one with the
+        same scoring as `recommend_from_db`; the rest share the batched search.
+
+        Args:
+            texts: The input texts. Empty texts get an empty result.
+            embedding_db: The database to search.
+            top_k (int): Maximum number of recommendations per text.
+            tags: Optional tag filter applied to every text (see `recommend_from_db`).
+
+        Returns:
+            One recommendation list per input text, in input order.
+        """
+        db = as_embedding_db(embedding_db)
+        if len(db) == 0:
+            raise ValueError("The provided embedding database is empty.")
+
+        positions = [i for i, text in enumerate(texts) if text]
+        results: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        if not positions:
+            return results
+
+        queries = [texts[i] for i in positions]
+        tag_embeddings = db.tag_embeddings
+        encode = [q for q in queries if tag_embeddings is None or q not in tag_embeddings]
+        encoded = dict(zip(encode, self.get_text_embeddings(encode))) if encode else {}
+        matrix = np.stack([
+            np.asarray(encoded[q] if q in encoded else tag_embeddings.get(q), dtype=np.float32).reshape(-1)
+            for q in queries
+        ])
+
+        boosts = [self._boost_tags(q) for q in queries]
+        plain = [i for i, boost in enumerate(boosts) if not boost and not tags]
+        if plain:
+            pool = top_k * MMR_OVERSAMPLE if self.diversity > 0 else top_k
+            scores, indices = db.search_batch(matrix[plain], pool)
+            for i, row_scores, row_indices in zip(plain, scores, indices):
+                # 인덱스 검색에서 후보가 모자라 채워 넣은 칸은 버립니다.
+                found = row_indices >= 0
+                results[positions[i]] = self._rerank(db, row_scores[found], row_indices[found], top_k, self.diversity)
+        for i, boost in enumerate(boosts):
+            if boost or tags:
+                results[positions[i]] = self._search(db, matrix[i], top_k, boost_tags=boost, filter_tags=tags)
+        return results
+
+    def _boost_tags(self, text: str) -> List[str]:
+        """Tags to boost for `text` (empty unless hybrid ranking is enabled)."""
+        if self.scorer is None or self.scorer.tag_weight == 0:
             return []
-        
-        num_to_recommend = min(len(all_music), 3)
-        
-        return random.sample(all_music, num_to_recommend)
+        return self.keyword_table.tags_for_text(text)
+
+    def _search(
+        self,
+        db: EmbeddingDatabase,
+        query: Any,
+        top_k: int,
+        boost_tags: Sequence[str] = (),
+        filter_tags: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        diversity: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Vector search over the whole DB or the tracks with `filter_tags`.
+
+        Results are re-scored with tag boosts for `boost_tags`, with the
+        `exclude` tracks dropped, and finally diversified with MMR. Every step
+        works on the score vector or the candidate block as array operations.
+        """
+        diversity = self.diversity if diversity is None else diversity
+        # 다양성 재순위를 하려면 top_k보다 넉넉한 후보가 필요합니다.
+        pool = top_k * MMR_OVERSAMPLE if diversity > 0 else top_k
+
+        rows = None
+        if filter_tags:
+            rows = self.tag_index(db).rows_for(filter_tags)
+            if len(rows) == 0:
+                return []
+        excluded = db.find_rows(exclude) if exclude else np.empty(0, dtype=np.int64)
+        boosting = bool(boost_tags) and self.scorer is not None
+        if not boosting and len(excluded) == 0:
+            scores, indices = db.search(query, pool, rows=rows)
+            return self._rerank(db, scores, indices, top_k, diversity)
+
+        if rows is None and db.index is not None:
+            # 근사 인덱스의 상위 후보(와 태그가 일치하는 곡)만 정확히 다시 점수를 매깁니다.
+            nearest_k = (pool * HYBRID_OVERSAMPLE if boosting else pool) + len(excluded)
+            _, rows = db.search(query, nearest_k)
+            if boosting:
+                rows = np.union1d(rows, self.tag_index(db).rows_for(boost_tags))
+        scores = cosine = db.scores(query, rows)
+        if boosting:
+            match = self.tag_index(db).match_fraction(boost_tags)
+            scores = self.scorer.combine(cosine, match if rows is None else match[rows])
+        if len(excluded):
+            scores[excluded if rows is None else np.isin(rows, excluded)] = -np.inf
+
+        order = top_k_order(scores, pool)
+        order = order[np.isfinite(scores[order])]
+        indices = order if rows is None else rows[order]
+        return self._rerank(db, scores[order], indices, top_k, diversity, cosine=cosine[order] if boosting else None)
+
+    @staticmethod
+    def _rerank(
+        db: EmbeddingDatabase,
+        scores: np.ndarray,
+        indices: np.ndarray,
+        top_k: int,
+        diversity: float,
+        cosine: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Picks `top_k` of the best-first candidates, with MMR when `diversity` > 0.
+
+        `cosine` holds the candidates' cosine similarities when `scores` are hybrid scores.
+        """
+        if diversity > 0 and len(indices) > 1:
+            picked = mmr(np.asarray(db.matrix[indices], dtype=np.float32), scores, top_k, diversity)
+            scores, indices = scores[picked], indices[picked]
+            cosine = cosine[picked] if cosine is not None else None
+        cosine = cosine[:top_k] if cosine is not None else None
+        return AudioRecommender._to_recommendations(db, scores[:top_k], indices[:top_k], cosine)
+
+    @staticmethod
+    def _to_recommendations(
+        db: EmbeddingDatabase, scores: np.ndarray, indices: np.ndarray, cosine: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        When the DB carries a score distribution, `score` is the calibrated percentile
+        (0-1) and the ranking score is kept as `raw_score`.
+
+        The distribution is measured on plain cosine similarities, so only the cosine
+        component (`cosine`, or `scores` when there were no tag boosts) is calibrated.
+        With tag boosts the list follows the hybrid `raw_score`, so `score` need not
+        decrease down the list.
+        """
+        calibration = getattr(db, "calibration", None)
+        calibrated = None
+        if calibration is not None:
+            calibrated = calibration.calibrate(scores if cosine is None else cosine).tolist()
+        recommendations = []
+        for i, (score, index) in enumerate(zip(scores.tolist(), indices.tolist())):
+            file_path = db.paths[index]
+            recommendation = {
+                "file_name": os.path.basename(file_path),
+                "file_path": file_path,
+                "score": score,
+            }
+            if calibrated is not None:
+                recommendation["score"] = calibrated[i]
+                recommendation["raw_score"] = score
+            recommendations.append(recommendation)
+        return recommendations
 
     def transcribe_audio(self, audio_path: str) -> str:
         """
@@ -101,12 +544,4 @@ class AudioRecommender:
         Returns:
             The transcribed text.
         """
-        print(f"오디오 파일의 음성을 텍스트로 변환합니다: {audio_path}")
-        try:
-            result = self.whisper_model.transcribe(audio_path, fp16=torch.cuda.is_available())
-            text = cast(str, result.get("text", ""))
-            print("음성 변환 완료.")
-            return text
-        except Exception as e:
-            print(f"오류: 음성 변환 중 예외 발생 - {e}")
-            return ""
+        return self.speech_to_text.transcribe(audio_path)
@@ -0,0 +1,111 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+# 임베딩 저장소 디렉토리 안에 함께 저장되는 점수 보정 파일 이름
+CALIBRATION_FILE_NAME = "score_calibration.json"
+CALIBRATION_FORMAT_VERSION = 1
+# 저장할 분위수 개수 (0%, 1%, ..., 100%)
+NUM_QUANTILES = 101
+# 점수 분포를 잴 때 쓰는 최대 곡 수. 더 큰 라이브러리는 고정 시드로 뽑은 곡만 씁니다.
+# (분위수 101개를 추정하기에는 충분하고, [쿼리 수, 곡 수] 점수 행렬의 메모리를 라이브러리 크기와 무관하게 묶어 둡니다.)
+CALIBRATION_MAX_TRACKS = 20000
+
+# DB 빌드 시 점수 분포를 잴 기준 쿼리. 실제 쿼리(음성 변환 텍스트)와 비슷한 일상 문장과 분위기 표현입니다.
+REFERENCE_QUERIES = (
+    "오늘 하루 정말 피곤했어",
+    "친구들이랑 신나게 놀고 싶다",
+    "비 오는 날 창밖을 보고 있어",
+    "내일 중요한 발표가 있어서 긴장돼",
+    "헤어진 사람이 자꾸 생각나",
+    "주말에 바다로 여행 가자",
+    "조용한 카페에서 책을 읽고 있어",
+    "생일 축하해 정말 고마워",
+    "운동하면서 땀 흘리니까 기분 좋다",
+    "밤늦게 혼자 집에 걸어가는 중이야",
+    "아이들이 마당에서 뛰어놀고 있어",
+    "시험에 떨어져서 너무 속상해",
+    "a calm and peaceful evening",
+    "an energetic upbeat party",
+    "a sad and lonely night",
+    "a tense and dramatic scene",
+    "a warm romantic moment",
+    "a bright cheerful morning",
+)
+
+
+class ScoreCalibration:
+    """
+    한 DB 버전의 텍스트-곡 유사도 분포. 원시 코사인 유사도를 0~1의 보정 점수로 바꿉니다.
+
+    DB 빌드 시 기준 쿼리(태그 어휘 + `REFERENCE_QUERIES` + 지정한 문장)와 모든 곡의 유사도를 계산해
+    분위수만 저장합니다. 보정 점수는 그 분포에서의 백분위이므로 "0.97"은 "이 라이브러리의
+    쿼리-곡 쌍 97%보다 가깝다"는 뜻이 되고, 모델이나 라이브러리가 바뀌어도 같은 의미를 가집니다.
+    표준편차(`std`)는 점수 차이를 라이브러리의 점수 폭에 대한 비율로 나타낼 때 씁니다.
+    """
+
+    def __init__(self, quantiles: Sequence[float], mean: float, std: float, num_queries: int = 0):
+        quantiles = np.asarray(quantiles, dtype=np.float64)
+        if quantiles.ndim != 1 or len(quantiles) < 2 or np.any(np.diff(quantiles) < 0):
+            raise ValueError("Quantiles must be a non-decreasing sequence of at least two values.")
+        if not std > 0:
+            raise ValueError("std must be positive.")
+        self.quantiles = quantiles
+        self.levels = np.linspace(0.0, 1.0, len(quantiles))
+        self.mean = float(mean)
+        self.std = float(std)
+        self.num_queries = num_queries
+
+    @classmethod
+    def from_scores(cls, scores: Any, num_quantiles: int = NUM_QUANTILES) -> "ScoreCalibration":
+        """
+        `[쿼리 수, 곡 수]` 유사도 행렬로부터 분포를 만듭니다.
+
+        float32 행렬은 float64로 복사하지 않고 그대로 쓰며, 평균과 표준편차만 float64로 누적합니다.
+        """
+        scores = np.asarray(scores)
+        if not np.issubdtype(scores.dtype, np.floating):
+            scores = scores.astype(np.float64)
+        flat = scores.reshape(-1)
+        if len(flat) < 2:
+            raise ValueError("At least two scores are required to calibrate.")
+        quantiles = np.quantile(flat, np.linspace(0.0, 1.0, num_quantiles))
+        mean, std = flat.mean(dtype=np.float64), flat.std(dtype=np.float64)
+        return cls(quantiles, mean, max(std, 1e-6), num_queries=scores.shape[0] if scores.ndim == 2 else 1)
+
+    def calibrate(self, scores: Any) -> np.ndarray:
+        """원시 점수를 분포상의 백분위(0~1)로 바꿉니다. 분포 범위를 벗어난 점수는 0 또는 1이 됩니다."""
+        return np.interp(np.asarray(scores, dtype=np.float64), self.quantiles, self.levels)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "format_version": CALIBRATION_FORMAT_VERSION,
+            "quantiles": self.quantiles.tolist(),
+            "mean": self.mean,
+            "std": self.std,
+            "num_queries": self.num_queries,
+        }
+
+    def save(self, store_dir: Union[str, Path]) -> None:
+        """임베딩 저장소 디렉토리 안의 `score_calibration.json`으로 저장합니다."""
+        store_dir = Path(store_dir)
+        path = store_dir / CALIBRATION_FILE_NAME
+        tmp_path = store_dir / (CALIBRATION_FILE_NAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, store_dir: Union[str, Path]) -> Optional["ScoreCalibration"]:
+        """저장소 디렉토리에서 분포를 읽어옵니다. 파일이 없으면(예: 이전 빌드) None을 반환합니다."""
+        path = Path(store_dir) / CALIBRATION_FILE_NAME
+        if not path.is_file():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        if info.get("format_version") != CALIBRATION_FORMAT_VERSION:
+            raise ValueError(f"Unsupported score calibration format: {info.get('format_version')}")
+        return cls(info["quantiles"], info["mean"], info["std"], info.get("num_queries", 0))
@@ -1,43 +1,222 @@
 # Whisper 라이브러리를 불러옵니다
 import whisper
+import torch
 
 # import mac_settings
 import os
+import logging
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src import model_registry
+from src.audio_decode import WHISPER_SAMPLE_RATE, load_audio
+from src.batching import TranscriptionBatcher, transcribe_batch
+from src.cpu_inference import CPUInferenceProfile
+from src.decoding_profile import DecodingProfile
+from src.metrics import span
+from src.vad import SpeechTrimmer
+
+logger = logging.getLogger(__name__)
 
 
 class SpeechToText:
-    def __init__(self, model_size="base", device=None):
+    def __init__(
+        self,
+        model_size="base",
+        device=None,
+        lazy: bool = False,
+        profile: Optional[CPUInferenceProfile] = None,
+        decoding: Optional[DecodingProfile] = None,
+    ):
         """
         Initializes the Whisper model.
 
+        The model comes from the process-wide registry, so creating several
+        SpeechToText objects does not load the weights more than once.
+
         Args:
             model_size (str): The size of the Whisper model to use (e.g., 'tiny', 'base').
             device (str): The device to run the model on ('cuda' or 'cpu').
+            lazy (bool): Defer loading the model until the first transcription.
+            profile (CPUInferenceProfile): CPU optimizations (int8 quantization,
+                torch.compile) applied to the model when it is loaded.
+            decoding (DecodingProfile): Default decoding settings (fixed language,
+                greedy decoding, timestamps, token/segment budget). Individual calls
+                can override it; the default matches `model.transcribe` defaults.
+        """
+        self.model_size = model_size
+        self.device = device
+        self.profile = profile
+        self.decoding = decoding or DecodingProfile()
+        self._model: Optional[whisper.Whisper] = None
+        self._batching: Optional[Tuple[int, float]] = None
+        self.batcher: Optional[TranscriptionBatcher] = None
+        self.trimmer: Optional[SpeechTrimmer] = None
+        if not lazy:
+            self.load()
+
+    def load(self) -> whisper.Whisper:
+        """Loads the model (once) and starts the batcher if batching was enabled before loading."""
+        if self._model is None:
+            self._model = model_registry.get_whisper_model(self.model_size, self.device, self.profile)
+            logger.info("Whisper model loaded.")
+            if self._batching is not None:
+                self.batcher = TranscriptionBatcher(
+                    self._model, max_batch_size=self._batching[0], max_wait_ms=self._batching[1]
+                )
+        return self._model
+
+    @property
+    def model(self) -> whisper.Whisper:
+        """The Whisper model, loaded on first access."""
+        return self._model if self._model is not None else self.load()
+
+    @model.setter
+    def model(self, model: whisper.Whisper) -> None:
+        self._model = model
+
+    def enable_batching(self, max_batch_size: int = 8, max_wait_ms: float = 20.0):
         """
-        print(f"Loading Whisper model ({model_size})...")
-        self.model = whisper.load_model(model_size, device=device)
-        print("Whisper model loaded.")
+        Routes `transcribe` calls through a micro-batching scheduler.
 
-    def transcribe(self, audio_path: str) -> str:
+        Concurrent calls (e.g. from several inference threads) arriving within
+        `max_wait_ms` of each other are decoded together in one Whisper batch.
+        With a lazy model, the scheduler starts once the model is loaded.
+
+        Args:
+            max_batch_size (int): Maximum number of requests per batch.
+            max_wait_ms (float): How long the first request waits for others to join.
+        """
+        self._batching = (max_batch_size, max_wait_ms)
+        if self._model is not None:
+            self.batcher = TranscriptionBatcher(self._model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    def enable_vad(self, budget_seconds: float = 30.0, strategy: str = "first", num_windows: int = 3):
+        """
+        Trims silence and caps the analyzed speech before Whisper runs.
+
+        Transcription latency is then bounded by `budget_seconds` instead of the
+        upload length, and uploads without any speech return "" without running Whisper.
+
+        Args:
+            budget_seconds (float): Maximum seconds of voiced audio to transcribe.
+            strategy (str): "first" keeps the first voiced seconds; "sampled" spreads
+                `num_windows` windows across the whole recording.
+            num_windows (int): Number of windows for the "sampled" strategy.
+        """
+        self.trimmer = SpeechTrimmer(budget_seconds=budget_seconds, strategy=strategy, num_windows=num_windows)
+
+    def warm_up(self) -> None:
+        """
+        Runs one transcription of a second of silence.
+
+        The first call pays for lazy initialization (kernel selection, allocator
+        growth, mel filters), so doing it at startup keeps it off the first request.
+        """
+        self.model.transcribe(np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32), fp16=torch.cuda.is_available())
+
+    def transcribe(self, audio_path: Union[str, np.ndarray], decoding: Optional[DecodingProfile] = None) -> str:
         """
         Transcribes an audio file to text.
 
         Args:
-            audio_path (str): The path to the audio file.
+            audio_path (str | np.ndarray): The path to the audio file (decoded with the
+                shared `src.audio_decode` layer), or an already decoded 16kHz mono
+                float32 waveform.
+            decoding (DecodingProfile): Decoding settings for this call. Defaults to
+                `self.decoding`. Its segment budget applies after silence trimming.
 
         Returns:
             str: The transcribed text.
         """
-        print(f"Transcribing {audio_path}...")
+        if isinstance(audio_path, str):
+            logger.debug("Transcribing %s...", audio_path)
+        else:
+            logger.debug("Transcribing %.1fs of decoded audio...", len(audio_path) / WHISPER_SAMPLE_RATE)
         try:
-            result = self.model.transcribe(audio_path)
-            transcribed_text = result["text"]
-            print(f"Transcription complete.")
+            if isinstance(audio_path, str):
+                with span("file_decode"):
+                    audio_path = load_audio(audio_path)
+            audio = audio_path
+            if self.trimmer is not None:
+                with span("vad"):
+                    audio = self.trimmer(audio_path)
+                if len(audio) == 0:
+                    logger.info("No speech detected. Skipping transcription.")
+                    return ""
+                logger.info(
+                    "Keeping %.1fs of voiced audio (of %.1fs).",
+                    len(audio) / WHISPER_SAMPLE_RATE,
+                    len(audio_path) / WHISPER_SAMPLE_RATE,
+                )
+            decoding = decoding or self.decoding
+            audio = decoding.clip(audio)
+            model = self.load()
+            with span("whisper"):
+                if self.batcher is not None:
+                    transcribed_text = self.batcher(audio, decoding)
+                else:
+                    result = model.transcribe(audio, fp16=torch.cuda.is_available(), **decoding.transcribe_options())
+                    transcribed_text = result["text"]
+            logger.debug("Transcription complete.")
             return transcribed_text
         except Exception as e:
-            print(f"Error during transcription: {e}")
+            logger.error("Error during transcription: %s", e)
             return ""
 
+    def transcribe_many(
+        self,
+        audios: List[Union[str, np.ndarray]],
+        max_segments: int = 16,
+        decoding: Optional[DecodingProfile] = None,
+    ) -> List[str]:
+        """
+        Transcribes several clips with batched Whisper decoding.
+
+        Silence trimming and the speech budget apply per clip, and clips without
+        speech get "" without being decoded. With micro-batching enabled, the clips
+        go through the shared batcher so they never run concurrently with other requests.
+
+        Args:
+            audios: Audio file paths or decoded 16kHz mono float32 waveforms.
+            max_segments (int): Maximum number of 30-second segments per decoder call.
+            decoding (DecodingProfile): Decoding settings for these clips. Defaults to `self.decoding`.
+
+        Returns:
+            One transcript per clip, in input order ("" for silent or failed clips).
+        """
+        texts = [""] * len(audios)
+        voiced: Dict[int, Union[str, np.ndarray]] = {}
+        for i, audio in enumerate(audios):
+            if isinstance(audio, str):
+                audio = load_audio(audio)
+            if self.trimmer is None:
+                voiced[i] = audio
+                continue
+            trimmed = self.trimmer(audio)
+            if len(trimmed) > 0:
+                voiced[i] = trimmed
+        logger.info("Transcribing %d of %d clips in one batch...", len(voiced), len(audios))
+        if not voiced:
+            return texts
+
+        decoding = decoding or self.decoding
+        try:
+            model = self.load()
+            if self.batcher is not None:
+                # 다른 요청과 같은 배치 스레드를 거치도록 해서, 모델 호출이 서로 겹치지 않게 합니다.
+                futures = [self.batcher.submit(audio, decoding) for audio in voiced.values()]
+                results = [future.result() for future in futures]
+            else:
+                results = transcribe_batch(model, list(voiced.values()), max_segments=max_segments, decoding=decoding)
+        except Exception as e:
+            logger.error("Error during batch transcription: %s", e)
+            return texts
+        for i, text in zip(voiced, results):
+            texts[i] = text
+        return texts
+
 
 if __name__ == "__main__":
     # This is an example of how to use the class.
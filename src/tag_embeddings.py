@@ -0,0 +1,76 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+# 임베딩 저장소 디렉토리 안에 함께 저장되는 태그 임베딩 파일 이름
+TAG_EMBEDDINGS_FILE_NAME = "tag_embeddings.npz"
+TAG_EMBEDDINGS_FORMAT_VERSION = 1
+
+
+def tag_vocabulary(music_tags: Dict[str, List[str]]) -> List[str]:
+    """`tags.json`(파일 이름 → 태그 목록)에 등장하는 모든 태그를 중복 없이 정렬해 반환합니다."""
+    return sorted({tag for tags in music_tags.values() for tag in tags})
+
+
+class TagEmbeddings:
+    """
+    태그 어휘 전체의 CLAP 텍스트 임베딩 행렬.
+
+    DB 빌드 시 오디오 임베딩과 같은 모델로 한 번 계산해 두므로, 태그(분위기)로 들어온
+    쿼리는 서버에서 텍스트 인코더를 실행하지 않고 이 행렬의 행을 바로 사용합니다.
+    """
+
+    def __init__(self, vocab: Sequence[str], matrix: Any):
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if matrix.ndim != 2 or len(vocab) != matrix.shape[0]:
+            raise ValueError(f"Expected {len(vocab)} rows of tag embeddings, got shape {matrix.shape}.")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.vocab = list(vocab)
+        self.matrix = matrix / norms
+        self._rows = {tag: i for i, tag in enumerate(self.vocab)}
+
+    def __len__(self) -> int:
+        return len(self.vocab)
+
+    def __contains__(self, tag: str) -> bool:
+        return tag.strip() in self._rows
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    def get(self, tag: str) -> Optional[np.ndarray]:
+        """태그의 정규화된 `[D]` 임베딩. 어휘에 없으면 None."""
+        row = self._rows.get(tag.strip())
+        return None if row is None else self.matrix[row]
+
+    def save(self, store_dir: Union[str, Path]) -> None:
+        """임베딩 저장소 디렉토리 안의 `tag_embeddings.npz`로 저장합니다."""
+        store_dir = Path(store_dir)
+        path = store_dir / TAG_EMBEDDINGS_FILE_NAME
+        tmp_path = store_dir / (TAG_EMBEDDINGS_FILE_NAME + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                matrix=self.matrix,
+                info=np.array(json.dumps(
+                    {"format_version": TAG_EMBEDDINGS_FORMAT_VERSION, "vocab": self.vocab}, ensure_ascii=False
+                )),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, store_dir: Union[str, Path]) -> Optional["TagEmbeddings"]:
+        """저장소 디렉토리에서 태그 임베딩을 읽어옵니다. 파일이 없으면(예: 이전 빌드) None을 반환합니다."""
+        path = Path(store_dir) / TAG_EMBEDDINGS_FILE_NAME
+        if not path.is_file():
+            return None
+        with np.load(path) as data:
+            info = json.loads(str(data["info"]))
+            if info.get("format_version") != TAG_EMBEDDINGS_FORMAT_VERSION:
+                raise ValueError(f"Unsupported tag embeddings format: {info.get('format_version')}")
+            return cls(info["vocab"], data["matrix"])
@@ -0,0 +1,128 @@
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+from urllib.parse import unquote
+
+import numpy as np
+
+# 프로젝트 루트의 키워드/동의어 표: 태그 → 그 태그를 가리키는 키워드 목록
+KEYWORDS_FILE_NAME = "keywords.json"
+
+
+def _track_key(path: str) -> str:
+    """DB 경로(로컬 경로, S3 키)와 `tags.json`의 파일 이름을 같은 곡으로 맞추기 위한 키."""
+    return unquote(os.path.basename(path))
+
+
+class KeywordTable:
+    """
+    변환 텍스트에 등장한 키워드(동의어 포함)를 태그로 바꿉니다.
+
+    모든 키워드를 긴 것부터 하나의 정규식으로 묶어 두므로, 태그나 키워드 수와 관계없이
+    텍스트를 한 번만 훑습니다. 한국어 키워드는 활용형(예: "슬퍼요")도 잡도록 부분 문자열로,
+    영어 키워드는 단어 경계로 찾습니다. 태그 이름 자체도 키워드로 취급합니다.
+    """
+
+    def __init__(self, synonyms: Dict[str, Sequence[str]]):
+        self._tags: Dict[str, List[str]] = {}
+        for tag, keywords in synonyms.items():
+            for keyword in [tag, *keywords]:
+                keyword = keyword.strip().lower()
+                if keyword and tag not in self._tags.setdefault(keyword, []):
+                    self._tags[keyword].append(tag)
+
+        patterns = []
+        for keyword in sorted(self._tags, key=len, reverse=True):
+            escaped = re.escape(keyword)
+            patterns.append(rf"\b{escaped}\b" if keyword.isascii() else escaped)
+        self._pattern = re.compile("|".join(patterns)) if patterns else None
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike] = KEYWORDS_FILE_NAME) -> "KeywordTable":
+        """`{"태그": ["키워드", ...]}` 형식의 JSON 파일을 읽습니다."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_tags(cls, tags: Iterable[str]) -> "KeywordTable":
+        """키워드 표가 없을 때, 태그 이름만으로 매칭하는 표."""
+        return cls({tag: [] for tag in tags})
+
+    def tags_for_text(self, text: str) -> List[str]:
+        """텍스트에 등장한 키워드가 가리키는 태그들 (처음 등장한 순서, 중복 없음)."""
+        if self._pattern is None or not text:
+            return []
+        found: Dict[str, None] = {}
+        for match in self._pattern.finditer(text.lower()):
+            for tag in self._tags[match.group(0)]:
+                found.setdefault(tag, None)
+        return list(found)
+
+
+class TagIndex:
+    """
+    태그 → 곡 번호의 역색인.
+
+    곡 번호는 `names`(DB의 경로 목록 등)에서의 위치이며, `tags.json`의 파일 이름과는
+    경로의 파일 이름 부분으로 맞춥니다. 한 번 만들어 두면 태그 조회는 해당 태그를 가진 곡 수에만 비례합니다.
+    """
+
+    def __init__(self, music_tags: Dict[str, Sequence[str]], names: Optional[Sequence[str]] = None):
+        names = list(music_tags) if names is None else list(names)
+        self.size = len(names)
+        tags_by_key = {_track_key(name): tags for name, tags in music_tags.items()}
+
+        postings: Dict[str, List[int]] = {}
+        for row, name in enumerate(names):
+            for tag in tags_by_key.get(_track_key(name), ()):
+                postings.setdefault(tag, []).append(row)
+        self._postings = {tag: np.asarray(rows, dtype=np.int64) for tag, rows in postings.items()}
+
+    def __contains__(self, tag: str) -> bool:
+        return tag in self._postings
+
+    @property
+    def tags(self) -> List[str]:
+        return sorted(self._postings)
+
+    def rows(self, tag: str) -> np.ndarray:
+        return self._postings.get(tag, np.empty(0, dtype=np.int64))
+
+    def rows_for(self, tags: Iterable[str]) -> np.ndarray:
+        """태그 중 하나라도 가진 곡 번호 (정렬, 중복 없음)."""
+        postings = [self.rows(tag) for tag in tags]
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(postings))
+
+    def match_fraction(self, tags: Sequence[str]) -> np.ndarray:
+        """곡마다 `tags` 중 몇 비율을 가지고 있는지 `[size]` float32 배열로 반환합니다."""
+        counts = np.zeros(self.size, dtype=np.float32)
+        tags = list(dict.fromkeys(tags))
+        for tag in tags:
+            counts[self.rows(tag)] += 1.0
+        if tags:
+            counts /= len(tags)
+        return counts
+
+
+class HybridScorer:
+    """
+    CLAP 코사인 유사도와 태그 일치도를 섞은 점수.
+
+    `score = embedding_weight * cosine + tag_weight * (쿼리 태그 중 곡이 가진 비율)`
+    """
+
+    def __init__(self, embedding_weight: float = 1.0, tag_weight: float = 0.1):
+        self.embedding_weight = embedding_weight
+        self.tag_weight = tag_weight
+
+    def combine(self, cosine: np.ndarray, tag_match: np.ndarray) -> np.ndarray:
+        return self.embedding_weight * cosine + self.tag_weight * tag_match
+
+    def as_dict(self) -> Dict[str, float]:
+        return {"embedding_weight": self.embedding_weight, "tag_weight": self.tag_weight}
@@ -0,0 +1,158 @@
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from src.audio_decode import WHISPER_SAMPLE_RATE
+
+BUDGET_STRATEGIES = ("first", "sampled")
+
+
+def frame_energies_db(audio: np.ndarray, frame_length: int) -> np.ndarray:
+    """겹치지 않는 프레임별 RMS 에너지(dB). 마지막의 짧은 프레임은 버립니다."""
+    num_frames = len(audio) // frame_length
+    frames = np.asarray(audio[:num_frames * frame_length], dtype=np.float32).reshape(num_frames, frame_length)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(rms + 1e-10)
+
+
+def detect_speech(
+    audio: np.ndarray,
+    sample_rate: int = WHISPER_SAMPLE_RATE,
+    frame_ms: float = 30.0,
+    min_energy_db: float = -50.0,
+    margin_db: float = 12.0,
+    min_speech_ms: float = 150.0,
+    min_silence_ms: float = 300.0,
+    padding_ms: float = 100.0,
+) -> List[Tuple[int, int]]:
+    """
+    에너지 기반 음성 구간 검출.
+
+    임계값은 클립마다 정합니다. 조용한 프레임(하위 10%)의 에너지보다 `margin_db` 높은 값과,
+    큰 프레임(상위 10%)보다 `margin_db` 낮은 값 중 작은 쪽을 쓰되 `min_energy_db` 아래로는 내리지 않습니다.
+    이렇게 하면 배경 소음이 있는 녹음과 처음부터 끝까지 말하는 녹음 모두에서 동작하고,
+    완전한 무음은 구간이 하나도 나오지 않습니다.
+
+    Args:
+        audio: 모노 float32 파형.
+        sample_rate: 샘플링 레이트.
+        frame_ms: 에너지를 계산할 프레임 길이.
+        min_energy_db: 이보다 조용한 프레임은 항상 무음으로 봅니다.
+        margin_db: 적응형 임계값의 여유폭.
+        min_speech_ms: 이보다 짧은 음성 구간(클릭, 잡음)은 버립니다.
+        min_silence_ms: 이보다 짧은 무음(단어 사이 쉼)은 음성 구간에 포함합니다.
+        padding_ms: 각 음성 구간 앞뒤로 덧붙일 길이 (단어 앞뒤가 잘리지 않도록).
+
+    Returns:
+        `(시작 샘플, 끝 샘플)` 구간 리스트 (시간순, 서로 겹치지 않음).
+    """
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    energies = frame_energies_db(audio, frame_length)
+    if len(energies) == 0:
+        return []
+
+    threshold = min(np.percentile(energies, 10) + margin_db, np.percentile(energies, 90) - margin_db)
+    voiced = energies > max(threshold, min_energy_db)
+    if not voiced.any():
+        return []
+
+    # 연속된 음성 프레임 구간 [start, end)
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    min_silence_frames = min_silence_ms / frame_ms
+    merged: List[List[int]] = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if merged and start - merged[-1][1] < min_silence_frames:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    min_speech_frames = min_speech_ms / frame_ms
+    padding = int(sample_rate * padding_ms / 1000)
+    regions: List[Tuple[int, int]] = []
+    for start, end in merged:
+        if end - start < min_speech_frames:
+            continue
+        region_start = max(0, start * frame_length - padding)
+        region_end = min(len(audio), end * frame_length + padding)
+        if regions and region_start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], region_end)
+        else:
+            regions.append((region_start, region_end))
+    return regions
+
+
+def apply_budget(voiced: np.ndarray, budget_samples: int, strategy: str = "first", num_windows: int = 3) -> np.ndarray:
+    """
+    음성만 이어 붙인 파형을 `budget_samples` 이하로 줄입니다.
+
+    - "first": 앞에서부터 예산만큼.
+    - "sampled": 예산을 `num_windows`개의 창으로 나눠 전체 길이에 고르게 배치합니다.
+      긴 녹음의 앞부분만이 아니라 전체 분위기를 보게 됩니다.
+    """
+    if len(voiced) <= budget_samples:
+        return voiced
+    if strategy == "first" or num_windows <= 1:
+        return voiced[:budget_samples]
+
+    window = budget_samples // num_windows
+    starts = np.linspace(0, len(voiced) - window, num_windows).astype(int)
+    return np.concatenate([voiced[start:start + window] for start in starts])
+
+
+class SpeechTrimmer:
+    """
+    Whisper 앞에 두는 전처리 단계. 무음을 잘라 내고, 분석할 음성 길이를 예산으로 제한합니다.
+
+    Whisper 비용은 입력 길이에 비례하므로, 업로드 길이와 관계없이 변환 지연 시간이
+    `budget_seconds`로 제한됩니다. 음성이 전혀 없으면 빈 배열을 반환하며, 호출하는 쪽은
+    Whisper를 실행하지 않고 바로 끝낼 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        budget_seconds: float = 30.0,
+        strategy: str = "first",
+        num_windows: int = 3,
+        sample_rate: int = WHISPER_SAMPLE_RATE,
+        **vad_options: Any,
+    ):
+        if strategy not in BUDGET_STRATEGIES:
+            raise ValueError(f"Unknown budget strategy: {strategy} (expected one of {BUDGET_STRATEGIES})")
+        self.budget_seconds = budget_seconds
+        self.strategy = strategy
+        self.num_windows = num_windows
+        self.sample_rate = sample_rate
+        self.vad_options = vad_options
+        self.calls = 0
+        self.silent = 0
+        self.input_seconds = 0.0
+        self.output_seconds = 0.0
+
+    def __call__(self, audio: np.ndarray) -> np.ndarray:
+        """무음을 제거하고 예산 이내로 줄인 파형. 음성이 없으면 길이 0인 배열."""
+        regions = detect_speech(audio, sample_rate=self.sample_rate, **self.vad_options)
+        if regions:
+            voiced = np.concatenate([audio[start:end] for start, end in regions])
+            trimmed = apply_budget(
+                voiced, int(self.budget_seconds * self.sample_rate), self.strategy, self.num_windows
+            )
+        else:
+            trimmed = np.zeros(0, dtype=np.float32)
+
+        self.calls += 1
+        self.silent += int(len(trimmed) == 0)
+        self.input_seconds += len(audio) / self.sample_rate
+        self.output_seconds += len(trimmed) / self.sample_rate
+        return trimmed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "budget_seconds": self.budget_seconds,
+            "strategy": self.strategy,
+            "calls": self.calls,
+            "silent": self.silent,
+            "input_seconds": self.input_seconds,
+            "output_seconds": self.output_seconds,
+        }
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+IVF 근사 최근접 이웃 인덱스 검증을 위한 유닛 테스트.
+
+모든 리스트를 탐색하면 전수 검색과 같은 결과를 내는지, 저장 후 다시 읽어도
+같은 결과를 내는지, DB에 붙였을 때 `search()`가 인덱스를 사용하는지 확인합니다.
+"""
+
+import numpy as np
+import pytest
+
+from src.ann_index import IVFIndex, recall_at_k
+from src.embedding_db import EmbeddingDatabase
+from src.recommender import AudioRecommender
+
+
+@pytest.fixture
+def clustered_db():
+    """[Fixture] 군집 구조가 있는 정규화된 임베딩 2,000개로 만든 DB."""
+    rng = np.random.default_rng(42)
+    centers = rng.standard_normal((20, 64)).astype(np.float32)
+    matrix = centers[rng.integers(20, size=2000)] + 0.3 * rng.standard_normal((2000, 64)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return EmbeddingDatabase([f"path/song_{i}.mp3" for i in range(2000)], matrix)
+
+
+def test_full_probe_matches_exact_search(clustered_db):
+    """[정상 케이스] nprobe가 전체 리스트 수와 같으면 전수 검색과 결과가 같아야 합니다."""
+    index = IVFIndex.build(clustered_db.matrix, n_lists=16, iterations=5)
+    query = clustered_db.matrix[123]
+
+    _, exact = clustered_db.search(query, top_k=10, exact=True)
+    _, approx = index.search(clustered_db.matrix, query, top_k=10, nprobe=16)
+
+    assert list(approx) == list(exact)
+
+
+def test_partial_probe_has_high_recall(clustered_db):
+    """[정상 케이스] 일부 리스트만 탐색해도 군집 데이터에서는 높은 재현율을 보여야 합니다."""
+    index = IVFIndex.build(clustered_db.matrix, n_lists=16, iterations=5)
+    rng = np.random.default_rng(0)
+
+    recalls = []
+    for row in rng.integers(len(clustered_db), size=20):
+        query = clustered_db.matrix[row]
+        _, exact = clustered_db.search(query, top_k=10, exact=True)
+        _, approx = index.search(clustered_db.matrix, query, top_k=10, nprobe=4)
+        recalls.append(recall_at_k(exact, approx))
+
+    assert np.mean(recalls) >= 0.9
+
+
+def test_index_roundtrip_and_attach(tmp_path, clustered_db):
+    """[정상 케이스] 저장소에 저장한 인덱스를 다시 읽어 DB에 붙이면 `search()`가 인덱스를 사용합니다."""
+    clustered_db.save(tmp_path / "store", dtype="float32")
+    IVFIndex.build(clustered_db.matrix, n_lists=16, iterations=5).save(tmp_path / "store")
+
+    db = EmbeddingDatabase.open(tmp_path / "store")
+    db.attach_index(IVFIndex.load(tmp_path / "store", nprobe=16))
+
+    scores, indices = db.search(clustered_db.matrix[5], top_k=3)
+
+    assert indices[0] == 5
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+    assert db.index.nprobe == 16
+
+
+def test_search_batch_pads_short_probe_results(clustered_db):
+    """
+    [엣지 케이스] 탐색한 리스트의 후보가 top_k보다 적어도 배치 검색이 실패하지 않고,
+    모자란 칸을 점수 -inf, 인덱스 -1로 채우며 배치 추천은 그 칸을 버려야 합니다.
+    """
+    db = EmbeddingDatabase(clustered_db.paths[:200], clustered_db.matrix[:200])
+    index = IVFIndex.build(db.matrix, n_lists=50, iterations=5)
+    index.nprobe = 1
+    db.attach_index(index)
+    queries = db.matrix[:8]
+
+    scores, indices = db.search_batch(queries, top_k=20)
+
+    assert scores.shape == indices.shape == (8, 20)
+    assert np.any(indices == -1)
+    for query, row_scores, row_indices in zip(queries, scores, indices):
+        expected_scores, expected_indices = db.search(query, top_k=20)
+        found = row_indices >= 0
+        np.testing.assert_array_equal(row_indices[found], expected_indices)
+        np.testing.assert_allclose(row_scores[found], expected_scores, rtol=1e-5, atol=1e-6)
+        assert np.all(np.isneginf(row_scores[~found]))
+
+    recommender = AudioRecommender.__new__(AudioRecommender)
+    recommender.get_text_embeddings = lambda texts: [db.matrix[i] for i in range(len(texts))]
+    results = recommender.recommend_batch([f"query {i}" for i in range(8)], db, top_k=20)
+    for result, row_indices in zip(results, indices):
+        assert [r["file_path"] for r in result] == [db.paths[i] for i in row_indices[row_indices >= 0]]
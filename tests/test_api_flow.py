@@ -7,6 +7,7 @@ API 통합 테스트 스크립트.
 전체 시나리오를 포함하는 통합 테스트(Integration Test)입니다.
 """
 
+import json
 import pytest
 import pickle
 import torch
@@ -92,7 +93,13 @@ def test_recommend_endpoint_success(monkeypatch, test_audio_file, test_embedding
     # 이렇게 하면 실제 음성 인식 모델의 성능과 무관하게 API 흐름을 테스트할 수 있습니다.
     monkeypatch.setattr(
         "src.pipeline.SpeechToText.transcribe",
-        lambda self, audio_path: "a happy song"
+        lambda self, audio_path, decoding=None: "a happy song"
+    )
+
+    # 텍스트 임베딩(CLAP) 역시 테스트 DB와 같은 차원의 가짜 임베딩으로 대체합니다.
+    monkeypatch.setattr(
+        "src.recommender.AudioRecommender.get_text_embedding",
+        lambda self, text: torch.randn(1, 768)
     )
 
     # 실행 및 검증: `TestClient` 컨텍스트 내에서 API의 생명주기(startup/shutdown)를 관리합니다.
@@ -122,6 +129,299 @@ def test_recommend_endpoint_success(monkeypatch, test_audio_file, test_embedding
             assert "score" in first_recommendation, "각 추천 결과에는 'score' 필드가 포함되어야 합니다."
 
 
+def test_recommend_endpoint_applies_request_filters(monkeypatch, test_audio_file, test_embedding_db):
+    """
+    [필터 케이스] `/recommend/`의 `top_k`, `exclude` 폼 필드가 결과에 반영되고,
+    잘못된 목록 형식은 400으로 거절되는지 검증합니다.
+    """
+    monkeypatch.setattr("main.EMBEDDING_DB_PATH", str(test_embedding_db))
+    monkeypatch.setattr("src.pipeline.SpeechToText.transcribe", lambda self, audio_path, decoding=None: "a happy song")
+    monkeypatch.setattr(
+        "src.recommender.AudioRecommender.get_text_embedding",
+        lambda self, text: torch.randn(1, 768)
+    )
+
+    with TestClient(app) as client:
+        with open(test_audio_file, "rb") as audio_file:
+            response = client.post(
+                "/recommend/",
+                files={"file": (test_audio_file.name, audio_file, "audio/wav")},
+                data={"top_k": "2", "exclude": '["song_1.wav"]', "diversity": "0.5"},
+            )
+        assert response.status_code == 200
+        assert [r["file_path"] for r in response.json()] == ["test_music/song_2.wav"]
+
+        with open(test_audio_file, "rb") as audio_file:
+            response = client.post(
+                "/recommend/",
+                files={"file": (test_audio_file.name, audio_file, "audio/wav")},
+                data={"tags": "[1, 2]"},
+            )
+        assert response.status_code == 400
+
+
+def test_recommend_endpoint_applies_decoding_options(monkeypatch, test_audio_file, test_embedding_db):
+    """
+    [디코딩 케이스] `/recommend/`의 디코딩 필드가 프리셋 위에 덧씌워진 프로필로 변환기에 전달되고,
+    필드가 없으면 서버 기본값(None)을, 알 수 없는 프리셋은 400을 반환하는지 검증합니다.
+    """
+    monkeypatch.setattr("main.EMBEDDING_DB_PATH", str(test_embedding_db))
+    monkeypatch.setattr("main.CACHE_ENABLED", False)
+    received = []
+
+    def fake_transcribe(self, audio_path, decoding=None):
+        received.append(decoding)
+        return "a happy song"
+
+    monkeypatch.setattr("src.pipeline.SpeechToText.transcribe", fake_transcribe)
+    monkeypatch.setattr(
+        "src.recommender.AudioRecommender.get_text_embedding",
+        lambda self, text: torch.randn(1, 768)
+    )
+
+    def post(client, data):
+        with open(test_audio_file, "rb") as audio_file:
+            return client.post(
+                "/recommend/", files={"file": (test_audio_file.name, audio_file, "audio/wav")}, data=data
+            )
+
+    with TestClient(app) as client:
+        assert post(client, {}).status_code == 200
+        assert post(client, {"decoding_profile": "fast", "max_tokens": "32"}).status_code == 200
+        assert post(client, {"language": "en", "greedy": "true"}).status_code == 200
+        assert post(client, {"decoding_profile": "beam"}).status_code == 400
+        assert post(client, {"max_tokens": "1000"}).status_code == 422
+
+    assert received[0] is None
+    assert received[1].as_dict() == {
+        "language": "ko", "greedy": True, "without_timestamps": True, "max_tokens": 32, "max_segments": 1,
+    }
+    assert received[2].language == "en" and received[2].greedy and not received[2].without_timestamps
+    assert len(received) == 3
+
+
+def test_jobs_submit_poll_dedup_and_cancel(monkeypatch, test_audio_file, test_embedding_db):
+    """
+    [작업 케이스] `POST /jobs`가 작업 ID를 바로 돌려주고, 같은 오디오의 중복 제출은 진행 중인 작업에 붙으며,
+    `GET /jobs/{id}`로 결과를, `DELETE /jobs/{id}`로 대기 중인 작업 취소를 할 수 있는지 검증합니다.
+    """
+    import threading
+    import time
+
+    monkeypatch.setattr("main.EMBEDDING_DB_PATH", str(test_embedding_db))
+    release = threading.Event()
+
+    def slow_transcribe(self, audio_path, decoding=None):
+        release.wait(5)
+        return "a happy song"
+
+    monkeypatch.setattr("src.pipeline.SpeechToText.transcribe", slow_transcribe)
+    monkeypatch.setattr(
+        "src.recommender.AudioRecommender.get_text_embedding",
+        lambda self, text: torch.randn(1, 768)
+    )
+
+    def submit(client, data=None):
+        with open(test_audio_file, "rb") as audio_file:
+            return client.post(
+                "/jobs", files={"file": (test_audio_file.name, audio_file, "audio/wav")}, data=data or {}
+            )
+
+    with TestClient(app) as client:
+        first = submit(client)
+        assert first.status_code == 202
+        job_id = first.json()["job_id"]
+
+        duplicate = submit(client).json()
+        assert duplicate == {"job_id": job_id, "status": duplicate["status"], "deduplicated": True}
+
+        # 하나뿐인 워커가 첫 작업을 잡을 때까지 기다린 뒤, 대기열에 다른 작업을 넣습니다.
+        deadline = time.monotonic() + 5
+        while client.get(f"/jobs/{job_id}").json()["status"] != "running":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        other = submit(client, {"top_k": "1", "priority": "low"}).json()
+        assert not other["deduplicated"]
+        assert client.get(f"/jobs/{other['job_id']}").json()["queue_position"] == 0
+        cancelled = client.delete(f"/jobs/{other['job_id']}")
+        assert cancelled.status_code == 200 and cancelled.json()["status"] == "cancelled"
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while (body := client.get(f"/jobs/{job_id}").json())["status"] != "succeeded":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert body["attached"] == 1
+        assert {r["file_name"] for r in body["result"]} == {"song_1.wav", "song_2.wav"}
+
+        assert client.delete(f"/jobs/{job_id}").status_code == 409
+        assert client.get("/jobs/unknown").status_code == 404
+        assert submit(client, {"priority": "urgent"}).status_code == 400
+
+
+def test_presigned_urls_bulk_and_inline(monkeypatch, test_audio_file, test_embedding_db):
+    """
+    [URL 케이스] `/generate-presigned-urls/`가 여러 키를 한 번에 서명하고,
+    `/recommend/`에 `include_urls`를 주면 추천 곡마다 다운로드 URL이 함께 반환되는지 검증합니다.
+    """
+    import boto3
+
+    monkeypatch.setattr("main.EMBEDDING_DB_PATH", str(test_embedding_db))
+    monkeypatch.setattr("src.pipeline.SpeechToText.transcribe", lambda self, audio_path, decoding=None: "a happy song")
+    monkeypatch.setattr(
+        "src.recommender.AudioRecommender.get_text_embedding",
+        lambda self, text: torch.randn(1, 768)
+    )
+    # 서명은 로컬 계산이므로 가짜 자격 증명의 클라이언트로 충분합니다.
+    session = boto3.session.Session(aws_access_key_id="testing", aws_secret_access_key="testing")
+    client = session.client("s3", region_name="ap-northeast-2")
+    monkeypatch.setattr("src.presign.get_s3_client", lambda region=None, endpoint_url=None: client)
+
+    with TestClient(app) as client_app:
+        response = client_app.post(
+            "/generate-presigned-urls/", json={"keys": ["music_library/a.mp3", "music_library/b.mp3"]}
+        )
+        assert response.status_code == 200
+        urls = response.json()["urls"]
+        assert set(urls) == {"music_library/a.mp3", "music_library/b.mp3"}
+        assert "music_library/a.mp3" in urls["music_library/a.mp3"]
+
+        single = client_app.get("/generate-presigned-url/", params={"key": "music_library/a.mp3"}).json()["url"]
+        assert single == urls["music_library/a.mp3"]
+
+        with open(test_audio_file, "rb") as audio_file:
+            response = client_app.post(
+                "/recommend/",
+                files={"file": (test_audio_file.name, audio_file, "audio/wav")},
+                data={"include_urls": "true"},
+            )
+        assert response.status_code == 200
+        for recommendation in response.json():
+            assert f"music_library/{recommendation['file_name']}" in recommendation["url"]
+
+        with open(test_audio_file, "rb") as audio_file:
+            response = client_app.post("/recommend/", files={"file": (test_audio_file.name, audio_file, "audio/wav")})
+        assert all("url" not in r for r in response.json())
+
+
+def test_recommend_returns_503_when_decoder_is_missing(monkeypatch, test_audio_file, test_embedding_db):
+    """[예외 케이스] ffmpeg를 실행할 수 없으면 처리되지 않은 500 대신 503으로 응답해야 합니다."""
+    monkeypatch.setattr("main.EMBEDDING_DB_PATH", str(test_embedding_db))
+    monkeypatch.setattr("src.audio_decode.FFMPEG_BINARY", "/nonexistent/ffmpeg")
+
+    with TestClient(app) as client:
+        with open(test_audio_file, "rb") as audio_file:
+            response = client.post("/recommend/", files={"file": (test_audio_file.name, audio_file, "audio/wav")})
+
+    assert response.status_code == 503
+    assert "디코더" in response.json()["detail"]
+
+
+def test_metrics_endpoint_reports_stage_latency(monkeypatch, test_audio_file, test_embedding_db):
+    """
+    [지표 케이스] 추천 요청 뒤 `/metrics`에 단계별 지연 시간 히스토그램, 엔드포인트별 요청 수,
+    추론 대기열/캐시 지표가 Prometheus 텍스트 형식으로 나타나는지 검증합니다.
+    """
+    monkeypatch.setattr("main.EMBEDDING_DB_PATH", str(test_embedding_db))
+    monkeypatch.setattr("src.pipeline.SpeechToText.transcribe", lambda self, audio_path, decoding=None: "a happy song")
+    monkeypatch.setattr(
+        "src.recommender.AudioRecommender.get_text_embedding",
+        lambda self, text: torch.randn(1, 768)
+    )
+
+    with TestClient(app) as client:
+        with open(test_audio_file, "rb") as audio_file:
+            response = client.post("/recommend/", files={"file": (test_audio_file.name, audio_file, "audio/wav")})
+        assert response.status_code == 200
+
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    for stage in ("upload_decode", "queue_wait", "transcribe", "search"):
+        assert f'bgm_stage_seconds_bucket{{stage="{stage}",le="+Inf"}}' in text
+    assert 'bgm_requests_total{endpoint="/recommend/",status="200"}' in text
+    assert "bgm_inference_queue_depth 0" in text
+    assert 'bgm_startup_phase_seconds{phase="load_db"}' in text
+
+
+def test_recommend_batch_streams_ndjson(monkeypatch, tmp_path, test_audio_file, test_embedding_db):
+    """
+    [배치 케이스] `/recommend/batch`가 업로드 파일과 매니페스트 항목을 함께 받아,
+    항목마다 NDJSON 한 줄씩 결과(또는 오류)를 스트리밍하는지 검증합니다.
+    """
+    # 준비: 매니페스트 키를 해석할 로컬 객체 저장소에 오디오 하나를 둡니다.
+    object_root = tmp_path / "objects"
+    (object_root / "clips").mkdir(parents=True)
+    (object_root / "clips" / "clip.wav").write_bytes(test_audio_file.read_bytes())
+    monkeypatch.setattr("main.EMBEDDING_DB_PATH", str(test_embedding_db))
+    monkeypatch.setattr("main.LOCAL_OBJECT_ROOT", str(object_root))
+
+    # 변환과 텍스트 임베딩은 배치 크기에 맞춘 가짜 결과로 대체합니다.
+    monkeypatch.setattr(
+        "src.pipeline.SpeechToText.transcribe_many",
+        lambda self, audios: ["a happy song"] * len(audios)
+    )
+    monkeypatch.setattr(
+        "src.recommender.AudioRecommender.get_text_embeddings",
+        lambda self, texts: torch.randn(len(texts), 768)
+    )
+
+    manifest = '["s3://bgm-selector-bucket/clips/clip.wav", "clips/missing.wav"]'
+    with TestClient(app) as client:
+        with open(test_audio_file, "rb") as audio_file:
+            response = client.post(
+                "/recommend/batch",
+                files=[("files", (test_audio_file.name, audio_file, "audio/wav"))],
+                data={"manifest": manifest, "top_k": "1"},
+            )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    by_index = {line["index"]: line for line in lines}
+    assert sorted(by_index) == [0, 1, 2]
+    assert len(by_index[0]["recommendations"]) == 1
+    assert len(by_index[1]["recommendations"]) == 1
+    assert by_index[2]["name"] == "clips/missing.wav"
+    assert "error" in by_index[2]
+
+
+def test_live_websocket_pushes_recommendations(monkeypatch, test_embedding_db):
+    """
+    [실시간 케이스] `/recommend/live`에 PCM 조각을 보내면 변환 결과와 추천 곡이 푸시되고,
+    `stop` 이후 세션 통계와 함께 종료되는지 검증합니다.
+    """
+    monkeypatch.setattr("main.EMBEDDING_DB_PATH", str(test_embedding_db))
+    monkeypatch.setattr("main.LIVE_STEP_SECONDS", 1.0)
+    monkeypatch.setattr(
+        "src.pipeline.SpeechToText.transcribe",
+        lambda self, audio: "a calm talk about the sea"
+    )
+    monkeypatch.setattr(
+        "src.recommender.AudioRecommender.get_text_embedding",
+        lambda self, text: torch.randn(1, 768)
+    )
+
+    one_second = np.zeros(16000, dtype="<i2").tobytes()
+    with TestClient(app) as client:
+        with client.websocket_connect("/recommend/live?top_k=2") as websocket:
+            websocket.send_bytes(one_second)
+            websocket.send_bytes(one_second[:3200])
+            websocket.send_text("stop")
+            messages = []
+            while not messages or messages[-1]["type"] != "end":
+                messages.append(websocket.receive_json())
+
+    types = [m["type"] for m in messages]
+    assert types == ["transcript", "recommendations", "end"]
+    assert messages[0]["text"] == "a calm talk about the sea"
+    assert len(messages[1]["recommendations"]) == 2
+    assert messages[1]["current"] == messages[1]["recommendations"][0]
+    assert messages[2]["audio_seconds"] == pytest.approx(1.1)
+
+
 def test_server_startup_fails_if_db_not_found(monkeypatch):
     """
     [실패 케이스] 임베딩 DB 파일이 존재하지 않을 때 서버 시작이 정상적으로 실패하는지 검증합니다.
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+업로드 스트림을 ffmpeg 파이프로 바로 디코딩하는 `decode_stream`과,
+파일을 한 번만 디코딩해 여러 샘플링 레이트로 나눠 주는 공유 디코딩 계층(`decode_file`, `DecoderPool`)의 유닛 테스트.
+
+ffmpeg 실행 파일이 필요하므로, 설치되어 있지 않은 환경에서는 건너뜁니다.
+"""
+
+import io
+import shutil
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pytest
+import scipy.io.wavfile
+from scipy.signal import resample_poly
+
+from src import audio_decode
+from src.audio_decode import (
+    AudioDecodeError,
+    AudioTooLargeError,
+    DecoderPool,
+    DecoderUnavailableError,
+    decode_file,
+    decode_stream,
+    resample,
+)
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+
+def _wav_bytes(seconds: float, samplerate: int = 44100) -> bytes:
+    """[헬퍼] 440Hz 사인파 WAV 파일의 바이트를 만듭니다."""
+    t = np.arange(int(seconds * samplerate)) / samplerate
+    data = (0.5 * np.sin(2 * np.pi * 440 * t) * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    scipy.io.wavfile.write(buffer, samplerate, data)
+    return buffer.getvalue()
+
+
+def test_decode_stream_resamples_to_16khz():
+    """[정상 케이스] 44.1kHz WAV가 16kHz 모노 float32 파형으로 디코딩되어야 합니다."""
+    audio = decode_stream(io.BytesIO(_wav_bytes(2.0)))
+
+    assert audio.dtype == np.float32
+    assert abs(len(audio) - 32000) < 200
+    assert 0.4 < np.abs(audio).max() <= 1.0
+
+
+def test_decode_stream_caps_duration():
+    """[제한 케이스] `max_seconds`보다 긴 입력은 그 길이까지만 디코딩되어야 합니다."""
+    audio = decode_stream(io.BytesIO(_wav_bytes(5.0)), max_seconds=1.0)
+
+    assert abs(len(audio) - 16000) < 200
+
+
+def test_decode_stream_rejects_large_upload():
+    """[제한 케이스] `max_bytes`를 넘는 업로드는 읽는 도중에 거절되어야 합니다."""
+    with pytest.raises(AudioTooLargeError):
+        decode_stream(io.BytesIO(_wav_bytes(5.0)), max_bytes=100_000)
+
+
+def test_decode_stream_rejects_non_audio():
+    """[예외 케이스] 오디오가 아닌 입력은 `AudioDecodeError`를 발생시켜야 합니다."""
+    with pytest.raises(AudioDecodeError):
+        decode_stream(io.BytesIO(b"this is not audio" * 100))
+
+
+def test_missing_ffmpeg_raises_decoder_unavailable(monkeypatch):
+    """[예외 케이스] ffmpeg를 실행할 수 없으면 `OSError` 대신 `DecoderUnavailableError`(`AudioDecodeError`)가 발생해야 합니다."""
+    monkeypatch.setattr(audio_decode, "FFMPEG_BINARY", "/nonexistent/ffmpeg")
+
+    with pytest.raises(DecoderUnavailableError):
+        decode_stream(io.BytesIO(_wav_bytes(1.0)))
+    assert issubclass(DecoderUnavailableError, AudioDecodeError)
+
+
+def _write_wav(tmp_path: Path, name: str, seconds: float, samplerate: int = 44100) -> str:
+    """[헬퍼] 사인파 WAV 파일을 `tmp_path`에 쓰고 경로를 반환합니다."""
+    path = tmp_path / name
+    path.write_bytes(_wav_bytes(seconds, samplerate))
+    return str(path)
+
+
+def test_resample_matches_scipy_default():
+    """[정상 케이스] 캐시한 필터로 변환한 결과가 `resample_poly`의 기본 설계와 같아야 합니다."""
+    waveform = np.random.default_rng(0).standard_normal(44100).astype(np.float32)
+
+    expected = resample_poly(waveform.astype(np.float64), 160, 441)
+    result = resample(waveform, 44100, 16000)
+
+    assert result.dtype == np.float32
+    assert len(result) == len(expected) == 16000
+    assert np.max(np.abs(result - expected)) < 1e-4
+    assert resample(waveform, 16000, 16000) is waveform
+
+
+def test_decode_file_returns_every_requested_rate(tmp_path):
+    """[정상 케이스] 한 번의 디코딩으로 Whisper(16kHz)와 CLAP(48kHz) 파형을 모두 만들어야 합니다."""
+    path = _write_wav(tmp_path, "tone.wav", 2.0)
+
+    waveforms = decode_file(path, (16000, 48000))
+
+    assert set(waveforms) == {16000, 48000}
+    assert len(waveforms[16000]) == 32000
+    assert len(waveforms[48000]) == 96000
+    assert all(w.dtype == np.float32 and 0.4 < np.abs(w).max() <= 1.0 for w in waveforms.values())
+
+
+def test_decode_file_caps_duration(tmp_path):
+    """[제한 케이스] `max_seconds`보다 긴 파일은 그 길이까지만 디코딩되어야 합니다."""
+    waveforms = decode_file(_write_wav(tmp_path, "long.wav", 5.0), max_seconds=1.0)
+
+    assert len(waveforms[16000]) == 16000
+
+
+def test_decode_file_falls_back_to_ffmpeg(tmp_path, monkeypatch):
+    """[정상 케이스] libsndfile과 PyAV를 쓸 수 없으면 ffmpeg로 디코딩해 같은 길이의 파형을 돌려줘야 합니다."""
+    path = _write_wav(tmp_path, "tone.wav", 2.0)
+    monkeypatch.setattr(audio_decode, "soundfile", None)
+    monkeypatch.setattr(audio_decode, "av", None)
+
+    waveforms = decode_file(path, (16000, 48000))
+
+    assert abs(len(waveforms[16000]) - 32000) < 200
+    assert abs(len(waveforms[48000]) - 96000) < 600
+
+
+def test_decode_file_decodes_aac_in_process(tmp_path, monkeypatch):
+    """
+    [정상 케이스] PyAV가 있으면 libsndfile이 못 읽는 AAC 파일도 ffmpeg 프로세스 없이 디코딩해야 합니다.
+    (ffmpeg 기본 설정으로 만든 M4A는 moov 정보가 파일 끝에 있어, 표준 입력 파이프로는 읽을 수 없습니다.)
+    """
+    pytest.importorskip("av")
+    wav = _write_wav(tmp_path, "tone.wav", 2.0)
+    m4a = str(tmp_path / "tone.m4a")
+    subprocess.run(["ffmpeg", "-loglevel", "error", "-i", wav, "-c:a", "aac", m4a], check=True)
+
+    def no_subprocess(*args, **kwargs):
+        raise AssertionError("ffmpeg process was spawned")
+
+    monkeypatch.setattr(audio_decode, "StreamingDecoder", no_subprocess)
+    waveforms = decode_file(m4a, (16000, 48000), max_seconds=1.5)
+
+    assert len(waveforms[48000]) == 72000
+    assert abs(len(waveforms[16000]) - 24000) < 10
+    assert 0.3 < np.abs(waveforms[16000][4000:20000]).max() <= 1.0
+
+
+def test_decode_file_errors(tmp_path):
+    """[예외 케이스] 없는 파일은 `FileNotFoundError`, 오디오가 아닌 파일은 `AudioDecodeError`를 발생시켜야 합니다."""
+    with pytest.raises(FileNotFoundError):
+        decode_file(tmp_path / "missing.wav")
+
+    not_audio = tmp_path / "notes.mp3"
+    not_audio.write_bytes(b"this is not audio" * 100)
+    with pytest.raises(AudioDecodeError):
+        decode_file(not_audio)
+
+
+def test_decoder_pool_reports_each_file(tmp_path):
+    """[정상 케이스] 풀은 모든 파일의 결과를 돌려주고, 실패한 파일은 파형 대신 오류를 담아야 합니다."""
+    paths = [_write_wav(tmp_path, f"song_{i}.wav", 0.5) for i in range(5)]
+    paths.append(str(tmp_path / "missing.wav"))
+
+    with DecoderPool(2, sample_rates=(48000,), max_in_flight=2) as pool:
+        results = {Path(r.path).name: r for r in pool.imap_unordered(paths)}
+
+    assert len(results) == 6
+    assert results["missing.wav"].waveforms is None and results["missing.wav"].error
+    assert all(len(results[f"song_{i}.wav"].waveforms[48000]) == 24000 for i in range(5))
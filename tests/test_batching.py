@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+MicroBatcher가 동시에 들어온 요청을 하나의 배치로 묶고,
+결과를 요청 순서에 맞게 돌려주는지 검증하는 유닛 테스트.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.batching import MicroBatcher
+
+
+def test_concurrent_requests_share_one_batch():
+    """[정상 케이스] 대기 시간 창 안에 도착한 요청들은 한 번의 배치 호출로 처리되어야 합니다."""
+    batch_sizes = []
+
+    def process(items):
+        batch_sizes.append(len(items))
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=200)
+    barrier = threading.Barrier(4)
+
+    def request(i):
+        barrier.wait()
+        return batcher(i)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(request, range(4)))
+
+    assert results == [0, 10, 20, 30]
+    assert batch_sizes == [4]
+    assert batcher.stats()["avg_batch_size"] == 4
+
+
+def test_batch_size_is_capped():
+    """[정상 케이스] 요청이 최대 배치 크기보다 많으면 여러 배치로 나뉘어야 합니다."""
+    batch_sizes = []
+
+    def process(items):
+        batch_sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=2, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(5)]
+
+    assert [f.result(timeout=5) for f in futures] == [0, 1, 2, 3, 4]
+    assert max(batch_sizes) <= 2
+    assert sum(batch_sizes) == 5
+
+
+def test_batch_error_is_propagated_to_every_request():
+    """[예외 케이스] 배치 처리 중 예외가 나면 그 배치의 모든 요청이 같은 예외를 받아야 합니다."""
+    def process(items):
+        raise RuntimeError("decoder failed")
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=10)
+
+    with pytest.raises(RuntimeError, match="decoder failed"):
+        batcher("audio")
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+임베딩 DB 빌드 스크립트(`scripts/build_embedding_db.py`)의 배치·체크포인트 흐름 검증을 위한 유닛 테스트.
+
+CLAP 모델과 디코더 프로세스 풀은 파일 내용으로 결정되는 가짜 파형/임베딩을 돌려주는 객체로 대체합니다.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+import torch
+
+from scripts import build_embedding_db as build
+from src.ann_index import IVF_INDEX_FILE_NAME
+from src.audio_decode import CLAP_SAMPLE_RATE, DecodeResult
+from src.embedding_db import (
+    EmbeddingDatabase,
+    load_embedding_db,
+    load_manifest,
+    publish_store_version,
+    resolve_store_dir,
+)
+from src.score_calibration import REFERENCE_QUERIES, ScoreCalibration
+
+
+def _vector(content: bytes) -> np.ndarray:
+    """[헬퍼] 파일 내용으로 정해지는 8차원 가짜 파형(=임베딩)."""
+    digest = hashlib.sha256(content).digest()
+    return np.frombuffer(digest[:8], dtype=np.uint8).astype(np.float32) + 1.0
+
+
+class _FakeDecoderPool:
+    """[헬퍼] 파일 내용을 바로 가짜 파형으로 바꾸는 `DecoderPool` 대역. `fail_after`개 이후에는 풀이 깨진 것처럼 실패합니다."""
+
+    fail_after = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def imap_unordered(self, paths):
+        for i, path in enumerate(paths):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise BrokenProcessPool("A child process terminated abruptly.")
+            with open(path, "rb") as f:
+                yield DecodeResult(path, {CLAP_SAMPLE_RATE: _vector(f.read())}, None, 0.0)
+
+
+class _FakeEmbedder:
+    """[헬퍼] 파형을 그대로 임베딩으로 돌려주고 처리한 파일을 기록합니다. `interrupt_at`번째 배치에서 중단됩니다."""
+
+    def __init__(self, interrupt_at=None):
+        self.interrupt_at = interrupt_at
+        self.batches = 0
+        self.embedded = []
+
+    def __call__(self, waveforms, model, processor, device):
+        self.batches += 1
+        if self.batches == self.interrupt_at:
+            raise KeyboardInterrupt
+        self.embedded.extend(waveforms)
+        return torch.from_numpy(np.stack(waveforms))
+
+
+@pytest.fixture
+def music_dir(tmp_path, monkeypatch):
+    """[Fixture] 가짜 모델·디코더를 쓰도록 바꾼 빌드 환경과 6곡짜리 음악 디렉토리."""
+    monkeypatch.setattr(build, "_load_clap_model", lambda device: (None, None))
+    monkeypatch.setattr(build, "DecoderPool", _FakeDecoderPool)
+    monkeypatch.setattr(_FakeDecoderPool, "fail_after", None)
+    music = tmp_path / "music"
+    music.mkdir()
+    for i in range(6):
+        (music / f"song_{i}.wav").write_bytes(f"song {i}".encode())
+    return music
+
+
+def _build(music_dir, output, embedder, monkeypatch, **kwargs):
+    monkeypatch.setattr(build, "_get_audio_embeddings", embedder)
+    return build.build_embedding_database(
+        str(music_dir), str(output), dtype="float32", num_workers=1, batch_size=2,
+        tags_file=None, calibrate=False, **kwargs
+    )
+
+
+def _assert_db_matches_files(output, music_dir):
+    db = load_embedding_db(output)
+    files = sorted(str(p.resolve()) for p in music_dir.iterdir())
+    assert db.paths == files
+    expected = np.stack([_vector(open(path, "rb").read()) for path in files])
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    np.testing.assert_allclose(db.matrix, expected, rtol=1e-6)
+
+
+def test_resume_after_interruption(tmp_path, music_dir, monkeypatch):
+    """[정상 케이스] 첫 배치 이후 중단된 빌드를 다시 실행하면 남은 파일만 임베딩하고, 전체 행렬을 경로 순서대로 저장해야 합니다."""
+    output = tmp_path / "db"
+    with pytest.raises(KeyboardInterrupt):
+        _build(music_dir, output, _FakeEmbedder(interrupt_at=2), monkeypatch)
+    assert len(list((tmp_path / ("db" + build.CHECKPOINT_SUFFIX)).glob("chunk_*.npz"))) == 1
+
+    embedder = _FakeEmbedder()
+    stats = _build(music_dir, output, embedder, monkeypatch)
+
+    assert len(embedder.embedded) == 4
+    assert stats["embedded"] == 4 and stats["reused"] == 2
+    assert not (tmp_path / ("db" + build.CHECKPOINT_SUFFIX)).exists()
+    _assert_db_matches_files(output, music_dir)
+
+
+def test_resume_reembeds_files_replaced_since_checkpoint(tmp_path, music_dir, monkeypatch):
+    """[엣지 케이스] 중단과 재개 사이에 내용이 바뀐 파일은 체크포인트의 임베딩을 버리고 다시 임베딩해야 합니다."""
+    output = tmp_path / "db"
+    first = _FakeEmbedder(interrupt_at=2)
+    with pytest.raises(KeyboardInterrupt):
+        _build(music_dir, output, first, monkeypatch)
+    (music_dir / "song_0.wav").write_bytes(b"a different recording")
+
+    embedder = _FakeEmbedder()
+    _build(music_dir, output, embedder, monkeypatch)
+
+    assert len(embedder.embedded) == 5
+    _assert_db_matches_files(output, music_dir)
+
+
+def test_decoder_failure_fails_the_build(tmp_path, music_dir, monkeypatch):
+    """[예외 케이스] 디코더 풀이 깨지면 빌드가 멈추지 않고 예외로 실패하며, 이미 임베딩한 배치는 체크포인트에 남아야 합니다."""
+    monkeypatch.setattr(_FakeDecoderPool, "fail_after", 3)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(_build, music_dir, tmp_path / "db", _FakeEmbedder(), monkeypatch)
+        with pytest.raises(RuntimeError, match="Decoding failed"):
+            future.result(timeout=30)
+
+    assert not (tmp_path / "db" / "CURRENT").exists()
+    assert len(list((tmp_path / ("db" + build.CHECKPOINT_SUFFIX)).glob("chunk_*.npz"))) == 2
+
+
+def test_ann_index_is_published_with_the_version(tmp_path, music_dir, monkeypatch):
+    """[정상 케이스] `ann_index=True`로 빌드하면 IVF 인덱스가 새 버전 디렉토리에 함께 공개되어야 합니다."""
+    stats = _build(music_dir, tmp_path / "db", _FakeEmbedder(), monkeypatch, ann_index=True, ann_lists=2)
+
+    assert (tmp_path / "db" / "versions" / stats["version"] / IVF_INDEX_FILE_NAME).is_file()
+
+
+def _touch(music, name):
+    st = os.stat(music / name)
+    os.utime(music / name, (st.st_atime, st.st_mtime + 10))
+
+
+# (변경 내용, 재사용될 파일 → 이전 버전에서의 원래 파일, 새로 임베딩할 파일, 해시를 계산할 파일)
+INCREMENTAL_CASES = {
+    "unchanged": (lambda music: None, {"song_1.wav": "song_1.wav"}, [], []),
+    "touched_same_content": (
+        lambda music: _touch(music, "song_1.wav"), {"song_1.wav": "song_1.wav"}, [], ["song_1.wav"],
+    ),
+    "renamed": (
+        lambda music: os.replace(music / "song_1.wav", music / "renamed.wav"),
+        {"renamed.wav": "song_1.wav"}, [], ["renamed.wav"],
+    ),
+    "modified": (
+        lambda music: (music / "song_1.wav").write_bytes(b"a different recording"), {}, ["song_1.wav"], ["song_1.wav"],
+    ),
+    "deleted": (lambda music: (music / "song_1.wav").unlink(), {}, [], []),
+    "new": (lambda music: (music / "song_9.wav").write_bytes(b"song 9"), {}, ["song_9.wav"], ["song_9.wav"]),
+}
+
+
+@pytest.mark.parametrize("case", list(INCREMENTAL_CASES))
+def test_plan_incremental(tmp_path, music_dir, monkeypatch, case):
+    """
+    [정상 케이스] 증분 빌드 계획이 바뀌지 않은 파일은 읽지 않고 재사용하고, 수정 시각만 바뀐 파일과 이름만 바뀐 파일은
+    내용 해시로 재사용하며, 내용이 바뀐 파일과 새 파일만 임베딩 대상으로 고르는지 검증합니다.
+    """
+    mutate, expected_reused, expected_embed, expected_hashed = INCREMENTAL_CASES[case]
+    output = tmp_path / "db"
+    _build(music_dir, output, _FakeEmbedder(), monkeypatch)
+    previous_store = resolve_store_dir(output)
+    previous_db, previous_manifest = EmbeddingDatabase.open(previous_store), load_manifest(previous_store)
+
+    mutate(music_dir)
+    hashed = []
+    file_sha256 = build._file_sha256
+    monkeypatch.setattr(build, "_file_sha256", lambda path: hashed.append(os.path.basename(path)) or file_sha256(path))
+    audio_files = sorted(str(p.resolve()) for p in music_dir.iterdir())
+    manifest, reused, to_embed = build._plan_incremental(audio_files, previous_db, previous_manifest)
+
+    names = lambda paths: sorted(os.path.basename(p) for p in paths)
+    others = {n: n for n in names(audio_files) if n not in expected_embed and n not in expected_reused}
+    assert {os.path.basename(p): os.path.basename(previous_db.paths[row]) for p, row in reused.items()} == {
+        **others, **expected_reused
+    }
+    assert names(to_embed) == expected_embed
+    assert sorted(hashed) == expected_hashed
+    assert sorted(manifest) == audio_files
+
+
+def test_incremental_build_embeds_only_changes(tmp_path, music_dir, monkeypatch):
+    """[정상 케이스] 증분 빌드는 바뀐 파일만 임베딩하고, 삭제된 파일은 빼며, 결과 DB는 전체 빌드와 같아야 합니다."""
+    output = tmp_path / "db"
+    _build(music_dir, output, _FakeEmbedder(), monkeypatch)
+    (music_dir / "song_0.wav").write_bytes(b"a different recording")
+    os.replace(music_dir / "song_1.wav", music_dir / "moved.wav")
+    (music_dir / "song_2.wav").unlink()
+    (music_dir / "song_9.wav").write_bytes(b"song 9")
+
+    embedder = _FakeEmbedder()
+    stats = _build(music_dir, output, embedder, monkeypatch, incremental=True)
+
+    assert sorted(w.tobytes() for w in embedder.embedded) == sorted(
+        _vector(content).tobytes() for content in (b"a different recording", b"song 9")
+    )
+    assert stats["embedded"] == 2 and stats["reused"] == 4
+    _assert_db_matches_files(output, music_dir)
+
+
+def test_publish_prunes_old_versions(tmp_path):
+    """[정상 케이스] 새 버전을 공개하면 가장 최근 `keep_versions`개만 남기고, `CURRENT`는 마지막 버전을 가리켜야 합니다."""
+    root = tmp_path / "db"
+    db = EmbeddingDatabase.from_matrix(["path/song_0.mp3"], np.ones((1, 8), dtype=np.float32))
+    versions = [publish_store_version(root, db, {}, keep_versions=2) for _ in range(4)]
+
+    assert sorted(p.name for p in (root / "versions").iterdir()) == versions[-2:]
+    assert (root / "CURRENT").read_text(encoding="utf-8") == versions[-1]
+
+
+class _FakeTextModel:
+    """[헬퍼] 쿼리마다 무작위 8차원 텍스트 임베딩을 돌려주는 CLAP 대역."""
+
+    def get_text_features(self, input_ids):
+        return torch.from_numpy(np.random.default_rng(1).normal(size=(len(input_ids), 8)).astype(np.float32))
+
+
+def test_score_calibration_samples_large_libraries(monkeypatch):
+    """
+    [정상 케이스] 곡 수가 `CALIBRATION_MAX_TRACKS`보다 많으면 고정 시드로 뽑은 곡만으로 float32 점수 행렬을 만들어
+    메모리를 묶어 두고, 같은 DB에서는 항상 같은 분포를 만들어야 합니다. 작은 DB는 모든 곡을 씁니다.
+    """
+    monkeypatch.setattr(build, "CALIBRATION_MAX_TRACKS", 50)
+    seen = []
+    from_scores = ScoreCalibration.from_scores
+    monkeypatch.setattr(ScoreCalibration, "from_scores", lambda scores: seen.append(scores) or from_scores(scores))
+    processor = lambda text, return_tensors, padding: {"input_ids": torch.zeros(len(text), 1)}
+    rng = np.random.default_rng(0)
+    large = EmbeddingDatabase.from_matrix([f"path/song_{i}.mp3" for i in range(200)], rng.normal(size=(200, 8)))
+    small = EmbeddingDatabase.from_matrix([f"path/song_{i}.mp3" for i in range(20)], rng.normal(size=(20, 8)))
+
+    first = build._build_score_calibration(large, None, _FakeTextModel(), processor, "cpu")
+    second = build._build_score_calibration(large, None, _FakeTextModel(), processor, "cpu")
+    build._build_score_calibration(small, None, _FakeTextModel(), processor, "cpu")
+
+    assert [scores.shape for scores in seen] == [(len(REFERENCE_QUERIES), 50)] * 2 + [(len(REFERENCE_QUERIES), 20)]
+    assert seen[0].dtype == np.float32
+    np.testing.assert_array_equal(first.quantiles, second.quantiles)
+
+
+@pytest.mark.parametrize("keep_versions", [0, -1])
+def test_publish_rejects_invalid_keep_versions(tmp_path, keep_versions):
+    """[예외 케이스] `keep_versions`가 1보다 작으면 아무것도 쓰기 전에 ValueError를 발생시켜야 합니다."""
+    root = tmp_path / "db"
+    db = EmbeddingDatabase.from_matrix(["path/song_0.mp3"], np.ones((1, 8), dtype=np.float32))
+    publish_store_version(root, db, {})
+
+    with pytest.raises(ValueError):
+        publish_store_version(root, db, {}, keep_versions=keep_versions)
+
+    assert len(list((root / "versions").iterdir())) == 1
+    assert len(load_embedding_db(root)) == 1
+
+
+def test_publish_never_prunes_the_current_version(tmp_path):
+    """[엣지 케이스] 활성 버전보다 뒤로 정렬되는 버전 디렉토리가 있어도 `CURRENT`가 가리키는 버전은 삭제하지 않아야 합니다."""
+    root = tmp_path / "db"
+    for name in ("99990101-000000-000000-aaaaaaaa", "99990101-000000-000000-bbbbbbbb"):
+        (root / "versions" / name).mkdir(parents=True)
+    db = EmbeddingDatabase.from_matrix(["path/song_0.mp3"], np.ones((1, 8), dtype=np.float32))
+
+    version = publish_store_version(root, db, {}, keep_versions=2)
+
+    assert sorted(p.name for p in (root / "versions").iterdir()) == sorted([version, "99990101-000000-000000-bbbbbbbb"])
+    assert len(load_embedding_db(root)) == 1
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+결과 캐시(LRU/TTL 메모리 캐시, 워커 간 공유 디스크 캐시, 키 생성 규칙)의 유닛 테스트.
+"""
+
+import time
+import numpy as np
+
+from src.cache import MISSING, DiskCache, LRUCache, ResultCache, TieredCache, audio_fingerprint
+
+
+def test_lru_evicts_least_recently_used():
+    """[정상 케이스] 항목 수 상한을 넘으면 가장 오래 사용되지 않은 항목이 제거되어야 합니다."""
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_respects_memory_cap_and_ttl():
+    """[제한 케이스] 메모리 상한을 넘는 항목은 밀려나고, TTL이 지난 항목은 조회되지 않아야 합니다."""
+    cache = LRUCache(max_entries=100, max_bytes=2000, ttl_seconds=0.05)
+    for i in range(10):
+        cache.set(str(i), "x" * 500)
+
+    assert cache.stats()["bytes"] <= 2000
+    assert cache.get("9") == "x" * 500
+
+    time.sleep(0.1)
+    assert cache.get("9") is MISSING
+
+
+def test_disk_cache_is_shared_between_instances(tmp_path):
+    """[정상 케이스] 같은 SQLite 파일을 연 다른 인스턴스(다른 워커)가 저장된 값을 읽을 수 있어야 합니다."""
+    path = tmp_path / "cache.sqlite"
+    writer = TieredCache(LRUCache(), DiskCache(path), namespace="recommendation")
+    reader = TieredCache(LRUCache(), DiskCache(path), namespace="recommendation")
+
+    writer.set("key", [{"file_name": "song.mp3", "score": 0.5}])
+
+    assert reader.get("key") == [{"file_name": "song.mp3", "score": 0.5}]
+    assert reader.memory.get("key") == [{"file_name": "song.mp3", "score": 0.5}]
+
+
+def test_cache_keys():
+    """[키 규칙] 같은 파형은 같은 지문을, 표기만 다른 텍스트는 같은 추천 키를 가져야 합니다."""
+    audio = np.random.randn(16000).astype(np.float32)
+    assert audio_fingerprint(audio) == audio_fingerprint(audio.copy())
+    assert audio_fingerprint(audio) != audio_fingerprint(audio * 0.5)
+
+    key = ResultCache.recommendation_key("Happy  song!", "v1", 5)
+    assert key == ResultCache.recommendation_key("happy song", "v1", 5)
+    assert key != ResultCache.recommendation_key("happy song", "v2", 5)
+    assert key != ResultCache.recommendation_key("happy song", "v1", 3)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+CPU 추론 프로필(int8 동적 양자화)의 유닛 테스트.
+가중치를 내려받지 않도록 작은 크기의 Whisper 모델을 임의 가중치로 만들어 사용합니다.
+"""
+
+import pytest
+import torch
+from torch import nn
+from whisper.model import ModelDimensions, Whisper
+
+from src.cpu_inference import CPUInferenceProfile
+
+
+def _tiny_whisper() -> Whisper:
+    torch.manual_seed(0)
+    dims = ModelDimensions(
+        n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2, n_audio_layer=1,
+        n_vocab=1000, n_text_ctx=32, n_text_state=64, n_text_head=2, n_text_layer=1,
+    )
+    model = Whisper(dims).eval()
+    with torch.no_grad():
+        model.decoder.positional_embedding.normal_(0, 0.02)
+    return model
+
+
+def test_int8_profile_quantizes_every_linear_layer():
+    """[정상 케이스] Whisper의 선형 계층이 모두 동적 int8 계층으로 바뀌고, 출력은 fp32와 거의 같아야 합니다."""
+    model = _tiny_whisper()
+    mel = torch.randn(1, 80, 3000)
+    with torch.no_grad():
+        expected = model.encoder(mel)
+
+    quantized = CPUInferenceProfile(quantize="int8").optimize(model)
+
+    assert not any(isinstance(m, nn.Linear) for m in quantized.modules())
+    assert isinstance(quantized.decoder.blocks[0].attn.query, torch.ao.nn.quantized.dynamic.Linear)
+    with torch.no_grad():
+        actual = quantized.encoder(mel)
+    cosine = torch.nn.functional.cosine_similarity(actual.flatten(), expected.flatten(), dim=0)
+    assert cosine > 0.99
+
+
+def test_unknown_quantization_mode_is_rejected():
+    """[예외 케이스] 지원하지 않는 양자화 모드는 거절해야 합니다."""
+    with pytest.raises(ValueError, match="Unknown quantization mode"):
+        CPUInferenceProfile(quantize="int4")
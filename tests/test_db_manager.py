@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+EmbeddingDBManager의 무중단 DB 교체 동작을 검증하는 유닛 테스트.
+
+새 버전을 공개한 뒤 재로드하면 스냅샷이 통째로 교체되고,
+교체 전에 가져간 스냅샷은 이전 DB를 그대로 유지하는지 확인합니다.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+import torch
+
+from scripts.build_ann_index import build_ann_index
+from src.ann_index import IVF_INDEX_FILE_NAME, IVFIndex
+from src import db_manager
+from src.db_manager import EmbeddingDBManager
+from src.embedding_db import EmbeddingDatabase, load_manifest, publish_store_version
+
+
+def _publish(root, num_songs):
+    db = EmbeddingDatabase.from_pairs([(f"path/song_{i}.mp3", torch.randn(1, 32)) for i in range(num_songs)])
+    manifest = {path: {"size": 1, "mtime": 0.0, "sha256": path} for path in db.paths}
+    return publish_store_version(root, db, manifest)
+
+
+def test_reload_swaps_snapshot(tmp_path):
+    """[정상 케이스] 재로드 후 새 스냅샷이 보이고, 기존 스냅샷은 그대로 유지되어야 합니다."""
+    root = tmp_path / "store"
+    first_version = _publish(root, 3)
+    manager = EmbeddingDBManager(root)
+    old_snapshot = manager.load()
+
+    second_version = _publish(root, 5)
+    manager.load()
+
+    assert old_snapshot.version == first_version
+    assert len(old_snapshot.db) == 3
+    assert manager.current.version == second_version
+    assert manager.info()["rows"] == 5
+
+
+def test_watcher_reloads_new_version(tmp_path):
+    """[정상 케이스] 감시 스레드가 `CURRENT` 변경을 감지하고 백그라운드에서 새 버전을 로드해야 합니다."""
+    root = tmp_path / "store"
+    _publish(root, 3)
+    manager = EmbeddingDBManager(root)
+    manager.load()
+    manager.start_watcher(0.05)
+
+    try:
+        new_version = _publish(root, 4)
+        deadline = time.time() + 5
+        while manager.current.version != new_version and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        manager.stop_watcher()
+
+    assert manager.current.version == new_version
+    assert len(manager.current.db) == 4
+
+
+def test_failed_reload_keeps_previous_snapshot(tmp_path):
+    """[예외 케이스] 새 버전 로드에 실패해도 기존 스냅샷을 계속 사용해야 합니다."""
+    root = tmp_path / "store"
+    version = _publish(root, 3)
+    manager = EmbeddingDBManager(root)
+    manager.load()
+
+    (root / "CURRENT").write_text("missing-version", encoding="utf-8")
+    with pytest.raises(FileNotFoundError):
+        manager.load()
+
+    assert manager.current.version == version
+    assert manager.info()["last_error"] is not None
+
+
+def test_ivf_index_published_with_version(tmp_path):
+    """[정상 케이스] 인덱스를 붙여 공개한 버전은 ANN_INDEX=ivf 관리자가 인덱스와 함께 로드해야 합니다."""
+    root = tmp_path / "store"
+    db = EmbeddingDatabase.from_pairs([(f"path/song_{i}.mp3", torch.randn(1, 32)) for i in range(50)])
+    db.attach_index(IVFIndex.build(db.matrix, n_lists=4, iterations=3))
+    publish_store_version(root, db, {path: {"size": 1, "mtime": 0.0, "sha256": path} for path in db.paths})
+
+    snapshot = EmbeddingDBManager(root, ann_index="ivf").load()
+
+    assert snapshot.db.index is not None
+    assert snapshot.db.index.n_lists == 4
+
+
+def test_missing_ivf_index_falls_back_to_exact_search(tmp_path):
+    """[엣지 케이스] 인덱스 없이 공개된 버전도 ANN_INDEX=ivf에서 전수 검색으로 로드되어야 합니다."""
+    root = tmp_path / "store"
+    version = _publish(root, 3)
+
+    snapshot = EmbeddingDBManager(root, ann_index="ivf").load()
+
+    assert snapshot.version == version
+    assert snapshot.db.index is None
+
+
+def test_watcher_does_not_retry_failed_version(tmp_path, monkeypatch):
+    """[예외 케이스] 감시 스레드는 로드에 실패한 버전을 주기마다 다시 시도하지 않아야 합니다."""
+    root = tmp_path / "store"
+    _publish(root, 3)
+    manager = EmbeddingDBManager(root)
+    manager.load()
+    attempts = []
+    load_snapshot = manager._load_snapshot
+    monkeypatch.setattr(manager, "_load_snapshot", lambda marker: attempts.append(marker) or load_snapshot(marker))
+
+    (root / "CURRENT").write_text("missing-version", encoding="utf-8")
+    manager.start_watcher(0.02)
+    try:
+        time.sleep(0.5)
+    finally:
+        manager.stop_watcher()
+
+    assert attempts == ["missing-version"]
+    assert manager.info()["last_error"] is not None
+
+
+def test_build_ann_index_publishes_new_version(tmp_path):
+    """[정상 케이스] 버전 저장소에 인덱스를 만들면 활성 버전을 건드리지 않고 인덱스를 포함한 새 버전을 공개해야 합니다."""
+    root = tmp_path / "store"
+    old_version = _publish(root, 50)
+
+    build_ann_index(str(root), n_lists=4, iterations=3)
+
+    new_version = (root / "CURRENT").read_text(encoding="utf-8")
+    assert new_version != old_version
+    assert not (root / "versions" / old_version / IVF_INDEX_FILE_NAME).exists()
+    assert (root / "versions" / new_version / IVF_INDEX_FILE_NAME).is_file()
+    assert load_manifest(root / "versions" / new_version) == load_manifest(root / "versions" / old_version)
+    assert len(EmbeddingDBManager(root, ann_index="ivf").load().db) == 50
+
+
+def test_snapshot_marker_matches_loaded_version(tmp_path):
+    """[경합 케이스] 활성 버전을 확인한 뒤 로드 전에 새 버전이 공개되어도, 스냅샷은 확인한 버전의 DB를 담아야 합니다."""
+    root = tmp_path / "store"
+    first_version = _publish(root, 3)
+    manager = EmbeddingDBManager(root)
+    marker = manager._version_marker()
+
+    _publish(root, 5)
+    snapshot = manager._load_snapshot(marker)
+
+    assert snapshot.marker == snapshot.version == first_version
+    assert len(snapshot.db) == 3
+
+
+def test_concurrent_background_reloads_start_once(tmp_path, monkeypatch):
+    """
+    [경합 케이스] 재로드 스레드가 아직 실행되기 전이라도, 이어서 부른 `reload_in_background()`는
+    새 재로드를 시작하지 않아야 합니다.
+    """
+    root = tmp_path / "store"
+    _publish(root, 3)
+    manager = EmbeddingDBManager(root)
+    manager.load()
+    attempts = []
+    load_snapshot = manager._load_snapshot
+    monkeypatch.setattr(manager, "_load_snapshot", lambda marker: attempts.append(marker) or load_snapshot(marker))
+
+    # 재로드 스레드는 두 호출이 모두 끝난 뒤에 실행합니다.
+    deferred = []
+
+    class DeferredThread(threading.Thread):
+        def start(self):
+            deferred.append(self)
+
+    monkeypatch.setattr(db_manager, "threading", SimpleNamespace(Thread=DeferredThread))
+    started = [manager.reload_in_background(), manager.reload_in_background()]
+    for thread in deferred:
+        threading.Thread.start(thread)
+        thread.join(5)
+
+    assert started == [True, False]
+    assert len(attempts) == 1
+    assert not manager.info()["reloading"]
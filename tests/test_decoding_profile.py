@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Whisper 디코딩 프로필(`src/decoding_profile.py`)과, 프로필이 변환기·배치 스케줄러에 전달되는 방식의 유닛 테스트.
+
+모델은 호출 인자만 기록하는 가짜 객체로 대체합니다.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import whisper
+
+from src import batching
+from src.batching import TranscriptionBatcher
+from src.decoding_profile import DecodingProfile, get_profile
+from src.speech_to_text import SpeechToText
+
+
+class _RecordingModel:
+    """[헬퍼] `transcribe` 호출 인자를 기록하는 가짜 Whisper 모델."""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append((len(audio), options))
+        return {"text": "안녕하세요"}
+
+
+def test_default_profile_keeps_whisper_defaults():
+    """[정상 케이스] 기본 프로필은 `model.transcribe`에 아무 옵션도 넘기지 않고 오디오도 자르지 않아야 합니다."""
+    profile = DecodingProfile()
+    audio = np.zeros(3 * whisper.audio.N_SAMPLES, dtype=np.float32)
+
+    assert profile.transcribe_options() == {}
+    assert profile.clip(audio) is audio
+
+
+def test_fast_profile_options():
+    """[정상 케이스] 빠른 프로필은 언어 고정, 단일 온도, 타임스탬프 없음, 토큰/창 상한을 옵션으로 바꿔야 합니다."""
+    profile = get_profile("fast")
+    audio = np.zeros(3 * whisper.audio.N_SAMPLES, dtype=np.float32)
+
+    assert profile.transcribe_options() == {
+        "language": "ko", "temperature": 0.0, "without_timestamps": True, "sample_len": 128,
+    }
+    assert profile.decoding_options() == {"language": "ko", "sample_len": 128}
+    assert len(profile.clip(audio)) == whisper.audio.N_SAMPLES
+
+
+def test_replace_ignores_missing_fields():
+    """[정상 케이스] `replace`는 None이 아닌 값만 덧씌우고, 같은 설정의 프로필은 같은 키를 가져야 합니다."""
+    profile = get_profile("korean").replace(language=None, max_tokens=64)
+
+    assert profile.language == "ko" and profile.max_tokens == 64
+    assert profile == DecodingProfile(language="ko", max_tokens=64)
+    assert hash(profile) == hash(DecodingProfile(language="ko", max_tokens=64))
+
+
+@pytest.mark.parametrize("kwargs", [{"language": "klingon"}, {"max_tokens": 0}, {"max_tokens": 500}, {"max_segments": 0}])
+def test_invalid_profile_is_rejected(kwargs):
+    """[예외 케이스] 알 수 없는 언어나 범위를 벗어난 상한은 `ValueError`를 발생시켜야 합니다."""
+    with pytest.raises(ValueError):
+        DecodingProfile(**kwargs)
+
+
+def test_unknown_preset_is_rejected():
+    """[예외 케이스] 알 수 없는 프리셋 이름은 `ValueError`를 발생시켜야 합니다."""
+    with pytest.raises(ValueError):
+        get_profile("beam")
+
+
+def test_transcribe_uses_call_profile_over_default():
+    """[정상 케이스] 호출마다 준 프로필이 변환기 기본 프로필보다 우선하고, 창 상한만큼만 모델에 전달되어야 합니다."""
+    stt = SpeechToText(lazy=True, decoding=DecodingProfile(language="ko"))
+    model = _RecordingModel()
+    stt.model = model
+    audio = np.zeros(2 * whisper.audio.N_SAMPLES, dtype=np.float32)
+
+    stt.transcribe(audio)
+    stt.transcribe(audio, get_profile("fast"))
+
+    assert model.calls[0] == (2 * whisper.audio.N_SAMPLES, {"language": "ko", "fp16": False})
+    assert model.calls[1][0] == whisper.audio.N_SAMPLES
+    assert model.calls[1][1]["sample_len"] == 128
+
+
+def test_batcher_groups_requests_by_profile(monkeypatch):
+    """[정상 케이스] 한 배치에 모인 요청은 디코딩 프로필별로 나뉘어 디코딩되고, 결과는 요청 순서대로 돌아가야 합니다."""
+    calls = []
+
+    def fake_transcribe_batch(model, audios, decoding=None, **options):
+        calls.append((decoding, len(audios)))
+        return [f"{decoding.language if decoding else 'auto'}-{len(a)}" for a in audios]
+
+    monkeypatch.setattr(batching, "transcribe_batch", fake_transcribe_batch)
+    batcher = TranscriptionBatcher(model=None, max_batch_size=4, max_wait_ms=200)
+    korean = DecodingProfile(language="ko")
+    requests = [(np.zeros(1), korean), (np.zeros(2), None), (np.zeros(3), DecodingProfile(language="ko"))]
+    barrier = threading.Barrier(len(requests))
+
+    def request(args):
+        barrier.wait()
+        return batcher(*args)
+
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        results = list(pool.map(request, requests))
+
+    assert results == ["ko-1", "auto-2", "ko-3"]
+    assert sorted(calls, key=lambda c: c[1]) == [(None, 1), (korean, 2)]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+EmbeddingDatabase 저장소 형식(메모리 매핑) 검증을 위한 유닛 테스트.
+
+기존 `(경로, 텐서)` 리스트를 저장소 형식으로 저장했다가 다시 열었을 때
+경로 순서와 검색 결과가 그대로 유지되는지 확인합니다.
+"""
+
+import pickle
+import numpy as np
+import pytest
+import torch
+
+from src.embedding_db import EmbeddingDatabase, load_embedding_db, load_manifest, publish_store_version
+from src.tag_embeddings import TagEmbeddings
+
+
+@pytest.fixture
+def embedding_pairs():
+    """[Fixture] 기존 `.pkl` DB와 같은 형태의 `(경로, 텐서)` 리스트 (20개 항목)."""
+    return [(f"path/song_{i}.mp3", torch.randn(1, 512)) for i in range(20)]
+
+
+@pytest.mark.parametrize("dtype", ["float16", "float32"])
+def test_store_roundtrip_preserves_search_results(tmp_path, embedding_pairs, dtype):
+    """
+    [정상 케이스] 저장 후 다시 연 DB가 메모리 매핑 행렬을 사용하면서도
+    원본과 같은 순서의 검색 결과를 반환하는지 검증합니다.
+    """
+    original = EmbeddingDatabase.from_pairs(embedding_pairs)
+    original.save(tmp_path / "store", dtype=dtype)
+
+    reopened = EmbeddingDatabase.open(tmp_path / "store")
+
+    assert isinstance(reopened.matrix, np.memmap)
+    assert reopened.matrix.dtype == np.dtype(dtype)
+    assert reopened.paths == original.paths
+
+    query = embedding_pairs[7][1]
+    scores, indices = reopened.search(query, top_k=5)
+    expected_scores, expected_indices = original.search(query, top_k=5)
+
+    assert indices[0] == 7
+    assert list(indices) == list(expected_indices)
+    np.testing.assert_allclose(scores, expected_scores, atol=1e-2)
+
+
+def test_load_embedding_db_reads_legacy_pickle(tmp_path, embedding_pairs):
+    """
+    [호환성] `load_embedding_db`가 기존 `.pkl` 파일도 그대로 읽을 수 있는지 검증합니다.
+    """
+    pkl_path = tmp_path / "embeddings.pkl"
+    with open(pkl_path, "wb") as f:
+        pickle.dump(embedding_pairs, f)
+
+    db = load_embedding_db(pkl_path)
+
+    assert len(db) == len(embedding_pairs)
+    np.testing.assert_allclose(np.linalg.norm(db.matrix, axis=1), 1.0, atol=1e-5)
+
+
+def test_publish_store_version_switches_current(tmp_path, embedding_pairs):
+    """
+    [정상 케이스] 새 버전을 공개하면 `load_embedding_db`가 저장소 루트에서 최신 버전을 열고,
+    `keep_versions`를 넘는 오래된 버전은 삭제되는지 검증합니다.
+    """
+    root = tmp_path / "store"
+    db = EmbeddingDatabase.from_pairs(embedding_pairs)
+    manifest = {path: {"size": 1, "mtime": 0.0, "sha256": path} for path in db.paths}
+
+    versions = [publish_store_version(root, db, manifest, keep_versions=2) for _ in range(3)]
+
+    loaded = load_embedding_db(root)
+    assert loaded.version == versions[-1]
+    assert loaded.paths == db.paths
+    assert load_manifest(loaded.store_dir) == manifest
+    assert sorted(p.name for p in (root / "versions").iterdir()) == versions[1:]
+
+
+def test_tag_embeddings_are_stored_with_the_db(tmp_path, embedding_pairs):
+    """[정상 케이스] DB에 붙은 태그 어휘 임베딩이 같은 저장소에 저장되고, 열 때 함께 로드되는지 검증합니다."""
+    db = EmbeddingDatabase.from_pairs(embedding_pairs)
+    db.tag_embeddings = TagEmbeddings(["평온", "신남", "슬픔"], np.random.randn(3, 512))
+    db.save(tmp_path / "store")
+
+    reopened = EmbeddingDatabase.open(tmp_path / "store")
+
+    assert reopened.tag_embeddings.vocab == ["평온", "신남", "슬픔"]
+    assert "신남" in reopened.tag_embeddings
+    np.testing.assert_allclose(reopened.tag_embeddings.get("신남"), db.tag_embeddings.get("신남"), rtol=1e-5)
+    assert np.linalg.norm(reopened.tag_embeddings.get("신남")) == pytest.approx(1.0, abs=1e-5)
+    assert reopened.tag_embeddings.get("없는 태그") is None
+
+
+@pytest.mark.parametrize("dtype", ["float16", "float32"])
+def test_search_batch_matches_single_queries(tmp_path, embedding_pairs, dtype):
+    """[정상 케이스] 행렬-행렬 배치 검색의 결과가 쿼리별 단일 검색 결과와 같아야 합니다."""
+    EmbeddingDatabase.from_pairs(embedding_pairs).save(tmp_path / "store", dtype=dtype)
+    db = EmbeddingDatabase.open(tmp_path / "store")
+    queries = torch.randn(4, 512)
+
+    scores, indices = db.search_batch(queries, top_k=5)
+
+    assert scores.shape == indices.shape == (4, 5)
+    for query, row_scores, row_indices in zip(queries, scores, indices):
+        expected_scores, expected_indices = db.search(query, top_k=5)
+        np.testing.assert_array_equal(row_indices, expected_indices)
+        np.testing.assert_allclose(row_scores, expected_scores, rtol=1e-5, atol=1e-6)
+
+    all_scores, _ = db.search_batch(queries, top_k=100)
+    assert all_scores.shape == (4, 20)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+InferencePool의 동시 실행 제한, 대기열 초과 시 즉시 거절, 요청 취소 시 자리 반납 시점을 검증하는 유닛 테스트.
+"""
+
+import asyncio
+import threading
+import pytest
+
+from src.inference_pool import InferencePool, QueueFullError
+
+
+def test_rejects_when_workers_and_queue_are_full():
+    """
+    [과부하 케이스] 실행 중(1) + 대기 중(1)이 가득 찬 상태에서 들어온 세 번째 요청은
+    기다리지 않고 Retry-After 값과 함께 즉시 거절되어야 합니다.
+    """
+    pool = InferencePool(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait))
+        second = asyncio.ensure_future(pool.run(lambda: "done"))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(QueueFullError) as excinfo:
+            await pool.run(lambda: "rejected")
+
+        release.set()
+        return await first, await second, excinfo.value
+
+    first_result, second_result, error = asyncio.run(scenario())
+    pool.shutdown()
+
+    assert first_result is True
+    assert second_result == "done"
+    assert error.retry_after >= 1
+    assert pool.stats()["rejected"] == 1
+    assert pool.in_flight == 0
+
+
+def test_event_loop_stays_responsive_during_inference():
+    """
+    [정상 케이스] 추론이 실행되는 동안에도 이벤트 루프의 다른 코루틴이 계속 실행되어야 합니다.
+    """
+    pool = InferencePool(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        task = asyncio.ensure_future(pool.run(release.wait))
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        release.set()
+        await task
+        return ticks
+
+    assert asyncio.run(scenario()) == 5
+    pool.shutdown()
+
+
+def test_cancelled_request_holds_its_slot_until_inference_finishes():
+    """
+    [취소 케이스] 실행 중인 작업을 기다리던 요청이 취소되어도 추론 스레드는 계속 돌므로,
+    작업이 실제로 끝날 때까지 자리를 차지해 새 요청을 거절해야 합니다.
+    """
+    pool = InferencePool(max_workers=1, max_queue=0)
+    release = threading.Event()
+    finished = threading.Event()
+
+    def slow():
+        release.wait()
+        finished.set()
+
+    async def scenario():
+        task = asyncio.ensure_future(pool.run(slow))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        held = pool.in_flight
+        with pytest.raises(QueueFullError):
+            pool.check_admission()
+
+        release.set()
+        await asyncio.get_running_loop().run_in_executor(None, finished.wait)
+        await asyncio.sleep(0.05)
+        return held, await pool.run(lambda: "admitted")
+
+    try:
+        held, result = asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.shutdown()
+
+    assert held == 1
+    assert result == "admitted"
+    assert pool.in_flight == 0
+
+
+def test_cancelled_queued_request_releases_its_slot_immediately():
+    """
+    [취소 케이스] 아직 실행되지 않고 대기 중인 요청이 취소되면 작업도 함께 취소되어 자리가 바로 반납되어야 합니다.
+    """
+    pool = InferencePool(max_workers=1, max_queue=1)
+    release = threading.Event()
+    ran = []
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait))
+        queued = asyncio.ensure_future(pool.run(lambda: ran.append("queued")))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        await asyncio.sleep(0)
+
+        in_flight = pool.in_flight
+        release.set()
+        await first
+        return in_flight
+
+    assert asyncio.run(scenario()) == 1
+    pool.shutdown()
+    assert ran == []
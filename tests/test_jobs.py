@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+비동기 작업 대기열(`src/jobs.py`)의 유닛 테스트.
+
+워커가 실행하는 함수는 `threading.Event`로 멈춰 두어, 대기/실행 상태를 테스트에서 직접 조절합니다.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.inference_pool import InferencePool, QueueFullError
+from src.jobs import CANCELLED, FAILED, RUNNING, SUCCEEDED, JobQueue
+
+
+def _wait_for(predicate, timeout: float = 5.0):
+    """[헬퍼] 조건이 참이 될 때까지 기다립니다."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "조건을 기다리다 시간이 초과되었습니다."
+        time.sleep(0.005)
+
+
+def _blocked_queue(**kwargs):
+    """[헬퍼] 첫 작업이 `release`될 때까지 유일한 워커를 붙잡아 두는 대기열을 만듭니다."""
+    queue = JobQueue(workers=1, **kwargs)
+    release = threading.Event()
+    blocker, _ = queue.submit(lambda: release.wait(5) and "blocker")
+    _wait_for(lambda: blocker.status == RUNNING)
+    return queue, blocker, release
+
+
+def test_job_runs_and_stores_result():
+    """[정상 케이스] 제출한 작업은 워커에서 실행되고 결과와 시각이 기록되어야 합니다."""
+    queue = JobQueue(workers=1)
+    job, deduplicated = queue.submit(lambda: [{"file_name": "a.wav"}])
+
+    _wait_for(lambda: job.status == SUCCEEDED)
+    assert not deduplicated
+    assert queue.get(job.id).result == [{"file_name": "a.wav"}]
+    assert job.created_at <= job.started_at <= job.finished_at
+    queue.shutdown()
+
+
+def test_failed_job_reports_error():
+    """[예외 케이스] 작업 함수가 예외를 던지면 실패 상태와 오류 메시지가 남아야 합니다."""
+    queue = JobQueue(workers=1)
+
+    def broken():
+        raise RuntimeError("whisper exploded")
+
+    job, _ = queue.submit(broken)
+    _wait_for(lambda: job.status == FAILED)
+    assert job.error == "whisper exploded"
+    queue.shutdown()
+
+
+def test_priority_order_and_position():
+    """[정상 케이스] 대기 중인 작업은 우선순위 순, 같은 우선순위 안에서는 제출 순으로 실행되어야 합니다."""
+    queue, _, release = _blocked_queue()
+    order = []
+    low, _ = queue.submit(lambda: order.append("low"), priority="low")
+    normal, _ = queue.submit(lambda: order.append("normal"))
+    high, _ = queue.submit(lambda: order.append("high"), priority="high")
+
+    assert [queue.position(j) for j in (high, normal, low)] == [0, 1, 2]
+    release.set()
+    _wait_for(lambda: low.status == SUCCEEDED)
+    assert order == ["high", "normal", "low"]
+    queue.shutdown()
+
+
+def test_duplicate_key_attaches_and_raises_priority():
+    """[중복 케이스] 같은 키의 작업이 대기 중이면 새로 계산하지 않고, 더 높은 우선순위로 올려야 합니다."""
+    queue, _, release = _blocked_queue()
+    calls = []
+    first, _ = queue.submit(lambda: calls.append("first") or "result", key="abc", priority="low")
+    queue.submit(lambda: calls.append("other"))
+    again, deduplicated = queue.submit(lambda: calls.append("second"), key="abc", priority="high")
+
+    assert deduplicated and again is first
+    assert first.priority == "high" and first.attached == 1
+    assert queue.position(first) == 0
+    release.set()
+    _wait_for(lambda: queue.stats()["succeeded"] == 3)
+    assert calls == ["first", "other"]
+
+    # 끝난 작업에는 붙지 않고 새로 계산합니다.
+    third, deduplicated = queue.submit(lambda: "fresh", key="abc")
+    assert not deduplicated and third is not first
+    queue.shutdown()
+
+
+def test_cancel_queued_and_running_jobs():
+    """[취소 케이스] 대기 중인 작업은 실행되지 않고, 실행 중인 작업은 끝난 뒤 결과가 버려져야 합니다."""
+    queue, blocker, release = _blocked_queue()
+    ran = []
+    queued, _ = queue.submit(lambda: ran.append("queued"))
+
+    assert queue.cancel(queued.id).status == CANCELLED
+    assert queue.cancel(blocker.id).cancel_requested
+    assert blocker.status == RUNNING
+    release.set()
+    _wait_for(lambda: blocker.status == CANCELLED)
+    assert blocker.result is None and ran == []
+    assert queue.cancel("missing") is None
+    queue.shutdown()
+
+
+def test_queue_limit_and_unknown_priority():
+    """[제한 케이스] 대기 작업이 한도에 도달하면 `QueueFullError`, 알 수 없는 우선순위는 `ValueError`여야 합니다."""
+    queue, _, release = _blocked_queue(max_queued=1)
+    queue.submit(lambda: None)
+
+    with pytest.raises(QueueFullError):
+        queue.submit(lambda: None)
+    with pytest.raises(ValueError):
+        queue.submit(lambda: None, priority="urgent")
+    release.set()
+    queue.shutdown()
+
+
+def test_finished_jobs_expire_after_ttl(monkeypatch):
+    """[만료 케이스] 끝난 작업은 결과 보관 시간이 지나면 조회되지 않아야 합니다."""
+    queue = JobQueue(workers=1, result_ttl_seconds=60)
+    job, _ = queue.submit(lambda: "done")
+    _wait_for(lambda: job.status == SUCCEEDED)
+    finished_at = job.finished_at
+
+    monkeypatch.setattr("src.jobs.time.time", lambda: finished_at + 59)
+    assert queue.get(job.id) is job
+    monkeypatch.setattr("src.jobs.time.time", lambda: finished_at + 61)
+    assert queue.get(job.id) is None
+    assert queue.stats()["stored"] == 0
+    queue.shutdown()
+
+
+def test_shutdown_cancels_waiting_jobs():
+    """[종료 케이스] 종료하면 대기 중인 작업은 취소되고 새 작업은 받지 않아야 합니다."""
+    queue, _, release = _blocked_queue()
+    waiting, _ = queue.submit(lambda: None)
+
+    queue.shutdown()
+    release.set()
+    assert waiting.status == CANCELLED
+    with pytest.raises(RuntimeError):
+        queue.submit(lambda: None)
+
+
+def test_jobs_share_the_inference_threads():
+    """
+    [정상 케이스] `execute`로 `InferencePool.run_blocking`을 주면 작업 워커가 여럿이어도 추론은 추론 스레드 수만큼만
+    동시에 실행되고, 실행 중이거나 기다리는 작업은 동기 요청의 입장 제어에 포함되어야 합니다.
+    """
+    pool = InferencePool(max_workers=1, max_queue=1)
+    queue = JobQueue(workers=2, execute=pool.run_blocking)
+    release = threading.Event()
+    running, peak, threads = [], [], []
+
+    def work():
+        running.append(1)
+        peak.append(len(running))
+        threads.append(threading.current_thread().name)
+        release.wait(5)
+        running.pop()
+        return "done"
+
+    first, _ = queue.submit(work)
+    second, _ = queue.submit(work)
+    _wait_for(lambda: pool.in_flight == 2)
+    with pytest.raises(QueueFullError):
+        pool.check_admission()
+
+    release.set()
+    _wait_for(lambda: first.status == SUCCEEDED and second.status == SUCCEEDED)
+    assert max(peak) == 1
+    assert len(threads) == 2 and all(name.startswith("inference") for name in threads)
+    assert pool.in_flight == 0
+    queue.shutdown()
+    pool.shutdown()
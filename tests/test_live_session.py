@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+실시간 추천 세션(`src/live_session.py`)의 유닛 테스트.
+
+링 버퍼가 고정 메모리로 최근 창을 시간순으로 돌려주는지, 변환 결과가 크게 바뀔 때만 다시 검색하는지,
+히스테리시스가 곡이 자주 바뀌지 않도록 막는지 검증합니다.
+"""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.live_session import LiveSession, PCMRingBuffer, TrackHysteresis, transcript_change
+
+
+def test_ring_buffer_keeps_latest_samples_in_order():
+    """[정상 케이스] 용량을 넘겨 써도 가장 최근 샘플만 시간순으로 남고, 버퍼를 새로 할당하지 않아야 합니다."""
+    buffer = PCMRingBuffer(5)
+    storage = buffer._data
+
+    buffer.write(np.arange(3, dtype=np.float32))
+    np.testing.assert_array_equal(buffer.window(), [0, 1, 2])
+    buffer.write(np.arange(3, 7, dtype=np.float32))
+    np.testing.assert_array_equal(buffer.window(), [2, 3, 4, 5, 6])
+    buffer.write(np.arange(10, 20, dtype=np.float32))
+    np.testing.assert_array_equal(buffer.window(), [15, 16, 17, 18, 19])
+
+    assert buffer._data is storage
+    assert buffer.total_samples == 17
+
+
+def test_ring_buffer_decodes_pcm16():
+    """[정상 케이스] 16비트 PCM 바이트가 [-1, 1) 범위의 float32로 저장되어야 합니다."""
+    buffer = PCMRingBuffer(4)
+    buffer.write_pcm(np.array([0, 16384, -32768], dtype="<i2").tobytes())
+    np.testing.assert_allclose(buffer.window(), [0.0, 0.5, -1.0])
+    with pytest.raises(ValueError):
+        buffer.write_pcm(b"\x00\x00", sample_format="mp3")
+
+
+def test_transcript_change():
+    assert transcript_change("a b c d", "a b c d") == 0.0
+    assert transcript_change("", "a b") == 1.0
+    assert 0.0 < transcript_change("a b c d", "a b c e") < 0.5
+
+
+def _ranking(*scores):
+    return [{"file_name": name, "file_path": name, "score": score} for name, score in scores]
+
+
+def test_hysteresis_holds_track_until_margin_and_hold_time():
+    """[정상 케이스] 새 1위 곡은 최소 유지 시간이 지나고 점수 차가 여유폭 이상일 때만 현재 곡을 대체해야 합니다."""
+    hysteresis = TrackHysteresis(switch_margin=0.05, min_hold_seconds=10.0)
+
+    assert hysteresis.update(_ranking(("a", 0.50), ("b", 0.40)), now=0.0)
+    # 유지 시간 전에는 크게 앞서도 바꾸지 않습니다.
+    assert not hysteresis.update(_ranking(("b", 0.90), ("a", 0.40)), now=5.0)
+    # 유지 시간이 지나도 점수 차가 작으면 바꾸지 않습니다.
+    assert not hysteresis.update(_ranking(("b", 0.52), ("a", 0.50)), now=12.0)
+    assert hysteresis.current["file_path"] == "a"
+    # 현재 곡이 순위에서 빠지면 바꿉니다.
+    assert hysteresis.update(_ranking(("c", 0.60), ("b", 0.59)), now=13.0)
+    assert hysteresis.current["file_path"] == "c"
+    assert hysteresis.switches == 1
+
+
+def test_session_researches_only_on_meaningful_change():
+    """[정상 케이스] 변환 결과가 거의 같으면 DB를 다시 검색하지 않고, 크게 바뀌면 검색해야 합니다."""
+    session = LiveSession(window_seconds=2.0, step_seconds=1.0, min_change=0.3, sample_rate=100)
+    pipeline = MagicMock()
+    pipeline.speech_to_text.transcribe.side_effect = [
+        "welcome to the talk about oceans",
+        "welcome to the talk about oceans today",
+        "now let us look at volcanoes and fire",
+    ]
+    pipeline.recommender.recommend_from_db.return_value = _ranking(("calm.mp3", 0.5))
+
+    results = []
+    for _ in range(3):
+        session.feed(np.zeros(100, dtype="<i2").tobytes())
+        assert session.due()
+        results.append(session.process(session.take_window(), pipeline, embedding_db=None))
+        assert not session.due()
+
+    assert [m["type"] for m in results[0]] == ["transcript", "recommendations"]
+    assert results[1] == []
+    assert [m["type"] for m in results[2]] == ["transcript"]
+    assert pipeline.recommender.recommend_from_db.call_count == 2
+    assert len(session.buffer) == 200
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+단계별 지연 시간 지표(`src/metrics.py`)와 구조화 로그(`src/logging_config.py`)의 유닛 테스트.
+"""
+
+import json
+import logging
+
+import pytest
+
+from src.logging_config import JSONFormatter
+from src.metrics import STAGE_SECONDS, MetricsRegistry, span
+
+
+def test_histogram_renders_cumulative_buckets():
+    """[정상 케이스] 히스토그램은 누적 버킷, `_sum`, `_count`를 Prometheus 텍스트 형식으로 내보내야 합니다."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo latency.", labelnames=("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    histogram.observe(5.0, stage="a")
+
+    text = registry.render()
+
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="a",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'demo_seconds_sum{stage="a"} 5.55' in text
+    assert 'demo_seconds_count{stage="a"} 3' in text
+
+
+def test_counter_labels_and_collectors():
+    """[정상 케이스] 카운터는 레이블별로 따로 세고, 등록한 수집기의 값도 함께 내보내야 합니다."""
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_total", "Demo counter.", labelnames=("status",))
+    counter.inc(status=200)
+    counter.inc(status=200)
+    counter.inc(status=503)
+    registry.register_collector(lambda: [("demo_queue", "gauge", "Queue depth.", [({}, 4)])])
+
+    text = registry.render()
+
+    assert 'demo_total{status="200"} 2.0' in text
+    assert 'demo_total{status="503"} 1.0' in text
+    assert "demo_queue 4" in text
+    with pytest.raises(ValueError):
+        counter.inc(code=200)
+
+
+def test_span_records_stage_histogram():
+    """[정상 케이스] `span()`은 예외가 나도 해당 단계의 히스토그램에 관측값을 남겨야 합니다."""
+    before = STAGE_SECONDS.count(stage="test_stage")
+    with span("test_stage"):
+        pass
+    with pytest.raises(RuntimeError):
+        with span("test_stage"):
+            raise RuntimeError("boom")
+    assert STAGE_SECONDS.count(stage="test_stage") == before + 2
+
+
+def test_json_formatter_includes_extra_fields():
+    """[정상 케이스] JSON 로그 한 줄에 기본 필드와 `extra=`로 넘긴 필드가 함께 들어가야 합니다."""
+    record = logging.LogRecord("src.pipeline", logging.INFO, __file__, 1, "span %s", ("search",), None)
+    record.stage = "search"
+    record.seconds = 0.012
+
+    payload = json.loads(JSONFormatter().format(record))
+
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "src.pipeline"
+    assert payload["message"] == "span search"
+    assert payload["stage"] == "search"
+    assert payload["seconds"] == 0.012
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+모델 레지스트리(프로세스당 1회 로드, lazy 로드, 시작 시간 기록)의 유닛 테스트.
+실제 모델 대신 호출 횟수를 세는 가짜 로더를 사용합니다.
+"""
+
+import threading
+import numpy as np
+
+from src import model_registry
+from src.speech_to_text import SpeechToText
+
+
+def test_load_once_runs_loader_once_under_concurrency():
+    """[동시성] 여러 스레드가 같은 모델을 동시에 요청해도 로더는 한 번만 실행되어야 합니다."""
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def loader():
+        calls.append(1)
+        return object()
+
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(model_registry.load_once(("test", "concurrent"), loader, phase="test_load"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert "test_load" in model_registry.startup_timings.as_dict()
+
+
+def test_lazy_speech_to_text_loads_on_first_use(monkeypatch):
+    """[lazy 모드] 모델은 첫 변환 요청 때 로드되고, 여러 인스턴스가 같은 모델을 공유해야 합니다."""
+    loads = []
+
+    class FakeWhisper:
+        def transcribe(self, audio, **kwargs):
+            return {"text": "안녕하세요"}
+
+    shared = FakeWhisper()
+
+    def fake_get_whisper_model(model_size, device, profile=None):
+        loads.append((model_size, device))
+        return shared
+
+    monkeypatch.setattr(model_registry, "get_whisper_model", fake_get_whisper_model)
+
+    stt = SpeechToText(model_size="tiny", lazy=True)
+    assert loads == []
+
+    assert stt.transcribe(np.zeros(16000, dtype=np.float32)) == "안녕하세요"
+    assert loads == [("tiny", None)]
+
+    eager = SpeechToText(model_size="tiny")
+    assert eager.model is stt.model
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+배치 요청의 매니페스트 파싱과 S3 키를 로컬 파일로 해석하는 대역(LocalObjectStore)의 유닛 테스트.
+"""
+
+import pytest
+
+from src.object_store import LocalObjectStore, parse_manifest
+
+
+def test_parse_manifest_accepts_json_and_lines():
+    """[정상 케이스] JSON 배열과 한 줄에 하나씩 적은 형식을 모두 읽어야 합니다."""
+    assert parse_manifest('["a.mp3", " b.mp3 "]') == ["a.mp3", "b.mp3"]
+    assert parse_manifest("a.mp3\n\ns3://bucket/b.mp3\n") == ["a.mp3", "s3://bucket/b.mp3"]
+    with pytest.raises(ValueError):
+        parse_manifest('[1, 2]')
+
+
+def test_local_object_store_resolves_keys_inside_root(tmp_path):
+    """[정상/예외 케이스] 키는 루트 안의 파일로 해석되고, 루트 밖이나 다른 버킷은 거절되어야 합니다."""
+    (tmp_path / "root" / "clips").mkdir(parents=True)
+    (tmp_path / "root" / "clips" / "a.wav").write_bytes(b"RIFF")
+    (tmp_path / "secret.txt").write_text("secret")
+    store = LocalObjectStore(tmp_path / "root", bucket="bucket")
+
+    assert store.resolve("clips/a.wav") == (tmp_path / "root" / "clips" / "a.wav").resolve()
+    assert store.resolve("s3://bucket/clips/a.wav") == store.resolve("/clips/a.wav")
+    with pytest.raises(ValueError):
+        store.resolve("../secret.txt")
+    with pytest.raises(ValueError):
+        store.resolve("s3://other-bucket/clips/a.wav")
+    with pytest.raises(FileNotFoundError):
+        store.resolve("clips/missing.wav")
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+S3 다운로드 URL 서명(`src/presign.py`)의 유닛 테스트.
+
+서명은 네트워크 호출 없이 로컬에서 계산되므로, 가짜 자격 증명을 가진 실제 boto3 클라이언트를 사용합니다.
+moto가 설치되어 있으면 서명한 URL로 실제 객체를 내려받는 테스트도 실행합니다.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+import boto3
+import pytest
+
+from src import presign
+from src.presign import PresignedURLCache, get_s3_client, object_key
+
+
+@pytest.fixture
+def s3_client():
+    session = boto3.session.Session(aws_access_key_id="testing", aws_secret_access_key="testing")
+    return session.client("s3", region_name="ap-northeast-2")
+
+
+def test_shared_client_is_created_once(monkeypatch):
+    """[정상 케이스] 여러 스레드가 동시에 요청해도 클라이언트는 (리전, 엔드포인트)마다 한 번만 만들어져야 합니다."""
+    monkeypatch.setattr(presign, "_clients", {})
+    created = []
+    original = boto3.session.Session.client
+
+    def counting_client(self, *args, **kwargs):
+        created.append(kwargs.get("region_name"))
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(boto3.session.Session, "client", counting_client)
+    barrier = threading.Barrier(8)
+
+    def get(_):
+        barrier.wait()
+        return get_s3_client("ap-northeast-2")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        clients = list(pool.map(get, range(8)))
+
+    assert len({id(c) for c in clients}) == 1
+    assert created == ["ap-northeast-2"]
+    assert get_s3_client("us-east-1") is not clients[0]
+
+
+def test_cached_url_is_reused_until_refresh(monkeypatch, s3_client):
+    """[정상 케이스] 같은 키는 `reuse_seconds` 동안 같은 URL을 돌려주고, 그 뒤에는 새로 서명해야 합니다."""
+    now = [1_000_000.0]
+    monkeypatch.setattr("src.cache.time.time", lambda: now[0])
+    signed = []
+    original = s3_client.generate_presigned_url
+
+    def counting_sign(*args, **kwargs):
+        signed.append(kwargs["Params"]["Key"])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(s3_client, "generate_presigned_url", counting_sign)
+    cache = PresignedURLCache("bgm-bucket", expires_in=3600, reuse_seconds=1800, client=s3_client)
+
+    first = cache.url("music_library/Morning.mp3")
+    assert cache.url("music_library/Morning.mp3") == first
+    query = parse_qs(urlparse(first).query)
+    assert query["X-Amz-Expires"] == ["3600"]
+    assert "bgm-bucket" in first and "music_library/Morning.mp3" in first
+
+    now[0] += 1801
+    cache.url("music_library/Morning.mp3")
+    assert signed == ["music_library/Morning.mp3", "music_library/Morning.mp3"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_bulk_urls_sign_each_key_once(s3_client):
+    """[정상 케이스] 여러 키를 한 번에 요청하면 중복 키는 한 번만 서명하고 모든 키의 URL을 돌려줘야 합니다."""
+    cache = PresignedURLCache("bgm-bucket", client=s3_client)
+    urls = cache.urls(["music_library/a.mp3", "music_library/b.mp3", "music_library/a.mp3"])
+
+    assert list(urls) == ["music_library/a.mp3", "music_library/b.mp3"]
+    assert cache.stats()["misses"] == 2
+
+
+def test_reuse_window_must_be_shorter_than_expiry():
+    """[예외 케이스] 재사용 시간이 URL 유효 시간 이상이면 만료된 URL을 줄 수 있으므로 거절해야 합니다."""
+    with pytest.raises(ValueError):
+        PresignedURLCache("bgm-bucket", expires_in=3600, reuse_seconds=3600)
+
+
+def test_object_key_mapping():
+    """[정상 케이스] DB 경로는 접두사 + 파일 이름으로, `s3://` 경로는 그 키 그대로 바뀌어야 합니다."""
+    assert object_key("/app/music_library/Morning.mp3") == "music_library/Morning.mp3"
+    assert object_key("test_music/song_1.wav", prefix="songs/") == "songs/song_1.wav"
+    assert object_key("s3://bgm-bucket/library/Evening.mp3") == "library/Evening.mp3"
+
+
+def test_presigned_url_downloads_object_from_moto(monkeypatch):
+    """[통합 케이스] moto의 S3 대역에서 서명한 URL로 실제 객체를 내려받을 수 있어야 합니다."""
+    moto = pytest.importorskip("moto")
+    requests = pytest.importorskip("requests")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+
+    with moto.mock_aws():
+        client = boto3.session.Session().client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="bgm-bucket")
+        client.put_object(Bucket="bgm-bucket", Key="music_library/Morning.mp3", Body=b"ID3 audio")
+
+        url = PresignedURLCache("bgm-bucket", client=client).url("music_library/Morning.mp3")
+        response = requests.get(url)
+
+    assert response.status_code == 200
+    assert response.content == b"ID3 audio"
@@ -7,9 +7,17 @@ AudioRecommender의 추천 로직 안정성 검증을 위한 유닛 테스트.
 안정적으로 동작하는지 검증하는 데 중점을 둡니다.
 """
 
+import weakref
+
+import numpy as np
 import pytest
 import torch
+from unittest.mock import MagicMock
+from src.cache import LRUCache
+from src.embedding_db import EmbeddingDatabase
 from src.recommender import AudioRecommender
+from src.tag_embeddings import TagEmbeddings
+from src.tag_index import HybridScorer, KeywordTable
 
 @pytest.fixture
 def recommender(mocker):
@@ -91,4 +99,156 @@ def test_recommend_with_empty_db(recommender):
     적절한 예외(ValueError)를 발생시키는지 검증합니다.
     """
     with pytest.raises(ValueError, match="The provided embedding database is empty."):
-        recommender.recommend_from_db("any text", [], top_k=5) 
\ No newline at end of file
+        recommender.recommend_from_db("any text", [], top_k=5) 
+def test_recommend_ranks_by_cosine_similarity(recommender, normal_embedding_db):
+    """
+    [정상 케이스] 텍스트 임베딩과 같은 방향의 곡이 가장 높은 점수로 1위에 오고,
+    결과가 점수 내림차순으로 정렬되는지 검증합니다.
+    """
+    # 준비: 쿼리 임베딩을 3번 곡 임베딩의 스칼라 배로 설정합니다. (코사인 유사도 1)
+    query = normal_embedding_db[3][1] * 2.5
+    recommender.get_text_embedding.return_value = query
+
+    # 실행
+    recommendations = recommender.recommend_from_db("test", normal_embedding_db, top_k=3)
+
+    # 검증
+    assert recommendations[0]["file_path"] == "path/song_3.mp3"
+    assert recommendations[0]["file_name"] == "song_3.mp3"
+    assert recommendations[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    scores = [r["score"] for r in recommendations]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_tag_query_skips_text_encoder(recommender, normal_embedding_db):
+    """
+    [정상 케이스] DB에 태그 어휘 임베딩이 있으면, 태그 쿼리는 텍스트 인코더를 호출하지 않고
+    미리 계산된 행으로 검색해야 합니다.
+    """
+    # 준비: '평온' 태그 임베딩을 5번 곡과 같은 방향으로 둡니다.
+    db = EmbeddingDatabase.from_pairs(normal_embedding_db)
+    tag_matrix = np.stack([normal_embedding_db[5][1].numpy().reshape(-1), np.random.randn(768)])
+    db.tag_embeddings = TagEmbeddings(["평온", "신남"], tag_matrix)
+
+    # 실행
+    from_text = recommender.recommend_from_db("평온", db, top_k=3)
+    from_tags = recommender.recommend_from_tags(["평온"], db, top_k=3)
+
+    # 검증
+    recommender.get_text_embedding.assert_not_called()
+    assert from_text[0]["file_path"] == "path/song_5.mp3"
+    assert from_tags == from_text
+
+
+def test_text_embedding_is_memoized(recommender):
+    """[캐시] 같은 텍스트의 임베딩은 CLAP 텍스트 인코더를 한 번만 실행해야 합니다."""
+    # 준비: 가짜 CLAP 모델/프로세서를 연결하고, 모킹되지 않은 원래 메서드를 호출합니다.
+    recommender.text_embedding_cache = LRUCache(max_entries=2)
+    recommender.clap_processor = lambda text, **kwargs: {"input_ids": torch.ones(len(text), 4, dtype=torch.long)}
+    recommender.clap_model = MagicMock()
+    recommender.clap_model.get_text_features.side_effect = lambda **kwargs: torch.randn(1, 768)
+
+    # 실행
+    first = AudioRecommender.get_text_embedding(recommender, "비 오는 날")
+    second = AudioRecommender.get_text_embedding(recommender, "비 오는 날")
+
+    # 검증
+    assert torch.equal(first, second)
+    assert recommender.clap_model.get_text_features.call_count == 1
+
+
+def test_recommend_batch_matches_single_requests(recommender, normal_embedding_db):
+    """
+    [배치 케이스] 여러 텍스트를 한 번에 추천한 결과가 텍스트별 단일 추천 결과와 같고,
+    빈 텍스트(음성 없음)는 빈 결과를 받아야 합니다.
+    """
+    # 준비: 텍스트마다 서로 다른 곡 방향의 임베딩을 돌려주도록 합니다.
+    embeddings = {"첫째": normal_embedding_db[1][1], "둘째": normal_embedding_db[7][1]}
+    recommender.get_text_embedding.side_effect = lambda text: embeddings[text]
+    recommender.get_text_embeddings = MagicMock(side_effect=lambda texts: torch.cat([embeddings[t] for t in texts]))
+
+    # 실행
+    batch = recommender.recommend_batch(["첫째", "", "둘째"], normal_embedding_db, top_k=3)
+
+    # 검증
+    assert batch[1] == []
+    for text, result in (("첫째", batch[0]), ("둘째", batch[2])):
+        single = recommender.recommend_from_db(text, normal_embedding_db, top_k=3)
+        assert [r["file_path"] for r in result] == [r["file_path"] for r in single]
+    recommender.get_text_embeddings.assert_called_once_with(["첫째", "둘째"])
+
+
+@pytest.fixture
+def hybrid_recommender(recommender):
+    """[Fixture] 태그 역색인과 키워드 표를 갖춘 하이브리드 추천기. 짝수 번 곡에만 '평온' 태그가 있습니다."""
+    recommender.music_tags = {f"song_{i}.mp3": ["평온"] if i % 2 == 0 else ["신남"] for i in range(10)}
+    recommender.keyword_table = KeywordTable({"평온": ["명상"], "신남": ["파티"]})
+    recommender._tag_indexes = weakref.WeakKeyDictionary()
+    recommender.enable_hybrid(HybridScorer(embedding_weight=1.0, tag_weight=0.5))
+    return recommender
+
+
+def test_tag_filter_narrows_candidates(hybrid_recommender, normal_embedding_db):
+    """[하이브리드] 태그 필터를 주면 그 태그를 가진 곡 중에서만 추천해야 합니다."""
+    db = EmbeddingDatabase.from_pairs(normal_embedding_db)
+    hybrid_recommender.get_text_embedding.return_value = normal_embedding_db[3][1]
+
+    recommendations = hybrid_recommender.recommend_from_db("아무 말", db, top_k=10, tags=["평온"])
+
+    scores = [r["score"] for r in recommendations]
+    assert scores == sorted(scores, reverse=True)
+    assert {r["file_path"] for r in recommendations} == {f"path/song_{i}.mp3" for i in range(0, 10, 2)}
+    assert hybrid_recommender.recommend_from_db("아무 말", db, top_k=10, tags=["없는 태그"]) == []
+
+
+def test_keyword_boost_reorders_by_tags(hybrid_recommender, normal_embedding_db):
+    """[하이브리드] 텍스트의 키워드가 가리키는 태그를 가진 곡은 코사인 유사도에 가산점을 받아야 합니다."""
+    db = EmbeddingDatabase.from_pairs(normal_embedding_db)
+    hybrid_recommender.get_text_embedding.return_value = normal_embedding_db[3][1]
+
+    plain = hybrid_recommender.recommend_from_db("아무 말", db, top_k=10)
+    boosted = hybrid_recommender.recommend_from_db("오늘은 명상을 합니다", db, top_k=10)
+
+    plain_scores = {r["file_path"]: r["score"] for r in plain}
+    for r in boosted:
+        index = int(r["file_path"].split("_")[1].split(".")[0])
+        expected = plain_scores[r["file_path"]] + (0.5 if index % 2 == 0 else 0.0)
+        assert r["score"] == pytest.approx(expected, abs=1e-5)
+    assert plain[0]["file_path"] == "path/song_3.mp3"
+
+    # 배치 추천도 같은 점수 규칙을 따라야 합니다.
+    hybrid_recommender.get_text_embeddings = MagicMock(side_effect=lambda texts: normal_embedding_db[3][1].repeat(len(texts), 1))
+    batch = hybrid_recommender.recommend_batch(["오늘은 명상을 합니다", "아무 말"], db, top_k=10)
+    assert [r["file_path"] for r in batch[0]] == [r["file_path"] for r in boosted]
+    assert [r["file_path"] for r in batch[1]] == [r["file_path"] for r in plain]
+
+
+def test_exclude_and_mmr_rerank(recommender):
+    """
+    [재순위] 제외 목록의 곡은 결과에서 빠지고, 다양성 재순위(MMR)를 켜면
+    서로 거의 같은 두 곡(같은 곡의 다른 편곡)이 나란히 추천되지 않아야 합니다.
+    """
+    # 준비: 쿼리와 가장 가까운 두 곡은 서로 거의 같고, 세 번째 곡은 다른 방향입니다.
+    query = torch.zeros(1, 768)
+    query[0, 0] = 1.0
+    near = torch.zeros(1, 768)
+    near[0, 0], near[0, 1] = 1.0, 0.3
+    other = torch.zeros(1, 768)
+    other[0, 0], other[0, 2] = 1.0, 1.0
+    db = EmbeddingDatabase.from_pairs([
+        ("path/stick_a.mp3", near),
+        ("path/stick_b.mp3", near + 0.01),
+        ("path/other.mp3", other),
+        ("path/far.mp3", -query),
+    ])
+    recommender.get_text_embedding.return_value = query
+
+    # 실행
+    plain = recommender.recommend_from_db("test", db, top_k=2)
+    diverse = recommender.recommend_from_db("test", db, top_k=2, diversity=0.5)
+    excluded = recommender.recommend_from_db("test", db, top_k=2, exclude=["stick_a.mp3", "path/other.mp3"])
+
+    # 검증
+    assert {r["file_name"] for r in plain} == {"stick_a.mp3", "stick_b.mp3"}
+    assert [r["file_name"] for r in diverse][1] == "other.mp3"
+    assert [r["file_name"] for r in excluded] == ["stick_b.mp3", "far.mp3"]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+다양성 재순위(`src/rerank.py`의 MMR)의 유닛 테스트.
+"""
+
+import numpy as np
+
+from src.rerank import mmr
+
+
+def _normalized(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def test_zero_diversity_keeps_relevance_order():
+    """[정상 케이스] diversity=0이면 관련도 내림차순 그대로여야 합니다."""
+    candidates = _normalized(np.random.default_rng(0).normal(size=(6, 8)))
+    relevance = np.array([0.1, 0.9, 0.5, 0.7, 0.3, 0.2], dtype=np.float32)
+    np.testing.assert_array_equal(mmr(candidates, relevance, 3, diversity=0.0), [1, 3, 2])
+
+
+def test_near_duplicates_are_not_picked_together():
+    """[정상 케이스] 관련도가 높아도 이미 고른 곡과 거의 같은 후보는 뒤로 밀려야 합니다."""
+    candidates = _normalized([[1.0, 0.0, 0.0], [1.0, 0.01, 0.0], [0.6, 0.8, 0.0], [0.0, 0.0, 1.0]])
+    relevance = np.array([0.95, 0.94, 0.80, 0.10], dtype=np.float32)
+
+    picked = mmr(candidates, relevance, 3, diversity=0.5)
+
+    assert picked.tolist()[:2] == [0, 2]
+    assert len(set(picked.tolist())) == 3
+    assert len(mmr(candidates, relevance, 10, diversity=0.5)) == 4
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+점수 보정(`src/score_calibration.py`)과, 보정 분포를 쓰는 추천 점수·결정 여유·점진적 변환의 유닛 테스트.
+
+모델은 가짜 텍스트 임베딩과 호출을 기록하는 모의 객체로 대체합니다.
+"""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+import torch
+
+from src.embedding_db import EmbeddingDatabase
+from src.pipeline import MusicRecommendationPipeline
+from src.recommender import AudioRecommender
+from src.score_calibration import CALIBRATION_FILE_NAME, ScoreCalibration
+from src.tag_index import HybridScorer
+
+
+def _calibrated_db(num_tracks=10, dim=16, seed=0):
+    """[헬퍼] 무작위 쿼리로 점수 분포를 계산해 붙인 메모리 DB."""
+    rng = np.random.default_rng(seed)
+    db = EmbeddingDatabase.from_matrix([f"path/song_{i}.mp3" for i in range(num_tracks)], rng.normal(size=(num_tracks, dim)))
+    queries = rng.normal(size=(50, dim)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    db.calibration = ScoreCalibration.from_scores(queries @ db.matrix.T)
+    return db
+
+
+def test_calibrate_maps_scores_to_percentiles():
+    """[정상 케이스] 보정 점수는 원시 점수 순서를 유지하는 0~1 백분위이고, 분포 범위 밖은 0과 1로 고정되어야 합니다."""
+    scores = np.random.default_rng(0).normal(0.1, 0.05, size=(20, 500))
+    calibration = ScoreCalibration.from_scores(scores)
+
+    raw = np.linspace(-0.5, 0.7, 50)
+    calibrated = calibration.calibrate(raw)
+    assert np.all(np.diff(calibrated) >= 0)
+    assert calibrated[0] == 0.0 and calibrated[-1] == 1.0
+    assert calibration.calibrate(np.median(scores)) == pytest.approx(0.5, abs=0.01)
+    assert calibration.std == pytest.approx(scores.std())
+    assert calibration.num_queries == 20
+
+
+def test_invalid_calibration_is_rejected():
+    """[예외 케이스] 점수가 하나뿐이거나 분위수가 감소하면 ValueError를 발생시켜야 합니다."""
+    with pytest.raises(ValueError):
+        ScoreCalibration.from_scores([0.3])
+    with pytest.raises(ValueError):
+        ScoreCalibration([0.5, 0.2, 0.9], mean=0.5, std=0.1)
+    with pytest.raises(ValueError):
+        ScoreCalibration([0.1, 0.2], mean=0.15, std=0.0)
+
+
+def test_calibration_is_saved_with_the_store(tmp_path):
+    """[정상 케이스] 점수 분포는 임베딩 저장소와 함께 저장/로드되고, 없는 저장소(이전 빌드)에서는 None이어야 합니다."""
+    db = _calibrated_db()
+    db.save(tmp_path / "calibrated", dtype="float32")
+    db.calibration = None
+    db.save(tmp_path / "plain", dtype="float32")
+
+    loaded = EmbeddingDatabase.open(tmp_path / "calibrated")
+    assert (tmp_path / "calibrated" / CALIBRATION_FILE_NAME).is_file()
+    np.testing.assert_allclose(loaded.calibration.quantiles, _calibrated_db().calibration.quantiles)
+    assert EmbeddingDatabase.open(tmp_path / "plain").calibration is None
+
+
+@pytest.fixture
+def recommender(mocker):
+    """[Fixture] 모델 로딩 없이, 1번 곡과 같은 방향의 텍스트 임베딩을 반환하는 추천기."""
+    instance = AudioRecommender.__new__(AudioRecommender)
+    instance.device = "cpu"
+    mocker.patch.object(instance, "get_text_embedding", return_value=torch.from_numpy(_calibrated_db().matrix[1:2]))
+    return instance
+
+
+def test_calibrated_scores_keep_raw_similarity(recommender):
+    """[정상 케이스] 보정 분포가 있는 DB에서는 `score`가 보정 점수, `raw_score`가 코사인 유사도여야 합니다."""
+    db = _calibrated_db()
+    recommendations = recommender.recommend_from_db("조용한 밤", db, top_k=3)
+
+    assert recommendations[0]["file_name"] == "song_1.mp3"
+    assert recommendations[0]["raw_score"] == pytest.approx(1.0, abs=1e-5)
+    assert recommendations[0]["score"] == 1.0
+    raw = [r["raw_score"] for r in recommendations]
+    assert [r["score"] for r in recommendations] == pytest.approx(db.calibration.calibrate(raw).tolist())
+
+    db.calibration = None
+    assert "raw_score" not in recommender.recommend_from_db("조용한 밤", db, top_k=3)[0]
+
+
+def _boost_song_5(recommender, mocker):
+    """[헬퍼] 질의 텍스트의 태그가 5번 곡에만 있는 것처럼, 하이브리드 점수로 5번 곡을 크게 올리도록 설정합니다."""
+    match = np.zeros(10, dtype=np.float32)
+    match[5] = 1.0
+    recommender.enable_hybrid(HybridScorer(embedding_weight=1.0, tag_weight=2.0))
+    mocker.patch.object(recommender, "_boost_tags", return_value=["평온"])
+    mocker.patch.object(recommender, "tag_index", return_value=MagicMock(**{"match_fraction.return_value": match}))
+
+
+def test_calibration_uses_only_the_cosine_component(recommender, mocker):
+    """[정상 케이스] 태그 가중치로 순위가 오른 곡도 `score`는 코사인 유사도의 백분위이고, `raw_score`는 순위를 정한 하이브리드 점수여야 합니다."""
+    db = _calibrated_db()
+    _boost_song_5(recommender, mocker)
+
+    recommendations = recommender.recommend_from_db("조용한 밤", db, top_k=3)
+
+    boosted = recommendations[0]
+    cosine = float(db.matrix[5] @ db.matrix[1])
+    assert boosted["file_name"] == "song_5.mp3"
+    assert boosted["raw_score"] == pytest.approx(cosine + 2.0, abs=1e-5)
+    assert boosted["score"] == pytest.approx(float(db.calibration.calibrate(cosine)))
+    assert recommendations[1]["file_name"] == "song_1.mp3" and recommendations[1]["score"] == 1.0
+
+
+def test_decision_margin(recommender):
+    """[정상 케이스] 결정 여유는 k번째와 k+1번째 코사인 유사도 차이를 점수 표준편차로 나눈 값이어야 합니다."""
+    db = _calibrated_db()
+    raw = np.sort(db.matrix @ db.matrix[1])[::-1]
+
+    assert recommender.decision_margin("조용한 밤", db, top_k=2) == pytest.approx(
+        (raw[1] - raw[2]) / db.calibration.std, rel=1e-5
+    )
+    assert recommender.decision_margin("조용한 밤", db, top_k=len(db)) == float("inf")
+    db.calibration = None
+    assert recommender.decision_margin("조용한 밤", db, top_k=2) is None
+
+
+def test_decision_margin_is_undefined_for_reranked_lists(recommender, mocker):
+    """[엣지 케이스] 결과를 MMR(요청 값 또는 기본값)이나 태그 가중치로 정하는 경우에는 여유를 계산하지 않아야 합니다."""
+    db = _calibrated_db()
+
+    assert recommender.decision_margin("조용한 밤", db, top_k=2, diversity=0.3) is None
+    recommender.enable_mmr(0.3)
+    assert recommender.decision_margin("조용한 밤", db, top_k=2) is None
+    assert recommender.decision_margin("조용한 밤", db, top_k=2, diversity=0.0) is not None
+
+    _boost_song_5(recommender, mocker)
+    assert recommender.decision_margin("조용한 밤", db, top_k=2, diversity=0.0) is None
+
+
+def _progressive_pipeline(margin):
+    """[헬퍼] 변환기와 추천기를 모의 객체로 바꾼, 앞 1초 점진적 변환을 켠 파이프라인."""
+    pipeline = MusicRecommendationPipeline.__new__(MusicRecommendationPipeline)
+    pipeline.cache = None
+    pipeline.speech_to_text = MagicMock()
+    pipeline.speech_to_text.transcribe.side_effect = lambda audio, decoding=None: f"{len(audio)} samples"
+    pipeline.recommender = MagicMock()
+    pipeline.recommender.decision_margin.return_value = margin
+    pipeline.recommender.recommend_from_db.side_effect = lambda text, db, **kwargs: [
+        {"file_name": "song_0.mp3", "file_path": "path/song_0.mp3", "score": 0.9, "text": text}
+    ]
+    pipeline.enable_progressive(prefix_seconds=1.0, min_margin=0.5)
+    return pipeline
+
+
+def test_progressive_exits_early_when_confident():
+    """[정상 케이스] 앞부분 추천의 결정 여유가 충분하면 전체 오디오를 변환하지 않아야 합니다."""
+    pipeline = _progressive_pipeline(margin=2.0)
+    audio = np.zeros(5 * 16000, dtype=np.float32)
+
+    result = pipeline.run(audio, _calibrated_db(), top_k=3, diversity=0.2)
+
+    assert [len(call.args[0]) for call in pipeline.speech_to_text.transcribe.call_args_list] == [16000]
+    assert result[0]["text"] == "16000 samples"
+    assert pipeline.recommender.decision_margin.call_args.kwargs["diversity"] == 0.2
+
+
+def test_progressive_falls_back_to_full_transcript():
+    """[정상 케이스] 결정 여유가 작거나 DB에 점수 분포가 없으면 전체 오디오를 변환해 추천해야 합니다."""
+    audio = np.zeros(5 * 16000, dtype=np.float32)
+
+    pipeline = _progressive_pipeline(margin=0.1)
+    result = pipeline.run(audio, _calibrated_db(), top_k=3)
+    assert [len(call.args[0]) for call in pipeline.speech_to_text.transcribe.call_args_list] == [16000, 80000]
+    assert result[0]["text"] == "80000 samples"
+
+    pipeline = _progressive_pipeline(margin=2.0)
+    db = _calibrated_db()
+    db.calibration = None
+    pipeline.run(audio, db, top_k=3)
+    assert [len(call.args[0]) for call in pipeline.speech_to_text.transcribe.call_args_list] == [80000]
+    pipeline.recommender.decision_margin.assert_not_called()
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+태그 역색인(`TagIndex`), 키워드/동의어 표(`KeywordTable`), 하이브리드 점수(`HybridScorer`)의 유닛 테스트.
+"""
+
+import numpy as np
+
+from src.tag_index import HybridScorer, KeywordTable, TagIndex
+
+MUSIC_TAGS = {
+    "That Zen Moment.mp3": ["평온", "중립"],
+    "Boogie Party.mp3": ["파티", "밝음"],
+    "Sergio%27s Magic Dustbin.mp3": ["장난", "밝음"],
+}
+
+
+def test_keyword_table_maps_keywords_and_synonyms_to_tags():
+    """[정상 케이스] 한국어 키워드는 활용형도, 영어 키워드는 단어 단위로만 태그로 바뀌어야 합니다."""
+    table = KeywordTable({"슬픔": ["슬퍼", "sad"], "차분함": ["슬퍼"], "밝음": ["happy"]})
+
+    assert table.tags_for_text("너무 슬퍼요") == ["슬픔", "차분함"]
+    assert table.tags_for_text("A HAPPY song, not sad") == ["밝음", "슬픔"]
+    assert table.tags_for_text("crusade") == []
+    # 태그 이름 자체도 키워드입니다.
+    assert table.tags_for_text("오늘의 기분은 밝음") == ["밝음"]
+
+
+def test_tag_index_matches_db_paths_by_file_name():
+    """[정상 케이스] DB 경로(로컬/S3 키)와 tags.json 파일 이름(URL 인코딩 포함)을 같은 곡으로 맞춰야 합니다."""
+    paths = ["music_library/Boogie Party.mp3", "s3/Sergio's Magic Dustbin.mp3", "other.mp3", "./That Zen Moment.mp3"]
+    index = TagIndex(MUSIC_TAGS, paths)
+
+    np.testing.assert_array_equal(index.rows("밝음"), [0, 1])
+    np.testing.assert_array_equal(index.rows_for(["평온", "파티"]), [0, 3])
+    assert len(index.rows("없는 태그")) == 0
+    np.testing.assert_allclose(index.match_fraction(["밝음", "파티"]), [1.0, 0.5, 0.0, 0.0])
+
+
+def test_hybrid_scorer_weights():
+    scorer = HybridScorer(embedding_weight=0.5, tag_weight=0.2)
+    np.testing.assert_allclose(scorer.combine(np.array([0.4, 0.8]), np.array([1.0, 0.0])), [0.4, 0.4])
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+에너지 기반 음성 구간 검출(VAD)과 분석 예산 적용의 유닛 테스트.
+음성 대신 일정 구간에만 소리가 있는 합성 신호를 사용합니다.
+"""
+
+import numpy as np
+import pytest
+
+from src import model_registry
+from src.speech_to_text import SpeechToText
+from src.vad import SpeechTrimmer, apply_budget, detect_speech
+
+SR = 16000
+
+
+def _bursts(layout):
+    """`[(초, 소리 여부), ...]` 순서대로 잡음 구간과 아주 작은 배경 잡음 구간을 이어 붙입니다."""
+    rng = np.random.default_rng(0)
+    parts = []
+    for seconds, voiced in layout:
+        amplitude = 0.3 if voiced else 0.001
+        parts.append((rng.standard_normal(int(seconds * SR)) * amplitude).astype(np.float32))
+    return np.concatenate(parts)
+
+
+def test_silence_has_no_speech():
+    """[무음] 완전한 무음과 아주 작은 배경 잡음만 있는 녹음에서는 음성 구간이 없어야 합니다."""
+    assert detect_speech(np.zeros(SR, dtype=np.float32)) == []
+    assert len(SpeechTrimmer()(np.zeros(5 * SR, dtype=np.float32))) == 0
+
+
+def test_detects_voiced_regions_and_drops_silence():
+    """[정상 케이스] 소리 구간만 (앞뒤 여유를 두고) 검출되고, 긴 무음은 잘려 나가야 합니다."""
+    audio = _bursts([(2, False), (1, True), (3, False), (2, True), (1, False)])
+
+    regions = detect_speech(audio)
+
+    assert len(regions) == 2
+    assert regions[0][0] == pytest.approx(2 * SR, abs=0.15 * SR)
+    assert regions[0][1] == pytest.approx(3 * SR, abs=0.15 * SR)
+    assert regions[1][0] == pytest.approx(6 * SR, abs=0.15 * SR)
+    trimmed = SpeechTrimmer(budget_seconds=60)(audio)
+    assert len(trimmed) == pytest.approx(3 * SR, abs=0.5 * SR)
+
+
+def test_continuous_speech_is_kept():
+    """[연속 음성] 처음부터 끝까지 소리가 있는 녹음은 거의 그대로 유지되어야 합니다."""
+    audio = _bursts([(4, True)])
+    assert len(SpeechTrimmer(budget_seconds=60)(audio)) >= 3.9 * SR
+
+
+@pytest.mark.parametrize("strategy", ["first", "sampled"])
+def test_budget_caps_analyzed_audio(strategy):
+    """[예산] 음성이 예산보다 길면 예산 길이로 줄어들고, sampled 전략은 녹음 전체에서 고르게 가져와야 합니다."""
+    voiced = np.arange(100 * SR, dtype=np.float32)
+
+    capped = apply_budget(voiced, 10 * SR, strategy=strategy, num_windows=4)
+
+    assert len(capped) <= 10 * SR
+    assert len(capped) >= 10 * SR - 4
+    if strategy == "first":
+        assert capped[-1] == 10 * SR - 1
+    else:
+        assert capped[-1] == voiced[-1]
+
+
+def test_silent_upload_skips_whisper(monkeypatch):
+    """[단축 경로] VAD가 켜져 있으면 무음 업로드는 Whisper를 실행하지 않고 빈 텍스트를 반환해야 합니다."""
+    class FailingWhisper:
+        def transcribe(self, audio, **kwargs):
+            raise AssertionError("Whisper should not run on silence.")
+
+    monkeypatch.setattr(model_registry, "get_whisper_model", lambda *args, **kwargs: FailingWhisper())
+    stt = SpeechToText(model_size="tiny", lazy=True)
+    stt.enable_vad(budget_seconds=10)
+
+    assert stt.transcribe(np.zeros(SR, dtype=np.float32)) == ""
+    assert stt.trimmer.stats()["silent"] == 1